@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from utils.lru_cache import MISSING, TTLCache
+
+User = get_user_model()
+
+
+class HydratedUserCache:
+    """
+    Small LRU of full User rows for the few code paths that need more than
+    the token claims. Entries are dropped by the User signal receivers.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @classmethod
+    def from_settings(cls) -> "HydratedUserCache":
+        conf = getattr(settings, "STATELESS_JWT", {})
+        return cls(
+            maxsize=conf.get("USER_CACHE_MAXSIZE", 1024),
+            ttl=conf.get("USER_CACHE_TTL", 60),
+        )
+
+    def get(self, user_id):
+        user = self.local.get(user_id)
+        if user is MISSING:
+            user = User.objects.filter(pk=user_id, is_active=True).first()
+            if user is not None:
+                self.local.set(user_id, user)
+        return user
+
+    def invalidate(self, user_id) -> None:
+        self.local.delete(user_id)
+
+    def clear(self) -> None:
+        self.local.clear()
+
+
+hydrated_users = HydratedUserCache.from_settings()
+
+
+class ClaimsUser(TokenUser):
+    """
+    request.user built from verified JWT claims; `id`/`pk` need no query.
+
+    hydrate() returns the full User when a path needs fields that are not
+    in the token.
+    """
+
+    def hydrate(self):
+        """
+        Returns:
+            The User row, or None if it was deleted or deactivated.
+        """
+        return hydrated_users.get(self.id)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWTAuthentication that trusts the verified token instead of loading
+    the User row on every request.
+
+    Tokens stay valid until they expire (SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"])
+    even if the user is deactivated in the meantime; hydrate() does check
+    is_active for the paths that need it.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return ClaimsUser(validated_token)
@@ -0,0 +1,19 @@
+from rest_framework.permissions import BasePermission
+
+
+class IsStaff(BasePermission):
+    """
+    Allows staff users only.
+
+    Access tokens carry no is_staff claim, so the flag is read from the
+    hydrated User (see ClaimsUser.hydrate).
+    """
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not (user and user.is_authenticated):
+            return False
+        hydrate = getattr(user, "hydrate", None)
+        if hydrate is not None:
+            user = hydrate()
+        return bool(user and user.is_staff)
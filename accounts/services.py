@@ -1,14 +1,20 @@
 from datetime import datetime
 
 from django.conf import settings
+from rest_framework_simplejwt.exceptions import InvalidToken
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from accounts.authentication import StatelessJWTAuthentication
 from accounts.serializers import SignInSerializer, SignUpSerializer
+from monitoring.tracing import stage
 
 
 class JWTService:
     """Wrapper on top of SimpleJWT tokens with custom lifetime support."""
 
+    # stateless: validating needs no User lookup, and one instance is reused
+    authenticator = StatelessJWTAuthentication()
+
     @staticmethod
     def generate_tokens(user):
         # Create refresh & access tokens
@@ -36,12 +42,10 @@ class JWTService:
 
     @staticmethod
     def validate_token(token: str):
-        from rest_framework_simplejwt.authentication import JWTAuthentication
-
         try:
-            JWTAuthentication().get_validated_token(token)
+            JWTService.authenticator.get_validated_token(token)
             return True
-        except Exception:
+        except InvalidToken:
             return False
 
 
@@ -52,13 +56,19 @@ class AuthenticationFacadeService:
     signin_serializer_class = SignInSerializer
 
     def sign_up(self, data, context=None):
-        serializer = self.signup_serializer_class(data=data, context=context)
-        serializer.is_valid(raise_exception=True)
-        user = serializer.save()
-        return JWTService.generate_tokens(user)
+        with stage("sign_up.validate"):
+            serializer = self.signup_serializer_class(data=data, context=context)
+            serializer.is_valid(raise_exception=True)
+        with stage("sign_up.create_user"):
+            user = serializer.save()
+        with stage("sign_up.issue_tokens"):
+            return JWTService.generate_tokens(user)
 
     def sign_in(self, data, context=None):
-        serializer = self.signin_serializer_class(data=data, context=context)
-        serializer.is_valid(raise_exception=True)
-        user = serializer.validated_data["user"]
-        return JWTService.generate_tokens(user)
+        # validation authenticates, so it includes the password hash check
+        with stage("sign_in.validate"):
+            serializer = self.signin_serializer_class(data=data, context=context)
+            serializer.is_valid(raise_exception=True)
+            user = serializer.validated_data["user"]
+        with stage("sign_in.issue_tokens"):
+            return JWTService.generate_tokens(user)
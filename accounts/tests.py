@@ -1,7 +1,18 @@
+from datetime import date, datetime, time, timedelta
+
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from accounts.authentication import (
+    ClaimsUser,
+    StatelessJWTAuthentication,
+    hydrated_users,
+)
+from accounts.services import JWTService
+from reservations.models import Reservation, ReservationStatus
+from restaurant.models import Restaurant, Table
 
 User = get_user_model()
 
@@ -56,3 +67,74 @@ class SignInViewTests(APITestCase):
         self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
         # Error should mention authorization
         self.assertTrue("authorization" in str(resp.data).lower())
+
+
+class StatelessJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        hydrated_users.clear()
+        self.user = User.objects.create_user(username="alice", password="pass")
+        self.access = JWTService.generate_tokens(self.user)["access"]
+
+    def test_authenticates_from_claims_without_a_query(self):
+        request = APIRequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {self.access}"
+        )
+        with self.assertNumQueries(0):
+            user, _ = StatelessJWTAuthentication().authenticate(request)
+
+        self.assertIsInstance(user, ClaimsUser)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertTrue(user.is_authenticated)
+
+    def test_hydrate_caches_the_user_until_it_changes(self):
+        request = APIRequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {self.access}"
+        )
+        user, _ = StatelessJWTAuthentication().authenticate(request)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.hydrate(), self.user)
+        with self.assertNumQueries(0):
+            user.hydrate()
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(user.hydrate())
+
+    def test_validate_token(self):
+        self.assertTrue(JWTService.validate_token(self.access))
+        self.assertFalse(JWTService.validate_token("not-a-token"))
+
+    def test_cancel_with_token_checks_ownership_by_id(self):
+        restaurant = Restaurant.objects.create(name="R")
+        table = Table.objects.create(restaurant=restaurant, number=1, seats=4)
+        start_dt = datetime.combine(date.today() + timedelta(days=1), time(19))
+        reservation = Reservation.objects.create(
+            user=self.user,
+            table=table,
+            num_seats=2,
+            cost=30,
+            reservation_time=start_dt,
+            end_time=start_dt + timedelta(hours=1),
+        )
+        url = reverse("reservations:cancel_reservation")
+        other = User.objects.create_user(username="bob", password="pass")
+        other_access = JWTService.generate_tokens(other)["access"]
+
+        resp = self.client.post(
+            url,
+            {"reservation_id": reservation.id},
+            format="json",
+            HTTP_AUTHORIZATION=f"Bearer {other_access}",
+        )
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+        resp = self.client.post(
+            url,
+            {"reservation_id": reservation.id},
+            format="json",
+            HTTP_AUTHORIZATION=f"Bearer {self.access}",
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, ReservationStatus.CANCELLED)
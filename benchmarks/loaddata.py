@@ -0,0 +1,148 @@
+import csv
+import io
+import random
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Iterator, List, Sequence, Tuple
+
+from django.db import connection, transaction
+
+from reservations.models import Reservation, ReservationStatus
+
+# seats of generated tables and how common each size is
+TABLE_SIZES = ((4, 40), (6, 30), (8, 20), (10, 10))
+# bookable half-hour starts from 11:00 to 22:00 and the chance that a free
+# table gets booked at each: a small lunch peak and a large dinner peak
+FIRST_SLOT = time(11)
+LUNCH_WEIGHTS = (0.05, 0.10, 0.25, 0.30, 0.25, 0.10, 0.05)  # 11:00-14:00
+AFTERNOON_WEIGHTS = (0.02, 0.02, 0.02, 0.03, 0.05, 0.08)  # 14:30-17:00
+DINNER_WEIGHTS = (0.15, 0.30, 0.45, 0.60, 0.60, 0.45, 0.30, 0.15, 0.08, 0.05)
+SLOT_WEIGHTS = LUNCH_WEIGHTS + AFTERNOON_WEIGHTS + DINNER_WEIGHTS
+# Monday..Sunday demand relative to a Thursday
+WEEKDAY_DEMAND = (0.6, 0.7, 0.8, 1.0, 1.4, 1.5, 1.1)
+# (duration in half hours, weight): lunches are short, dinners long
+LUNCH_DURATIONS = ((2, 50), (3, 35), (4, 15))
+DINNER_DURATIONS = ((3, 20), (4, 45), (5, 20), (6, 15))
+DINNER_FROM_SLOT = len(LUNCH_WEIGHTS) + len(AFTERNOON_WEIGHTS)
+SEAT_PRICE = 10
+
+# (user_id, table_id, num_seats, cost, status, reservation_time, end_time)
+Row = Tuple[int, int, int, Decimal, str, datetime, datetime]
+
+
+def table_seats(rng: random.Random, count: int) -> List[int]:
+    sizes, weights = zip(*TABLE_SIZES)
+    return rng.choices(sizes, weights, k=count)
+
+
+def generate_reservations(
+    rng: random.Random,
+    tables: Sequence[Tuple[int, int]],
+    user_ids: Sequence[int],
+    first_day: date,
+    days: int,
+    occupancy: float = 1.0,
+    cancel_rate: float = 0.08,
+) -> Iterator[Row]:
+    """
+    Yield reservations day by day, walking each table's day in half-hour
+    steps and booking it with SLOT_WEIGHTS x WEEKDAY_DEMAND x occupancy
+    probability while it is free. CONFIRMED rows of a table never overlap.
+
+    A few users book much more often than the rest, and parties mostly
+    fill their table. The same rng state yields the same rows.
+
+    Args:
+        tables: (table_id, seats) pairs.
+    """
+    durations = {
+        slot: list(
+            zip(*(DINNER_DURATIONS if slot >= DINNER_FROM_SLOT else LUNCH_DURATIONS))
+        )
+        for slot in range(len(SLOT_WEIGHTS))
+    }
+    confirmed, cancelled = ReservationStatus.CONFIRMED, ReservationStatus.CANCELLED
+    random_, choices = rng.random, rng.choices
+    users = len(user_ids)
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        opening = datetime.combine(day, FIRST_SLOT)
+        demand = WEEKDAY_DEMAND[day.weekday()] * occupancy
+        chances = [weight * demand for weight in SLOT_WEIGHTS]
+        for table_id, seats in tables:
+            slot = 0
+            while slot < len(chances):
+                if random_() >= chances[slot]:
+                    slot += 1
+                    continue
+                length = choices(*durations[slot])[0]
+                party = seats - int(random_() * min(seats, 4))
+                units = party if party < seats else seats - 1
+                start = opening + timedelta(minutes=30 * slot)
+                yield (
+                    # squaring skews bookings towards the first users
+                    user_ids[int(users * random_() ** 2)],
+                    table_id,
+                    party,
+                    Decimal(units * SEAT_PRICE),
+                    cancelled if random_() < cancel_rate else confirmed,
+                    start,
+                    start + timedelta(minutes=30 * length),
+                )
+                slot += length
+
+
+class BulkCreateWriter:
+    """Writes reservation rows with bulk_create, one transaction per batch."""
+
+    def write(self, rows: List[Row]) -> None:
+        with transaction.atomic():
+            Reservation.objects.bulk_create(
+                Reservation(
+                    user_id=user_id,
+                    table_id=table_id,
+                    num_seats=num_seats,
+                    cost=cost,
+                    status=status,
+                    reservation_time=start,
+                    end_time=end,
+                )
+                for user_id, table_id, num_seats, cost, status, start, end in rows
+            )
+
+
+class CopyWriter:
+    """
+    Writes reservation rows with PostgreSQL's COPY FROM STDIN, which skips
+    per-row INSERT parsing and planning.
+    """
+
+    columns = (
+        "user_id",
+        "table_id",
+        "num_seats",
+        "cost",
+        "status",
+        "reservation_time",
+        "end_time",
+        "created_at",
+    )
+
+    def __init__(self):
+        # the load time, as auto_now_add gives bulk_create rows
+        self.created_at = datetime.now()
+
+    def write(self, rows: List[Row]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow((*row, self.created_at))
+        buffer.seek(0)
+        table = Reservation._meta.db_table
+        sql = f"COPY {table} ({', '.join(self.columns)}) FROM STDIN WITH (FORMAT csv)"
+        with transaction.atomic(), connection.cursor() as cursor:
+            if hasattr(cursor, "copy_expert"):  # psycopg2
+                cursor.copy_expert(sql, buffer)
+            else:
+                with cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
@@ -0,0 +1,82 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from benchmarks.runner import summarize, test_database
+from benchmarks.servers import (
+    ASGIWorker,
+    DatabaseProbe,
+    WSGIWorker,
+    booking_requests,
+)
+from restaurant.repos.cache import restaurant_metadata_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Books the same requests through one synchronous WSGI worker and "
+        "through one ASGI worker running the async booking view, and "
+        "reports throughput and latency of both."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=32,
+            help="Requests the ASGI worker has in flight at once.",
+        )
+        parser.add_argument(
+            "--db-latency-ms",
+            type=float,
+            default=0.0,
+            help="Round-trip delay added to every query, to mimic a remote "
+            "database; a local database answers in microseconds.",
+        )
+        parser.add_argument(
+            "--keepdb", action="store_true", help="Reuse and keep the test database."
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be at least 1.")
+
+        results = {}
+        with test_database(keepdb=options["keepdb"]), override_settings(
+            ROOT_URLCONF="benchmarks.urls"
+        ), DatabaseProbe(latency_ms=options["db_latency_ms"]):
+            for mode, path, worker in (
+                ("wsgi", "/wsgi/book/", WSGIWorker()),
+                ("asgi", "/asgi/book/", ASGIWorker(options["concurrency"])),
+            ):
+                requests = booking_requests(path, options["requests"] + 5)
+                concurrency = 1 if mode == "wsgi" else options["concurrency"]
+                # same warm caches for both runs
+                restaurant_metadata_cache.clear()
+                worker.serve(requests[:5])
+                started = time.perf_counter()
+                samples, errors = worker.serve(requests[5:])
+                results[mode] = summarize(
+                    samples, errors, time.perf_counter() - started, concurrency
+                )
+                self._report(mode, results[mode])
+
+        speedup = results["asgi"]["throughput_ops_s"] / max(
+            results["wsgi"]["throughput_ops_s"], 1e-9
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"ASGI throughput: {speedup:.1f}x one WSGI worker")
+        )
+
+    def _report(self, mode, summary):
+        latency = summary["latency_ms"]
+        self.stdout.write(
+            f"{mode}: {summary['throughput_ops_s']:>8.1f} req/s  "
+            f"p50={latency['p50']:.2f}ms p99={latency['p99']:.2f}ms  "
+            f"queries/req={summary['queries_per_op']['mean']}  "
+            f"errors={summary['errors']}"
+        )
+        if summary["first_error"]:
+            self.stdout.write(self.style.WARNING(f"      {summary['first_error']}"))
@@ -0,0 +1,121 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+
+from benchmarks.runner import summarize, test_database
+from benchmarks.servers import (
+    CONNECTION_MODES,
+    DatabaseProbe,
+    WSGIWorker,
+    booking_requests,
+    connection_mode,
+)
+from restaurant.repos.cache import restaurant_metadata_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Books the same requests through one WSGI worker opening a database "
+        "connection per request, keeping one persistent connection, and "
+        "taking connections from a psycopg pool, and reports throughput, "
+        "latency and connections opened for each. Needs PostgreSQL; the "
+        "pool also needs psycopg 3 with psycopg_pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument(
+            "--pool-size",
+            type=int,
+            default=2,
+            help="Connections in the pool; one worker uses one at a time.",
+        )
+        parser.add_argument(
+            "--modes",
+            nargs="+",
+            choices=CONNECTION_MODES,
+            default=list(CONNECTION_MODES),
+        )
+        parser.add_argument(
+            "--keepdb", action="store_true", help="Reuse and keep the test database."
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["pool_size"] < 1:
+            raise CommandError("--requests and --pool-size must be at least 1.")
+        if connection.vendor != "postgresql":
+            raise CommandError("Connection pooling is only supported on PostgreSQL.")
+
+        modes = list(options["modes"])
+        if "pool" in modes and not self._pool_supported():
+            self.stdout.write(
+                self.style.WARNING(
+                    "Skipping pool: it needs psycopg 3 and psycopg_pool installed."
+                )
+            )
+            modes.remove("pool")
+
+        results = {}
+        with test_database(keepdb=options["keepdb"]), override_settings(
+            ROOT_URLCONF="benchmarks.urls"
+        ), DatabaseProbe():
+            worker = WSGIWorker()
+            for mode in modes:
+                requests = booking_requests("/wsgi/book/", options["requests"] + 5)
+                with connection_mode(mode, options["pool_size"]):
+                    restaurant_metadata_cache.clear()
+                    worker.serve(requests[:5])
+                    opened = []
+
+                    def counter(**kwargs):
+                        opened.append(kwargs["connection"])
+
+                    connection_created.connect(counter)
+                    try:
+                        started = time.perf_counter()
+                        samples, errors = worker.serve(requests[5:])
+                        elapsed = time.perf_counter() - started
+                    finally:
+                        connection_created.disconnect(counter)
+                    if mode == "pool":
+                        # connection_created fires on every checkout
+                        stats = connection.pool.get_stats()
+                        connects = stats["connections_num"] - options["pool_size"]
+                    else:
+                        connects = len(opened)
+                results[mode] = summarize(samples, errors, elapsed, 1)
+                self._report(mode, results[mode], connects)
+
+        if "connect" in results:
+            baseline = max(results["connect"]["throughput_ops_s"], 1e-9)
+            for mode in [m for m in results if m != "connect"]:
+                speedup = results[mode]["throughput_ops_s"] / baseline
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"{mode} throughput: {speedup:.1f}x a connection per request"
+                    )
+                )
+
+    @staticmethod
+    def _pool_supported():
+        from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+        try:
+            import psycopg_pool  # noqa: F401
+        except ImportError:
+            return False
+        return is_psycopg3
+
+    def _report(self, mode, summary, connects):
+        latency = summary["latency_ms"]
+        self.stdout.write(
+            f"{mode:>10}: {summary['throughput_ops_s']:>8.1f} req/s  "
+            f"p50={latency['p50']:.2f}ms p99={latency['p99']:.2f}ms  "
+            f"connections opened={connects}  "
+            f"errors={summary['errors']}"
+        )
+        if summary["first_error"]:
+            self.stdout.write(self.style.WARNING(f"      {summary['first_error']}"))
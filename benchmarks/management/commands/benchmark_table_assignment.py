@@ -0,0 +1,170 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import NotFound
+
+from benchmarks.runner import test_database
+from benchmarks.scenarios import TABLE_SEATS, create_restaurant, create_user
+from reservations.models import Reservation
+from reservations.repos.repository import ReservationRepo
+from reservations.services.facade import ReservationFacadeService
+from reservations.services.packing import RepackingTableSelectionStrategy
+from restaurant.repos.cache import CachedRestaurantRepo, restaurant_metadata_cache
+from restaurant.services.table_selection import DefaultTableSelectionStrategy
+from utils.stats import percentile
+
+# party sizes 1..10 and how often each is requested
+PARTY_WEIGHTS = (4, 24, 8, 20, 6, 12, 2, 6, 1, 3)
+# bookable start times (half hours from 11:00 to 21:30) and durations
+OPENING_HOUR, LAST_START_HOUR, CLOSING_HOUR = 11, 21.5, 24
+DURATIONS = (1.0, 1.5, 2.0, 2.5, 3.0)
+
+
+class _MoveCountingRepo(ReservationRepo):
+    def __init__(self):
+        self.moves = 0
+
+    def moveReservations(self, moves):
+        moved = ReservationRepo.moveReservations(moves)
+        self.moves += len(moved)
+        return moved
+
+
+class Command(BaseCommand):
+    help = (
+        "Books the same synthetic days of out-of-order requests with the "
+        "default table selection and with RepackingTableSelectionStrategy, "
+        "and reports how many parties got a table and the seat utilisation."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=5)
+        parser.add_argument(
+            "--requests", type=int, default=60, help="Booking requests per day."
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--time-budget-ms",
+            type=float,
+            default=50.0,
+            help="Time a lookup may spend on repacking.",
+        )
+        parser.add_argument(
+            "--keepdb", action="store_true", help="Reuse and keep the test database."
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 1 or options["requests"] < 1:
+            raise CommandError("--days and --requests must be at least 1.")
+
+        rng = random.Random(options["seed"])
+        days = [
+            self._day(rng, offset, options["requests"])
+            for offset in range(1, options["days"] + 1)
+        ]
+
+        results = {}
+        with test_database(keepdb=options["keepdb"]):
+            restaurant_metadata_cache.clear()
+            user = create_user("assignment")
+            for name in ("default", "repacking"):
+                repo = _MoveCountingRepo()
+                if name == "default":
+                    selector = DefaultTableSelectionStrategy(
+                        repo=repo, table_repo=CachedRestaurantRepo()
+                    )
+                else:
+                    selector = RepackingTableSelectionStrategy(
+                        repo=repo,
+                        table_repo=CachedRestaurantRepo(),
+                        time_budget=options["time_budget_ms"] / 1000,
+                    )
+                facade = ReservationFacadeService(
+                    reservation_repo=repo, table_selector=selector
+                )
+                results[name] = self._run(facade, user, days, name)
+                results[name]["moves"] = repo.moves
+                self._report(name, results[name])
+
+        gained = results["repacking"]["booked"] - results["default"]["booked"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Repacking seated {gained} more parties; seat utilisation "
+                f"{results['default']['utilisation']:.1%} -> "
+                f"{results['repacking']['utilisation']:.1%}"
+            )
+        )
+
+    @staticmethod
+    def _day(rng, offset, count):
+        """
+        One day of requests, in the random order they arrive in.
+        """
+        day = date.today() + timedelta(days=offset)
+        requests = []
+        for _ in range(count):
+            start = OPENING_HOUR + 0.5 * rng.randrange(
+                int((LAST_START_HOUR - OPENING_HOUR) * 2) + 1
+            )
+            duration = min(rng.choice(DURATIONS), CLOSING_HOUR - start)
+            requests.append(
+                {
+                    "reservation_date": day.isoformat(),
+                    "reservation_time": f"{int(start):02d}:{int(start % 1 * 60):02d}",
+                    "duration_hours": str(duration),
+                    "party_size": rng.choices(
+                        range(1, len(PARTY_WEIGHTS) + 1), PARTY_WEIGHTS
+                    )[0],
+                }
+            )
+        return requests
+
+    @staticmethod
+    def _run(facade, user, days, name):
+        restaurant = create_restaurant(f"assignment-{name}")
+        booked = rejected = 0
+        timings = []
+        for requests in days:
+            for request in requests:
+                started = time.perf_counter()
+                try:
+                    facade.book({"restaurant_id": restaurant.id, **request}, user)
+                except NotFound:
+                    rejected += 1
+                    continue
+                finally:
+                    timings.append((time.perf_counter() - started) * 1000)
+                booked += 1
+
+        # read back: repacking may have moved reservations after booking
+        guest_hours = seated = table_seats = 0
+        for reservation in Reservation.objects.filter(
+            table__restaurant=restaurant
+        ).select_related("table"):
+            hours = (
+                reservation.end_time - reservation.reservation_time
+            ).total_seconds() / 3600
+            guest_hours += reservation.num_seats * hours
+            seated += reservation.num_seats
+            table_seats += reservation.table.seats
+        offered = sum(TABLE_SEATS) * (CLOSING_HOUR - OPENING_HOUR) * len(days)
+        return {
+            "booked": booked,
+            "rejected": rejected,
+            # guest-hours seated over seat-hours the restaurant offered
+            "utilisation": guest_hours / offered,
+            # guests over the seats of the tables they were given
+            "fit": seated / table_seats if table_seats else 0.0,
+            "p50_ms": percentile(timings, 50),
+            "p99_ms": percentile(timings, 99),
+        }
+
+    def _report(self, name, result):
+        self.stdout.write(
+            f"{name:>9}: booked={result['booked']} rejected={result['rejected']}  "
+            f"seat utilisation={result['utilisation']:.1%} "
+            f"table fit={result['fit']:.1%}  moves={result['moves']}  "
+            f"p50={result['p50_ms']:.2f}ms p99={result['p99_ms']:.2f}ms"
+        )
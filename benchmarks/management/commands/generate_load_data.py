@@ -0,0 +1,162 @@
+import random
+import time
+from datetime import date, timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from benchmarks.loaddata import (
+    BulkCreateWriter,
+    CopyWriter,
+    generate_reservations,
+    table_seats,
+)
+from benchmarks.scenarios import PASSWORD
+from reservations.models import Reservation
+from restaurant.models import Restaurant, Table
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates restaurants, tables, users and years of reservations with "
+        "lunch and dinner peaks, weekly demand and cancellations, for "
+        "reproducing production-scale performance. Same seed, same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--restaurants", type=int, default=10)
+        parser.add_argument("--tables", type=int, default=20, help="Per restaurant.")
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--years", type=float, default=1.0)
+        parser.add_argument(
+            "--start-date",
+            type=date.fromisoformat,
+            help="First day of reservations. Defaults to --years before today.",
+        )
+        parser.add_argument(
+            "--future-days",
+            type=int,
+            default=30,
+            help="Days of bookings after today when --start-date is not given.",
+        )
+        parser.add_argument(
+            "--occupancy",
+            type=float,
+            default=1.0,
+            help="Scales the chance that a free table gets booked.",
+        )
+        parser.add_argument("--cancel-rate", type=float, default=0.08)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--prefix",
+            default="load",
+            help="Prefix of generated usernames and restaurant names.",
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Write reservations with COPY (PostgreSQL only).",
+        )
+
+    def handle(self, *args, **options):
+        if options["copy"] and connection.vendor != "postgresql":
+            raise CommandError("--copy needs PostgreSQL.")
+        if min(options["restaurants"], options["tables"], options["users"]) < 1:
+            raise CommandError(
+                "--restaurants, --tables and --users must be at least 1."
+            )
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        prefix = options["prefix"]
+        if User.objects.filter(username__startswith=f"{prefix}-").exists():
+            raise CommandError(f"Users named {prefix}-* exist; pass another --prefix.")
+
+        rng = random.Random(options["seed"])
+        days = round(365 * options["years"])
+        first_day = options["start_date"] or (
+            date.today() - timedelta(days=days - options["future_days"])
+        )
+        started = time.perf_counter()
+
+        user_ids = self._users(prefix, options["users"], options["batch_size"])
+        tables = self._restaurants(
+            rng, prefix, options["restaurants"], options["tables"]
+        )
+        self.stdout.write(
+            f"Created {len(user_ids)} users, {options['restaurants']} restaurants "
+            f"and {len(tables)} tables in {time.perf_counter() - started:.1f}s"
+        )
+
+        writer = CopyWriter() if options["copy"] else BulkCreateWriter()
+        rows = generate_reservations(
+            rng,
+            tables,
+            user_ids,
+            first_day,
+            days,
+            occupancy=options["occupancy"],
+            cancel_rate=options["cancel_rate"],
+        )
+        total = 0
+        loading = time.perf_counter()
+        while batch := list(islice(rows, options["batch_size"])):
+            writer.write(batch)
+            total += len(batch)
+            if total % (options["batch_size"] * 50) < len(batch):
+                self._progress(total, loading)
+        self._progress(total, loading)
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {Reservation._meta.db_table}")
+        # only new restaurants got rows, so no cached occupancy is stale
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {total} reservations from {first_day} over {days} days "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+        )
+
+    @staticmethod
+    def _users(prefix, count, batch_size):
+        # hashing is deliberately slow, so every user shares one hash
+        password = make_password(PASSWORD)
+        with transaction.atomic():
+            User.objects.bulk_create(
+                (
+                    User(username=f"{prefix}-{i}", password=password)
+                    for i in range(1, count + 1)
+                ),
+                batch_size=batch_size,
+            )
+        return list(
+            User.objects.filter(username__startswith=f"{prefix}-")
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+    @staticmethod
+    def _restaurants(rng, prefix, count, tables_each):
+        with transaction.atomic():
+            restaurants = Restaurant.objects.bulk_create(
+                Restaurant(name=f"{prefix.title()} {i}") for i in range(1, count + 1)
+            )
+            seats = table_seats(rng, count * tables_each)
+            tables = Table.objects.bulk_create(
+                Table(restaurant=restaurant, number=number, seats=seats.pop())
+                for restaurant in restaurants
+                for number in range(1, tables_each + 1)
+            )
+        return [(table.id, table.seats) for table in tables]
+
+    def _progress(self, total, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"  {total} reservations, {total / max(elapsed, 1e-9):.0f} rows/s"
+        )
@@ -0,0 +1,143 @@
+import json
+import platform
+import subprocess
+from datetime import datetime
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from benchmarks.runner import compare, run_scenario, test_database
+from benchmarks.scenarios import SCENARIOS
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the booking and auth benchmarks against a throwaway test "
+        "database and reports throughput, latency percentiles and query "
+        "counts per operation."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "scenarios",
+            nargs="*",
+            metavar="scenario",
+            help=f"Scenarios to run (default: all of {', '.join(SCENARIOS)}).",
+        )
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=1)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--compare", help="JSON results of an earlier run to compare against."
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=20.0,
+            help="Percent a timing may worsen before it counts as a regression.",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit with an error when --compare finds a regression.",
+        )
+        parser.add_argument(
+            "--keepdb", action="store_true", help="Reuse and keep the test database."
+        )
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1 or options["iterations"] < 1:
+            raise CommandError("--iterations and --concurrency must be at least 1.")
+        baseline = self._load(options["compare"]) if options["compare"] else None
+
+        names = options["scenarios"] or list(SCENARIOS)
+        unknown = set(names) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}.")
+        operations = {}
+        with test_database(keepdb=options["keepdb"]):
+            for name in names:
+                operations[name] = run_scenario(
+                    SCENARIOS[name](),
+                    iterations=options["iterations"],
+                    concurrency=options["concurrency"],
+                    warmup=options["warmup"],
+                )
+                self._report(name, operations[name])
+
+        if options["output"]:
+            results = {"meta": self._meta(options), "operations": operations}
+            with open(options["output"], "w") as fp:
+                json.dump(results, fp, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is not None:
+            self._warn_if_incomparable(baseline.get("meta", {}), options)
+            regressions = compare(
+                baseline["operations"], operations, options["threshold"]
+            )
+            for line in regressions:
+                self.stdout.write(self.style.WARNING(f"regression: {line}"))
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS("No regressions."))
+            elif options["fail_on_regression"]:
+                raise CommandError(f"{len(regressions)} regression(s) found.")
+
+    @staticmethod
+    def _load(path):
+        try:
+            with open(path) as fp:
+                return json.load(fp)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+
+    @staticmethod
+    def _meta(options) -> dict:
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            "commit": commit,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "iterations": options["iterations"],
+            "concurrency": options["concurrency"],
+            "warmup": options["warmup"],
+        }
+
+    def _warn_if_incomparable(self, meta, options):
+        current = {
+            "database": connection.vendor,
+            "iterations": options["iterations"],
+            "concurrency": options["concurrency"],
+        }
+        for key, value in current.items():
+            if key in meta and meta[key] != value:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"baseline ran with {key}={meta[key]}, this run with "
+                        f"{key}={value}; timings are not comparable."
+                    )
+                )
+
+    def _report(self, name, summary):
+        latency = summary["latency_ms"]
+        self.stdout.write(
+            f"{name:>20}: {summary['throughput_ops_s']:>9.1f} ops/s  "
+            f"p50={latency['p50']:.2f}ms p90={latency['p90']:.2f}ms "
+            f"p99={latency['p99']:.2f}ms  "
+            f"queries/op={summary['queries_per_op']['mean']}  "
+            f"errors={summary['errors']}"
+        )
+        if summary["first_error"]:
+            self.stdout.write(self.style.WARNING(f"{'':>22}{summary['first_error']}"))
@@ -0,0 +1,198 @@
+import threading
+import time
+from contextlib import contextmanager
+from statistics import mean
+from typing import Dict, List
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from reservations.services.events import reservation_events
+from utils.stats import percentile
+from utils.tasks import SyncBackend, get_backend, set_backend
+
+# (metric path, direction) pairs checked by compare(); +1 means higher is worse
+COMPARED_METRICS = (
+    (("latency_ms", "p50"), +1),
+    (("latency_ms", "p99"), +1),
+    (("throughput_ops_s",), -1),
+)
+# extra queries per call, on average, tolerated before it counts as a
+# regression; cache hits make the mean wobble a little between runs
+QUERY_TOLERANCE = 0.5
+
+
+@contextmanager
+def test_database(keepdb: bool = False):
+    """
+    Runs the enclosed block against a freshly created test database, as
+    the test runner would, and destroys it afterwards unless `keepdb`.
+
+    Background tasks run inline, as under the test runner, so no task
+    thread writes events or rollups while requests are being timed.
+    """
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    backend = get_backend()
+    set_backend(SyncBackend())
+    try:
+        yield
+    finally:
+        # buffered events belong to the test database
+        reservation_events.close()
+        set_backend(backend)
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+class QueryCounter:
+    """
+    connection.execute_wrapper hook counting the queries run on one thread's
+    connection.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_scenario(scenario, iterations: int, concurrency: int = 1, warmup: int = 5):
+    """
+    Runs `scenario` `iterations` times split across `concurrency` threads,
+    after `warmup` untimed calls on the calling thread.
+
+    Each thread uses its own database connection, so with concurrency > 1
+    the operations really contend in the database.
+
+    Returns:
+        dict: The summary built by summarize().
+    """
+    scenario.setup(warmup + iterations)
+    try:
+        for i in range(warmup):
+            scenario.run(i)
+        samples, errors, elapsed = _timed_run(
+            scenario, range(warmup, warmup + iterations), concurrency
+        )
+    finally:
+        scenario.teardown()
+    return summarize(samples, errors, elapsed, concurrency)
+
+
+def _timed_run(scenario, indexes, concurrency):
+    shards = [indexes[k::concurrency] for k in range(concurrency)]
+    samples, errors = [], []
+
+    if concurrency == 1:
+        started = time.perf_counter()
+        _work(scenario, shards[0], samples, errors)
+        return samples, errors, time.perf_counter() - started
+
+    barrier = threading.Barrier(concurrency + 1)
+    threads = [
+        threading.Thread(
+            target=_threaded_work,
+            args=(scenario, shard, samples, errors, barrier),
+        )
+        for shard in shards
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return samples, errors, time.perf_counter() - started
+
+
+def _work(scenario, indexes, samples, errors):
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        for i in indexes:
+            queries = counter.count
+            started = time.perf_counter()
+            try:
+                scenario.run(i)
+            except Exception as exc:
+                errors.append(f"{type(exc).__name__}: {exc}")
+                continue
+            # list.append is atomic, so threads can share the lists
+            samples.append(
+                ((time.perf_counter() - started) * 1000, counter.count - queries)
+            )
+
+
+def _threaded_work(scenario, indexes, samples, errors, barrier):
+    try:
+        barrier.wait()
+        _work(scenario, indexes, samples, errors)
+    finally:
+        connection.close()
+
+
+def summarize(samples, errors: List[str], elapsed: float, concurrency: int) -> dict:
+    """
+    Aggregates (latency in ms, query count) samples of successful calls.
+    """
+    latencies = [latency for latency, _ in samples]
+    queries = [count for _, count in samples]
+    return {
+        "iterations": len(samples) + len(errors),
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_ops_s": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(mean(latencies), 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 3),
+            "p90": round(percentile(latencies, 90), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(max(latencies, default=0.0), 3),
+        },
+        "queries_per_op": {
+            "mean": round(mean(queries), 2) if queries else 0.0,
+            "max": max(queries, default=0),
+        },
+    }
+
+
+def compare(baseline: Dict[str, dict], current: Dict[str, dict], threshold: float):
+    """
+    Lists regressions of `current` against `baseline` operation summaries.
+
+    Timings regress when they are more than `threshold` percent worse,
+    query counts when the mean grows by more than QUERY_TOLERANCE.
+
+    Returns:
+        list[str]: One line per regression; empty when there is none.
+    """
+    regressions = []
+    for name, now in current.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        for path, direction in COMPARED_METRICS:
+            old, new = _lookup(before, path), _lookup(now, path)
+            if not old:
+                continue
+            change = (new - old) / old * 100 * direction
+            if change > threshold:
+                regressions.append(
+                    f"{name} {'.'.join(path)}: {old} -> {new} ({change:+.1f}% worse)"
+                )
+        old_q = before["queries_per_op"]["mean"]
+        new_q = now["queries_per_op"]["mean"]
+        if new_q - old_q > QUERY_TOLERANCE:
+            regressions.append(f"{name} queries_per_op.mean: {old_q} -> {new_q}")
+    return regressions
+
+
+def _lookup(summary: dict, path):
+    for key in path:
+        summary = summary[key]
+    return summary
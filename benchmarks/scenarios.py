@@ -0,0 +1,269 @@
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.urls import reverse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from accounts.services import AuthenticationFacadeService, JWTService
+from reservations.models import Reservation, ReservationStatus
+from reservations.services.facade import ReservationFacadeService
+from reservations.views import BookReservationView, CancelReservationView
+from restaurant.models import Restaurant, Table
+
+User = get_user_model()
+
+PASSWORD = "Benchmark!Pass123"
+# seats of each benchmark restaurant's tables
+TABLE_SEATS = (4, 4, 4, 6, 6, 8, 8, 10)
+# bookings placed per day, kept below len(TABLE_SEATS) so concurrent
+# bookers of the same day can still fall back to another table
+BOOKINGS_PER_DAY = 4
+
+
+class BenchmarkError(Exception):
+    """A benchmarked call returned something other than success."""
+
+
+class Scenario(ABC):
+    """
+    One benchmarked operation.
+
+    setup(n) creates whatever run(i) needs for every i in range(n); run(i)
+    performs the operation once and raises on failure. run() is called
+    from several threads at once and must not share unsaved state.
+    teardown() undoes process-wide changes setup() made.
+    """
+
+    name = ""
+
+    def setup(self, n: int) -> None:
+        pass
+
+    @abstractmethod
+    def run(self, i: int) -> None:
+        pass
+
+    def teardown(self) -> None:
+        pass
+
+
+class BookScenario(Scenario):
+    """ReservationFacadeService.book, BOOKINGS_PER_DAY bookings per day."""
+
+    name = "book"
+
+    def setup(self, n):
+        self.user = create_user(self.name)
+        self.restaurant = create_restaurant(self.name)
+        self.facade = ReservationFacadeService()
+
+    def payload(self, i: int) -> dict:
+        day = date.today() + timedelta(days=1 + i // BOOKINGS_PER_DAY)
+        return {
+            "restaurant_id": self.restaurant.id,
+            "reservation_date": day.isoformat(),
+            "reservation_time": "19:00",
+            "duration_hours": "2.0",
+            "party_size": 2,
+        }
+
+    def run(self, i):
+        self.facade.book(self.payload(i), self.user)
+
+
+class CancelScenario(Scenario):
+    """ReservationFacadeService.cancel_reservation of pre-booked reservations."""
+
+    name = "cancel"
+
+    def setup(self, n):
+        self.user = create_user(self.name)
+        restaurant = create_restaurant(self.name)
+        tables = list(restaurant.tables.all())
+        reservations = []
+        for i in range(n):
+            table = tables[i % len(tables)]
+            start_dt = datetime.combine(
+                date.today() + timedelta(days=1 + i // len(tables)), time(19)
+            )
+            reservations.append(
+                Reservation(
+                    user=self.user,
+                    table=table,
+                    num_seats=2,
+                    cost=(table.seats - 1) * 10,
+                    status=ReservationStatus.CONFIRMED,
+                    reservation_time=start_dt,
+                    end_time=start_dt + timedelta(hours=2),
+                )
+            )
+        created = Reservation.objects.bulk_create(reservations)
+        self.reservation_ids = [r.id for r in created]
+        self.facade = ReservationFacadeService()
+
+    def run(self, i):
+        self.facade.cancel_reservation(self.reservation_ids[i], self.user)
+
+
+class SignInScenario(Scenario):
+    """AuthenticationFacadeService.sign_in, password hashing included."""
+
+    name = "sign_in"
+
+    def setup(self, n):
+        self.user = create_user(self.name)
+        self.facade = AuthenticationFacadeService()
+
+    def run(self, i):
+        self.facade.sign_in(
+            {"username": self.user.username, "password": PASSWORD},
+            context={"request": None},
+        )
+
+
+class ViewScenarioMixin:
+    """
+    Runs the request through the full Django stack (middleware, JWT
+    authentication, DRF view) with one test Client per thread.
+    """
+
+    expected_status = 200
+
+    def setup(self, n):
+        super().setup(n)
+        self.access = JWTService.generate_tokens(self.user)["access"]
+        self.local = threading.local()
+
+    @property
+    def client(self) -> Client:
+        if not hasattr(self.local, "client"):
+            self.local.client = Client(HTTP_AUTHORIZATION=f"Bearer {self.access}")
+        return self.local.client
+
+    def check(self, response) -> None:
+        if response.status_code != self.expected_status:
+            raise BenchmarkError(
+                f"HTTP {response.status_code}: {response.content[:200]!r}"
+            )
+
+
+class DatabaseUserAuthMixin:
+    """
+    Authenticates the benchmarked views with simplejwt's JWTAuthentication,
+    which loads the User row on every request, as a baseline for the
+    stateless authentication configured in settings.
+    """
+
+    views = (BookReservationView, CancelReservationView)
+
+    def setup(self, n):
+        super().setup(n)
+        self.saved = [(view, view.authentication_classes) for view in self.views]
+        for view in self.views:
+            view.authentication_classes = [JWTAuthentication]
+
+    def teardown(self):
+        for view, classes in self.saved:
+            view.authentication_classes = classes
+        super().teardown()
+
+
+class BookViewScenario(ViewScenarioMixin, BookScenario):
+    name = "book_view"
+
+    def run(self, i):
+        self.check(
+            self.client.post(
+                reverse("reservations:book_reservation"),
+                self.payload(i),
+                content_type="application/json",
+            )
+        )
+
+
+class CancelViewScenario(ViewScenarioMixin, CancelScenario):
+    name = "cancel_view"
+
+    def run(self, i):
+        self.check(
+            self.client.post(
+                reverse("reservations:cancel_reservation"),
+                {"reservation_id": self.reservation_ids[i]},
+                content_type="application/json",
+            )
+        )
+
+
+class BookViewDatabaseUserScenario(DatabaseUserAuthMixin, BookViewScenario):
+    name = "book_view_db_user"
+
+
+class CancelViewDatabaseUserScenario(DatabaseUserAuthMixin, CancelViewScenario):
+    name = "cancel_view_db_user"
+
+
+class AvailabilityViewScenario(ViewScenarioMixin, BookScenario):
+    name = "availability_view"
+
+    def run(self, i):
+        payload = self.payload(i)
+        self.check(
+            self.client.get(
+                reverse("reservations:availability"),
+                {
+                    "restaurant_id": payload["restaurant_id"],
+                    "date": payload["reservation_date"],
+                    "party_size": payload["party_size"],
+                    "duration_hours": payload["duration_hours"],
+                },
+            )
+        )
+
+
+class SignInViewScenario(ViewScenarioMixin, SignInScenario):
+    name = "sign_in_view"
+
+    def run(self, i):
+        self.check(
+            self.client.post(
+                reverse("accounts:signin"),
+                {"username": self.user.username, "password": PASSWORD},
+                content_type="application/json",
+            )
+        )
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        BookScenario,
+        CancelScenario,
+        SignInScenario,
+        BookViewScenario,
+        CancelViewScenario,
+        BookViewDatabaseUserScenario,
+        CancelViewDatabaseUserScenario,
+        AvailabilityViewScenario,
+        SignInViewScenario,
+    )
+}
+
+
+def create_user(prefix: str):
+    return User.objects.create_user(
+        username=f"bench-{prefix}-{User.objects.count()}", password=PASSWORD
+    )
+
+
+def create_restaurant(prefix: str) -> Restaurant:
+    restaurant = Restaurant.objects.create(
+        name=f"Benchmark {prefix} {Restaurant.objects.count()}"
+    )
+    Table.objects.bulk_create(
+        Table(restaurant=restaurant, number=number, seats=seats)
+        for number, seats in enumerate(TABLE_SEATS, start=1)
+    )
+    return restaurant
@@ -0,0 +1,246 @@
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test.client import FakePayload
+
+from accounts.services import JWTService
+from benchmarks.scenarios import BOOKINGS_PER_DAY, BookScenario
+
+# (latency in ms, queries) of one served request
+Sample = Tuple[float, int]
+
+_request_queries: ContextVar[Optional[List[int]]] = ContextVar(
+    "request_queries", default=None
+)
+
+
+class DatabaseProbe:
+    """
+    execute_wrapper installed on every connection while active. It counts
+    each request's queries and can add a fixed round-trip delay per query
+    to mimic a database on another host.
+
+    The delay sleeps, so like real network I/O it leaves the GIL free for
+    other requests.
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+
+    def __call__(self, execute, sql, params, many, context):
+        counter = _request_queries.get()
+        if counter is not None:
+            counter[0] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return execute(sql, params, many, context)
+
+    def install(self, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def __enter__(self):
+        connection_created.connect(self.install)
+        self.install(connection)
+        return self
+
+    def __exit__(self, *exc_info):
+        connection_created.disconnect(self.install)
+        if self in connection.execute_wrappers:
+            connection.execute_wrappers.remove(self)
+
+
+# how connection_mode() configures the default connection
+CONNECTION_MODES = ("connect", "persistent", "pool")
+
+
+@contextmanager
+def connection_mode(mode: str, pool_size: int = 1):
+    """
+    Reconfigures the default connection for the enclosed block:
+    "connect" opens a new connection for every request, "persistent"
+    keeps one open across requests, and "pool" takes it from Django's
+    psycopg 3 pool of `pool_size` connections. Health checks are on for
+    the last two, as config.settings turns them on.
+    """
+    settings_dict = connection.settings_dict
+    saved = {
+        key: settings_dict[key]
+        for key in ("CONN_MAX_AGE", "CONN_HEALTH_CHECKS", "OPTIONS")
+    }
+    connection.close()
+    settings_dict["OPTIONS"] = {
+        k: v for k, v in settings_dict["OPTIONS"].items() if k != "pool"
+    }
+    settings_dict["CONN_HEALTH_CHECKS"] = mode != "connect"
+    settings_dict["CONN_MAX_AGE"] = None if mode == "persistent" else 0
+    if mode == "pool":
+        settings_dict["OPTIONS"]["pool"] = {
+            "min_size": pool_size,
+            "max_size": pool_size,
+        }
+    try:
+        yield
+    finally:
+        connection.close()
+        if mode == "pool":
+            connection.close_pool()
+        settings_dict.update(saved)
+
+
+def booking_requests(path: str, count: int) -> List[Tuple[str, dict, dict]]:
+    """
+    `count` booking requests for the worker's serve(), as (path, headers,
+    payload), by one user on different days.
+    """
+    scenario = BookScenario()
+    scenario.setup(count)
+    # one booking per day: requests in flight together must not race
+    # for the same tables, or conflicts would be measured too
+    headers = {
+        "Authorization": f"Bearer {JWTService.generate_tokens(scenario.user)['access']}"
+    }
+    return [
+        (path, headers, scenario.payload(i * BOOKINGS_PER_DAY)) for i in range(count)
+    ]
+
+
+class WSGIWorker:
+    """
+    One synchronous worker (gunicorn's default): requests are handled by
+    Django's WSGIHandler one after the other.
+    """
+
+    def __init__(self):
+        self.handler = WSGIHandler()
+
+    def serve(self, requests) -> Tuple[List[Sample], List[str]]:
+        samples, errors = [], []
+        for path, headers, payload in requests:
+            body = json.dumps(payload).encode()
+            environ = {
+                "REQUEST_METHOD": "POST",
+                "PATH_INFO": path,
+                "SCRIPT_NAME": "",
+                "QUERY_STRING": "",
+                "SERVER_NAME": "testserver",
+                "SERVER_PORT": "80",
+                "SERVER_PROTOCOL": "HTTP/1.1",
+                "CONTENT_TYPE": "application/json",
+                "CONTENT_LENGTH": str(len(body)),
+                "wsgi.input": FakePayload(body),
+                "wsgi.url_scheme": "http",
+                "wsgi.errors": None,
+                **{
+                    f"HTTP_{k.upper().replace('-', '_')}": v for k, v in headers.items()
+                },
+            }
+            statuses = []
+            counter = [0]
+            token = _request_queries.set(counter)
+            started = time.perf_counter()
+            try:
+                response = self.handler(
+                    environ, lambda status, _: statuses.append(status)
+                )
+                b"".join(response)
+                response.close()
+            finally:
+                _request_queries.reset(token)
+            _record(
+                samples,
+                errors,
+                int(statuses[0].split()[0]),
+                time.perf_counter() - started,
+                counter[0],
+            )
+        return samples, errors
+
+
+class ASGIWorker:
+    """
+    One ASGI worker (uvicorn): requests are handled concurrently by
+    Django's ASGIHandler on one event loop, at most `concurrency` at a time.
+    """
+
+    def __init__(self, concurrency: int):
+        self.handler = ASGIHandler()
+        self.concurrency = concurrency
+
+    def serve(self, requests) -> Tuple[List[Sample], List[str]]:
+        return asyncio.run(self._serve(requests))
+
+    async def _serve(self, requests):
+        samples, errors = [], []
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def one(path, headers, payload):
+            async with slots:
+                counter = [0]
+                _request_queries.set(counter)
+                started = time.perf_counter()
+                status = await self._request(path, headers, payload)
+                _record(
+                    samples, errors, status, time.perf_counter() - started, counter[0]
+                )
+
+        await asyncio.gather(*(one(*request) for request in requests))
+        return samples, errors
+
+    async def _request(self, path, headers, payload) -> int:
+        body = json.dumps(payload).encode()
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                *((k.lower().encode(), v.encode()) for k, v in headers.items()),
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": ("testserver", 80),
+        }
+        response = {}
+        done = asyncio.Event()
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Django listens for a disconnect while the view runs
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif not message.get("more_body", False):
+                done.set()
+
+        await self.handler(scope, receive, send)
+        return response["status"]
+
+
+def _record(samples, errors, status: int, elapsed: float, queries: int) -> None:
+    if status == 200:
+        samples.append((elapsed * 1000, queries))
+    else:
+        errors.append(f"HTTP {status}")
@@ -0,0 +1,167 @@
+import random
+from datetime import date
+from io import StringIO
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from benchmarks.loaddata import generate_reservations
+from benchmarks.runner import compare, run_scenario, summarize
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.servers import connection_mode
+from reservations.models import Reservation, ReservationStatus
+from reservations.services.interval_index import reservation_index
+from restaurant.models import Restaurant, Table
+from restaurant.repos.cache import restaurant_metadata_cache
+
+
+class SummarizeTests(TestCase):
+    def test_percentiles_throughput_and_errors(self):
+        samples = [(float(ms), 3) for ms in range(1, 101)]
+        summary = summarize(samples, ["boom"], elapsed=2.0, concurrency=4)
+
+        self.assertEqual(summary["iterations"], 101)
+        self.assertEqual(summary["errors"], 1)
+        self.assertEqual(summary["first_error"], "boom")
+        self.assertEqual(summary["throughput_ops_s"], 50.0)
+        self.assertEqual(summary["latency_ms"]["p50"], 50.0)
+        self.assertEqual(summary["latency_ms"]["p99"], 99.0)
+        self.assertEqual(summary["queries_per_op"], {"mean": 3, "max": 3})
+
+
+class CompareTests(TestCase):
+    def setUp(self):
+        self.baseline = {
+            "book": summarize([(10.0, 3)] * 10, [], elapsed=1.0, concurrency=1)
+        }
+
+    def test_within_threshold_is_not_a_regression(self):
+        current = {"book": summarize([(11.0, 3)] * 10, [], elapsed=1.1, concurrency=1)}
+        self.assertEqual(compare(self.baseline, current, threshold=20), [])
+
+    def test_slower_run_and_extra_queries_are_regressions(self):
+        current = {"book": summarize([(15.0, 4)] * 10, [], elapsed=1.5, concurrency=1)}
+        regressions = compare(self.baseline, current, threshold=20)
+
+        self.assertTrue(any("latency_ms.p50" in r for r in regressions))
+        self.assertTrue(any("throughput_ops_s" in r for r in regressions))
+        self.assertTrue(any("queries_per_op" in r for r in regressions))
+
+    def test_operations_missing_from_baseline_are_skipped(self):
+        current = {"cancel": summarize([(99.0, 9)], [], elapsed=1.0, concurrency=1)}
+        self.assertEqual(compare(self.baseline, current, threshold=20), [])
+
+
+class ScenarioTests(TestCase):
+    def setUp(self):
+        reservation_index.invalidate()
+        restaurant_metadata_cache.clear()
+
+    def test_book_scenario_books_every_iteration(self):
+        summary = run_scenario(SCENARIOS["book"](), iterations=6, warmup=2)
+
+        self.assertEqual(summary["errors"], 0, summary["first_error"])
+        self.assertEqual(summary["iterations"], 6)
+        self.assertEqual(Reservation.objects.count(), 8)
+        self.assertGreater(summary["queries_per_op"]["mean"], 0)
+
+    def test_cancel_view_scenario_cancels_through_the_api(self):
+        summary = run_scenario(SCENARIOS["cancel_view"](), iterations=3, warmup=1)
+
+        self.assertEqual(summary["errors"], 0, summary["first_error"])
+        self.assertEqual(
+            Reservation.objects.filter(status=ReservationStatus.CANCELLED).count(), 4
+        )
+
+
+class LoadDataTests(TestCase):
+    def _rows(self, seed):
+        return list(
+            generate_reservations(
+                random.Random(seed),
+                tables=[(1, 4), (2, 8)],
+                user_ids=[10, 11, 12],
+                first_day=date(2030, 1, 1),
+                days=28,
+            )
+        )
+
+    def test_same_seed_same_rows_and_no_confirmed_overlaps(self):
+        rows = self._rows(seed=7)
+        self.assertEqual(rows, self._rows(seed=7))
+        self.assertNotEqual(rows, self._rows(seed=8))
+
+        statuses = {row[4] for row in rows}
+        self.assertEqual(statuses, {"CONFIRMED", "CANCELLED"})
+        for table_id, seats in ((1, 4), (2, 8)):
+            windows = sorted(
+                (start, end)
+                for _, table, party, _, status, start, end in rows
+                if table == table_id
+            )
+            self.assertTrue(all(a[1] <= b[0] for a, b in zip(windows, windows[1:])))
+            self.assertTrue(all(row[2] <= seats for row in rows if row[1] == table_id))
+
+    def test_command_creates_users_restaurants_and_reservations(self):
+        call_command(
+            "generate_load_data",
+            "--restaurants=2",
+            "--tables=3",
+            "--users=5",
+            "--years=0.05",
+            "--start-date=2030-01-01",
+            "--batch-size=50",
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(
+            get_user_model().objects.filter(username__startswith="load-").count(), 5
+        )
+        self.assertEqual(Restaurant.objects.filter(name__startswith="Load ").count(), 2)
+        self.assertEqual(Table.objects.count(), 6)
+        self.assertGreater(Reservation.objects.count(), 18)
+
+    @skipUnless(connection.vendor == "postgresql", "COPY needs PostgreSQL")
+    def test_command_copies_rows_with_either_driver(self):
+        call_command(
+            "generate_load_data",
+            "--restaurants=1",
+            "--tables=2",
+            "--users=3",
+            "--years=0.05",
+            "--start-date=2030-01-01",
+            "--copy",
+            stdout=StringIO(),
+        )
+
+        self.assertGreater(Reservation.objects.count(), 6)
+
+
+class ConnectionModeTests(TestCase):
+    def test_mode_applies_inside_the_block_and_is_restored(self):
+        settings_dict = connection.settings_dict
+        before = (
+            settings_dict["CONN_MAX_AGE"],
+            settings_dict["CONN_HEALTH_CHECKS"],
+            dict(settings_dict["OPTIONS"]),
+        )
+
+        with connection_mode("persistent"):
+            self.assertIsNone(settings_dict["CONN_MAX_AGE"])
+            self.assertTrue(settings_dict["CONN_HEALTH_CHECKS"])
+        with connection_mode("connect"):
+            self.assertEqual(settings_dict["CONN_MAX_AGE"], 0)
+            self.assertFalse(settings_dict["CONN_HEALTH_CHECKS"])
+            self.assertNotIn("pool", settings_dict["OPTIONS"])
+
+        self.assertEqual(
+            (
+                settings_dict["CONN_MAX_AGE"],
+                settings_dict["CONN_HEALTH_CHECKS"],
+                settings_dict["OPTIONS"],
+            ),
+            before,
+        )
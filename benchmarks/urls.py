@@ -0,0 +1,10 @@
+from django.urls import path
+
+from reservations.views import AsyncBookReservationView, BookReservationView
+
+# sync and async booking side by side for benchmark_asgi; not routed by
+# config.urls
+urlpatterns = [
+    path("wsgi/book/", BookReservationView.as_view(), name="book_wsgi"),
+    path("asgi/book/", AsyncBookReservationView.as_view(), name="book_asgi"),
+]
@@ -0,0 +1,21 @@
+"""
+Celery entry point for the background task workers:
+
+    celery -A config.celery worker
+
+Used when TASKS["BACKEND"] is "celery"; the workers run the tasks sent
+by utils.tasks.CeleryBackend.
+"""
+
+import os
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+
+from utils.tasks import CeleryBackend  # noqa: E402
+
+app = CeleryBackend(settings.CELERY_BROKER_URL, settings.CELERY_RESULT_BACKEND).app
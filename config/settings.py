@@ -40,12 +40,16 @@ INSTALLED_APPS = [
     "accounts.apps.AccountsConfig",
     "restaurant.apps.RestaurantConfig",
     "reservations.apps.ReservationsConfig",
+    "benchmarks.apps.BenchmarksConfig",
+    "monitoring.apps.MonitoringConfig",
 ]
 
 # =====================================
 # MIDDLEWARE
 # =====================================
 MIDDLEWARE = [
+    # first, so its timings cover the rest of the stack
+    "monitoring.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -79,13 +83,23 @@ TEMPLATES = [
 ]
 
 # =====================================
-# WSGI
+# WSGI / ASGI
 # =====================================
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
+# serve booking and cancellation with the async views; turn on when running
+# under an ASGI server (uvicorn config.asgi:application)
+ASYNC_VIEWS = os.getenv("DJANGO_ASYNC_VIEWS", "False") == "True"
 
 # =====================================
 # DATABASES (PostgreSQL)
 # =====================================
+# DATABASE_POOL=True serves connections from Django's psycopg 3 pool, one
+# pool of DATABASE_POOL_MIN_SIZE to DATABASE_POOL_MAX_SIZE connections per
+# worker process. Otherwise each thread keeps its connection open for
+# DATABASE_CONN_MAX_AGE seconds; ASGI requests do not reuse them, so there
+# the default is to close them and the pool is the way to reuse them.
+DATABASE_POOL = os.getenv("DATABASE_POOL", "False") == "True"
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -94,6 +108,42 @@ DATABASES = {
         "PASSWORD": os.getenv("DATABASE_PASSWORD", ""),
         "HOST": os.getenv("DATABASE_HOST", "localhost"),
         "PORT": os.getenv("DATABASE_PORT", "5432"),
+        # pooled connections are returned to the pool after each request
+        "CONN_MAX_AGE": (
+            0
+            if DATABASE_POOL
+            else int(os.getenv("DATABASE_CONN_MAX_AGE", "0" if ASYNC_VIEWS else "60"))
+        ),
+        # ping a persistent connection before reusing it in a new request, or
+        # a pooled one as the pool hands it out
+        "CONN_HEALTH_CHECKS": os.getenv("DATABASE_CONN_HEALTH_CHECKS", "True")
+        == "True",
+        "OPTIONS": {},
+    }
+}
+if DATABASE_POOL:
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("DATABASE_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("DATABASE_POOL_MAX_SIZE", "10")),
+        # seconds a request waits for a free connection before failing
+        "timeout": float(os.getenv("DATABASE_POOL_TIMEOUT", "10")),
+        # idle connections above min_size are closed after this many seconds
+        "max_idle": float(os.getenv("DATABASE_POOL_MAX_IDLE", "300")),
+    }
+
+# =====================================
+# CACHES
+# =====================================
+# occupancy grids and idempotency responses live in the default cache.
+# The local-memory default is per process: run several workers against a
+# shared backend, e.g. django.core.cache.backends.db.DatabaseCache with
+# the table created by `python manage.py createcachetable`
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
     }
 }
 
@@ -103,6 +153,79 @@ DATABASES = {
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND")
 
+# =====================================
+# BACKGROUND TASKS
+# =====================================
+TASKS = {
+    # "thread": in-process thread pool, "celery": workers started with
+    # `celery -A config.celery worker`, "sync": inline in the caller
+    "BACKEND": os.getenv("TASK_BACKEND", "thread"),
+    "THREADS": int(os.getenv("TASK_THREADS", "2")),
+}
+
+# tests run tasks inline, see utils.test_runner
+TEST_RUNNER = "utils.test_runner.TestRunner"
+
+# reservation events are written in batches by a background task
+RESERVATION_EVENTS = {
+    "BATCH_SIZE": int(os.getenv("RESERVATION_EVENTS_BATCH_SIZE", "200")),
+    "FLUSH_INTERVAL": float(os.getenv("RESERVATION_EVENTS_FLUSH_INTERVAL", "1.0")),
+}
+
+# =====================================
+# RESTAURANT METADATA CACHE
+# =====================================
+RESTAURANT_METADATA_CACHE = {
+    "MAXSIZE": int(os.getenv("RESTAURANT_CACHE_MAXSIZE", "1024")),
+    # without a shared alias, seconds other workers may serve table
+    # changes late
+    "TTL": int(os.getenv("RESTAURANT_CACHE_TTL", "30")),
+    # optional Django cache alias shared between workers; it also tells
+    # their in-process copies when a restaurant changes
+    "SHARED_CACHE_ALIAS": os.getenv("RESTAURANT_CACHE_SHARED_ALIAS") or None,
+}
+
+# per-worker index of upcoming reservations used by
+# IntervalIndexTableSelectionStrategy; a restaurant is reloaded from the
+# database once it is MAX_AGE seconds old, as other workers' bookings
+# never reach it
+RESERVATION_INDEX = {
+    "MAX_AGE": float(os.getenv("RESERVATION_INDEX_MAX_AGE", "30")),
+}
+
+# =====================================
+# PRICING
+# =====================================
+PRICING = {
+    # seat price where no PriceRule of the restaurant applies
+    "SEAT_PRICE": os.getenv("SEAT_PRICE", "10"),
+}
+
+# =====================================
+# IDEMPOTENCY KEYS (booking endpoint)
+# =====================================
+IDEMPOTENCY = {
+    # Django cache alias in front of the IdempotencyRecord table
+    "CACHE_ALIAS": os.getenv("IDEMPOTENCY_CACHE_ALIAS", "default"),
+    # how long responses are replayed, in seconds
+    "TTL": int(os.getenv("IDEMPOTENCY_TTL", "86400")),
+    # how long a retry waits for the first request before answering 409
+    "WAIT_TIMEOUT": float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "10")),
+    # an unfinished first request older than this is presumed dead
+    "CLAIM_TIMEOUT": int(os.getenv("IDEMPOTENCY_CLAIM_TIMEOUT", "60")),
+}
+
+# =====================================
+# MONITORING
+# =====================================
+MONITORING = {
+    # scrapers send it as "Authorization: Bearer <token>"; without it
+    # /metrics is for staff signed in to the admin only
+    "METRICS_TOKEN": os.getenv("METRICS_TOKEN") or None,
+    # return per-request stage timings in a Server-Timing header
+    "SERVER_TIMING": os.getenv("MONITORING_SERVER_TIMING", "False") == "True",
+}
+
 # =====================================
 # AUTHENTICATION VALIDATORS
 # =====================================
@@ -143,7 +266,8 @@ REST_FRAMEWORK = {
         "rest_framework.renderers.JSONRenderer",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # request.user is built from the token claims, without a User query
+        "accounts.authentication.StatelessJWTAuthentication",
     ],
 }
 
@@ -152,6 +276,12 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=30),
 }
 
+# full User rows kept for ClaimsUser.hydrate()
+STATELESS_JWT = {
+    "USER_CACHE_MAXSIZE": int(os.getenv("JWT_USER_CACHE_MAXSIZE", "1024")),
+    "USER_CACHE_TTL": int(os.getenv("JWT_USER_CACHE_TTL", "60")),
+}
+
 # =====================================
 # SWAGGER
 # =====================================
@@ -2,11 +2,13 @@ from django.contrib import admin
 from django.urls import include, path, re_path
 
 from docs.swagger.swagger_config import schema_view
+from monitoring.views import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/accounts/", include("accounts.urls", namespace="accounts")),
     path("api/reservations/", include("reservations.urls", namespace="reservations")),
+    path("metrics", metrics_view, name="metrics"),
     # Swagger UI
     re_path(
         r"^swagger/$",
@@ -0,0 +1,82 @@
+from drf_yasg import openapi
+from rest_framework import status
+
+AvailabilityResponse = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "restaurant_id": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "date": openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+        "party_size": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "duration_hours": openapi.Schema(type=openapi.TYPE_STRING),
+        "slots": openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(type=openapi.TYPE_STRING, format="time"),
+            description="Free start times (HH:MM), in 30-minute steps.",
+        ),
+    },
+    required=["restaurant_id", "date", "party_size", "duration_hours", "slots"],
+)
+
+
+AVAILABILITY_VIEW_SCHEMA = {
+    "operation_id": "reservation_availability",
+    "operation_summary": "List free start times",
+    "operation_description": (
+        "Returns every half-hour start time on the given date at which the "
+        "restaurant has a table for the party for the whole duration."
+    ),
+    "manual_parameters": [
+        openapi.Parameter(
+            "restaurant_id",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_INTEGER,
+            required=True,
+            description="ID of the restaurant.",
+        ),
+        openapi.Parameter(
+            "date",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATE,
+            required=True,
+            description="Day to search (YYYY-MM-DD).",
+        ),
+        openapi.Parameter(
+            "party_size",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_INTEGER,
+            required=True,
+            description="Number of guests.",
+        ),
+        openapi.Parameter(
+            "duration_hours",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_NUMBER,
+            required=False,
+            description="Hours (0.5–3.0, in 0.5 increments). Defaults to 1.",
+        ),
+    ],
+    "responses": {
+        status.HTTP_200_OK: openapi.Response(
+            description="Free start times for the request.",
+            schema=AvailabilityResponse,
+        ),
+        status.HTTP_400_BAD_REQUEST: openapi.Response(
+            description="Bad Request - Invalid query parameters.",
+            examples={"application/json": {"party_size": ["This field is required."]}},
+        ),
+        status.HTTP_401_UNAUTHORIZED: openapi.Response(
+            description="Unauthorized - Authentication credentials were not provided or are invalid.",
+            examples={
+                "application/json": {
+                    "detail": "Authentication credentials were not provided."
+                }
+            },
+        ),
+        status.HTTP_404_NOT_FOUND: openapi.Response(
+            description="Not Found - The specified restaurant does not exist.",
+            examples={"application/json": {"detail": "Restaurant not found."}},
+        ),
+    },
+    "tags": ["Reservations"],
+}
@@ -40,8 +40,19 @@ BOOK_RESERVATION_VIEW_SCHEMA = {
     "operation_summary": "Book a reservation",
     "operation_description": (
         "Allows an authenticated user to book a table at a restaurant. "
-        "Provide restaurant ID, date, time, party size, and duration."
+        "Provide restaurant ID, date, time, party size, and duration. "
+        "Send an Idempotency-Key header to retry safely: retries with the same "
+        "key get the first response back, with an Idempotent-Replayed header."
     ),
+    "manual_parameters": [
+        openapi.Parameter(
+            "Idempotency-Key",
+            openapi.IN_HEADER,
+            type=openapi.TYPE_STRING,
+            required=False,
+            description="Client-chosen unique key (up to 255 characters) per booking attempt.",
+        ),
+    ],
     "request_body": openapi.Schema(
         type=openapi.TYPE_OBJECT,
         properties={
@@ -113,6 +124,26 @@ BOOK_RESERVATION_VIEW_SCHEMA = {
             description="Not Found - The specified restaurant or a suitable table could not be found.",
             examples={"application/json": {"detail": "Restaurant not found."}},
         ),
+        status.HTTP_409_CONFLICT: openapi.Response(
+            description=(
+                "Conflict - Every table tried was booked concurrently, or a "
+                "request with the same Idempotency-Key is still being processed; "
+                "retry the request."
+            ),
+            examples={
+                "application/json": {
+                    "detail": "Tables were booked concurrently, please retry."
+                }
+            },
+        ),
+        status.HTTP_422_UNPROCESSABLE_ENTITY: openapi.Response(
+            description="Unprocessable Entity - The Idempotency-Key was already used for a different request.",
+            examples={
+                "application/json": {
+                    "detail": "This Idempotency-Key was already used for a different request."
+                }
+            },
+        ),
     },
     "tags": ["Reservations"],
 }
@@ -0,0 +1,99 @@
+from drf_yasg import openapi
+from rest_framework import status
+
+from docs.swagger.reservation.book import BOOK_RESERVATION_VIEW_SCHEMA
+
+BookReservationBatchItemResponse = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "index": openapi.Schema(
+            type=openapi.TYPE_INTEGER,
+            description="Position of the request in the submitted list.",
+        ),
+        "booked": openapi.Schema(type=openapi.TYPE_BOOLEAN),
+        "detail": openapi.Schema(
+            type=openapi.TYPE_STRING,
+            description="Failure reason, present when booked is false.",
+        ),
+        "restaurant": openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "id": openapi.Schema(type=openapi.TYPE_INTEGER),
+                "name": openapi.Schema(type=openapi.TYPE_STRING),
+            },
+        ),
+        "reservation": openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "id": openapi.Schema(type=openapi.TYPE_INTEGER),
+                "table_id": openapi.Schema(type=openapi.TYPE_INTEGER),
+                "start_time": openapi.Schema(
+                    type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+                ),
+                "end_time": openapi.Schema(
+                    type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+                ),
+            },
+        ),
+    },
+    required=["index", "booked"],
+)
+
+BookReservationBatchResponse = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "booked": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "failed": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "results": openapi.Schema(
+            type=openapi.TYPE_ARRAY, items=BookReservationBatchItemResponse
+        ),
+    },
+    required=["booked", "failed", "results"],
+)
+
+
+BOOK_RESERVATION_BATCH_VIEW_SCHEMA = {
+    "operation_id": "book_reservation_batch",
+    "operation_summary": "Book several reservations at once",
+    "operation_description": (
+        "Books a list of party requests (up to 100) for the authenticated user. "
+        "Every item is validated first and any invalid item rejects the whole "
+        "batch. Valid items are booked together and reported one by one."
+    ),
+    "request_body": openapi.Schema(
+        type=openapi.TYPE_ARRAY,
+        items=BOOK_RESERVATION_VIEW_SCHEMA["request_body"],
+    ),
+    "responses": {
+        status.HTTP_200_OK: openapi.Response(
+            description="Batch processed. See per-item results.",
+            schema=BookReservationBatchResponse,
+        ),
+        status.HTTP_400_BAD_REQUEST: openapi.Response(
+            description="Bad Request - One or more items failed validation.",
+            examples={
+                "application/json": [
+                    {},
+                    {"party_size": ["This field is required."]},
+                ]
+            },
+        ),
+        status.HTTP_401_UNAUTHORIZED: openapi.Response(
+            description="Unauthorized - Authentication credentials were not provided or are invalid.",
+            examples={
+                "application/json": {
+                    "detail": "Authentication credentials were not provided."
+                }
+            },
+        ),
+        status.HTTP_409_CONFLICT: openapi.Response(
+            description="Conflict - Picked tables kept being booked concurrently; retry the batch.",
+            examples={
+                "application/json": {
+                    "detail": "Tables were booked concurrently, please retry."
+                }
+            },
+        ),
+    },
+    "tags": ["Reservations"],
+}
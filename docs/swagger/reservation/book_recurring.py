@@ -0,0 +1,129 @@
+from drf_yasg import openapi
+from rest_framework import status
+
+BookRecurringReservationRequest = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "restaurant_id": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "start_date": openapi.Schema(
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATE,
+            description="First day of the series.",
+        ),
+        "until": openapi.Schema(
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATE,
+            description="Last day an occurrence may fall on.",
+        ),
+        "reservation_time": openapi.Schema(
+            type=openapi.TYPE_STRING, description="Start time, e.g. 19:30."
+        ),
+        "duration_hours": openapi.Schema(
+            type=openapi.TYPE_NUMBER,
+            description="0.5 to 3.0 hours in 0.5-hour steps. Defaults to 1.",
+        ),
+        "party_size": openapi.Schema(type=openapi.TYPE_INTEGER, minimum=1),
+        "frequency": openapi.Schema(
+            type=openapi.TYPE_STRING, enum=["DAILY", "WEEKLY"], default="WEEKLY"
+        ),
+        "interval": openapi.Schema(
+            type=openapi.TYPE_INTEGER,
+            minimum=1,
+            maximum=52,
+            default=1,
+            description="Days or weeks between occurrences.",
+        ),
+        "weekdays": openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_STRING,
+                enum=["MO", "TU", "WE", "TH", "FR", "SA", "SU"],
+            ),
+            description="Days of a WEEKLY series. Defaults to the weekday of start_date.",
+        ),
+    },
+    required=["restaurant_id", "start_date", "until", "reservation_time", "party_size"],
+)
+
+RecurringOccurrenceResponse = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "start_time": openapi.Schema(
+            type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+        ),
+        "end_time": openapi.Schema(
+            type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+        ),
+        "booked": openapi.Schema(type=openapi.TYPE_BOOLEAN),
+        "reservation_id": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "table_id": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "detail": openapi.Schema(
+            type=openapi.TYPE_STRING,
+            description="Conflict reason, present when booked is false.",
+        ),
+    },
+    required=["start_time", "end_time", "booked"],
+)
+
+BookRecurringReservationResponse = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "series_id": openapi.Schema(
+            type=openapi.TYPE_INTEGER,
+            x_nullable=True,
+            description="Null when no occurrence could be booked.",
+        ),
+        "booked": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "conflicts": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "occurrences": openapi.Schema(
+            type=openapi.TYPE_ARRAY, items=RecurringOccurrenceResponse
+        ),
+    },
+    required=["series_id", "booked", "conflicts", "occurrences"],
+)
+
+
+BOOK_RECURRING_RESERVATION_VIEW_SCHEMA = {
+    "operation_id": "book_recurring_reservation",
+    "operation_summary": "Book a recurring reservation",
+    "operation_description": (
+        "Books a standing reservation for the authenticated user: the same party "
+        "and time slot every `interval` days or weeks from start_date to until, "
+        "up to 366 occurrences. The series keeps to one table where it can. "
+        "Occurrences no table can take are reported and not booked."
+    ),
+    "request_body": BookRecurringReservationRequest,
+    "responses": {
+        status.HTTP_200_OK: openapi.Response(
+            description="Series processed. See per-occurrence results.",
+            schema=BookRecurringReservationResponse,
+        ),
+        status.HTTP_400_BAD_REQUEST: openapi.Response(
+            description="Bad Request - Invalid series.",
+            examples={
+                "application/json": {"until": ["until cannot be before start_date."]}
+            },
+        ),
+        status.HTTP_401_UNAUTHORIZED: openapi.Response(
+            description="Unauthorized - Authentication credentials were not provided or are invalid.",
+            examples={
+                "application/json": {
+                    "detail": "Authentication credentials were not provided."
+                }
+            },
+        ),
+        status.HTTP_404_NOT_FOUND: openapi.Response(
+            description="Not Found - Restaurant does not exist or has no table for the party.",
+            examples={"application/json": {"detail": "Restaurant not found."}},
+        ),
+        status.HTTP_409_CONFLICT: openapi.Response(
+            description="Conflict - Picked tables kept being booked concurrently; retry the series.",
+            examples={
+                "application/json": {
+                    "detail": "Tables were booked concurrently, please retry."
+                }
+            },
+        ),
+    },
+    "tags": ["Reservations"],
+}
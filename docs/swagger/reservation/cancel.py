@@ -26,9 +26,9 @@ CANCEL_RESERVATION_VIEW_SCHEMA = {
             ),
         ),
         status.HTTP_400_BAD_REQUEST: openapi.Response(
-            description="Bad request (e.g., invalid reservation ID format, or other validation error from serializer)",
+            description="Bad request (e.g., invalid reservation ID format, or the reservation does not exist)",
             examples={
-                "application/json": {"reservation_id": ["This field is required."]}
+                "application/json": {"reservation_id": ["Reservation does not exist."]}
             },
         ),
         status.HTTP_401_UNAUTHORIZED: openapi.Response(
@@ -47,10 +47,6 @@ CANCEL_RESERVATION_VIEW_SCHEMA = {
                 }
             },
         ),
-        status.HTTP_404_NOT_FOUND: openapi.Response(
-            description="Reservation not found",
-            examples={"application/json": {"detail": "Reservation not found."}},
-        ),
     },
     "tags": ["Reservations"],
 }
@@ -0,0 +1,52 @@
+from drf_yasg import openapi
+from rest_framework import status
+
+from reservations.serializers import CancelReservationBatchSerializer
+
+CANCEL_RESERVATION_BATCH_VIEW_SCHEMA = {
+    "operation_id": "reservation_cancel_batch",
+    "operation_summary": "Cancel several reservations",
+    "operation_description": (
+        "Cancels up to 100 of the user's reservations, e.g. every table of a "
+        "party, with one statement. Ids that do not exist, belong to another "
+        "user or are already cancelled are reported and skipped."
+    ),
+    "request_body": CancelReservationBatchSerializer,
+    "responses": {
+        status.HTTP_200_OK: openapi.Response(
+            description="One result per id, in request order.",
+            examples={
+                "application/json": {
+                    "cancelled": 1,
+                    "results": [
+                        {
+                            "reservation_id": 42,
+                            "cancelled": True,
+                            "detail": "Reservation cancelled successfully.",
+                        },
+                        {
+                            "reservation_id": 43,
+                            "cancelled": False,
+                            "detail": "Reservation is already cancelled.",
+                        },
+                    ],
+                }
+            },
+        ),
+        status.HTTP_400_BAD_REQUEST: openapi.Response(
+            description="Bad Request - The list is missing, empty or too long.",
+            examples={
+                "application/json": {"reservation_ids": ["This list may not be empty."]}
+            },
+        ),
+        status.HTTP_401_UNAUTHORIZED: openapi.Response(
+            description="Unauthorized - Authentication credentials were not provided or are invalid.",
+            examples={
+                "application/json": {
+                    "detail": "Authentication credentials were not provided."
+                }
+            },
+        ),
+    },
+    "tags": ["Reservations"],
+}
@@ -0,0 +1,53 @@
+from drf_yasg import openapi
+from rest_framework import status
+
+from reservations.serializers import CloseDaySerializer
+
+CLOSE_DAY_VIEW_SCHEMA = {
+    "operation_id": "reservation_close_day",
+    "operation_summary": "Close a restaurant for a day (staff only)",
+    "operation_description": (
+        "Cancels every confirmed reservation overlapping the day and every "
+        "waiting waitlist entry for it, in one transaction. The cancelled "
+        "tables are not backfilled from the waitlist."
+    ),
+    "request_body": CloseDaySerializer,
+    "responses": {
+        status.HTTP_200_OK: openapi.Response(
+            description="What was cancelled.",
+            examples={
+                "application/json": {
+                    "restaurant_id": 3,
+                    "date": "2025-12-24",
+                    "cancelled_reservations": 57,
+                    "cancelled_waitlist_entries": 4,
+                }
+            },
+        ),
+        status.HTTP_400_BAD_REQUEST: openapi.Response(
+            description="Bad Request - Invalid restaurant_id or date.",
+            examples={"application/json": {"date": ["This field is required."]}},
+        ),
+        status.HTTP_401_UNAUTHORIZED: openapi.Response(
+            description="Unauthorized - Authentication credentials were not provided or are invalid.",
+            examples={
+                "application/json": {
+                    "detail": "Authentication credentials were not provided."
+                }
+            },
+        ),
+        status.HTTP_403_FORBIDDEN: openapi.Response(
+            description="Forbidden - The user is not staff.",
+            examples={
+                "application/json": {
+                    "detail": "You do not have permission to perform this action."
+                }
+            },
+        ),
+        status.HTTP_404_NOT_FOUND: openapi.Response(
+            description="Not Found - The restaurant does not exist.",
+            examples={"application/json": {"detail": "Restaurant not found."}},
+        ),
+    },
+    "tags": ["Reservations"],
+}
@@ -0,0 +1,79 @@
+from drf_yasg import openapi
+from rest_framework import status
+
+EXPORT_RESERVATIONS_VIEW_SCHEMA = {
+    "operation_id": "reservation_export",
+    "operation_summary": "Export reservations (staff only)",
+    "operation_description": (
+        "Streams every reservation matching the filters with its table, "
+        "restaurant, user, cost and status, as CSV (with a header row) or "
+        "as NDJSON (one JSON object per line), ordered by id."
+    ),
+    "manual_parameters": [
+        openapi.Parameter(
+            "file_format",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            enum=["csv", "ndjson"],
+            required=False,
+            description="Output format. Defaults to csv.",
+        ),
+        openapi.Parameter(
+            "start_date",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATE,
+            required=False,
+            description="First reservation day to include (YYYY-MM-DD).",
+        ),
+        openapi.Parameter(
+            "end_date",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATE,
+            required=False,
+            description="Last reservation day to include (YYYY-MM-DD).",
+        ),
+        openapi.Parameter(
+            "restaurant_id",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Items(type=openapi.TYPE_INTEGER),
+            collection_format="multi",
+            required=False,
+            description="Restaurants to include; repeat for several. All by default.",
+        ),
+    ],
+    "produces": ["text/csv", "application/x-ndjson"],
+    "responses": {
+        status.HTTP_200_OK: openapi.Response(
+            description="The reservations, streamed.",
+            schema=openapi.Schema(type=openapi.TYPE_FILE),
+        ),
+        status.HTTP_400_BAD_REQUEST: openapi.Response(
+            description="Bad Request - Invalid query parameters.",
+            examples={
+                "application/json": {
+                    "non_field_errors": ["start_date must not be after end_date."]
+                }
+            },
+        ),
+        status.HTTP_401_UNAUTHORIZED: openapi.Response(
+            description="Unauthorized - Authentication credentials were not provided or are invalid.",
+            examples={
+                "application/json": {
+                    "detail": "Authentication credentials were not provided."
+                }
+            },
+        ),
+        status.HTTP_403_FORBIDDEN: openapi.Response(
+            description="Forbidden - The user is not staff.",
+            examples={
+                "application/json": {
+                    "detail": "You do not have permission to perform this action."
+                }
+            },
+        ),
+    },
+    "tags": ["Reservations"],
+}
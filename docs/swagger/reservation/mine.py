@@ -0,0 +1,75 @@
+from drf_yasg import openapi
+from rest_framework import status
+
+MY_RESERVATIONS_VIEW_SCHEMA = {
+    "operation_id": "reservation_mine",
+    "operation_summary": "List my reservations",
+    "operation_description": (
+        "The authenticated user's reservations, newest first, one page at a "
+        "time. Follow `next` for the following page until it is null; pages "
+        "stay consistent while reservations are added."
+    ),
+    "manual_parameters": [
+        openapi.Parameter(
+            "cursor",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            required=False,
+            description="Opaque position from the previous page's `next` link.",
+        ),
+        openapi.Parameter(
+            "limit",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_INTEGER,
+            required=False,
+            description="Reservations per page, 1-100. Defaults to 20.",
+        ),
+        openapi.Parameter(
+            "status",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            enum=["CONFIRMED", "CANCELLED"],
+            required=False,
+            description="Only list reservations with this status.",
+        ),
+    ],
+    "responses": {
+        status.HTTP_200_OK: openapi.Response(
+            description="A page of reservations.",
+            examples={
+                "application/json": {
+                    "next": (
+                        "http://localhost:8000/api/reservations/mine/"
+                        "?cursor=WyIyMDI1LTA2LTAxVDE5OjAwOjAwIiwgNDJd"
+                    ),
+                    "results": [
+                        {
+                            "id": 43,
+                            "status": "CONFIRMED",
+                            "num_seats": 4,
+                            "cost": "40.00",
+                            "end_time": "2025-06-02T21:00:00",
+                            "restaurant_id": 1,
+                            "restaurant_name": "Chez Django",
+                            "table_number": 3,
+                            "start_time": "2025-06-02T19:00:00",
+                        }
+                    ],
+                }
+            },
+        ),
+        status.HTTP_400_BAD_REQUEST: openapi.Response(
+            description="Bad Request - Invalid query parameters.",
+            examples={"application/json": {"cursor": ["Invalid cursor."]}},
+        ),
+        status.HTTP_401_UNAUTHORIZED: openapi.Response(
+            description="Unauthorized - Authentication credentials were not provided or are invalid.",
+            examples={
+                "application/json": {
+                    "detail": "Authentication credentials were not provided."
+                }
+            },
+        ),
+    },
+    "tags": ["Reservations"],
+}
@@ -0,0 +1,142 @@
+from drf_yasg import openapi
+from rest_framework import status
+
+_figures = {
+    "bookings": openapi.Schema(type=openapi.TYPE_INTEGER),
+    "covers": openapi.Schema(type=openapi.TYPE_INTEGER),
+    "revenue": openapi.Schema(type=openapi.TYPE_STRING, format="decimal"),
+    "cancellations": openapi.Schema(type=openapi.TYPE_INTEGER),
+    "guest_minutes": openapi.Schema(type=openapi.TYPE_INTEGER),
+    "occupancy_pct": openapi.Schema(type=openapi.TYPE_NUMBER),
+}
+
+OCCUPANCY_REPORT_VIEW_SCHEMA = {
+    "operation_id": "reservation_occupancy_report",
+    "operation_summary": "Occupancy and revenue report (staff only)",
+    "operation_description": (
+        "Bookings, covers, revenue, cancellations and seat occupancy of a "
+        "restaurant per day or per hour, read from the precomputed occupancy "
+        "rollup. Bookings, covers and revenue count in the hour a reservation "
+        "starts; occupancy counts every hour it spans. Only buckets with "
+        "activity are listed. Recent bookings appear once their events are "
+        "written, within a few seconds."
+    ),
+    "manual_parameters": [
+        openapi.Parameter(
+            "restaurant_id",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_INTEGER,
+            required=True,
+        ),
+        openapi.Parameter(
+            "start_date",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATE,
+            required=True,
+            description="First day to include (YYYY-MM-DD).",
+        ),
+        openapi.Parameter(
+            "end_date",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATE,
+            required=True,
+            description="Last day to include (YYYY-MM-DD).",
+        ),
+        openapi.Parameter(
+            "start_hour",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_INTEGER,
+            required=False,
+            description="First hour of each day to include, 0-23. Defaults to 0.",
+        ),
+        openapi.Parameter(
+            "end_hour",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_INTEGER,
+            required=False,
+            description=(
+                "Hour each day ends at, 1-24. Defaults to 24. Pass the opening "
+                "hours for a meaningful occupancy."
+            ),
+        ),
+        openapi.Parameter(
+            "group_by",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            enum=["day", "hour"],
+            required=False,
+            description="Bucket size. Defaults to day.",
+        ),
+    ],
+    "responses": {
+        status.HTTP_200_OK: openapi.Response(
+            description="The report.",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "restaurant_id": openapi.Schema(type=openapi.TYPE_INTEGER),
+                    "start_date": openapi.Schema(
+                        type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
+                    ),
+                    "end_date": openapi.Schema(
+                        type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
+                    ),
+                    "start_hour": openapi.Schema(type=openapi.TYPE_INTEGER),
+                    "end_hour": openapi.Schema(type=openapi.TYPE_INTEGER),
+                    "seats": openapi.Schema(type=openapi.TYPE_INTEGER),
+                    "buckets": openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                "day": openapi.Schema(
+                                    type=openapi.TYPE_STRING,
+                                    format=openapi.FORMAT_DATE,
+                                ),
+                                "hour": openapi.Schema(
+                                    type=openapi.TYPE_INTEGER,
+                                    description="Only with group_by=hour.",
+                                ),
+                                **_figures,
+                            },
+                        ),
+                    ),
+                    "totals": openapi.Schema(
+                        type=openapi.TYPE_OBJECT, properties=_figures
+                    ),
+                },
+            ),
+        ),
+        status.HTTP_400_BAD_REQUEST: openapi.Response(
+            description="Bad Request - Invalid query parameters.",
+            examples={
+                "application/json": {
+                    "non_field_errors": ["start_hour must be before end_hour."]
+                }
+            },
+        ),
+        status.HTTP_401_UNAUTHORIZED: openapi.Response(
+            description="Unauthorized - Authentication credentials were not provided or are invalid.",
+            examples={
+                "application/json": {
+                    "detail": "Authentication credentials were not provided."
+                }
+            },
+        ),
+        status.HTTP_403_FORBIDDEN: openapi.Response(
+            description="Forbidden - The user is not staff.",
+            examples={
+                "application/json": {
+                    "detail": "You do not have permission to perform this action."
+                }
+            },
+        ),
+        status.HTTP_404_NOT_FOUND: openapi.Response(
+            description="Not Found - The restaurant does not exist.",
+            examples={"application/json": {"detail": "Restaurant not found."}},
+        ),
+    },
+    "tags": ["Reservations"],
+}
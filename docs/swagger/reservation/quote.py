@@ -0,0 +1,64 @@
+from drf_yasg import openapi
+from rest_framework import status
+
+from docs.swagger.reservation.availability import AVAILABILITY_VIEW_SCHEMA
+
+QuoteTableResponse = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "table_id": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "seats": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "cost": openapi.Schema(
+            type=openapi.TYPE_STRING,
+            description="Price of booking the table at this start time.",
+        ),
+    },
+    required=["table_id", "seats", "cost"],
+)
+
+QuoteResponse = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "restaurant_id": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "date": openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+        "party_size": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "duration_hours": openapi.Schema(type=openapi.TYPE_STRING),
+        "slots": openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "start_time": openapi.Schema(
+                        type=openapi.TYPE_STRING, format="time"
+                    ),
+                    "tables": openapi.Schema(
+                        type=openapi.TYPE_ARRAY, items=QuoteTableResponse
+                    ),
+                },
+            ),
+            description="Free start times (HH:MM), in 30-minute steps, with the free tables and their prices.",
+        ),
+    },
+    required=["restaurant_id", "date", "party_size", "duration_hours", "slots"],
+)
+
+
+QUOTE_VIEW_SCHEMA = {
+    "operation_id": "reservation_quote",
+    "operation_summary": "Quote prices for free tables",
+    "operation_description": (
+        "Returns, for every half-hour start time on the given date, each table "
+        "that can seat the party for the whole duration and the price of booking "
+        "it then. Prices follow the restaurant's price rules for the weekday and "
+        "time of day."
+    ),
+    "manual_parameters": AVAILABILITY_VIEW_SCHEMA["manual_parameters"],
+    "responses": {
+        **AVAILABILITY_VIEW_SCHEMA["responses"],
+        status.HTTP_200_OK: openapi.Response(
+            description="Free tables and prices for the request.",
+            schema=QuoteResponse,
+        ),
+    },
+    "tags": ["Reservations"],
+}
@@ -0,0 +1,103 @@
+from drf_yasg import openapi
+from rest_framework import status
+
+SEARCH_AVAILABILITY_VIEW_SCHEMA = {
+    "operation_id": "reservation_search",
+    "operation_summary": "Search free tables across restaurants",
+    "operation_description": (
+        "Lists the restaurants with an available table for the party for the "
+        "whole duration from the given date and time, one page at a time. The "
+        "best fits come first: the smallest table a booking would get, then the "
+        "most free tables. Follow `next` for the following page until it is null."
+    ),
+    "manual_parameters": [
+        openapi.Parameter(
+            "date",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATE,
+            required=True,
+            description="Day of the reservation (YYYY-MM-DD).",
+        ),
+        openapi.Parameter(
+            "reservation_time",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            required=True,
+            description="Start time (HH:MM).",
+        ),
+        openapi.Parameter(
+            "party_size",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_INTEGER,
+            required=True,
+            description="Number of guests.",
+        ),
+        openapi.Parameter(
+            "duration_hours",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_NUMBER,
+            required=False,
+            description="Hours (0.5–3.0, in 0.5 increments). Defaults to 1.",
+        ),
+        openapi.Parameter(
+            "restaurant_id",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Items(type=openapi.TYPE_INTEGER),
+            collection_format="multi",
+            required=False,
+            description="Only search these restaurants. Repeat for several.",
+        ),
+        openapi.Parameter(
+            "cursor",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            required=False,
+            description="Opaque position from the previous page's `next` link.",
+        ),
+        openapi.Parameter(
+            "limit",
+            openapi.IN_QUERY,
+            type=openapi.TYPE_INTEGER,
+            required=False,
+            description="Restaurants per page, 1-100. Defaults to 20.",
+        ),
+    ],
+    "responses": {
+        status.HTTP_200_OK: openapi.Response(
+            description="A page of restaurants with a free table.",
+            examples={
+                "application/json": {
+                    "next": (
+                        "http://localhost:8000/api/reservations/search/"
+                        "?date=2025-06-06&reservation_time=20:00&party_size=6"
+                        "&cursor=WzYsIDMsIDQyXQ"
+                    ),
+                    "results": [
+                        {
+                            "restaurant": {"id": 7, "name": "Chez Django"},
+                            "free_tables": 3,
+                            "table_seats": 6,
+                            "start_time": "2025-06-06T20:00:00",
+                            "end_time": "2025-06-06T21:00:00",
+                        }
+                    ],
+                }
+            },
+        ),
+        status.HTTP_400_BAD_REQUEST: openapi.Response(
+            description="Bad Request - Invalid query parameters.",
+            examples={"application/json": {"party_size": ["This field is required."]}},
+        ),
+        status.HTTP_401_UNAUTHORIZED: openapi.Response(
+            description="Unauthorized - Authentication credentials were not provided or are invalid.",
+            examples={
+                "application/json": {
+                    "detail": "Authentication credentials were not provided."
+                }
+            },
+        ),
+    },
+    "tags": ["Reservations"],
+}
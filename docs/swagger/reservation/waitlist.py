@@ -0,0 +1,142 @@
+from drf_yasg import openapi
+from rest_framework import status
+
+from reservations.serializers import LeaveWaitlistSerializer
+
+WaitlistEntryResponse = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "id": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "restaurant_id": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "party_size": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "start_time": openapi.Schema(
+            type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+        ),
+        "end_time": openapi.Schema(
+            type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+        ),
+        "status": openapi.Schema(
+            type=openapi.TYPE_STRING, enum=["WAITING", "BOOKED", "CANCELLED"]
+        ),
+        "reservation_id": openapi.Schema(
+            type=openapi.TYPE_INTEGER,
+            x_nullable=True,
+            description="The reservation booked for the entry, once BOOKED.",
+        ),
+    },
+)
+
+UNAUTHORIZED = openapi.Response(
+    description="Unauthorized (user not authenticated)",
+    examples={
+        "application/json": {"detail": "Authentication credentials were not provided."}
+    },
+)
+
+WAITLIST_VIEW_SCHEMA = {
+    "operation_id": "waitlist",
+    "operation_summary": "List my waitlist entries",
+    "operation_description": (
+        "Returns the user's waitlist entries that have not ended yet, in start "
+        "order. Entries booked from a cancellation have status BOOKED and a "
+        "reservation_id."
+    ),
+    "responses": {
+        status.HTTP_200_OK: openapi.Response(
+            description="Waitlist entries",
+            schema=openapi.Schema(type=openapi.TYPE_ARRAY, items=WaitlistEntryResponse),
+        ),
+        status.HTTP_401_UNAUTHORIZED: UNAUTHORIZED,
+    },
+    "tags": ["Reservations"],
+}
+
+JOIN_WAITLIST_VIEW_SCHEMA = {
+    "operation_id": "join_waitlist",
+    "operation_summary": "Join a restaurant's waitlist",
+    "operation_description": (
+        "Takes the same body as book_reservation. When a cancellation frees a "
+        "table that fits the party for the whole requested window, the entry "
+        "is booked automatically; earlier entries are served first. Only "
+        "for times with no fitting table free, and one entry per user for "
+        "any overlapping window."
+    ),
+    "request_body": openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            "restaurant_id": openapi.Schema(type=openapi.TYPE_INTEGER, example=1),
+            "reservation_date": openapi.Schema(
+                type=openapi.TYPE_STRING,
+                format=openapi.FORMAT_DATE,
+                example="2025-06-26",
+            ),
+            "reservation_time": openapi.Schema(
+                type=openapi.TYPE_STRING, format="time", example="19:30"
+            ),
+            "party_size": openapi.Schema(type=openapi.TYPE_INTEGER, example=4),
+            "duration_hours": openapi.Schema(type=openapi.TYPE_NUMBER, example=2),
+        },
+        required=[
+            "restaurant_id",
+            "reservation_date",
+            "reservation_time",
+            "party_size",
+            "duration_hours",
+        ],
+    ),
+    "responses": {
+        status.HTTP_201_CREATED: openapi.Response(
+            description="Added to the waitlist", schema=WaitlistEntryResponse
+        ),
+        status.HTTP_400_BAD_REQUEST: openapi.Response(
+            description="Bad Request - Invalid input data or validation error.",
+            examples={
+                "application/json": {"field_name": ["Error message for this field."]}
+            },
+        ),
+        status.HTTP_401_UNAUTHORIZED: UNAUTHORIZED,
+        status.HTTP_404_NOT_FOUND: openapi.Response(
+            description="Not Found - The restaurant does not exist or none of its tables fits the party.",
+            examples={"application/json": {"detail": "Restaurant not found."}},
+        ),
+        status.HTTP_409_CONFLICT: openapi.Response(
+            description=(
+                "Conflict - A fitting table is free, so book it directly, or the "
+                "user is already waiting for an overlapping time."
+            ),
+            examples={
+                "application/json": {
+                    "detail": "A table is free for this time, please book it directly."
+                }
+            },
+        ),
+    },
+    "tags": ["Reservations"],
+}
+
+LEAVE_WAITLIST_VIEW_SCHEMA = {
+    "operation_summary": "Leave a waitlist",
+    "request_body": LeaveWaitlistSerializer,
+    "responses": {
+        status.HTTP_200_OK: openapi.Response(
+            description="Left the waitlist, or the entry was already booked or cancelled",
+            examples={
+                "application/json": {"detail": "Left the waitlist successfully."}
+            },
+        ),
+        status.HTTP_401_UNAUTHORIZED: UNAUTHORIZED,
+        status.HTTP_403_FORBIDDEN: openapi.Response(
+            description="Forbidden (the entry belongs to another user)",
+            examples={
+                "application/json": {
+                    "detail": "You do not have permission to change this waitlist entry."
+                }
+            },
+        ),
+        status.HTTP_404_NOT_FOUND: openapi.Response(
+            description="Waitlist entry not found",
+            examples={"application/json": {"detail": "Waitlist entry not found."}},
+        ),
+    },
+    "tags": ["Reservations"],
+}
@@ -0,0 +1,74 @@
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from monitoring.metrics import (
+    HTTP_REQUEST_DB_DURATION,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUEST_QUERIES,
+    HTTP_REQUESTS,
+)
+from monitoring.tracing import start_trace
+
+UNMATCHED_ENDPOINT = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status and database work of every request per
+    endpoint, and activates a Trace the service facades add stages to.
+
+    Endpoints are labelled by URL name (e.g. "reservations:book_reservation")
+    rather than path, so ids in URLs cannot blow up label cardinality.
+    With MONITORING["SERVER_TIMING"] on, the trace is also returned in a
+    Server-Timing header.
+
+    Runs natively under both WSGI and ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, "MONITORING", {}).get(
+            "SERVER_TIMING", False
+        )
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = perf_counter()
+        with start_trace() as trace:
+            response = self.get_response(request)
+        return self._record(request, response, trace, perf_counter() - started)
+
+    async def __acall__(self, request):
+        started = perf_counter()
+        with start_trace() as trace:
+            response = await self.get_response(request)
+        return self._record(request, response, trace, perf_counter() - started)
+
+    def _record(self, request, response, trace, elapsed):
+        endpoint = self._endpoint(request)
+        HTTP_REQUESTS.inc(
+            method=request.method, endpoint=endpoint, status=response.status_code
+        )
+        HTTP_REQUEST_DURATION.observe(elapsed, method=request.method, endpoint=endpoint)
+        HTTP_REQUEST_QUERIES.observe(trace.queries, endpoint=endpoint)
+        HTTP_REQUEST_DB_DURATION.observe(trace.query_seconds, endpoint=endpoint)
+
+        if self.server_timing:
+            response["Server-Timing"] = trace.server_timing(elapsed)
+        return response
+
+    @staticmethod
+    def _endpoint(request) -> str:
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return UNMATCHED_ENDPOINT
+        return match.view_name
@@ -0,0 +1,168 @@
+import re
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from accounts.services import JWTService
+from monitoring.metrics import (
+    HTTP_REQUEST_QUERIES,
+    HTTP_REQUESTS,
+    STAGE_DURATION,
+    MetricsRegistry,
+    registry,
+)
+from monitoring.tracing import current_trace, stage, start_trace
+from reservations.services.interval_index import reservation_index
+from restaurant.models import Restaurant, Table
+from restaurant.repos.cache import restaurant_metadata_cache
+
+User = get_user_model()
+
+
+class MetricsRegistryTests(TestCase):
+    def test_renders_counters_and_cumulative_histogram_buckets(self):
+        metrics = MetricsRegistry()
+        hits = metrics.counter("hits_total", "Hits.", ("path",))
+        latency = metrics.histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+        hits.inc(path='/a"b')
+        hits.inc(2, path='/a"b')
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(5)
+
+        text = metrics.render()
+
+        self.assertIn("# TYPE hits_total counter", text)
+        self.assertIn('hits_total{path="/a\\"b"} 3', text)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{le="1"} 2', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("latency_seconds_sum 5.55", text)
+        self.assertIn("latency_seconds_count 3", text)
+
+    def test_registering_a_name_twice_returns_the_same_metric(self):
+        metrics = MetricsRegistry()
+        first = metrics.counter("hits_total", "Hits.")
+        self.assertIs(metrics.counter("hits_total", "Hits."), first)
+        with self.assertRaises(ValueError):
+            metrics.histogram("hits_total", "Hits.")
+
+
+class TracingTests(TestCase):
+    def setUp(self):
+        registry.clear()
+
+    def test_stage_records_duration_and_queries_into_the_active_trace(self):
+        with start_trace() as trace:
+            with stage("test.lookup"):
+                list(User.objects.all())
+            self.assertIs(current_trace(), trace)
+
+        self.assertIsNone(current_trace())
+        self.assertEqual(trace.queries, 1)
+        self.assertEqual([name for name, _ in trace.stages], ["test.lookup"])
+        self.assertEqual(STAGE_DURATION.count(stage="test.lookup"), 1)
+
+    def test_stage_without_trace_still_feeds_the_histogram(self):
+        with stage("test.offline"):
+            pass
+        self.assertEqual(STAGE_DURATION.count(stage="test.offline"), 1)
+
+
+class MetricsMiddlewareTests(APITestCase):
+    def setUp(self):
+        registry.clear()
+        reservation_index.invalidate()
+        restaurant_metadata_cache.clear()
+        self.user = User.objects.create_user(username="alice", password="pass")
+        self.client.force_authenticate(self.user)
+        self.restaurant = Restaurant.objects.create(name="R")
+        Table.objects.create(restaurant=self.restaurant, number=1, seats=4)
+        self.payload = {
+            "restaurant_id": self.restaurant.id,
+            "reservation_date": (date.today() + timedelta(days=1)).isoformat(),
+            "reservation_time": "19:00",
+            "duration_hours": "1.0",
+            "party_size": 2,
+        }
+
+    def test_booking_records_endpoint_queries_and_stages(self):
+        resp = self.client.post(
+            reverse("reservations:book_reservation"), self.payload, format="json"
+        )
+        self.assertEqual(resp.status_code, 200)
+
+        endpoint = "reservations:book_reservation"
+        self.assertEqual(
+            HTTP_REQUESTS.value(method="POST", endpoint=endpoint, status=200), 1
+        )
+        self.assertEqual(HTTP_REQUEST_QUERIES.count(endpoint=endpoint), 1)
+        for name in (
+            "book.validate",
+            "book.find_restaurant",
+            "book.select_table",
+            "book.pricing",
+            "book.persist",
+        ):
+            self.assertEqual(STAGE_DURATION.count(stage=name), 1, name)
+
+        self.client.force_login(User.objects.create_user("ops", is_staff=True))
+        text = self.client.get(reverse("metrics")).content.decode()
+        self.assertIn(
+            'http_requests_total{method="POST",endpoint="reservations:book_reservation",'
+            'status="200"} 1',
+            text,
+        )
+        self.assertIn('app_stage_db_queries_total{stage="book.persist"}', text)
+
+    def test_unresolved_paths_share_one_label(self):
+        self.client.get("/no/such/path/")
+        self.assertEqual(
+            HTTP_REQUESTS.value(method="GET", endpoint="unmatched", status=404), 1
+        )
+
+    @override_settings(MONITORING={"SERVER_TIMING": True})
+    def test_server_timing_header_lists_stages(self):
+        resp = self.client.post(
+            reverse("reservations:book_reservation"), self.payload, format="json"
+        )
+        self.assertIn("db;dur=", resp["Server-Timing"])
+        self.assertIn("book-persist;dur=", resp["Server-Timing"])
+
+    def test_metrics_endpoint_is_staff_only_without_a_token(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        self.client.force_login(User.objects.create_user("ops", is_staff=True))
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 200)
+
+    @override_settings(MONITORING={"METRICS_TOKEN": "s3cret"})
+    def test_metrics_endpoint_requires_configured_token(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 401)
+        resp = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp["Content-Type"].startswith("text/plain"))
+        # non-ASCII must not break the constant-time comparison
+        resp = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer s3crét")
+        self.assertEqual(resp.status_code, 401)
+
+    @override_settings(ROOT_URLCONF="benchmarks.urls")
+    async def test_async_view_queries_are_charged_to_the_request(self):
+        access = JWTService.generate_tokens(self.user)["access"]
+        resp = await self.async_client.post(
+            "/asgi/book/",
+            self.payload,
+            content_type="application/json",
+            headers={"Authorization": f"Bearer {access}"},
+        )
+        self.assertEqual(resp.status_code, 200)
+
+        text = registry.render()
+        queries = re.search(
+            r'http_request_db_queries_sum\{endpoint="book_asgi"\} (\d+)', text
+        )
+        self.assertGreater(int(queries.group(1)), 0)
+        self.assertIn('app_stage_db_queries_total{stage="book.persist"} 1', text)
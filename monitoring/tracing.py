@@ -0,0 +1,106 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import List, Optional, Tuple
+
+from monitoring.metrics import STAGE_DURATION, STAGE_QUERIES
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+
+
+class Trace:
+    """
+    Per-request record of database work and traced stage durations.
+
+    Every query run while the trace is active is counted and timed by
+    trace_queries(), on whichever thread the ORM runs it.
+    """
+
+    __slots__ = ("queries", "query_seconds", "stages")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.stages: List[Tuple[str, float]] = []
+
+    def server_timing(self, total_seconds: float) -> str:
+        """
+        The trace as a Server-Timing header value, durations in ms.
+        """
+        entries = [f"total;dur={total_seconds * 1000:.2f}"]
+        entries.append(
+            f'db;dur={self.query_seconds * 1000:.2f};desc="{self.queries} queries"'
+        )
+        entries.extend(
+            f"{name.replace('.', '-')};dur={seconds * 1000:.2f}"
+            for name, seconds in self.stages
+        )
+        return ", ".join(entries)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def trace_queries(execute, sql, params, many, context):
+    """
+    execute_wrapper installed on every connection (see MonitoringConfig)
+    that charges queries to the active trace.
+
+    The trace is found through a context variable rather than a wrapper
+    on the request thread's connection: under ASGI the async ORM runs
+    queries on a worker thread with its own connection, and asgiref
+    carries the context there.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        trace.query_seconds += perf_counter() - started
+        trace.queries += 1
+
+
+def install_query_tracing(connection, **kwargs) -> None:
+    """
+    connection_created receiver adding trace_queries to the connection.
+    """
+    if trace_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(trace_queries)
+
+
+@contextmanager
+def start_trace():
+    """
+    Activates a new Trace for the enclosed block and yields it.
+    """
+    trace = Trace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Times the enclosed block as stage `name`.
+
+    The duration always feeds the app_stage_duration_seconds histogram;
+    inside a request it is also added to the request's trace together
+    with the number of queries the stage ran.
+    """
+    trace = _current_trace.get()
+    queries = trace.queries if trace is not None else 0
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = perf_counter() - started
+        STAGE_DURATION.observe(elapsed, stage=name)
+        if trace is not None:
+            trace.stages.append((name, elapsed))
+            STAGE_QUERIES.inc(trace.queries - queries, stage=name)
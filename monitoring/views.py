@@ -0,0 +1,30 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+from monitoring.metrics import registry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@require_GET
+def metrics_view(request):
+    """
+    get:
+    Metrics of this worker process in the Prometheus text format.
+
+    Readable with MONITORING["METRICS_TOKEN"] sent as "Authorization:
+    Bearer <token>", or by staff signed in to the admin. Without a
+    configured token only staff can read them.
+    """
+    token = getattr(settings, "MONITORING", {}).get("METRICS_TOKEN")
+    # as bytes: compare_digest() rejects non-ASCII str
+    if token and hmac.compare_digest(
+        request.headers.get("Authorization", "").encode(), f"Bearer {token}".encode()
+    ):
+        return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
+    if request.user.is_staff:
+        return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
+    return HttpResponse(status=401 if token else 403)
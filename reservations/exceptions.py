@@ -0,0 +1,34 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class BookingConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Tables were booked concurrently, please retry."
+    default_code = "booking_conflict"
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = "This Idempotency-Key was already used for a different request."
+    default_code = "idempotency_key_reused"
+
+
+class IdempotencyKeyInProgress(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = (
+        "A request with this Idempotency-Key is still being processed, please retry."
+    )
+    default_code = "idempotency_key_in_progress"
+
+
+class TableAvailable(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "A table is free for this time, please book it directly."
+    default_code = "table_available"
+
+
+class AlreadyWaitlisted(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "You are already on a waitlist for an overlapping time."
+    default_code = "already_waitlisted"
@@ -0,0 +1,183 @@
+import random
+import time as clock
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from benchmarks.runner import test_database
+from reservations.models import Reservation, ReservationStatus
+from reservations.repos.repository import ReservationRepo
+from restaurant.models import Restaurant, Table
+from utils.stats import percentile
+
+INDEX_NAME = "reservation_confirmed_overlap"
+RESTAURANT_PREFIX = "Overlap Benchmark"
+# (hour, minute, duration in hours) of each table's bookable daily slots
+DAILY_SLOTS = ((12, 0, 1.5), (14, 0, 1.0), (18, 0, 2.0), (20, 30, 2.0))
+# bookings are taken this far ahead; the timed windows fall in this range
+# like the ones ReservationFacadeService.book asks about
+BOOKING_HORIZON_DAYS = 30
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds N years of reservations into a throwaway test database and "
+        "reports p50/p99 latency of ReservationRepo.findByRestaurantAndInterval "
+        "without and with its index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--years", type=int, default=1)
+        parser.add_argument("--restaurants", type=int, default=5)
+        parser.add_argument("--tables", type=int, default=10)
+        parser.add_argument(
+            "--occupancy",
+            type=float,
+            default=0.7,
+            help="Share of daily slots that get booked.",
+        )
+        parser.add_argument("--samples", type=int, default=200)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the seeded rows in the test database; use with --keepdb.",
+        )
+        parser.add_argument(
+            "--keepdb", action="store_true", help="Reuse and keep the test database."
+        )
+
+    def handle(self, *args, **options):
+        # the index is dropped and rebuilt: never on the configured database
+        with test_database(keepdb=options["keepdb"]):
+            self._benchmark(options)
+
+    def _benchmark(self, options):
+        rng = random.Random(options["seed"])
+        index = next(i for i in Reservation._meta.indexes if i.name == INDEX_NAME)
+
+        restaurants = self._seed(rng, options)
+        windows = [self._window(rng, restaurants) for _ in range(options["samples"])]
+        index_dropped = False
+        try:
+            with connection.schema_editor() as editor:
+                editor.remove_index(Reservation, index)
+            index_dropped = True
+            before = self._measure(windows)
+
+            with connection.schema_editor() as editor:
+                editor.add_index(Reservation, index)
+            index_dropped = False
+            after = self._measure(windows)
+        finally:
+            if index_dropped:
+                with connection.schema_editor() as editor:
+                    editor.add_index(Reservation, index)
+            if not options["keep"]:
+                self._cleanup(restaurants)
+
+        self._report("without index", before)
+        self._report("with index", after)
+        speedup = percentile(before, 50) / max(percentile(after, 50), 1e-9)
+        self.stdout.write(self.style.SUCCESS(f"p50 speedup: {speedup:.1f}x"))
+
+    def _seed(self, rng, options):
+        user, _ = get_user_model().objects.get_or_create(username="overlap-benchmark")
+        restaurants = [
+            Restaurant.objects.create(name=f"{RESTAURANT_PREFIX} {i}")
+            for i in range(1, options["restaurants"] + 1)
+        ]
+        tables = Table.objects.bulk_create(
+            Table(restaurant=r, number=n, seats=4 + (n % 7))
+            for r in restaurants
+            for n in range(1, options["tables"] + 1)
+        )
+
+        first_day = date.today() - timedelta(days=365 * options["years"])
+        batch, total = [], 0
+        started = clock.perf_counter()
+        for offset in range(365 * options["years"] + BOOKING_HORIZON_DAYS):
+            day = first_day + timedelta(days=offset)
+            for table in tables:
+                for hour, minute, hours in DAILY_SLOTS:
+                    if rng.random() >= options["occupancy"]:
+                        continue
+                    start_dt = datetime.combine(day, time(hour, minute))
+                    batch.append(
+                        Reservation(
+                            user=user,
+                            table=table,
+                            num_seats=table.seats,
+                            cost=(table.seats - 1) * 10,
+                            status=(
+                                ReservationStatus.CANCELLED
+                                if rng.random() < 0.1
+                                else ReservationStatus.CONFIRMED
+                            ),
+                            reservation_time=start_dt,
+                            end_time=start_dt + timedelta(hours=hours),
+                        )
+                    )
+                    if len(batch) >= options["batch_size"]:
+                        total += self._flush(batch)
+        total += self._flush(batch)
+
+        self.stdout.write(
+            f"Seeded {total} reservations in {clock.perf_counter() - started:.1f}s"
+        )
+        return restaurants
+
+    @staticmethod
+    def _flush(batch) -> int:
+        count = len(batch)
+        with transaction.atomic():
+            Reservation.objects.bulk_create(batch)
+        batch.clear()
+        return count
+
+    @staticmethod
+    def _window(rng, restaurants):
+        day = date.today() + timedelta(days=rng.randrange(BOOKING_HORIZON_DAYS))
+        start_dt = datetime.combine(day, time(11)) + timedelta(
+            minutes=30 * rng.randrange(22)
+        )
+        return rng.choice(restaurants).id, start_dt, start_dt + timedelta(hours=2)
+
+    @staticmethod
+    def _measure(windows):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE reservations_reservation")
+
+        # warm up caches and plans before timing
+        for window in windows[:10]:
+            ReservationRepo.findByRestaurantAndInterval(*window)
+
+        timings = []
+        for window in windows:
+            started = clock.perf_counter()
+            ReservationRepo.findByRestaurantAndInterval(*window)
+            timings.append((clock.perf_counter() - started) * 1000)
+        return timings
+
+    @staticmethod
+    def _cleanup(restaurants):
+        ids = tuple(r.id for r in restaurants)
+        # raw delete: the ORM would load every row to fire delete signals
+        placeholders = ", ".join(["%s"] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM reservations_reservation WHERE table_id IN "
+                f"(SELECT id FROM restaurant_table WHERE restaurant_id IN ({placeholders}))",
+                ids,
+            )
+        Restaurant.objects.filter(id__in=ids).delete()
+
+    def _report(self, label, timings):
+        self.stdout.write(
+            f"{label:>14}: p50={percentile(timings, 50):.3f}ms "
+            f"p99={percentile(timings, 99):.3f}ms over {len(timings)} queries"
+        )
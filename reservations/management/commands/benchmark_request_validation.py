@@ -0,0 +1,67 @@
+import time as clock
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from rest_framework.exceptions import ValidationError
+
+from reservations.serializers import ReservationRequestSerializer
+from reservations.services.booking_request import BookingRequest, BookingRequestParser
+from utils.stats import percentile
+
+
+def _drf_parse(data) -> BookingRequest:
+    # what book() did before BookingRequestParser
+    serializer = ReservationRequestSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+    return BookingRequest.from_validated_data(serializer.validated_data)
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports the per-request cost of validating a booking request with "
+        "ReservationRequestSerializer and with BookingRequestParser."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20000)
+        parser.add_argument(
+            "--invalid",
+            action="store_true",
+            help="Time a request with a bad party_size instead of a valid one.",
+        )
+
+    def handle(self, *args, **options):
+        data = {
+            "restaurant_id": 1,
+            "reservation_date": (date.today() + timedelta(days=1)).isoformat(),
+            "reservation_time": "19:30",
+            "duration_hours": "1.5",
+            "party_size": 0 if options["invalid"] else 4,
+        }
+        fast = BookingRequestParser()
+
+        before = self._measure(_drf_parse, data, options["iterations"])
+        after = self._measure(fast.parse, data, options["iterations"])
+        self._report("serializer", before)
+        self._report("parser", after)
+        speedup = percentile(before, 50) / max(percentile(after, 50), 1e-9)
+        self.stdout.write(self.style.SUCCESS(f"p50 speedup: {speedup:.1f}x"))
+
+    @staticmethod
+    def _measure(parse, data, iterations):
+        timings = []
+        for _ in range(iterations):
+            started = clock.perf_counter()
+            try:
+                parse(data)
+            except ValidationError:
+                pass
+            timings.append((clock.perf_counter() - started) * 1e6)
+        return timings
+
+    def _report(self, label, timings):
+        self.stdout.write(
+            f"{label:>10}: p50={percentile(timings, 50):.1f}us "
+            f"p99={percentile(timings, 99):.1f}us "
+            f"mean={sum(timings) / len(timings):.1f}us over {len(timings)} requests"
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from reservations.services.idempotency import IdempotencyService
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes stored Idempotency-Key responses older than "
+        'IDEMPOTENCY["TTL"]. Run it periodically, e.g. daily from cron.'
+    )
+
+    def handle(self, *args, **options):
+        deleted = IdempotencyService.from_settings().purge()
+        self.stdout.write(f"Deleted {deleted} idempotency records.")
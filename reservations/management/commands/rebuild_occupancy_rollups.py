@@ -0,0 +1,101 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from reservations.repos.repository import ReservationRepo
+from reservations.services.rollups import rebuild_range
+
+
+def _setup_worker():
+    # a no-op in forked workers; spawned ones start without Django
+    django.setup()
+
+
+def _rebuild(first_day, last_day, restaurant_ids):
+    return first_day, last_day, rebuild_range(first_day, last_day, restaurant_ids)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the occupancy rollup from reservations, in chunks of days "
+        "rebuilt in parallel by worker processes. Each chunk is replaced in "
+        "its own transaction. Run it with event writing paused (no bookings "
+        "or cancellations, and no queued events): an event written after its "
+        "chunk was rebuilt is counted twice."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start-date",
+            type=date.fromisoformat,
+            help="First day to rebuild (YYYY-MM-DD). Defaults to the first reservation.",
+        )
+        parser.add_argument(
+            "--end-date",
+            type=date.fromisoformat,
+            help="Last day to rebuild (YYYY-MM-DD). Defaults to the last reservation.",
+        )
+        parser.add_argument(
+            "--restaurant",
+            type=int,
+            action="append",
+            default=[],
+            help="Restaurant id to rebuild; repeat for several. All by default.",
+        )
+        parser.add_argument("--chunk-days", type=int, default=7)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes. 1 rebuilds in this process.",
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        first, last = ReservationRepo.findTimeBounds()
+        start_date = options["start_date"] or (first and first.date())
+        end_date = options["end_date"] or (last and last.date())
+        if start_date is None or end_date is None:
+            self.stdout.write("No reservations to roll up.")
+            return
+        if start_date > end_date:
+            raise CommandError("--start-date must not be after --end-date.")
+        if options["chunk_days"] < 1 or options["workers"] < 1:
+            raise CommandError("--chunk-days and --workers must be positive.")
+
+        restaurant_ids = options["restaurant"] or None
+        chunks = []
+        day = start_date
+        while day <= end_date:
+            chunk_end = min(day + timedelta(days=options["chunk_days"] - 1), end_date)
+            chunks.append((day, chunk_end, restaurant_ids))
+            day = chunk_end + timedelta(days=1)
+
+        started = time.perf_counter()
+        rows = 0
+        if options["workers"] == 1:
+            for chunk in chunks:
+                rows += self._report(*_rebuild(*chunk))
+        else:
+            # forked workers must not share this process' connections
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=options["workers"], initializer=_setup_worker
+            ) as pool:
+                for future in as_completed([pool.submit(_rebuild, *c) for c in chunks]):
+                    rows += self._report(*future.result())
+
+        self.stdout.write(
+            f"Rebuilt {rows} rollup rows for {(end_date - start_date).days + 1} days "
+            f"in {len(chunks)} chunks in {time.perf_counter() - started:.1f}s"
+        )
+
+    def _report(self, first_day, last_day, rows):
+        if self.verbosity > 1:
+            self.stdout.write(f"  {first_day}..{last_day}: {rows} rows")
+        return rows
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+CONSTRAINT_NAME = "reservation_confirmed_no_overlap"
+
+
+def add_exclusion_constraint(apps, schema_editor):
+    """
+    Reject overlapping CONFIRMED reservations on the same table.
+
+    PostgreSQL only: other backends keep relying on the selection step.
+    Table equality is expressed as a single-point int8range so the GiST
+    index needs only built-in range operator classes (no btree_gist).
+    The constraint is DEFERRABLE so multi-row moves can defer it to commit.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"""
+        ALTER TABLE reservations_reservation
+        ADD CONSTRAINT {CONSTRAINT_NAME}
+        EXCLUDE USING gist (
+            int8range(table_id, table_id, '[]') WITH =,
+            tstzrange(reservation_time, end_time, '[)') WITH &&
+        )
+        WHERE (status = 'CONFIRMED')
+        DEFERRABLE INITIALLY IMMEDIATE
+        """)
+
+
+def drop_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"ALTER TABLE reservations_reservation DROP CONSTRAINT IF EXISTS {CONSTRAINT_NAME}"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservations", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_exclusion_constraint, drop_exclusion_constraint),
+    ]
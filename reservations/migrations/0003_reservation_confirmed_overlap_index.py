@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservations", "0002_reservation_confirmed_no_overlap"),
+        ("restaurant", "0002_table_is_available"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                condition=models.Q(("status", "CONFIRMED")),
+                fields=["table", "end_time", "reservation_time"],
+                name="reservation_confirmed_overlap",
+            ),
+        ),
+    ]
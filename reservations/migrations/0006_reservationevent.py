@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservations", "0005_waitlistentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReservationEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("BOOKED", "Booked"), ("CANCELLED", "Cancelled")],
+                        max_length=10,
+                    ),
+                ),
+                ("reservation_id", models.BigIntegerField(db_index=True)),
+                ("user_id", models.BigIntegerField()),
+                ("restaurant_id", models.BigIntegerField()),
+                ("table_id", models.BigIntegerField()),
+                ("num_seats", models.PositiveIntegerField()),
+                ("cost", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("reservation_time", models.DateTimeField()),
+                ("end_time", models.DateTimeField()),
+                ("occurred_at", models.DateTimeField(db_index=True)),
+            ],
+            options={
+                "ordering": ["occurred_at", "id"],
+            },
+        ),
+    ]
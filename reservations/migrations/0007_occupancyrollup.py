@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservations", "0006_reservationevent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OccupancyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("restaurant_id", models.BigIntegerField()),
+                ("day", models.DateField()),
+                ("hour", models.PositiveSmallIntegerField()),
+                ("bookings", models.IntegerField(default=0)),
+                ("covers", models.IntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("cancellations", models.IntegerField(default=0)),
+                ("guest_minutes", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("restaurant_id", "day", "hour"),
+                        name="occupancy_rollup_bucket",
+                    )
+                ],
+            },
+        ),
+    ]
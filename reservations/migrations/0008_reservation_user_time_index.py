@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservations", "0007_occupancyrollup"),
+        ("restaurant", "0002_table_is_available"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["user", "reservation_time", "id"], name="reservation_user_time"
+            ),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservations", "0008_reservation_user_time_index"),
+        ("restaurant", "0002_table_is_available"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReservationSeries",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("party_size", models.PositiveIntegerField()),
+                (
+                    "frequency",
+                    models.CharField(
+                        choices=[("DAILY", "Daily"), ("WEEKLY", "Weekly")],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "interval",
+                    models.PositiveSmallIntegerField(
+                        default=1, help_text="Days or weeks between occurrences"
+                    ),
+                ),
+                (
+                    "weekdays",
+                    models.CharField(
+                        blank=True,
+                        help_text="Comma-separated BYDAY codes of a weekly series, e.g. TU,TH",
+                        max_length=20,
+                    ),
+                ),
+                ("start_date", models.DateField()),
+                (
+                    "until",
+                    models.DateField(help_text="Last day an occurrence may fall on"),
+                ),
+                ("start_time", models.TimeField()),
+                ("duration_hours", models.DecimalField(decimal_places=1, max_digits=2)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "restaurant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservation_series",
+                        to="restaurant.restaurant",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservation_series",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="reservation",
+            name="series",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="The recurring series the reservation was booked for",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="reservations",
+                to="reservations.reservationseries",
+            ),
+        ),
+    ]
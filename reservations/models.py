@@ -4,7 +4,7 @@ from django.conf import settings
 from django.db import models
 from django.utils import timezone as dj_timezone
 
-from restaurant.models import Table
+from restaurant.models import Restaurant, Table
 
 class ReservationStatus(models.TextChoices):
     CONFIRMED = "CONFIRMED", "Confirmed"
@@ -32,12 +32,228 @@ class Reservation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     reservation_time = models.DateTimeField(help_text="Start time of the reservation")
     end_time = models.DateTimeField(help_text="End time of the reservation")
+    series = models.ForeignKey(
+        "ReservationSeries",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="reservations",
+        help_text="The recurring series the reservation was booked for",
+    )
 
     class Meta:
         ordering = ["-reservation_time", "table"]
+        indexes = [
+            # serves ReservationRepo.findByRestaurantAndInterval; end_time
+            # leads because bookings ask about upcoming windows, where
+            # `end_time > start` is the selective bound
+            models.Index(
+                fields=["table", "end_time", "reservation_time"],
+                name="reservation_confirmed_overlap",
+                condition=models.Q(status=ReservationStatus.CONFIRMED),
+            ),
+            # keyset pagination of a user's reservations, newest first
+            models.Index(
+                fields=["user", "reservation_time", "id"],
+                name="reservation_user_time",
+            ),
+        ]
 
     def __str__(self) -> str:
         return (
             f"Reservation {self.id} by {self.user} for Table {self.table.number} "
             f"({self.status})"
         )
+
+
+class SeriesFrequency(models.TextChoices):
+    DAILY = "DAILY", "Daily"
+    WEEKLY = "WEEKLY", "Weekly"
+
+
+class ReservationSeries(models.Model):
+    """
+    A standing reservation: the same party and time slot on a daily or
+    weekly pattern, like an RRULE with FREQ, INTERVAL, BYDAY and UNTIL.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="reservation_series",
+    )
+    restaurant = models.ForeignKey(
+        Restaurant, on_delete=models.CASCADE, related_name="reservation_series"
+    )
+    party_size = models.PositiveIntegerField()
+    frequency = models.CharField(max_length=10, choices=SeriesFrequency.choices)
+    interval = models.PositiveSmallIntegerField(
+        default=1, help_text="Days or weeks between occurrences"
+    )
+    weekdays = models.CharField(
+        max_length=20,
+        blank=True,
+        help_text="Comma-separated BYDAY codes of a weekly series, e.g. TU,TH",
+    )
+    start_date = models.DateField()
+    until = models.DateField(help_text="Last day an occurrence may fall on")
+    start_time = models.TimeField()
+    duration_hours = models.DecimalField(max_digits=2, decimal_places=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.frequency} series {self.id} of user {self.user_id} at "
+            f"restaurant {self.restaurant_id}"
+        )
+
+
+class WaitlistStatus(models.TextChoices):
+    WAITING = "WAITING", "Waiting"
+    BOOKED = "BOOKED", "Booked"
+    CANCELLED = "CANCELLED", "Cancelled"
+
+
+class WaitlistEntry(models.Model):
+    """
+    A party waiting for a table at a restaurant for a specific time window,
+    booked automatically when a cancellation frees a fitting table.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="waitlist"
+    )
+    restaurant = models.ForeignKey(
+        Restaurant, on_delete=models.CASCADE, related_name="waitlist"
+    )
+    party_size = models.PositiveIntegerField()
+    reservation_time = models.DateTimeField(help_text="Requested start time")
+    end_time = models.DateTimeField(help_text="Requested end time")
+    status = models.CharField(
+        max_length=10,
+        choices=WaitlistStatus.choices,
+        default=WaitlistStatus.WAITING,
+    )
+    reservation = models.OneToOneField(
+        Reservation,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="waitlist_entry",
+        help_text="The reservation made when the entry was backfilled",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        indexes = [
+            # serves WaitlistRepo.findWaitingWithin: waiting entries of a
+            # restaurant starting inside a freed window
+            models.Index(
+                fields=["restaurant", "reservation_time", "end_time"],
+                name="waitlist_waiting_window",
+                condition=models.Q(status=WaitlistStatus.WAITING),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return (
+            f"Waitlist entry {self.id} of user {self.user_id} for "
+            f"{self.party_size} at restaurant {self.restaurant_id} ({self.status})"
+        )
+
+
+class ReservationEventKind(models.TextChoices):
+    BOOKED = "BOOKED", "Booked"
+    CANCELLED = "CANCELLED", "Cancelled"
+
+
+class ReservationEvent(models.Model):
+    """
+    Audit and analytics record of a booking or cancellation, written in
+    batches by a background task.
+
+    References are plain ids rather than foreign keys: the history
+    outlives deleted reservations and users, and bulk inserts skip the
+    foreign-key checks.
+    """
+
+    kind = models.CharField(max_length=10, choices=ReservationEventKind.choices)
+    reservation_id = models.BigIntegerField(db_index=True)
+    user_id = models.BigIntegerField()
+    restaurant_id = models.BigIntegerField()
+    table_id = models.BigIntegerField()
+    num_seats = models.PositiveIntegerField()
+    cost = models.DecimalField(max_digits=10, decimal_places=2)
+    reservation_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    occurred_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ["occurred_at", "id"]
+
+    def __str__(self) -> str:
+        return f"Reservation {self.reservation_id} {self.kind} at {self.occurred_at}"
+
+
+class OccupancyRollup(models.Model):
+    """
+    Booking totals of one restaurant for one hour of one day, kept up to
+    date from ReservationEvents and rebuilt with rebuild_occupancy_rollups.
+
+    bookings, covers and revenue count the CONFIRMED reservations starting
+    in the hour and cancellations the CANCELLED ones; guest_minutes sums
+    num_seats x the minutes of the hour each CONFIRMED reservation spans.
+    """
+
+    restaurant_id = models.BigIntegerField()
+    day = models.DateField()
+    hour = models.PositiveSmallIntegerField()
+    bookings = models.IntegerField(default=0)
+    covers = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cancellations = models.IntegerField(default=0)
+    guest_minutes = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["restaurant_id", "day", "hour"],
+                name="occupancy_rollup_bucket",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Restaurant {self.restaurant_id} on {self.day} at {self.hour}:00"
+
+
+class IdempotencyRecord(models.Model):
+    """
+    The response to a request sent with an Idempotency-Key header, replayed
+    when the client retries the request with the same key.
+
+    status_code and response stay null while the first request is still
+    being processed.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(
+        max_length=64, help_text="SHA-256 of the request method, path and body"
+    )
+    status_code = models.PositiveSmallIntegerField(null=True)
+    # JSON text rather than jsonb, which would reorder the keys on replay
+    response = models.TextField(null=True)
+    created_at = models.DateTimeField(default=dj_timezone.now, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"], name="idempotency_record_user_key"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Idempotency key {self.key!r} of user {self.user_id}"
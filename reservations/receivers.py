@@ -0,0 +1,90 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from reservations.models import Reservation, ReservationStatus
+from reservations.services.availability import OVERNIGHT, availability_service
+from reservations.services.interval_index import reservation_index
+from reservations.services.waitlist import backfill_waitlist
+from reservations.signals import reservations_changed
+from restaurant.models import Table
+from restaurant.signals import tables_changed
+
+
+@receiver(post_save, sender=Reservation)
+def reservation_saved(sender, instance, **kwargs):
+    transaction.on_commit(
+        lambda: reservations_changed.send(sender=Reservation, reservations=[instance])
+    )
+
+
+@receiver(post_delete, sender=Reservation)
+def reservation_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: reservation_index.discard(instance.id))
+
+
+@receiver(reservations_changed)
+def sync_interval_index(sender, reservations, **kwargs):
+    for reservation in reservations:
+        reservation_index.sync(reservation)
+
+
+@receiver(reservations_changed)
+def invalidate_occupancy_grids(sender, reservations, **kwargs):
+    stale = set()
+    for reservation in reservations:
+        restaurant_id = _restaurant_id(reservation)
+        # the previous day's grid runs OVERNIGHT into this one
+        day = (reservation.reservation_time - OVERNIGHT).date()
+        while day <= (reservation.end_time - timedelta.resolution).date():
+            stale.add((restaurant_id, day))
+            day += timedelta(days=1)
+    for restaurant_id, day in stale:
+        availability_service.invalidate_day(restaurant_id, day)
+
+
+@receiver(reservations_changed)
+def backfill_from_waitlist(sender, reservations, backfill=True, **kwargs):
+    if not backfill:
+        return
+    freed = defaultdict(list)
+    for reservation in reservations:
+        if reservation.status == ReservationStatus.CANCELLED:
+            key = (_restaurant_id(reservation), reservation.table_id)
+            freed[key].append(
+                [
+                    reservation.reservation_time.isoformat(),
+                    reservation.end_time.isoformat(),
+                ]
+            )
+    # one backfill per table, however many of its reservations were freed
+    for (restaurant_id, table_id), intervals in freed.items():
+        backfill_waitlist.delay(restaurant_id, table_id, intervals)
+
+
+@receiver(post_save, sender=Table)
+@receiver(post_delete, sender=Table)
+def table_changed(sender, instance, **kwargs):
+    reservation_index.invalidate(instance.restaurant_id)
+    availability_service.invalidate_restaurant(instance.restaurant_id)
+
+
+@receiver(tables_changed)
+def tables_bulk_changed(sender, restaurant_ids, **kwargs):
+    for restaurant_id in restaurant_ids:
+        reservation_index.invalidate(restaurant_id)
+        availability_service.invalidate_restaurant(restaurant_id)
+
+
+def _restaurant_id(reservation):
+    # the booking paths assign a loaded Table, so this rarely hits the DB
+    if Reservation.table.is_cached(reservation):
+        return reservation.table.restaurant_id
+    return (
+        Table.objects.filter(pk=reservation.table_id)
+        .values_list("restaurant_id", flat=True)
+        .first()
+    )
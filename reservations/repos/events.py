@@ -0,0 +1,13 @@
+from typing import List
+
+from reservations.models import ReservationEvent
+
+
+class ReservationEventRepo:
+    """
+    Repository for ReservationEvent model.
+    """
+
+    @staticmethod
+    def bulkCreateEvents(events: List[ReservationEvent]) -> None:
+        ReservationEvent.objects.bulk_create(events)
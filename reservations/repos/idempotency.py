@@ -0,0 +1,74 @@
+from datetime import datetime
+from typing import Optional
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from reservations.models import IdempotencyRecord
+
+
+class IdempotencyRepo:
+    """
+    Repository for IdempotencyRecord model.
+    """
+
+    @staticmethod
+    def claimKey(user_id: int, key: str, fingerprint: str) -> bool:
+        """
+        Insert an in-flight record for (user_id, key).
+
+        Returns:
+            False if the key already has a record; the unique constraint
+            makes the claim race-free between workers.
+        """
+        try:
+            with transaction.atomic():
+                IdempotencyRecord.objects.create(
+                    user_id=user_id, key=key, fingerprint=fingerprint
+                )
+        except IntegrityError:
+            return False
+        return True
+
+    @staticmethod
+    def findByUserAndKey(user_id: int, key: str) -> Optional[IdempotencyRecord]:
+        return IdempotencyRecord.objects.filter(user_id=user_id, key=key).first()
+
+    @staticmethod
+    def takeOver(record: IdempotencyRecord, fingerprint: str) -> bool:
+        """
+        Reclaim an expired or abandoned record for a new request.
+
+        Returns:
+            False if another request took it over first.
+        """
+        return bool(
+            IdempotencyRecord.objects.filter(
+                pk=record.pk, created_at=record.created_at
+            ).update(
+                fingerprint=fingerprint,
+                status_code=None,
+                response=None,
+                created_at=timezone.now(),
+            )
+        )
+
+    @staticmethod
+    def saveResponse(user_id: int, key: str, status_code: int, response: str) -> None:
+        IdempotencyRecord.objects.filter(user_id=user_id, key=key).update(
+            status_code=status_code, response=response
+        )
+
+    @staticmethod
+    def releaseKey(user_id: int, key: str) -> None:
+        """
+        Drop an in-flight record so the request can be retried with its key.
+        """
+        IdempotencyRecord.objects.filter(
+            user_id=user_id, key=key, status_code__isnull=True
+        ).delete()
+
+    @staticmethod
+    def deleteCreatedBefore(cutoff: datetime) -> int:
+        deleted, _ = IdempotencyRecord.objects.filter(created_at__lt=cutoff).delete()
+        return deleted
@@ -1,7 +1,33 @@
+from collections import defaultdict
 from datetime import datetime
-from typing import List
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from asgiref.sync import sync_to_async
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, Exists, F, Max, Min, OuterRef, Q
 
 from reservations.models import Reservation, ReservationStatus
+from reservations.signals import reservations_changed
+from restaurant.models import Table
+from restaurant.repos.cache import TableSnapshot
+
+# SQLSTATE raised by the reservation_confirmed_no_overlap exclusion constraint
+EXCLUSION_VIOLATION = "23P01"
+OVERLAP_CONSTRAINT = "reservation_confirmed_no_overlap"
+
+
+class ReservationConflictError(Exception):
+    """
+    Raised when the database rejects a reservation because its table is
+    already booked for an overlapping interval.
+    """
+
+
+def _is_overlap_violation(exc: IntegrityError) -> bool:
+    cause = exc.__cause__
+    code = getattr(cause, "pgcode", None) or getattr(cause, "sqlstate", None)
+    return code == EXCLUSION_VIOLATION
 
 
 class ReservationRepo:
@@ -24,6 +50,240 @@ class ReservationRepo:
             )
         )
 
+    @staticmethod
+    async def afindByRestaurantAndInterval(
+        restaurant_id: int,
+        start_dt: datetime,
+        end_dt: datetime,
+    ) -> List[Reservation]:
+        """
+        Async findByRestaurantAndInterval.
+        """
+        return [
+            reservation
+            async for reservation in Reservation.objects.filter(
+                table__restaurant_id=restaurant_id,
+                reservation_time__lt=end_dt,
+                end_time__gt=start_dt,
+                status=ReservationStatus.CONFIRMED,
+            )
+        ]
+
+    @staticmethod
+    def findIntervalsByRestaurant(
+        restaurant_id: int,
+        start_dt: datetime,
+        end_dt: datetime,
+    ) -> List[Tuple[int, datetime, datetime]]:
+        """
+        Same filter as findByRestaurantAndInterval, returning only
+        (table_id, reservation_time, end_time) tuples.
+        """
+        return list(
+            Reservation.objects.filter(
+                table__restaurant_id=restaurant_id,
+                reservation_time__lt=end_dt,
+                end_time__gt=start_dt,
+                status=ReservationStatus.CONFIRMED,
+            ).values_list("table_id", "reservation_time", "end_time")
+        )
+
+    @staticmethod
+    def findIntervalsByTable(
+        table_id: int,
+        start_dt: datetime,
+        end_dt: datetime,
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        (reservation_time, end_time) of a table's CONFIRMED reservations
+        overlapping [start_dt, end_dt), in start order.
+        """
+        return list(
+            Reservation.objects.filter(
+                table_id=table_id,
+                reservation_time__lt=end_dt,
+                end_time__gt=start_dt,
+                status=ReservationStatus.CONFIRMED,
+            )
+            .order_by("reservation_time")
+            .values_list("reservation_time", "end_time")
+        )
+
+    @staticmethod
+    def isTableBooked(table_id: int, start_dt: datetime, end_dt: datetime) -> bool:
+        """
+        Whether a CONFIRMED reservation holds the table during any of
+        [start_dt, end_dt).
+        """
+        return Reservation.objects.filter(
+            table_id=table_id,
+            reservation_time__lt=end_dt,
+            end_time__gt=start_dt,
+            status=ReservationStatus.CONFIRMED,
+        ).exists()
+
+    @staticmethod
+    def findIntervalsByTables(
+        table_ids: Sequence[int],
+        start_dt: datetime,
+        end_dt: datetime,
+    ) -> Dict[int, List[Tuple[datetime, datetime]]]:
+        """
+        findIntervalsByTable for several tables with one query:
+        table_id -> (reservation_time, end_time) in start order. Tables
+        without reservations are left out.
+        """
+        intervals = defaultdict(list)
+        rows = (
+            Reservation.objects.filter(
+                table_id__in=table_ids,
+                reservation_time__lt=end_dt,
+                end_time__gt=start_dt,
+                status=ReservationStatus.CONFIRMED,
+            )
+            .order_by("table_id", "reservation_time")
+            .values_list("table_id", "reservation_time", "end_time")
+        )
+        for table_id, reservation_time, end_time in rows:
+            intervals[table_id].append((reservation_time, end_time))
+        return dict(intervals)
+
+    @staticmethod
+    def findPageByUser(
+        user_id: int,
+        limit: int,
+        before: Optional[Tuple[datetime, int]] = None,
+        status: Optional[str] = None,
+    ) -> List[dict]:
+        """
+        Up to `limit` of a user's reservations, newest first, as dicts
+        with their table and restaurant joined in.
+
+        `before` is the (reservation_time, id) of the last row of the
+        previous page. Seeking past it walks the reservation_user_time
+        index, so every page costs the same however deep it is.
+        """
+        rows = Reservation.objects.filter(user_id=user_id)
+        if status:
+            rows = rows.filter(status=status)
+        if before:
+            reservation_time, reservation_id = before
+            # the inclusive bound limits the index scan, the OR breaks ties
+            rows = rows.filter(
+                Q(reservation_time__lt=reservation_time)
+                | Q(reservation_time=reservation_time, id__lt=reservation_id),
+                reservation_time__lte=reservation_time,
+            )
+        return list(
+            rows.order_by("-reservation_time", "-id").values(
+                "id",
+                "status",
+                "num_seats",
+                "cost",
+                "end_time",
+                restaurant_id=F("table__restaurant_id"),
+                restaurant_name=F("table__restaurant__name"),
+                table_number=F("table__number"),
+                start_time=F("reservation_time"),
+            )[:limit]
+        )
+
+    @staticmethod
+    def searchFreeTables(
+        start_dt: datetime,
+        end_dt: datetime,
+        party_size: int,
+        limit: int,
+        after: Optional[Tuple[int, int, int]] = None,
+        restaurant_ids: Optional[Sequence[int]] = None,
+    ) -> List[dict]:
+        """
+        Restaurants with an available table that seats the party and has
+        no CONFIRMED reservation overlapping [start_dt, end_dt), as dicts
+        of restaurant_id, restaurant_name, free_tables and table_seats.
+
+        One grouped query over every restaurant: tables anti-joined with
+        their overlapping reservations (NOT EXISTS, served by the
+        per-table reservation indexes), counted per restaurant.
+        table_seats is the table RULE1 would pick: with whole seat counts,
+        the smallest table with at least `party_size` seats is also the
+        smallest with `party_size + 1` when no table seats an odd party
+        exactly.
+
+        Rows are ranked by table_seats, then most free_tables, then
+        restaurant_id; `after` is that key of the last row of the
+        previous page.
+        """
+        overlapping = Reservation.objects.filter(
+            table_id=OuterRef("id"),
+            reservation_time__lt=end_dt,
+            end_time__gt=start_dt,
+            status=ReservationStatus.CONFIRMED,
+        )
+        tables = Table.objects.filter(is_available=True, seats__gte=party_size)
+        if restaurant_ids:
+            tables = tables.filter(restaurant_id__in=restaurant_ids)
+        rows = (
+            tables.filter(~Exists(overlapping))
+            .values("restaurant_id", restaurant_name=F("restaurant__name"))
+            .annotate(free_tables=Count("id"), table_seats=Min("seats"))
+        )
+        if after:
+            table_seats, free_tables, restaurant_id = after
+            rows = rows.filter(
+                Q(table_seats__gt=table_seats)
+                | Q(table_seats=table_seats, free_tables__lt=free_tables)
+                | Q(
+                    table_seats=table_seats,
+                    free_tables=free_tables,
+                    restaurant_id__gt=restaurant_id,
+                )
+            )
+        return list(
+            rows.order_by("table_seats", "-free_tables", "restaurant_id")[:limit]
+        )
+
+    @staticmethod
+    def findTimeBounds() -> Tuple[Optional[datetime], Optional[datetime]]:
+        """
+        The earliest reservation_time and the latest end_time, or Nones
+        when there are no reservations.
+        """
+        bounds = Reservation.objects.aggregate(
+            first=Min("reservation_time"), last=Max("end_time")
+        )
+        return bounds["first"], bounds["last"]
+
+    @staticmethod
+    def streamForRollup(
+        start_dt: datetime,
+        end_dt: datetime,
+        restaurant_ids: Optional[Sequence[int]] = None,
+        chunk_size: int = 5000,
+    ) -> Iterator[tuple]:
+        """
+        (restaurant_id, status, reservation_time, end_time, num_seats,
+        cost) of every reservation overlapping [start_dt, end_dt), read
+        from a server-side cursor.
+        """
+        rows = Reservation.objects.filter(
+            reservation_time__lt=end_dt, end_time__gt=start_dt
+        )
+        if restaurant_ids:
+            rows = rows.filter(table__restaurant_id__in=restaurant_ids)
+        return (
+            rows.order_by()
+            .values_list(
+                "table__restaurant_id",
+                "status",
+                "reservation_time",
+                "end_time",
+                "num_seats",
+                "cost",
+            )
+            .iterator(chunk_size=chunk_size)
+        )
+
     @staticmethod
     def createReservation(
         user,
@@ -33,13 +293,264 @@ class ReservationRepo:
         start_dt: datetime,
         end_dt: datetime,
     ) -> Reservation:
-        reservation = Reservation(
-            user=user,
+        """
+        Raises:
+            ReservationConflictError: If the table was booked for an
+                overlapping interval by a concurrent transaction.
+        """
+        reservation = ReservationRepo.buildReservation(
+            user, table, num_seats, cost, start_dt, end_dt
+        )
+        try:
+            with transaction.atomic():
+                reservation.save()
+        except IntegrityError as exc:
+            if _is_overlap_violation(exc):
+                raise ReservationConflictError(str(exc)) from exc
+            raise
+        return reservation
+
+    @staticmethod
+    async def acreateReservation(
+        user,
+        table,
+        num_seats: int,
+        cost,
+        start_dt: datetime,
+        end_dt: datetime,
+    ) -> Reservation:
+        """
+        Async createReservation.
+
+        Async code cannot hold a transaction open, so the INSERT runs in
+        autocommit mode; a rejected row leaves nothing to roll back.
+
+        Raises:
+            ReservationConflictError: If the table was booked for an
+                overlapping interval by a concurrent transaction.
+        """
+        reservation = ReservationRepo.buildReservation(
+            user, table, num_seats, cost, start_dt, end_dt
+        )
+        try:
+            await reservation.asave()
+        except IntegrityError as exc:
+            if _is_overlap_violation(exc):
+                raise ReservationConflictError(str(exc)) from exc
+            raise
+        return reservation
+
+    @staticmethod
+    def cancelByUser(reservation_ids: Sequence[int], user_id: int) -> List[Reservation]:
+        """
+        Cancel the user's CONFIRMED reservations among reservation_ids
+        with one UPDATE ... RETURNING.
+
+        Returns:
+            The cancelled reservations. Ids that do not exist, belong to
+            another user or were already cancelled are left out; tell
+            them apart with findCancelStates.
+        """
+        placeholders = ", ".join(["%s"] * len(reservation_ids))
+        return ReservationRepo._cancel(
+            f"id IN ({placeholders}) AND user_id = %s", [*reservation_ids, user_id]
+        )
+
+    @staticmethod
+    async def acancelByUser(
+        reservation_ids: Sequence[int], user_id: int
+    ) -> List[Reservation]:
+        """
+        Async cancelByUser, in autocommit mode.
+        """
+        return await sync_to_async(ReservationRepo.cancelByUser)(
+            reservation_ids, user_id
+        )
+
+    @staticmethod
+    def cancelByRestaurantAndInterval(
+        restaurant_id: int, start_dt: datetime, end_dt: datetime, backfill: bool = True
+    ) -> List[Reservation]:
+        """
+        Cancel every CONFIRMED reservation of a restaurant overlapping
+        [start_dt, end_dt) with one UPDATE ... RETURNING.
+
+        Args:
+            backfill: False to leave the freed tables to the waitlist
+                untouched, e.g. when the restaurant closes.
+        """
+        return ReservationRepo._cancel(
+            f"table_id IN (SELECT id FROM {Table._meta.db_table} "
+            "WHERE restaurant_id = %s) AND reservation_time < %s AND end_time > %s",
+            [restaurant_id, end_dt, start_dt],
+            backfill=backfill,
+        )
+
+    @staticmethod
+    def findCancelStates(reservation_ids: Sequence[int]) -> Dict[int, Tuple[int, str]]:
+        """
+        (user_id, status) per existing reservation id, to explain why
+        cancelByUser left it out.
+        """
+        return {
+            reservation_id: (user_id, status)
+            for reservation_id, user_id, status in Reservation.objects.filter(
+                id__in=reservation_ids
+            ).values_list("id", "user_id", "status")
+        }
+
+    @staticmethod
+    async def afindCancelStates(
+        reservation_ids: Sequence[int],
+    ) -> Dict[int, Tuple[int, str]]:
+        return {
+            reservation_id: (user_id, status)
+            async for reservation_id, user_id, status in Reservation.objects.filter(
+                id__in=reservation_ids
+            ).values_list("id", "user_id", "status")
+        }
+
+    @staticmethod
+    def _cancel(
+        condition: str, params: Sequence, backfill: bool = True
+    ) -> List[Reservation]:
+        """
+        Cancel the CONFIRMED reservations matching a WHERE condition.
+
+        raw() builds the returned rows into Reservations with the
+        database's type converters. Raw updates skip post_save, so
+        `reservations_changed` is sent explicitly once the surrounding
+        transaction commits.
+        """
+        table = Reservation._meta.db_table
+        cancelled = list(
+            Reservation.objects.raw(
+                f"UPDATE {table} SET status = %s "
+                f"WHERE status = %s AND {condition} "
+                f"RETURNING *, (SELECT restaurant_id FROM {Table._meta.db_table} "
+                f"WHERE id = {table}.table_id) AS restaurant_id",
+                [ReservationStatus.CANCELLED, ReservationStatus.CONFIRMED, *params],
+            )
+        )
+        for reservation in cancelled:
+            # only the ids are needed, by the events and the receivers
+            reservation.table = Table(
+                id=reservation.table_id, restaurant_id=reservation.restaurant_id
+            )
+        if cancelled:
+            transaction.on_commit(
+                lambda: reservations_changed.send(
+                    sender=Reservation, reservations=cancelled, backfill=backfill
+                )
+            )
+        return cancelled
+
+    @staticmethod
+    def buildReservation(
+        user,
+        table,
+        num_seats: int,
+        cost,
+        start_dt: datetime,
+        end_dt: datetime,
+    ) -> Reservation:
+        """
+        Build an unsaved Reservation, e.g. for bulkCreateReservations.
+        `user` may be a User or just its id.
+        """
+        if isinstance(table, TableSnapshot):
+            table = table.to_model()
+        return Reservation(
+            # by id, so a token-claims request.user works without a lookup
+            user_id=getattr(user, "pk", user),
             table=table,
             num_seats=num_seats,
             cost=cost,
             reservation_time=start_dt,
             end_time=end_dt,
         )
-        reservation.save()
-        return reservation
+
+    @staticmethod
+    def bulkCreateReservations(reservations: List[Reservation]) -> List[Reservation]:
+        """
+        Insert many reservations with a single statement.
+
+        bulk_create skips post_save, so `reservations_changed` is sent
+        explicitly once the surrounding transaction commits.
+
+        Raises:
+            ReservationConflictError: If any row overlaps a reservation
+                booked by a concurrent transaction; nothing is inserted.
+        """
+        try:
+            with transaction.atomic():
+                created = Reservation.objects.bulk_create(reservations)
+        except IntegrityError as exc:
+            if _is_overlap_violation(exc):
+                raise ReservationConflictError(str(exc)) from exc
+            raise
+        transaction.on_commit(
+            lambda: reservations_changed.send(sender=Reservation, reservations=created)
+        )
+        return created
+
+    @staticmethod
+    def moveReservations(
+        moves: Sequence[Tuple[Reservation, object]],
+    ) -> List[Reservation]:
+        """
+        Move not-yet-started CONFIRMED reservations to other tables, all or
+        nothing.
+
+        Swapping two reservations overlaps them for a moment, so on
+        PostgreSQL the no-overlap constraint is deferred until every row
+        has moved. Queryset updates skip post_save, so `reservations_changed`
+        is sent explicitly once the surrounding transaction commits.
+
+        Args:
+            moves: (reservation, new table) pairs, as read by the caller.
+
+        Raises:
+            ReservationConflictError: If a reservation was cancelled, moved
+                or started since it was read, or the new layout overlaps a
+                concurrent booking; nothing is moved.
+        """
+        now = datetime.now()
+        try:
+            with transaction.atomic():
+                deferred = connection.vendor == "postgresql"
+                if deferred:
+                    with connection.cursor() as cursor:
+                        cursor.execute(f"SET CONSTRAINTS {OVERLAP_CONSTRAINT} DEFERRED")
+                for reservation, table in moves:
+                    moved = Reservation.objects.filter(
+                        pk=reservation.pk,
+                        table_id=reservation.table_id,
+                        status=ReservationStatus.CONFIRMED,
+                        reservation_time__gt=now,
+                    ).update(table_id=table.id)
+                    if not moved:
+                        raise ReservationConflictError(
+                            f"Reservation {reservation.pk} changed before it could move."
+                        )
+                if deferred:
+                    # check now rather than at an outer commit
+                    with connection.cursor() as cursor:
+                        cursor.execute(
+                            f"SET CONSTRAINTS {OVERLAP_CONSTRAINT} IMMEDIATE"
+                        )
+        except IntegrityError as exc:
+            if _is_overlap_violation(exc):
+                raise ReservationConflictError(str(exc)) from exc
+            raise
+
+        moved = []
+        for reservation, table in moves:
+            if isinstance(table, TableSnapshot):
+                table = table.to_model()
+            reservation.table = table
+            moved.append(reservation)
+        transaction.on_commit(
+            lambda: reservations_changed.send(sender=Reservation, reservations=moved)
+        )
+        return moved
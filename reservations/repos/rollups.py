@@ -0,0 +1,114 @@
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+from django.db import connection
+from django.db.models import Sum
+
+from reservations.models import OccupancyRollup
+
+# the summed columns, in the order of rollup deltas
+DELTA_FIELDS = ("bookings", "covers", "revenue", "cancellations", "guest_minutes")
+
+
+class OccupancyRollupRepo:
+    """
+    Repository for OccupancyRollup model.
+    """
+
+    DELTA_FIELDS = DELTA_FIELDS
+    # rows per INSERT in applyDeltas, under SQLite's bound-parameter limit
+    upsert_batch_size = 100
+
+    @staticmethod
+    def applyDeltas(deltas: Dict[tuple, Sequence]) -> None:
+        """
+        Add deltas keyed by (restaurant_id, day, hour) to the stored
+        rows, creating missing ones, with INSERT ... ON CONFLICT DO UPDATE
+        (PostgreSQL and SQLite). Concurrent writers cannot lose updates.
+        """
+        table = OccupancyRollup._meta.db_table
+        key_fields = ("restaurant_id", "day", "hour")
+        increments = ", ".join(
+            f"{f} = {table}.{f} + excluded.{f}" for f in DELTA_FIELDS
+        )
+        rows = [(*key, *delta) for key, delta in deltas.items()]
+        size = OccupancyRollupRepo.upsert_batch_size
+        with connection.cursor() as cursor:
+            for i in range(0, len(rows), size):
+                batch = rows[i : i + size]
+                placeholders = ", ".join(
+                    ["(" + ", ".join(["%s"] * 8) + ")"] * len(batch)
+                )
+                cursor.execute(
+                    f"INSERT INTO {table} ({', '.join(key_fields + DELTA_FIELDS)}) "
+                    f"VALUES {placeholders} "
+                    f"ON CONFLICT ({', '.join(key_fields)}) DO UPDATE SET {increments}",
+                    [value for row in batch for value in row],
+                )
+
+    @staticmethod
+    def bulkCreateRows(rows: Dict[tuple, Sequence]) -> None:
+        OccupancyRollup.objects.bulk_create(
+            (
+                OccupancyRollup(
+                    restaurant_id=restaurant_id,
+                    day=day,
+                    hour=hour,
+                    **dict(zip(DELTA_FIELDS, totals)),
+                )
+                for (restaurant_id, day, hour), totals in rows.items()
+            ),
+            batch_size=2000,
+        )
+
+    @staticmethod
+    def deleteRange(
+        first_day: date, last_day: date, restaurant_ids: Optional[Sequence[int]] = None
+    ) -> None:
+        rows = OccupancyRollup.objects.filter(day__range=(first_day, last_day))
+        if restaurant_ids:
+            rows = rows.filter(restaurant_id__in=restaurant_ids)
+        rows.delete()
+
+    @staticmethod
+    def findDaily(
+        restaurant_id: int,
+        start_date: date,
+        end_date: date,
+        start_hour: int = 0,
+        end_hour: int = 24,
+    ) -> List[dict]:
+        """
+        Per-day sums of the hours in [start_hour, end_hour), for days
+        with any rollup row.
+        """
+        return list(
+            OccupancyRollup.objects.filter(
+                restaurant_id=restaurant_id,
+                day__range=(start_date, end_date),
+                hour__gte=start_hour,
+                hour__lt=end_hour,
+            )
+            .values("day")
+            .annotate(**{f: Sum(f) for f in DELTA_FIELDS})
+            .order_by("day")
+        )
+
+    @staticmethod
+    def findHourly(
+        restaurant_id: int,
+        start_date: date,
+        end_date: date,
+        start_hour: int = 0,
+        end_hour: int = 24,
+    ) -> List[dict]:
+        return list(
+            OccupancyRollup.objects.filter(
+                restaurant_id=restaurant_id,
+                day__range=(start_date, end_date),
+                hour__gte=start_hour,
+                hour__lt=end_hour,
+            )
+            .order_by("day", "hour")
+            .values("day", "hour", *DELTA_FIELDS)
+        )
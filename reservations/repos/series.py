@@ -0,0 +1,13 @@
+from reservations.models import ReservationSeries
+
+
+class ReservationSeriesRepo:
+    """
+    Repository for ReservationSeries model.
+    """
+
+    @staticmethod
+    def createSeries(user, restaurant_id: int, **fields) -> ReservationSeries:
+        return ReservationSeries.objects.create(
+            user_id=user.pk, restaurant_id=restaurant_id, **fields
+        )
@@ -0,0 +1,118 @@
+from datetime import datetime
+from typing import List, Sequence, Tuple
+
+from reservations.models import Reservation, WaitlistEntry, WaitlistStatus
+
+
+class WaitlistRepo:
+    """
+    Repository for WaitlistEntry model.
+    """
+
+    @staticmethod
+    def createEntry(
+        user,
+        restaurant_id: int,
+        party_size: int,
+        start_dt: datetime,
+        end_dt: datetime,
+    ) -> WaitlistEntry:
+        return WaitlistEntry.objects.create(
+            user_id=user.pk,
+            restaurant_id=restaurant_id,
+            party_size=party_size,
+            reservation_time=start_dt,
+            end_time=end_dt,
+        )
+
+    @staticmethod
+    def hasWaitingOverlap(user_id: int, start_dt: datetime, end_dt: datetime) -> bool:
+        """
+        Whether the user has a WAITING entry, at any restaurant,
+        overlapping [start_dt, end_dt).
+        """
+        return WaitlistEntry.objects.filter(
+            user_id=user_id,
+            status=WaitlistStatus.WAITING,
+            reservation_time__lt=end_dt,
+            end_time__gt=start_dt,
+        ).exists()
+
+    @staticmethod
+    def findById(entry_id: int) -> WaitlistEntry:
+        """
+        Raises:
+            WaitlistEntry.DoesNotExist: If there is no such entry.
+        """
+        return WaitlistEntry.objects.get(pk=entry_id)
+
+    @staticmethod
+    def findUpcomingByUser(user_id: int, since: datetime) -> List[WaitlistEntry]:
+        return list(
+            WaitlistEntry.objects.filter(user_id=user_id, end_time__gt=since).order_by(
+                "reservation_time", "id"
+            )
+        )
+
+    @staticmethod
+    def findWaitingWithin(
+        restaurant_id: int,
+        start_dt: datetime,
+        end_dt: datetime,
+        max_party_size: int,
+    ) -> List[WaitlistEntry]:
+        """
+        WAITING entries of a restaurant whose window lies inside
+        [start_dt, end_dt), in request order.
+
+        Rows are locked FOR UPDATE, skipping those a concurrent backfill
+        already holds, so call it inside a transaction.
+        """
+        return list(
+            WaitlistEntry.objects.select_for_update(skip_locked=True)
+            .filter(
+                restaurant_id=restaurant_id,
+                status=WaitlistStatus.WAITING,
+                reservation_time__gte=start_dt,
+                reservation_time__lt=end_dt,
+                end_time__lte=end_dt,
+                party_size__lte=max_party_size,
+            )
+            .order_by("created_at", "id")
+        )
+
+    @staticmethod
+    def markBooked(booked: Sequence[Tuple[WaitlistEntry, Reservation]]) -> None:
+        entries = []
+        for entry, reservation in booked:
+            entry.status = WaitlistStatus.BOOKED
+            entry.reservation = reservation
+            entries.append(entry)
+        WaitlistEntry.objects.bulk_update(entries, ["status", "reservation"])
+
+    @staticmethod
+    def cancelWaitingEntry(entry_id: int) -> bool:
+        """
+        Returns:
+            False if the entry is no longer WAITING.
+        """
+        return bool(
+            WaitlistEntry.objects.filter(
+                pk=entry_id, status=WaitlistStatus.WAITING
+            ).update(status=WaitlistStatus.CANCELLED)
+        )
+
+    @staticmethod
+    def cancelWaitingByRestaurantAndInterval(
+        restaurant_id: int, start_dt: datetime, end_dt: datetime
+    ) -> int:
+        """
+        Cancel the WAITING entries of a restaurant overlapping
+        [start_dt, end_dt); returns how many.
+        """
+        return WaitlistEntry.objects.filter(
+            restaurant_id=restaurant_id,
+            status=WaitlistStatus.WAITING,
+            reservation_time__lt=end_dt,
+            end_time__gt=start_dt,
+        ).update(status=WaitlistStatus.CANCELLED)
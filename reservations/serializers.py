@@ -3,17 +3,70 @@ from decimal import Decimal, InvalidOperation
 
 from rest_framework import serializers
 
-from reservations.models import Reservation
+from reservations.models import ReservationStatus, SeriesFrequency
+from reservations.services.pagination import decode_cursor, decode_search_cursor
+from reservations.services.recurring import (
+    MAX_OCCURRENCES,
+    WEEKDAYS,
+    expand_occurrences,
+)
 from restaurant.models import Restaurant
 
 
+def validate_half_hour_duration(value: Decimal) -> Decimal:
+    """
+    - Must not exceed 3.0 hours.
+    - Must be at least 0.5 hours.
+    - Must be in 0.5-hour increments.
+    """
+    try:
+        half_hours = (value * 2).to_integral_value()
+    except (InvalidOperation, AttributeError):
+        raise serializers.ValidationError("Invalid duration_hours value.")
+
+    if half_hours != value * 2:
+        raise serializers.ValidationError(
+            "duration_hours must be in 0.5-hour increments (e.g., 1.0, 1.5, 2.0)."
+        )
+
+    if value > Decimal("3.0"):
+        raise serializers.ValidationError("duration_hours cannot exceed 3.0 hours.")
+    if value < Decimal("0.5"):
+        raise serializers.ValidationError("duration_hours must be at least 0.5 hours.")
+
+    return value
+
+
 class CancelReservationSerializer(serializers.Serializer):
+    # existence is checked by the cancelling UPDATE itself
     reservation_id = serializers.IntegerField()
 
-    def validate_reservation_id(self, value):
-        if not Reservation.objects.filter(id=value).exists():
-            raise serializers.ValidationError("Reservation does not exist.")
-        return value
+
+class CancelReservationBatchSerializer(serializers.Serializer):
+    reservation_ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=100
+    )
+
+
+class CloseDaySerializer(serializers.Serializer):
+    restaurant_id = serializers.IntegerField()
+    date = serializers.DateField()
+
+
+class LeaveWaitlistSerializer(serializers.Serializer):
+    waitlist_id = serializers.IntegerField()
+
+
+class MyReservationsRequestSerializer(serializers.Serializer):
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+    status = serializers.ChoiceField(choices=ReservationStatus.choices, required=False)
+
+    def validate_cursor(self, value):
+        try:
+            return decode_cursor(value)
+        except ValueError:
+            raise serializers.ValidationError("Invalid cursor.")
 
 
 class ReservationRequestSerializer(serializers.Serializer):
@@ -35,29 +88,7 @@ class ReservationRequestSerializer(serializers.Serializer):
         return value
 
     def validate_duration_hours(self, value: Decimal) -> Decimal:
-        """
-        - Must not exceed 3.0 hours.
-        - Must be at least 0.5 hours.
-        - Must be in 0.5-hour increments.
-        """
-        try:
-            half_hours = (value * 2).to_integral_value()
-        except (InvalidOperation, AttributeError):
-            raise serializers.ValidationError("Invalid duration_hours value.")
-
-        if half_hours != value * 2:
-            raise serializers.ValidationError(
-                "duration_hours must be in 0.5-hour increments (e.g., 1.0, 1.5, 2.0)."
-            )
-
-        if value > Decimal("3.0"):
-            raise serializers.ValidationError("duration_hours cannot exceed 3.0 hours.")
-        if value < Decimal("0.5"):
-            raise serializers.ValidationError(
-                "duration_hours must be at least 0.5 hours."
-            )
-
-        return value
+        return validate_half_hour_duration(value)
 
     def validate(self, attrs):
         """
@@ -79,3 +110,158 @@ class ReservationRequestSerializer(serializers.Serializer):
                 )
 
         return attrs
+
+
+class RecurringReservationRequestSerializer(serializers.Serializer):
+    restaurant_id = serializers.IntegerField()
+    start_date = serializers.DateField()
+    until = serializers.DateField()
+    reservation_time = serializers.TimeField()
+    duration_hours = serializers.DecimalField(
+        max_digits=2,
+        decimal_places=1,
+        min_value=Decimal("0.5"),
+        max_value=Decimal("3.0"),
+        default=Decimal("1"),
+    )
+    party_size = serializers.IntegerField(min_value=1)
+    frequency = serializers.ChoiceField(
+        choices=SeriesFrequency.choices, default=SeriesFrequency.WEEKLY
+    )
+    interval = serializers.IntegerField(min_value=1, max_value=52, default=1)
+    weekdays = serializers.ListField(
+        child=serializers.ChoiceField(choices=WEEKDAYS), required=False, default=list
+    )
+
+    def validate_duration_hours(self, value: Decimal) -> Decimal:
+        return validate_half_hour_duration(value)
+
+    def validate(self, attrs):
+        """
+        Check the series and expand it into attrs["occurrences"], the
+        (start, end) of each reservation.
+        """
+        first = datetime.datetime.combine(
+            attrs["start_date"], attrs["reservation_time"]
+        )
+        if first <= datetime.datetime.now():
+            raise serializers.ValidationError(
+                "The first reservation cannot be in the past or exactly now."
+            )
+        if attrs["until"] < attrs["start_date"]:
+            raise serializers.ValidationError(
+                {"until": "until cannot be before start_date."}
+            )
+        if attrs["weekdays"] and attrs["frequency"] != SeriesFrequency.WEEKLY:
+            raise serializers.ValidationError(
+                {"weekdays": "weekdays only apply to a WEEKLY series."}
+            )
+
+        occurrences = expand_occurrences(
+            attrs["start_date"],
+            attrs["until"],
+            attrs["reservation_time"],
+            attrs["duration_hours"],
+            attrs["frequency"],
+            attrs["interval"],
+            attrs["weekdays"],
+        )
+        if occurrences is None:
+            raise serializers.ValidationError(
+                f"A series can have at most {MAX_OCCURRENCES} occurrences."
+            )
+        if not occurrences:
+            raise serializers.ValidationError(
+                "The series has no occurrences between start_date and until."
+            )
+        attrs["occurrences"] = occurrences
+        return attrs
+
+
+class AvailabilityRequestSerializer(serializers.Serializer):
+    restaurant_id = serializers.IntegerField()
+    date = serializers.DateField()
+    duration_hours = serializers.DecimalField(
+        max_digits=2,
+        decimal_places=1,
+        min_value=Decimal("0.5"),
+        max_value=Decimal("3.0"),
+        default=Decimal("1"),
+    )
+    party_size = serializers.IntegerField(min_value=1)
+
+    def validate_duration_hours(self, value: Decimal) -> Decimal:
+        return validate_half_hour_duration(value)
+
+    def validate_date(self, value: datetime.date) -> datetime.date:
+        if value < datetime.date.today():
+            raise serializers.ValidationError("date cannot be in the past.")
+        return value
+
+
+class AvailabilitySearchRequestSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    reservation_time = serializers.TimeField()
+    duration_hours = serializers.DecimalField(
+        max_digits=2,
+        decimal_places=1,
+        min_value=Decimal("0.5"),
+        max_value=Decimal("3.0"),
+        default=Decimal("1"),
+    )
+    party_size = serializers.IntegerField(min_value=1)
+    restaurant_id = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, default=list
+    )
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    def validate_duration_hours(self, value: Decimal) -> Decimal:
+        return validate_half_hour_duration(value)
+
+    def validate_cursor(self, value):
+        try:
+            return decode_search_cursor(value)
+        except ValueError:
+            raise serializers.ValidationError("Invalid cursor.")
+
+    def validate(self, attrs):
+        start = datetime.datetime.combine(attrs["date"], attrs["reservation_time"])
+        if start <= datetime.datetime.now():
+            raise serializers.ValidationError(
+                "Reservation date and time cannot be in the past or exactly now. Please choose a future time."
+            )
+        return attrs
+
+
+class ReservationExportRequestSerializer(serializers.Serializer):
+    # not "format": DRF reads that query parameter to pick a renderer
+    file_format = serializers.ChoiceField(choices=("csv", "ndjson"), default="csv")
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    restaurant_id = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, default=list
+    )
+
+    def validate(self, attrs):
+        start_date, end_date = attrs.get("start_date"), attrs.get("end_date")
+        if start_date and end_date and start_date > end_date:
+            raise serializers.ValidationError("start_date must not be after end_date.")
+        return attrs
+
+
+class OccupancyReportRequestSerializer(serializers.Serializer):
+    restaurant_id = serializers.IntegerField()
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    # the opening hours, which occupancy is measured against
+    start_hour = serializers.IntegerField(min_value=0, max_value=23, default=0)
+    end_hour = serializers.IntegerField(min_value=1, max_value=24, default=24)
+    group_by = serializers.ChoiceField(choices=("day", "hour"), default="day")
+
+    def validate(self, attrs):
+        if attrs["start_date"] > attrs["end_date"]:
+            raise serializers.ValidationError("start_date must not be after end_date.")
+        if attrs["start_hour"] >= attrs["end_hour"]:
+            raise serializers.ValidationError("start_hour must be before end_hour.")
+        return attrs
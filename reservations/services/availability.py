@@ -0,0 +1,190 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+from django.core.cache import cache as default_cache
+
+from reservations.repos.repository import ReservationRepo
+from restaurant.repos.cache import CachedRestaurantRepo
+
+SLOT = timedelta(minutes=30)
+SLOTS_PER_DAY = 48
+FULL_DAY = (1 << SLOTS_PER_DAY) - 1
+# a booking starting late may run this far into the next day: the
+# longest duration_hours, see validate_half_hour_duration
+OVERNIGHT = timedelta(hours=3)
+GRID_SLOTS = SLOTS_PER_DAY + OVERNIGHT // SLOT
+FULL_GRID = (1 << GRID_SLOTS) - 1
+
+
+class OccupancyGrid:
+    """
+    Per-table occupancy of one restaurant-day, one bit per 30-minute slot.
+
+    Bit `i` of a table's mask is set when the table is booked at any point
+    in [00:00 + i * 30min, 00:00 + (i + 1) * 30min). The masks run
+    OVERNIGHT past midnight, so late starts see the next morning too.
+    """
+
+    __slots__ = ("tables",)
+
+    def __init__(self, tables: Tuple[Tuple[int, int, int], ...]):
+        # (table_id, seats, busy_mask) per table
+        self.tables = tables
+
+    @classmethod
+    def build(cls, day: date, tables, intervals) -> "OccupancyGrid":
+        day_start = datetime.combine(day, time.min)
+        day_end = day_start + timedelta(days=1) + OVERNIGHT
+
+        # unavailable tables cannot be booked, see fitting_tables
+        tables = [t for t in tables if t.is_available]
+        busy = {t.id: 0 for t in tables}
+        for table_id, start_dt, end_dt in intervals:
+            if table_id not in busy:
+                continue
+            first = (max(start_dt, day_start) - day_start) // SLOT
+            last = -(-(min(end_dt, day_end) - day_start) // SLOT)  # ceil
+            busy[table_id] |= ((1 << (last - first)) - 1) << first
+
+        return cls(tuple((t.id, t.seats, busy[t.id]) for t in tables))
+
+    def free_starts(self, party_size: int, slots: int) -> int:
+        """
+        Bitmask of the day's start slots where some table can seat the
+        party for `slots` consecutive slots.
+
+        RULE1 only decides *which* table is picked; a slot is bookable iff
+        a free table with at least `party_size` seats exists.
+        """
+        starts = 0
+        for _, _, run in self.table_starts(party_size, slots):
+            starts |= run
+        return starts
+
+    def table_starts(self, party_size: int, slots: int) -> List[Tuple[int, int, int]]:
+        """
+        (table_id, seats, start mask) for each table with at least
+        `party_size` seats, as free_starts per table.
+        """
+        starts = []
+        for table_id, seats, busy in self.tables:
+            if seats < party_size:
+                continue
+            free = ~busy & FULL_GRID
+            run = free
+            for k in range(1, slots):
+                run &= free >> k
+            starts.append((table_id, seats, run & FULL_DAY))
+        return starts
+
+
+class AvailabilityService:
+    """
+    Answers "which start times are free?" for a restaurant-day from a
+    cached OccupancyGrid built with one reservation query.
+
+    Cached grids are dropped per day when reservations change and per
+    restaurant (by bumping a version) when its tables change. With more
+    than one worker the cache must be shared between them (see CACHES),
+    or the others keep serving a grid until it expires.
+    """
+
+    cache_timeout = 300
+
+    def __init__(self, reservation_repo=None, restaurant_repo=None, cache=None):
+        self.res_repo = reservation_repo or ReservationRepo()
+        self.rest_repo = restaurant_repo or CachedRestaurantRepo()
+        self.cache = cache or default_cache
+
+    def grid(self, restaurant_id: int, day: date) -> OccupancyGrid:
+        key = self._grid_key(restaurant_id, day)
+        tables = self.cache.get(key)
+        if tables is None:
+            day_start = datetime.combine(day, time.min)
+            grid = OccupancyGrid.build(
+                day,
+                self.rest_repo.findTablesByRestaurant(restaurant_id),
+                self.res_repo.findIntervalsByRestaurant(
+                    restaurant_id, day_start, day_start + timedelta(days=1) + OVERNIGHT
+                ),
+            )
+            self.cache.set(key, grid.tables, self.cache_timeout)
+            return grid
+        return OccupancyGrid(tables)
+
+    def free_slots(
+        self,
+        restaurant_id: int,
+        day: date,
+        party_size: int,
+        duration_hours: Decimal,
+        now: Optional[datetime] = None,
+    ) -> List[time]:
+        slots = int(duration_hours * 2)
+        starts = self.grid(restaurant_id, day).free_starts(party_size, slots)
+        starts &= self._future(day, now)
+
+        day_start = datetime.combine(day, time.min)
+        return [
+            (day_start + i * SLOT).time()
+            for i in range(SLOTS_PER_DAY)
+            if starts >> i & 1
+        ]
+
+    def free_table_starts(
+        self,
+        restaurant_id: int,
+        day: date,
+        party_size: int,
+        duration_hours: Decimal,
+        now: Optional[datetime] = None,
+    ) -> List[Tuple[int, int, int]]:
+        """
+        free_slots per table: (table_id, seats, start mask) for every
+        table that seats the party, with bit `i` of the mask set when the
+        table is free for the duration from slot `i`.
+        """
+        slots = int(duration_hours * 2)
+        future = self._future(day, now)
+        return [
+            (table_id, seats, run & future)
+            for table_id, seats, run in self.grid(restaurant_id, day).table_starts(
+                party_size, slots
+            )
+        ]
+
+    @staticmethod
+    def _future(day: date, now: Optional[datetime] = None) -> int:
+        """
+        Bitmask of the day's slots that start strictly in the future.
+        """
+        now = now or datetime.now()
+        if now.date() == day:
+            day_start = datetime.combine(day, time.min)
+            first_future = (now - day_start) // SLOT + 1
+            return FULL_DAY ^ ((1 << first_future) - 1)
+        if now.date() > day:
+            return 0
+        return FULL_DAY
+
+    def invalidate_day(self, restaurant_id: int, day: date) -> None:
+        self.cache.delete(self._grid_key(restaurant_id, day))
+
+    def invalidate_restaurant(self, restaurant_id: int) -> None:
+        key = self._version_key(restaurant_id)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, 1, None)
+
+    def _grid_key(self, restaurant_id: int, day: date) -> str:
+        version = self.cache.get(self._version_key(restaurant_id), 0)
+        return f"reservations:occupancy:{restaurant_id}:v{version}:{day.isoformat()}"
+
+    @staticmethod
+    def _version_key(restaurant_id: int) -> str:
+        return f"reservations:occupancy:{restaurant_id}:version"
+
+
+availability_service = AvailabilityService()
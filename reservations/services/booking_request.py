@@ -0,0 +1,188 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import List, Optional
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import ISO_8601, api_settings
+
+from reservations.serializers import ReservationRequestSerializer
+
+
+class BookingRequest:
+    """
+    A validated booking request, with its start and end datetimes.
+    """
+
+    __slots__ = ("restaurant_id", "party_size", "duration_hours", "start", "end")
+
+    def __init__(
+        self,
+        restaurant_id: int,
+        party_size: int,
+        duration_hours: Decimal,
+        start: datetime,
+        end: datetime,
+    ):
+        self.restaurant_id = restaurant_id
+        self.party_size = party_size
+        self.duration_hours = duration_hours
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def from_validated_data(cls, payload: dict) -> "BookingRequest":
+        start = datetime.combine(
+            payload["reservation_date"], payload["reservation_time"]
+        )
+        return cls(
+            payload["restaurant_id"],
+            payload["party_size"],
+            payload["duration_hours"],
+            start,
+            start + timedelta(hours=float(payload["duration_hours"])),
+        )
+
+
+class BookingRequestParser:
+    """
+    Validates booking requests like ReservationRequestSerializer, without
+    building its fields for every request.
+
+    The common spellings of each field (JSON integers, ISO date and time
+    strings, the half-hour durations the serializer accepts) are checked
+    against a schema compiled once from the serializer, and each value is
+    parsed once. Anything else, invalid or just unusual, is handed to the
+    serializer, so errors and edge cases keep its exact semantics.
+    """
+
+    __slots__ = ("serializer_class", "min_party_size", "durations", "default_duration")
+
+    def __init__(self, serializer_class=ReservationRequestSerializer):
+        self.serializer_class = serializer_class
+        serializer = serializer_class()
+        fields = serializer.fields
+        self.min_party_size = fields["party_size"].min_value
+        duration = fields["duration_hours"]
+        self.default_duration = self._duration(duration.default)
+
+        # spelling -> (validated value, timedelta), for the durations the
+        # serializer accepts, as sent in JSON strings or numbers
+        self.durations = {}
+        for half_hours in range(1, 2 * int(duration.max_value) + 1):
+            for spelling in {
+                f"{half_hours / 2:g}",
+                f"{half_hours / 2:.1f}",
+                f"{half_hours / 2:.2f}",
+            }:
+                try:
+                    value = serializer.validate_duration_hours(
+                        duration.run_validation(spelling)
+                    )
+                except ValidationError:
+                    continue
+                self.durations[spelling] = self._duration(value)
+
+        if not (
+            self._iso_only(fields["reservation_date"], api_settings.DATE_INPUT_FORMATS)
+            and self._iso_only(
+                fields["reservation_time"], api_settings.TIME_INPUT_FORMATS
+            )
+        ):
+            # custom input formats: always defer to the serializer
+            self.durations = {}
+
+    def parse(self, data, context=None) -> BookingRequest:
+        """
+        Raises:
+            ValidationError: As ReservationRequestSerializer would.
+        """
+        request = self._fast_parse(data)
+        if request is None:
+            serializer = self.serializer_class(data=data, context=context)
+            serializer.is_valid(raise_exception=True)
+            request = BookingRequest.from_validated_data(serializer.validated_data)
+        return request
+
+    def parse_many(self, data, max_length: int, context=None) -> List[BookingRequest]:
+        """
+        parse() for a non-empty list of up to max_length requests; one
+        invalid item rejects the list with the serializer's errors.
+        """
+        if type(data) is list and 0 < len(data) <= max_length:
+            requests = [self._fast_parse(item) for item in data]
+            if None not in requests:
+                return requests
+        serializer = self.serializer_class(
+            data=data,
+            many=True,
+            allow_empty=False,
+            max_length=max_length,
+            context=context,
+        )
+        serializer.is_valid(raise_exception=True)
+        return [
+            BookingRequest.from_validated_data(p) for p in serializer.validated_data
+        ]
+
+    def _fast_parse(self, data) -> Optional[BookingRequest]:
+        """
+        A BookingRequest, or None when the serializer has to decide.
+        """
+        if type(data) is not dict or not self.durations:
+            return None
+        restaurant_id = self._integer(data.get("restaurant_id"))
+        party_size = self._integer(data.get("party_size"))
+        if restaurant_id is None or party_size is None:
+            return None
+        if party_size < self.min_party_size:
+            return None
+
+        raw = data.get("duration_hours")
+        if raw is None:
+            if "duration_hours" in data:
+                return None
+            duration = self.default_duration
+        else:
+            kind = type(raw)
+            if kind is not str:
+                if kind is not int and kind is not float:
+                    return None
+                raw = str(raw)
+            duration = self.durations.get(raw)
+            if duration is None:
+                return None
+
+        reservation_date = data.get("reservation_date")
+        reservation_time = data.get("reservation_time")
+        if type(reservation_date) is not str or type(reservation_time) is not str:
+            return None
+        try:
+            start = datetime.combine(
+                date.fromisoformat(reservation_date),
+                time.fromisoformat(reservation_time).replace(tzinfo=None),
+            )
+        except ValueError:
+            return None
+        if start <= datetime.now():
+            return None
+        return BookingRequest(
+            restaurant_id, party_size, duration[0], start, start + duration[1]
+        )
+
+    @staticmethod
+    def _integer(value) -> Optional[int]:
+        kind = type(value)
+        if kind is int:
+            return value
+        if kind is str and value.isascii() and value.isdigit() and len(value) < 20:
+            return int(value)
+        return None
+
+    @staticmethod
+    def _duration(value: Decimal):
+        return value, timedelta(hours=float(value))
+
+    @staticmethod
+    def _iso_only(field, default_formats) -> bool:
+        formats = getattr(field, "input_formats", default_formats)
+        return [f.lower() for f in formats] == [ISO_8601]
@@ -0,0 +1,143 @@
+import atexit
+import threading
+from datetime import datetime
+from typing import Iterable, List
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from reservations.models import Reservation, ReservationEvent
+from reservations.repos.events import ReservationEventRepo
+from reservations.repos.rollups import OccupancyRollupRepo
+from reservations.services.rollups import event_deltas
+from utils.tasks import Task, get_backend, task
+
+
+@task
+def record_reservation_events(events: List[dict]) -> None:
+    """
+    Write a batch of reservation_event() dicts with one INSERT, and add
+    them to the occupancy rollup in the same transaction.
+    """
+    with transaction.atomic():
+        ReservationEventRepo.bulkCreateEvents(
+            [
+                ReservationEvent(
+                    **{
+                        **event,
+                        "reservation_time": datetime.fromisoformat(
+                            event["reservation_time"]
+                        ),
+                        "end_time": datetime.fromisoformat(event["end_time"]),
+                        "occurred_at": datetime.fromisoformat(event["occurred_at"]),
+                    }
+                )
+                for event in events
+            ]
+        )
+        OccupancyRollupRepo.applyDeltas(event_deltas(events))
+
+
+def reservation_event(kind: str, reservation: Reservation) -> dict:
+    """
+    A JSON-serialisable event; `reservation.table` should be loaded.
+    """
+    return {
+        "kind": kind,
+        "reservation_id": reservation.id,
+        "user_id": reservation.user_id,
+        "restaurant_id": reservation.table.restaurant_id,
+        "table_id": reservation.table_id,
+        "num_seats": reservation.num_seats,
+        "cost": str(reservation.cost),
+        "reservation_time": reservation.reservation_time.isoformat(),
+        "end_time": reservation.end_time.isoformat(),
+        "occurred_at": datetime.now().isoformat(),
+    }
+
+
+class EventBatcher:
+    """
+    Collects events in memory and passes them to a background task in
+    batches, so writing them costs one task and one bulk INSERT per batch
+    instead of a query per request.
+
+    A batch is sent once it holds batch_size events, or flush_interval
+    seconds after its first event. Events still buffered when the process
+    exits are written inline; those of a crashed process are lost. With
+    an inline task backend events are written right away, in the
+    caller's thread and transaction.
+    """
+
+    def __init__(self, task: Task, batch_size: int = 200, flush_interval: float = 1.0):
+        self.task = task
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending: List[dict] = []
+        self.lock = threading.Lock()
+        self.timer = None
+        atexit.register(self.close)
+
+    @classmethod
+    def from_settings(cls, task: Task) -> "EventBatcher":
+        conf = getattr(settings, "RESERVATION_EVENTS", {})
+        return cls(
+            task,
+            batch_size=conf.get("BATCH_SIZE", 200),
+            flush_interval=conf.get("FLUSH_INTERVAL", 1.0),
+        )
+
+    def add(self, events: Iterable[dict]) -> None:
+        if get_backend().inline:
+            self.task(list(events))
+            return
+        with self.lock:
+            self.pending.extend(events)
+            if len(self.pending) < self.batch_size:
+                if self.pending and self.timer is None:
+                    self.timer = threading.Timer(self.flush_interval, self.flush)
+                    self.timer.daemon = True
+                    self.timer.start()
+                return
+            batch = self._take()
+        self.task.delay(batch)
+
+    async def aadd(self, events: Iterable[dict]) -> None:
+        """
+        add() for async code; only an inline backend leaves the event loop.
+        """
+        if get_backend().inline:
+            await sync_to_async(self.task)(list(events))
+            return
+        self.add(events)
+
+    def add_on_commit(self, events: Iterable[dict]) -> None:
+        """
+        add() once the current transaction commits; in autocommit mode,
+        right away. Not for async code, which cannot call on_commit.
+        """
+        events = list(events)
+        transaction.on_commit(lambda: self.add(events))
+
+    def flush(self) -> None:
+        with self.lock:
+            batch = self._take()
+        if batch:
+            self.task.delay(batch)
+
+    def close(self) -> None:
+        with self.lock:
+            batch = self._take()
+        if batch:
+            self.task(batch)
+
+    def _take(self) -> List[dict]:
+        batch, self.pending = self.pending, []
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        return batch
+
+
+reservation_events = EventBatcher.from_settings(record_reservation_events)
@@ -0,0 +1,111 @@
+import csv
+import json
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from typing import AsyncIterator, Iterable, Iterator, Optional, Sequence
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reservations.models import Reservation
+
+# (column, ORM path) of every exported field; values_list joins table,
+# restaurant and user in the same query, so no row loads a related object
+EXPORT_COLUMNS = (
+    ("id", "id"),
+    ("restaurant_id", "table__restaurant_id"),
+    ("restaurant_name", "table__restaurant__name"),
+    ("table_id", "table_id"),
+    ("table_number", "table__number"),
+    ("table_seats", "table__seats"),
+    ("user_id", "user_id"),
+    ("username", "user__username"),
+    ("num_seats", "num_seats"),
+    ("cost", "cost"),
+    ("status", "status"),
+    ("reservation_time", "reservation_time"),
+    ("end_time", "end_time"),
+    ("created_at", "created_at"),
+)
+HEADER = tuple(column for column, _ in EXPORT_COLUMNS)
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def export_rows(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    restaurant_ids: Sequence[int] = (),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[tuple]:
+    """
+    Stream reservations as tuples ordered like HEADER.
+
+    Rows come from a server-side cursor on PostgreSQL (chunk_size rows
+    per fetch), so memory stays flat however many rows match.
+
+    Args:
+        start_date: First day of reservation_time to include.
+        end_date: Last day of reservation_time to include.
+        restaurant_ids: Only these restaurants, when given.
+    """
+    queryset = Reservation.objects.all()
+    if start_date:
+        queryset = queryset.filter(
+            reservation_time__gte=datetime.combine(start_date, time.min)
+        )
+    if end_date:
+        queryset = queryset.filter(
+            reservation_time__lt=datetime.combine(
+                end_date + timedelta(days=1), time.min
+            )
+        )
+    if restaurant_ids:
+        queryset = queryset.filter(table__restaurant_id__in=restaurant_ids)
+    return (
+        queryset.order_by("id")
+        .values_list(*(path for _, path in EXPORT_COLUMNS))
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+class _Line:
+    """File-like object whose write() returns the line instead of storing it."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def csv_lines(rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(_Line())
+    yield writer.writerow(HEADER)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(rows: Iterable[tuple]) -> Iterator[str]:
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(HEADER, row))) + "\n"
+
+
+async def achunks(
+    lines: Iterable[str], size: int = DEFAULT_CHUNK_SIZE
+) -> AsyncIterator[str]:
+    """
+    `lines` joined into chunks of up to `size` lines, for ASGI responses:
+    Django reads a sync iterator into a list before sending any of it.
+
+    Each chunk is read in one sync_to_async call, on the request's thread,
+    which holds the database cursor.
+    """
+    lines = iter(lines)
+    take = sync_to_async(lambda: "".join(islice(lines, size)))
+    while chunk := await take():
+        yield chunk
+
+
+# format name -> (line renderer, content type)
+EXPORT_FORMATS = {
+    "csv": (csv_lines, "text/csv"),
+    "ndjson": (ndjson_lines, "application/x-ndjson"),
+}
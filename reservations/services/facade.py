@@ -1,12 +1,57 @@
+from collections import defaultdict
+from contextlib import nullcontext
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
 from rest_framework.exceptions import NotFound, PermissionDenied
 
-from reservations.models import Reservation, ReservationStatus
-from reservations.repos.repository import ReservationRepo
-from reservations.serializers import ReservationRequestSerializer
-from restaurant.repos.repository import RestaurantRepo
-from restaurant.services.price_policy import DefaultPricingPolicy
-from restaurant.services.table_selection import DefaultTableSelectionStrategy
-from utils.build_reservation_datetimes import build_reservation_datetimes
+from monitoring.tracing import stage
+from reservations.exceptions import (
+    AlreadyWaitlisted,
+    BookingConflict,
+    TableAvailable,
+)
+from reservations.models import (
+    Reservation,
+    ReservationEventKind,
+    ReservationStatus,
+    WaitlistStatus,
+)
+from reservations.repos.repository import ReservationConflictError, ReservationRepo
+from reservations.repos.series import ReservationSeriesRepo
+from reservations.repos.waitlist import WaitlistRepo
+from reservations.serializers import (
+    AvailabilityRequestSerializer,
+    AvailabilitySearchRequestSerializer,
+    CancelReservationBatchSerializer,
+    CloseDaySerializer,
+    MyReservationsRequestSerializer,
+    OccupancyReportRequestSerializer,
+    RecurringReservationRequestSerializer,
+    ReservationExportRequestSerializer,
+    ReservationRequestSerializer,
+)
+from reservations.services.availability import (
+    SLOT,
+    SLOTS_PER_DAY,
+    availability_service,
+)
+from reservations.services.booking_request import BookingRequestParser
+from reservations.services.events import reservation_event, reservation_events
+from reservations.services.export import EXPORT_FORMATS, export_rows
+from reservations.services.pagination import encode_cursor, encode_search_cursor
+from reservations.services.packing import TablePacker, group_overlapping_windows
+from reservations.services.recurring import assign_tables
+from reservations.services.rollups import OccupancyReportService
+from restaurant.repos.cache import CachedRestaurantRepo
+from restaurant.services.price_policy import default_pricing_policy
+from restaurant.services.table_selection import (
+    DefaultTableSelectionStrategy,
+    fitting_tables,
+    select_smallest_fitting_table,
+)
 
 
 class ReservationFacadeService:
@@ -15,6 +60,18 @@ class ReservationFacadeService:
     """
 
     serializer_class = ReservationRequestSerializer
+    availability_serializer_class = AvailabilityRequestSerializer
+    quote_serializer_class = AvailabilityRequestSerializer
+    search_serializer_class = AvailabilitySearchRequestSerializer
+    export_serializer_class = ReservationExportRequestSerializer
+    occupancy_serializer_class = OccupancyReportRequestSerializer
+    mine_serializer_class = MyReservationsRequestSerializer
+    cancel_batch_serializer_class = CancelReservationBatchSerializer
+    close_day_serializer_class = CloseDaySerializer
+    recurring_serializer_class = RecurringReservationRequestSerializer
+    batch_max_size = 100
+    # tables tried before giving up when concurrent bookers win the race
+    max_booking_attempts = 3
 
     def __init__(
         self,
@@ -22,51 +79,152 @@ class ReservationFacadeService:
         restaurant_repo=None,
         table_selector=None,
         pricing_policy=None,
+        availability=None,
+        waitlist_repo=None,
+        events=None,
+        occupancy_reports=None,
+        booking_parser=None,
+        series_repo=None,
     ):
         self.res_repo = reservation_repo or ReservationRepo()
-        self.rest_repo = restaurant_repo or RestaurantRepo()
+        self.rest_repo = restaurant_repo or CachedRestaurantRepo()
         self.table_selector = table_selector or DefaultTableSelectionStrategy(
-            repo=self.res_repo
+            repo=self.res_repo, table_repo=self.rest_repo
+        )
+        self.pricing = pricing_policy or default_pricing_policy()
+        self.availability_service = availability or availability_service
+        self.waitlist_repo = waitlist_repo or WaitlistRepo()
+        self.events = events or reservation_events
+        self.occupancy_reports = occupancy_reports or OccupancyReportService(
+            restaurant_repo=self.rest_repo
+        )
+        self.booking_parser = booking_parser or BookingRequestParser(
+            self.serializer_class
         )
-        self.pricing = pricing_policy or DefaultPricingPolicy(seat_price=10)
+        self.series_repo = series_repo or ReservationSeriesRepo()
 
     def book(self, data, user, context=None):
-        # 1) validate input
-        serializer = self.serializer_class(data=data, context=context)
-        serializer.is_valid(raise_exception=True)
-        payload = serializer.validated_data
+        # 1) validate input and 3) compute start/end datetimes
+        with stage("book.validate"):
+            request = self.booking_parser.parse(data, context)
+        start_dt, end_dt = request.start, request.end
 
         # 2) find restaurant
-        restaurant = self.rest_repo.findById(payload["restaurant_id"])
+        with stage("book.find_restaurant"):
+            restaurant = self.rest_repo.findById(request.restaurant_id)
         if not restaurant:
             raise NotFound("Restaurant not found.")
 
-        # 3) compute start/end datetimes
-        start_dt, end_dt = build_reservation_datetimes(
-            data["reservation_date"],
-            data["reservation_time"],
-            float(data["duration_hours"]),
+        # 4) pick a table and 5) compute cost and persist; a table lost to
+        # a concurrent booking is skipped and the next-best one is tried.
+        # Reservations moved to make room are moved in the same transaction
+        # as the INSERT, so a failed attempt takes them back.
+        attempt = (
+            transaction.atomic
+            if self.table_selector.moves_reservations
+            else nullcontext
         )
+        tried = set()
+        for _ in range(self.max_booking_attempts):
+            table = None
+            try:
+                with attempt():
+                    with stage("book.select_table"):
+                        table = self.table_selector.find_by_restaurant_and_time(
+                            request.restaurant_id,
+                            start_dt,
+                            end_dt,
+                            request.party_size,
+                            exclude_table_ids=tried,
+                        )
+                    if not table:
+                        raise NotFound("Table not found.")
 
-        # 4) pick a table
-        table = self.table_selector.find_by_restaurant_and_time(
-            payload["restaurant_id"],
-            start_dt,
-            end_dt,
-            payload["party_size"],
+                    with stage("book.pricing"):
+                        cost = self.pricing.calculate(
+                            table, request.party_size, start_dt
+                        )
+                    with stage("book.persist"):
+                        reservation = self.res_repo.createReservation(
+                            user, table, request.party_size, cost, start_dt, end_dt
+                        )
+                break
+            except ReservationConflictError:
+                tried.add(table.id)
+        else:
+            raise BookingConflict()
+
+        self.events.add_on_commit(
+            [reservation_event(ReservationEventKind.BOOKED, reservation)]
         )
-        if not table:
-            raise NotFound("Table not found.")
 
-        # 5) compute cost and persist
-        cost = self.pricing.calculate(table, payload["party_size"])
-        reservation = self.res_repo.createReservation(
-            user, table, payload["party_size"], cost, start_dt, end_dt
+        # 6) return whatever your view wants to show
+        with stage("book.respond"):
+            return self._booked(restaurant, reservation)
+
+    async def abook(self, data, user, context=None):
+        """
+        Awaitable book() for async views: the same steps, with the
+        restaurant lookup, table selection and INSERT awaited so the
+        event loop serves other requests while they wait on the database.
+        """
+        if self.table_selector.moves_reservations:
+            # its moves must share a transaction with the INSERT
+            return await sync_to_async(self.book)(data, user, context)
+
+        # 1) validate input and 3) compute start/end datetimes
+        with stage("book.validate"):
+            request = self.booking_parser.parse(data, context)
+        start_dt, end_dt = request.start, request.end
+
+        # 2) find restaurant
+        with stage("book.find_restaurant"):
+            restaurant = await self.rest_repo.afindById(request.restaurant_id)
+        if not restaurant:
+            raise NotFound("Restaurant not found.")
+
+        # 4) pick a table and 5) compute cost and persist
+        tried = set()
+        for _ in range(self.max_booking_attempts):
+            with stage("book.select_table"):
+                table = await self.table_selector.afind_by_restaurant_and_time(
+                    request.restaurant_id,
+                    start_dt,
+                    end_dt,
+                    request.party_size,
+                    exclude_table_ids=tried,
+                )
+            if not table:
+                raise NotFound("Table not found.")
+
+            with stage("book.pricing"):
+                cost = await self.pricing.acalculate(
+                    table, request.party_size, start_dt
+                )
+            try:
+                with stage("book.persist"):
+                    reservation = await self.res_repo.acreateReservation(
+                        user, table, request.party_size, cost, start_dt, end_dt
+                    )
+                break
+            except ReservationConflictError:
+                tried.add(table.id)
+        else:
+            raise BookingConflict()
+
+        # autocommit: the row is already committed
+        await self.events.aadd(
+            [reservation_event(ReservationEventKind.BOOKED, reservation)]
         )
 
         # 6) return whatever your view wants to show
+        with stage("book.respond"):
+            return self._booked(restaurant, reservation)
+
+    @staticmethod
+    def _booked(restaurant, reservation) -> dict:
         return {
-            "detail": f"you reserved table {reservation.table.id} successfully.",
+            "detail": f"you reserved table {reservation.table_id} successfully.",
             "restaurant": {"id": restaurant.id, "name": restaurant.name},
             "reservation": {
                 "id": reservation.id,
@@ -75,10 +233,422 @@ class ReservationFacadeService:
             },
         }
 
+    def book_many(self, data, user, context=None):
+        """
+        Books a list of party requests in one go.
+
+        All requests are validated in a single pass; one invalid item
+        rejects the whole batch. Valid requests are grouped by restaurant
+        and overlapping time window so occupancy is read once per group,
+        tables are assigned by an in-memory packing pass and every
+        reservation is inserted with one bulk_create in one transaction.
+
+        Returns:
+            A dict with booked/failed counts and one result per request,
+            in request order.
+        """
+        # 1) validate input, with 3) start/end datetimes
+        requests = self.booking_parser.parse_many(data, self.batch_max_size, context)
+
+        # 2) find restaurants
+        restaurants = self.rest_repo.findByIds(r.restaurant_id for r in requests)
+
+        results = [None] * len(requests)
+        by_restaurant = defaultdict(list)
+        for index, request in enumerate(requests):
+            if request.restaurant_id not in restaurants:
+                results[index] = self._failed(index, "Restaurant not found.")
+                continue
+            by_restaurant[request.restaurant_id].append(
+                (index, request, request.start, request.end)
+            )
+
+        # 4) pick tables and 5) persist everything at once; if a concurrent
+        # booking wins one of the picked tables, repack with fresh occupancy
+        for attempt in range(1, self.max_booking_attempts + 1):
+            pending, failures = self._pack(by_restaurant, user)
+            try:
+                with transaction.atomic():
+                    created = self.res_repo.bulkCreateReservations(
+                        [r for _, r in pending]
+                    )
+                    self.events.add_on_commit(
+                        reservation_event(ReservationEventKind.BOOKED, r)
+                        for r in created
+                    )
+                break
+            except ReservationConflictError:
+                if attempt == self.max_booking_attempts:
+                    raise BookingConflict()
+
+        for index in failures:
+            results[index] = self._failed(index, "Table not found.")
+        for (index, _), reservation in zip(pending, created):
+            results[index] = {
+                "index": index,
+                "booked": True,
+                "restaurant": {
+                    "id": reservation.table.restaurant_id,
+                    "name": restaurants[reservation.table.restaurant_id].name,
+                },
+                "reservation": {
+                    "id": reservation.id,
+                    "table_id": reservation.table_id,
+                    "start_time": reservation.reservation_time,
+                    "end_time": reservation.end_time,
+                },
+            }
+
+        return {
+            "booked": len(created),
+            "failed": len(requests) - len(created),
+            "results": results,
+        }
+
+    def _pack(self, by_restaurant, user):
+        """
+        Assign tables to grouped batch items, reading occupancy once per
+        restaurant and overlapping window.
+
+        Returns:
+            (pending, failures): unsaved reservations keyed by item index,
+            and the indexes for which no table was free.
+        """
+        pending, failures = [], []
+        for restaurant_id, items in by_restaurant.items():
+            tables = self.rest_repo.findTablesByRestaurant(restaurant_id)
+            groups = group_overlapping_windows(items, window=lambda i: (i[2], i[3]))
+            for group_start, group_end, group in groups:
+                packer = TablePacker(
+                    tables,
+                    self.res_repo.findByRestaurantAndInterval(
+                        restaurant_id, group_start, group_end
+                    ),
+                )
+                # largest parties first so they are not squeezed out
+                for index, request, start_dt, end_dt in sorted(
+                    group, key=lambda i: -i[1].party_size
+                ):
+                    party_size = request.party_size
+                    table = packer.assign(start_dt, end_dt, party_size)
+                    if not table:
+                        failures.append(index)
+                        continue
+                    cost = self.pricing.calculate(table, party_size, start_dt)
+                    pending.append(
+                        (
+                            index,
+                            self.res_repo.buildReservation(
+                                user, table, party_size, cost, start_dt, end_dt
+                            ),
+                        )
+                    )
+        return pending, failures
+
+    @staticmethod
+    def _failed(index: int, detail: str) -> dict:
+        return {"index": index, "booked": False, "detail": detail}
+
+    def book_recurring(self, data, user, context=None) -> dict:
+        """
+        Books a standing reservation: one reservation per occurrence of a
+        daily or weekly series, up to a year of them.
+
+        The occupancy of every fitting table over the whole series is read
+        with one range query and checked against the occurrences with a
+        merge sweep per table. Each occurrence gets the smallest free table,
+        as book() would give it, keeping to one table of that size where
+        it can; occurrences no table can take are reported, not booked. Everything bookable is
+        inserted with one bulk_create in one transaction.
+
+        Returns:
+            A dict with the series id (None when nothing could be booked),
+            booked/conflict counts and one result per occurrence, in
+            date order.
+        """
+        serializer = self.recurring_serializer_class(data=data, context=context)
+        serializer.is_valid(raise_exception=True)
+        payload = serializer.validated_data
+        occurrences = payload["occurrences"]
+        party_size = payload["party_size"]
+
+        restaurant_id = payload["restaurant_id"]
+        if not self.rest_repo.findById(restaurant_id):
+            raise NotFound("Restaurant not found.")
+        # the tables book() would consider, see fitting_tables
+        tables = fitting_tables(
+            self.rest_repo.findTablesByRestaurant(restaurant_id), party_size
+        )
+        if not tables:
+            raise NotFound("Table not found.")
+
+        # if a concurrent booking takes one of the picked slots, reassign
+        # with fresh occupancy
+        for attempt in range(1, self.max_booking_attempts + 1):
+            busy = self.res_repo.findIntervalsByTables(
+                [t.id for t in tables], occurrences[0][0], occurrences[-1][1]
+            )
+            assigned = assign_tables(occurrences, tables, busy)
+            pending = [
+                (index, table)
+                for index, table in enumerate(assigned)
+                if table is not None
+            ]
+            series, created = None, []
+            try:
+                with transaction.atomic():
+                    if pending:
+                        series = self.series_repo.createSeries(
+                            user,
+                            restaurant_id,
+                            party_size=party_size,
+                            frequency=payload["frequency"],
+                            interval=payload["interval"],
+                            weekdays=",".join(payload["weekdays"]),
+                            start_date=payload["start_date"],
+                            until=payload["until"],
+                            start_time=payload["reservation_time"],
+                            duration_hours=payload["duration_hours"],
+                        )
+                    reservations = []
+                    for index, table in pending:
+                        start_dt, end_dt = occurrences[index]
+                        reservation = self.res_repo.buildReservation(
+                            user,
+                            table,
+                            party_size,
+                            self.pricing.calculate(table, party_size, start_dt),
+                            start_dt,
+                            end_dt,
+                        )
+                        reservation.series = series
+                        reservations.append(reservation)
+                    created = self.res_repo.bulkCreateReservations(reservations)
+                    self.events.add_on_commit(
+                        reservation_event(ReservationEventKind.BOOKED, r)
+                        for r in created
+                    )
+                break
+            except ReservationConflictError:
+                if attempt == self.max_booking_attempts:
+                    raise BookingConflict()
+
+        results = [
+            {"start_time": start_dt, "end_time": end_dt, "booked": False}
+            for start_dt, end_dt in occurrences
+        ]
+        for (index, _), reservation in zip(pending, created):
+            results[index].update(
+                booked=True,
+                reservation_id=reservation.id,
+                table_id=reservation.table_id,
+            )
+        for result in results:
+            if not result["booked"]:
+                result["detail"] = "Table not found."
+
+        return {
+            "series_id": series.id if series else None,
+            "booked": len(created),
+            "conflicts": len(occurrences) - len(created),
+            "occurrences": results,
+        }
+
+    def availability(self, data, context=None):
+        """
+        Lists every free half-hour start time for a restaurant, date,
+        party size and duration.
+        """
+        serializer = self.availability_serializer_class(data=data, context=context)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+
+        if not self.rest_repo.findById(query["restaurant_id"]):
+            raise NotFound("Restaurant not found.")
+
+        slots = self.availability_service.free_slots(
+            query["restaurant_id"],
+            query["date"],
+            query["party_size"],
+            query["duration_hours"],
+        )
+        return {
+            "restaurant_id": query["restaurant_id"],
+            "date": query["date"],
+            "party_size": query["party_size"],
+            "duration_hours": query["duration_hours"],
+            "slots": [slot.strftime("%H:%M") for slot in slots],
+        }
+
+    def search(self, data, context=None) -> dict:
+        """
+        One page of the restaurants with a free table for a party at a
+        date, time and duration, best fit first: the smallest table RULE1
+        would pick, then the most free tables.
+
+        Returns:
+            {"results": [...], "next_cursor": ...}, as my_reservations.
+        """
+        serializer = self.search_serializer_class(data=data, context=context)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+
+        start_dt = datetime.combine(query["date"], query["reservation_time"])
+        end_dt = start_dt + timedelta(hours=float(query["duration_hours"]))
+        # one extra row tells whether another page follows
+        rows = self.res_repo.searchFreeTables(
+            start_dt,
+            end_dt,
+            query["party_size"],
+            query["limit"] + 1,
+            query.get("cursor"),
+            query["restaurant_id"],
+        )
+        next_cursor = None
+        if len(rows) > query["limit"]:
+            rows = rows[: query["limit"]]
+            last = rows[-1]
+            next_cursor = encode_search_cursor(
+                (last["table_seats"], last["free_tables"], last["restaurant_id"])
+            )
+        return {
+            "results": [
+                {
+                    "restaurant": {
+                        "id": row["restaurant_id"],
+                        "name": row["restaurant_name"],
+                    },
+                    "free_tables": row["free_tables"],
+                    "table_seats": row["table_seats"],
+                    "start_time": start_dt,
+                    "end_time": end_dt,
+                }
+                for row in rows
+            ],
+            "next_cursor": next_cursor,
+        }
+
+    def quote(self, data, context=None) -> dict:
+        """
+        Prices every free table at each free half-hour start time of a
+        restaurant day, for a party size and duration.
+
+        Free tables come from the occupancy grid availability() reads, and
+        the whole day is priced with one quote_day call to the pricing
+        policy rather than once per table and slot.
+        """
+        serializer = self.quote_serializer_class(data=data, context=context)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+
+        restaurant_id = query["restaurant_id"]
+        if not self.rest_repo.findById(restaurant_id):
+            raise NotFound("Restaurant not found.")
+
+        starts = [
+            (table_id, seats, run)
+            for table_id, seats, run in self.availability_service.free_table_starts(
+                restaurant_id,
+                query["date"],
+                query["party_size"],
+                query["duration_hours"],
+            )
+            if run
+        ]
+        tables = {t.id: t for t in self.rest_repo.findTablesByRestaurant(restaurant_id)}
+        starts = [start for start in starts if start[0] in tables]
+        prices = self.pricing.quote_day(
+            restaurant_id,
+            query["date"],
+            [tables[table_id] for table_id, _, _ in starts],
+            query["party_size"],
+        )
+
+        day_start = datetime.combine(query["date"], time.min)
+        slots = []
+        for i in range(SLOTS_PER_DAY):
+            free = [
+                {
+                    "table_id": table_id,
+                    "seats": seats,
+                    "cost": self._money(prices[table_id][i]),
+                }
+                for table_id, seats, run in starts
+                if run >> i & 1
+            ]
+            if free:
+                slots.append(
+                    {
+                        "start_time": (day_start + i * SLOT).strftime("%H:%M"),
+                        "tables": free,
+                    }
+                )
+        return {
+            "restaurant_id": restaurant_id,
+            "date": query["date"],
+            "party_size": query["party_size"],
+            "duration_hours": query["duration_hours"],
+            "slots": slots,
+        }
+
+    @staticmethod
+    def _money(value) -> str:
+        return str(Decimal(str(value)).quantize(Decimal("0.01")))
+
+    def my_reservations(self, data, user, context=None) -> dict:
+        """
+        One page of the user's reservations, newest first.
+
+        Returns:
+            {"results": [...], "next_cursor": ...}; next_cursor is None on
+            the last page, else pass it back as `cursor` for the next one.
+        """
+        serializer = self.mine_serializer_class(data=data, context=context)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+
+        # one extra row tells whether another page follows
+        rows = self.res_repo.findPageByUser(
+            user.pk, query["limit"] + 1, query.get("cursor"), query.get("status")
+        )
+        next_cursor = None
+        if len(rows) > query["limit"]:
+            rows = rows[: query["limit"]]
+            next_cursor = encode_cursor((rows[-1]["start_time"], rows[-1]["id"]))
+        for row in rows:
+            # as DecimalField renders it, rather than as a float
+            row["cost"] = str(row["cost"])
+        return {"results": rows, "next_cursor": next_cursor}
+
+    def export(self, data, context=None):
+        """
+        Validates export filters and returns the rows lazily, rendered
+        one line at a time.
+
+        Returns:
+            (lines, content_type, file_format); nothing is read from the
+            database until `lines` is iterated.
+        """
+        serializer = self.export_serializer_class(data=data, context=context)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+
+        render, content_type = EXPORT_FORMATS[query["file_format"]]
+        rows = export_rows(
+            start_date=query.get("start_date"),
+            end_date=query.get("end_date"),
+            restaurant_ids=query["restaurant_id"],
+        )
+        return render(rows), content_type, query["file_format"]
+
     def cancel_reservation(self, reservation_id: int, user) -> str:
         """
         Cancels a reservation if the user is authorized and the reservation meets cancellation criteria.
 
+        A single conditional UPDATE cancels the user's CONFIRMED
+        reservation; only when it matches nothing is the row read, to
+        tell why.
+
         Args:
             reservation_id: The ID of the reservation to cancel.
             user: The user attempting to cancel the reservation.
@@ -91,20 +661,211 @@ class ReservationFacadeService:
             PermissionDenied: If the user is not authorized to cancel the reservation
                               or if cancellation is not allowed by business rules.
         """
-        try:
-            reservation = Reservation.objects.get(id=reservation_id)
-        except Reservation.DoesNotExist:
-            raise
+        cancelled = self.res_repo.cancelByUser([reservation_id], user.pk)
+        if cancelled:
+            self.events.add_on_commit(
+                reservation_event(ReservationEventKind.CANCELLED, r) for r in cancelled
+            )
+            return "Reservation cancelled successfully."
+        state = self.res_repo.findCancelStates([reservation_id]).get(reservation_id)
+        return self._not_cancelled(state, user)
 
-        if reservation.user != user:
+    async def acancel_reservation(self, reservation_id: int, user) -> str:
+        """
+        Awaitable cancel_reservation() for async views; same rules and errors.
+        """
+        cancelled = await self.res_repo.acancelByUser([reservation_id], user.pk)
+        if cancelled:
+            # autocommit: the row is already committed
+            await self.events.aadd(
+                reservation_event(ReservationEventKind.CANCELLED, r) for r in cancelled
+            )
+            return "Reservation cancelled successfully."
+        states = await self.res_repo.afindCancelStates([reservation_id])
+        return self._not_cancelled(states.get(reservation_id), user)
+
+    @staticmethod
+    def _not_cancelled(state, user) -> str:
+        """
+        Explain a cancellation that matched no row, from the
+        (user_id, status) of the reservation or None.
+        """
+        if state is None:
+            raise Reservation.DoesNotExist("Reservation matching query does not exist.")
+        if state[0] != user.pk:
             raise PermissionDenied(
                 "You do not have permission to cancel this reservation."
             )
+        return "Reservation is already cancelled."
+
+    def cancel_many(self, data, user, context=None) -> dict:
+        """
+        Cancels several of the user's reservations, e.g. a whole party,
+        with one UPDATE. Each freed table is then backfilled from the
+        waitlist once, in the background.
+
+        Returns:
+            A dict with the cancelled count and one result per id, in
+            request order; ids that are missing, another user's or
+            already cancelled are reported and skipped.
+        """
+        serializer = self.cancel_batch_serializer_class(data=data, context=context)
+        serializer.is_valid(raise_exception=True)
+        reservation_ids = serializer.validated_data["reservation_ids"]
+
+        cancelled = self.res_repo.cancelByUser(reservation_ids, user.pk)
+        self.events.add_on_commit(
+            reservation_event(ReservationEventKind.CANCELLED, r) for r in cancelled
+        )
+        done = {r.id for r in cancelled}
+        missed = [i for i in reservation_ids if i not in done]
+        states = self.res_repo.findCancelStates(missed) if missed else {}
+
+        results = []
+        for reservation_id in reservation_ids:
+            if reservation_id in done:
+                result = {
+                    "cancelled": True,
+                    "detail": "Reservation cancelled successfully.",
+                }
+            else:
+                try:
+                    detail = self._not_cancelled(states.get(reservation_id), user)
+                except Reservation.DoesNotExist:
+                    detail = "Reservation not found."
+                except PermissionDenied as exc:
+                    detail = str(exc.detail)
+                result = {"cancelled": False, "detail": detail}
+            results.append({"reservation_id": reservation_id, **result})
+        return {"cancelled": len(cancelled), "results": results}
+
+    def close_day(self, data, context=None) -> dict:
+        """
+        Cancels every reservation and waitlist entry a restaurant has on a
+        day, e.g. when it closes unexpectedly, in one transaction.
+
+        Raises:
+            NotFound: If the restaurant does not exist.
+        """
+        serializer = self.close_day_serializer_class(data=data, context=context)
+        serializer.is_valid(raise_exception=True)
+        restaurant_id = serializer.validated_data["restaurant_id"]
+        day = serializer.validated_data["date"]
+
+        if not self.rest_repo.findById(restaurant_id):
+            raise NotFound("Restaurant not found.")
+        start_dt = datetime.combine(day, time.min)
+        end_dt = start_dt + timedelta(days=1)
+        with transaction.atomic():
+            waitlisted = self.waitlist_repo.cancelWaitingByRestaurantAndInterval(
+                restaurant_id, start_dt, end_dt
+            )
+            # the day's waitlist is cancelled, so there is nothing to backfill
+            cancelled = self.res_repo.cancelByRestaurantAndInterval(
+                restaurant_id, start_dt, end_dt, backfill=False
+            )
+            self.events.add_on_commit(
+                reservation_event(ReservationEventKind.CANCELLED, r) for r in cancelled
+            )
+        return {
+            "restaurant_id": restaurant_id,
+            "date": day,
+            "cancelled_reservations": len(cancelled),
+            "cancelled_waitlist_entries": waitlisted,
+        }
+
+    def occupancy(self, data, context=None) -> dict:
+        """
+        Occupancy, covers, revenue and cancellations of a restaurant per
+        day or hour of a date range, read from the occupancy rollup.
+
+        Raises:
+            NotFound: If the restaurant does not exist.
+        """
+        serializer = self.occupancy_serializer_class(data=data, context=context)
+        serializer.is_valid(raise_exception=True)
+        payload = serializer.validated_data
+
+        if not self.rest_repo.findById(payload["restaurant_id"]):
+            raise NotFound("Restaurant not found.")
+        return self.occupancy_reports.report(**payload)
+
+    def join_waitlist(self, data, user, context=None) -> dict:
+        """
+        Put the user on the restaurant's waitlist for a time window.
+
+        The entry is booked automatically when a cancellation frees a
+        fitting table, see WaitlistBackfillService.
+
+        Raises:
+            NotFound: If the restaurant does not exist or none of its
+                tables fits the party.
+            TableAvailable: If table_selector finds a table free now.
+            AlreadyWaitlisted: If the user already waits for an
+                overlapping window, which a backfill could book twice.
+        """
+        request = self.booking_parser.parse(data, context)
+
+        restaurant = self.rest_repo.findById(request.restaurant_id)
+        if not restaurant:
+            raise NotFound("Restaurant not found.")
+        tables = self.rest_repo.findTablesByRestaurant(restaurant.id)
+        if not select_smallest_fitting_table(tables, request.party_size):
+            raise NotFound("Table not found.")
+        if self.waitlist_repo.hasWaitingOverlap(user.pk, request.start, request.end):
+            raise AlreadyWaitlisted()
+
+        with transaction.atomic():
+            free = self.table_selector.find_by_restaurant_and_time(
+                restaurant.id, request.start, request.end, request.party_size
+            )
+            # only asking: undo any moves a repacking selector made
+            transaction.set_rollback(True)
+        if free is not None:
+            raise TableAvailable()
 
-        if reservation.status == ReservationStatus.CANCELLED:
-            return "Reservation is already cancelled."
+        entry = self.waitlist_repo.createEntry(
+            user, restaurant.id, request.party_size, request.start, request.end
+        )
+        return self._waitlisted(entry)
 
-        reservation.status = ReservationStatus.CANCELLED
-        reservation.save(update_fields=["status"])
+    def waitlist(self, user) -> list:
+        """
+        The user's waitlist entries that have not ended yet.
+        """
+        return [
+            self._waitlisted(entry)
+            for entry in self.waitlist_repo.findUpcomingByUser(user.pk, datetime.now())
+        ]
 
-        return "Reservation cancelled successfully."
+    def leave_waitlist(self, entry_id: int, user) -> str:
+        """
+        Raises:
+            WaitlistEntry.DoesNotExist: If the entry is not found.
+            PermissionDenied: If the entry belongs to another user.
+        """
+        entry = self.waitlist_repo.findById(entry_id)
+        if entry.user_id != user.pk:
+            raise PermissionDenied(
+                "You do not have permission to change this waitlist entry."
+            )
+        if entry.status == WaitlistStatus.CANCELLED:
+            return "Waitlist entry is already cancelled."
+        # conditional, as a backfill may book the entry meanwhile
+        if entry.status == WaitlistStatus.WAITING and (
+            self.waitlist_repo.cancelWaitingEntry(entry.id)
+        ):
+            return "Left the waitlist successfully."
+        return "Waitlist entry was already booked; cancel the reservation instead."
+
+    @staticmethod
+    def _waitlisted(entry) -> dict:
+        return {
+            "id": entry.id,
+            "restaurant_id": entry.restaurant_id,
+            "party_size": entry.party_size,
+            "start_time": entry.reservation_time,
+            "end_time": entry.end_time,
+            "status": entry.status,
+            "reservation_id": entry.reservation_id,
+        }
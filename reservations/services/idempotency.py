@@ -0,0 +1,232 @@
+import asyncio
+import hashlib
+import json
+import time
+from datetime import timedelta
+from typing import Any, NamedTuple, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.encoders import JSONEncoder
+
+from reservations.exceptions import IdempotencyKeyInProgress, IdempotencyKeyReused
+from reservations.models import IdempotencyRecord
+from reservations.repos.idempotency import IdempotencyRepo
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+# a retry polls for the first request's response with backoff up to this
+MAX_POLL_INTERVAL = 0.2
+
+
+class StoredResponse(NamedTuple):
+    status_code: int
+    data: Any
+
+
+class Claim(NamedTuple):
+    """
+    The outcome of IdempotencyService.begin: either the stored response to
+    replay, or the right to process the request and then complete() it.
+    """
+
+    user_id: int
+    key: str
+    fingerprint: str
+    replay: Optional[StoredResponse] = None
+
+
+# _step() result while the first request is still in flight
+_WAIT = object()
+
+
+class IdempotencyService:
+    """
+    Stores the first response per (user, Idempotency-Key) and replays it
+    when the client retries the request.
+
+    Completed responses live in a Django cache with a TTL, keyed by user
+    and key, in front of the IdempotencyRecord table, which also holds the
+    in-flight claims: the unique (user, key) constraint lets exactly one
+    request claim a key, and duplicates sent meanwhile poll for its
+    response for up to wait_timeout seconds. A claim older than
+    claim_timeout is presumed dead (its worker crashed) and taken over.
+
+    Server errors and 409 conflicts are not stored: they release the
+    claim, so a retry with the same key is processed again.
+    """
+
+    key_prefix = "idempotency"
+
+    def __init__(
+        self,
+        ttl: int = 86400,
+        wait_timeout: float = 10,
+        claim_timeout: int = 60,
+        poll_interval: float = 0.01,
+        cache_alias: str = "default",
+        repo=None,
+    ):
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self.claim_timeout = claim_timeout
+        self.poll_interval = poll_interval
+        self.cache_alias = cache_alias
+        self.repo = repo or IdempotencyRepo()
+
+    @classmethod
+    def from_settings(cls) -> "IdempotencyService":
+        conf = getattr(settings, "IDEMPOTENCY", {})
+        return cls(
+            ttl=conf.get("TTL", 86400),
+            wait_timeout=conf.get("WAIT_TIMEOUT", 10),
+            claim_timeout=conf.get("CLAIM_TIMEOUT", 60),
+            cache_alias=conf.get("CACHE_ALIAS", "default"),
+        )
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    @staticmethod
+    def fingerprint(method: str, path: str, data) -> str:
+        body = json.dumps(data, cls=JSONEncoder, sort_keys=True)
+        return hashlib.sha256(f"{method} {path}\n{body}".encode()).hexdigest()
+
+    def begin(self, user_id: int, key: str, fingerprint: str) -> Claim:
+        """
+        Claim the key, or wait for the request that holds it and return
+        its response to replay.
+
+        Raises:
+            ValidationError: If the key is empty or too long.
+            IdempotencyKeyReused: If the key was used for another request.
+            IdempotencyKeyInProgress: If the first request did not finish
+                within wait_timeout.
+        """
+        self._validate(key)
+        claim = Claim(user_id, key, fingerprint)
+        deadline = time.monotonic() + self.wait_timeout
+        delay = self.poll_interval
+        while True:
+            outcome = self._step(claim)
+            if outcome is not _WAIT:
+                return outcome
+            if time.monotonic() >= deadline:
+                raise IdempotencyKeyInProgress()
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_POLL_INTERVAL)
+
+    async def abegin(self, user_id: int, key: str, fingerprint: str) -> Claim:
+        """
+        Awaitable begin(): waiting for the first request sleeps on the
+        event loop instead of blocking a thread.
+        """
+        self._validate(key)
+        claim = Claim(user_id, key, fingerprint)
+        step = sync_to_async(self._step)
+        deadline = time.monotonic() + self.wait_timeout
+        delay = self.poll_interval
+        while True:
+            outcome = await step(claim)
+            if outcome is not _WAIT:
+                return outcome
+            if time.monotonic() >= deadline:
+                raise IdempotencyKeyInProgress()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_POLL_INTERVAL)
+
+    def complete(self, claim: Claim, status_code: int, data) -> None:
+        """
+        Store the response to a claimed request, or release the claim if
+        the response should not be replayed.
+        """
+        if status_code >= 500 or status_code == 409:
+            self.release(claim)
+            return
+        # stored as rendered, so a replay returns the same JSON
+        body = json.dumps(data, cls=JSONEncoder)
+        self.repo.saveResponse(claim.user_id, claim.key, status_code, body)
+        self.cache.set(
+            self._key(claim), (claim.fingerprint, status_code, body), self.ttl
+        )
+
+    async def acomplete(self, claim: Claim, status_code: int, data) -> None:
+        await sync_to_async(self.complete)(claim, status_code, data)
+
+    def release(self, claim: Claim) -> None:
+        self.repo.releaseKey(claim.user_id, claim.key)
+
+    async def arelease(self, claim: Claim) -> None:
+        await sync_to_async(self.release)(claim)
+
+    def purge(self) -> int:
+        """
+        Delete records older than the TTL; returns how many.
+        """
+        return self.repo.deleteCreatedBefore(
+            timezone.now() - timedelta(seconds=self.ttl)
+        )
+
+    def _step(self, claim: Claim):
+        """
+        One attempt at begin(): a Claim to return, or _WAIT.
+        """
+        cached = self.cache.get(self._key(claim))
+        if cached is not None:
+            fingerprint, status_code, body = cached
+            self._check_fingerprint(claim, fingerprint)
+            return claim._replace(replay=StoredResponse(status_code, json.loads(body)))
+
+        if self.repo.claimKey(claim.user_id, claim.key, claim.fingerprint):
+            return claim
+        record = self.repo.findByUserAndKey(claim.user_id, claim.key)
+        if record is None:
+            # released in the meantime
+            return _WAIT
+
+        age = timezone.now() - record.created_at
+        if age > timedelta(seconds=self.ttl):
+            return self._take_over(claim, record)
+        self._check_fingerprint(claim, record.fingerprint)
+        if record.status_code is not None:
+            self.cache.set(
+                self._key(claim),
+                (record.fingerprint, record.status_code, record.response),
+                self.ttl - age.total_seconds(),
+            )
+            return claim._replace(
+                replay=StoredResponse(record.status_code, json.loads(record.response))
+            )
+        if age > timedelta(seconds=self.claim_timeout):
+            return self._take_over(claim, record)
+        return _WAIT
+
+    def _take_over(self, claim: Claim, record: IdempotencyRecord):
+        if self.repo.takeOver(record, claim.fingerprint):
+            return claim
+        return _WAIT
+
+    @staticmethod
+    def _check_fingerprint(claim: Claim, fingerprint: str) -> None:
+        if fingerprint != claim.fingerprint:
+            raise IdempotencyKeyReused()
+
+    @staticmethod
+    def _validate(key: str) -> None:
+        max_length = IdempotencyRecord._meta.get_field("key").max_length
+        if not key or len(key) > max_length:
+            raise ValidationError(
+                {
+                    IDEMPOTENCY_HEADER: [
+                        f"Must be between 1 and {max_length} characters."
+                    ]
+                }
+            )
+
+    def _key(self, claim: Claim) -> str:
+        # keys are client-chosen; hashing keeps them memcached-safe
+        digest = hashlib.sha256(claim.key.encode()).hexdigest()
+        return f"{self.key_prefix}:{claim.user_id}:{digest}"
@@ -0,0 +1,216 @@
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+from reservations.models import Reservation, ReservationStatus
+from reservations.repos.repository import ReservationRepo
+from restaurant.models import Table
+from restaurant.repos.repository import RestaurantRepo
+
+
+class _TableTimeline:
+    """
+    Sorted, non-overlapping CONFIRMED intervals booked on a single table.
+
+    Booking never places two CONFIRMED reservations on the same table at
+    overlapping times, so ordering by start also orders by end and a single
+    bisect answers "is the table free in [start, end)?".
+    """
+
+    __slots__ = ("starts", "ends", "ids")
+
+    def __init__(self):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+        self.ids: List[int] = []
+
+    def add(self, reservation_id: int, start_dt: datetime, end_dt: datetime) -> None:
+        pos = bisect_left(self.starts, start_dt)
+        self.starts.insert(pos, start_dt)
+        self.ends.insert(pos, end_dt)
+        self.ids.insert(pos, reservation_id)
+
+    def remove(self, reservation_id: int, start_dt: datetime) -> None:
+        pos = bisect_left(self.starts, start_dt)
+        while pos < len(self.ids) and self.starts[pos] == start_dt:
+            if self.ids[pos] == reservation_id:
+                del self.starts[pos], self.ends[pos], self.ids[pos]
+                return
+            pos += 1
+
+    def is_free(self, start_dt: datetime, end_dt: datetime) -> bool:
+        # last interval starting before end_dt is the only possible overlap
+        pos = bisect_left(self.starts, end_dt)
+        return pos == 0 or self.ends[pos - 1] <= start_dt
+
+
+class _RestaurantTimeline:
+    """
+    Tables of one restaurant plus their booked intervals ending after `horizon`.
+    """
+
+    def __init__(self, tables: Iterable[Table], horizon: datetime):
+        self.horizon = horizon
+        self.loaded_at = time.monotonic()
+        self.tables: List[Table] = list(tables)
+        self.timelines: Dict[int, _TableTimeline] = {
+            t.id: _TableTimeline() for t in self.tables
+        }
+        # reservation id -> (table id, start) of the entry currently indexed
+        self.entries: Dict[int, Tuple[int, datetime]] = {}
+
+    def add(self, reservation) -> bool:
+        timeline = self.timelines.get(reservation.table_id)
+        if timeline is None or reservation.end_time <= self.horizon:
+            return False
+        timeline.add(reservation.id, reservation.reservation_time, reservation.end_time)
+        self.entries[reservation.id] = (
+            reservation.table_id,
+            reservation.reservation_time,
+        )
+        return True
+
+    def discard(self, reservation_id: int) -> None:
+        entry = self.entries.pop(reservation_id, None)
+        if entry is None:
+            return
+        table_id, start_dt = entry
+        self.timelines[table_id].remove(reservation_id, start_dt)
+
+    def free_tables(self, start_dt: datetime, end_dt: datetime) -> List[Table]:
+        return [
+            t for t in self.tables if self.timelines[t.id].is_free(start_dt, end_dt)
+        ]
+
+
+class ReservationIntervalIndex:
+    """
+    In-process, per-restaurant index of CONFIRMED reservations per table.
+
+    A restaurant is loaded lazily on first lookup with one query for its
+    tables and one for reservations ending after the load time (the
+    `horizon`). From then on it is kept current through `sync`, which the
+    `reservations_changed` signal feeds for every save made by
+    `ReservationRepo.createReservation` and `cancel_reservation`.
+    Lookups for intervals starting before the horizon are not answered
+    and callers must fall back to the database.
+
+    The index is local to the process; every worker keeps its own copy,
+    which the signals only update for that worker's own bookings and
+    cancellations. A restaurant is therefore reloaded once it is
+    `max_age` seconds old, and callers must confirm its answers against
+    the database.
+    """
+
+    def __init__(self, reservation_repo=None, restaurant_repo=None, max_age=30.0):
+        self.res_repo = reservation_repo or ReservationRepo()
+        self.rest_repo = restaurant_repo or RestaurantRepo()
+        self.max_age = max_age
+        self._restaurants: Dict[int, _RestaurantTimeline] = {}
+        self._table_restaurant: Dict[int, int] = {}
+        self._reservation_restaurant: Dict[int, int] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_settings(cls) -> "ReservationIntervalIndex":
+        conf = getattr(settings, "RESERVATION_INDEX", {})
+        return cls(max_age=conf.get("MAX_AGE", 30.0))
+
+    def is_warm(self, restaurant_id: int) -> bool:
+        timeline = self._restaurants.get(restaurant_id)
+        return timeline is not None and not self._expired(timeline)
+
+    def warm(self, restaurant_id: int) -> None:
+        """
+        (Re)load a restaurant's tables and upcoming reservations.
+        """
+        with self._lock:
+            # loading under the lock keeps concurrent syncs from slipping
+            # in between the queries and the swap
+            horizon = datetime.now()
+            tables = self.rest_repo.findTablesByRestaurant(restaurant_id)
+            upcoming = self.res_repo.findByRestaurantAndInterval(
+                restaurant_id, horizon, datetime.max
+            )
+
+            timeline = _RestaurantTimeline(tables, horizon)
+            for reservation in upcoming:
+                timeline.add(reservation)
+
+            self._forget(restaurant_id)
+            self._restaurants[restaurant_id] = timeline
+            for table in timeline.tables:
+                self._table_restaurant[table.id] = restaurant_id
+            for reservation_id in timeline.entries:
+                self._reservation_restaurant[reservation_id] = restaurant_id
+
+    def free_tables(
+        self, restaurant_id: int, start_dt: datetime, end_dt: datetime
+    ) -> Optional[List[Table]]:
+        """
+        Return the restaurant's tables that are free in [start_dt, end_dt),
+        or None when the index cannot answer for that interval.
+        """
+        with self._lock:
+            timeline = self._restaurants.get(restaurant_id)
+            if (
+                timeline is None
+                or self._expired(timeline)
+                or start_dt < timeline.horizon
+            ):
+                return None
+            return timeline.free_tables(start_dt, end_dt)
+
+    def sync(self, reservation: Reservation) -> None:
+        """
+        Mirror the current state of a reservation into the index.
+        """
+        with self._lock:
+            self._discard(reservation.id)
+            if reservation.status != ReservationStatus.CONFIRMED:
+                return
+            restaurant_id = self._table_restaurant.get(reservation.table_id)
+            if restaurant_id is not None and self._restaurants[restaurant_id].add(
+                reservation
+            ):
+                self._reservation_restaurant[reservation.id] = restaurant_id
+
+    def discard(self, reservation_id: int) -> None:
+        with self._lock:
+            self._discard(reservation_id)
+
+    def invalidate(self, restaurant_id: Optional[int] = None) -> None:
+        """
+        Drop one restaurant (or everything) so it is reloaded on next use.
+        """
+        with self._lock:
+            if restaurant_id is None:
+                self._restaurants.clear()
+                self._table_restaurant.clear()
+                self._reservation_restaurant.clear()
+            else:
+                self._forget(restaurant_id)
+
+    def _expired(self, timeline: _RestaurantTimeline) -> bool:
+        return time.monotonic() - timeline.loaded_at >= self.max_age
+
+    def _discard(self, reservation_id: int) -> None:
+        restaurant_id = self._reservation_restaurant.pop(reservation_id, None)
+        if restaurant_id is not None:
+            self._restaurants[restaurant_id].discard(reservation_id)
+
+    def _forget(self, restaurant_id: int) -> None:
+        timeline = self._restaurants.pop(restaurant_id, None)
+        if timeline is None:
+            return
+        for table in timeline.tables:
+            self._table_restaurant.pop(table.id, None)
+        for reservation_id in timeline.entries:
+            self._reservation_restaurant.pop(reservation_id, None)
+
+
+reservation_index = ReservationIntervalIndex.from_settings()
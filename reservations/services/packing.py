@@ -0,0 +1,286 @@
+import time
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import (
+    Collection,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from reservations.repos.repository import ReservationConflictError, ReservationRepo
+from restaurant.models import Table
+from restaurant.repos.repository import RestaurantRepo
+from restaurant.services.table_selection import (
+    DefaultTableSelectionStrategy,
+    TableSelectionStrategy,
+    select_smallest_fitting_table,
+)
+
+T = TypeVar("T")
+
+
+def group_overlapping_windows(
+    items: Iterable[T], window
+) -> List[Tuple[datetime, datetime, List[T]]]:
+    """
+    Cluster items whose [start, end) windows overlap, transitively.
+
+    Args:
+        items: Anything; `window(item)` must return its (start, end).
+        window: Callable extracting the time window of an item.
+
+    Returns:
+        (cluster_start, cluster_end, items) tuples ordered by start.
+    """
+    groups: List[Tuple[datetime, datetime, List[T]]] = []
+    for item in sorted(items, key=lambda i: window(i)[0]):
+        start_dt, end_dt = window(item)
+        if groups and start_dt < groups[-1][1]:
+            g_start, g_end, members = groups[-1]
+            members.append(item)
+            groups[-1] = (g_start, max(g_end, end_dt), members)
+        else:
+            groups.append((start_dt, end_dt, [item]))
+    return groups
+
+
+class TablePacker:
+    """
+    Assigns tables to several parties of one restaurant in memory.
+
+    Starts from the occupancy already persisted for the window and records
+    every assignment it makes, so later parties see earlier ones as busy.
+    """
+
+    def __init__(self, tables: Sequence[Table], occupied: Iterable):
+        self.tables = list(tables)
+        self.busy: Dict[int, List[Tuple[datetime, datetime]]] = {
+            t.id: [] for t in self.tables
+        }
+        for reservation in occupied:
+            self.busy.setdefault(reservation.table_id, []).append(
+                (reservation.reservation_time, reservation.end_time)
+            )
+
+    def is_free(self, table: Table, start_dt: datetime, end_dt: datetime) -> bool:
+        return all(
+            end_dt <= b_start or b_end <= start_dt
+            for b_start, b_end in self.busy[table.id]
+        )
+
+    def assign(
+        self, start_dt: datetime, end_dt: datetime, party_size: int
+    ) -> Optional[Table]:
+        """
+        Pick a table by RULE1 among those still free and mark it busy.
+        """
+        free = [t for t in self.tables if self.is_free(t, start_dt, end_dt)]
+        table = select_smallest_fitting_table(free, party_size)
+        if table is not None:
+            self.busy[table.id].append((start_dt, end_dt))
+        return table
+
+
+# (key, start, end, current table id or None, table ids it may not use)
+Interval = Tuple[Hashable, datetime, datetime, Optional[int], Collection[int]]
+
+
+def colour_intervals(
+    tables: Sequence[Table],
+    fixed: Iterable,
+    movable: Iterable[Interval],
+    deadline: Optional[float] = None,
+) -> Optional[Dict[Hashable, Table]]:
+    """
+    Assign interchangeable tables to time intervals (interval graph
+    colouring).
+
+    Intervals are placed greedily in start order. An interval keeps its
+    current table when that is free; otherwise it takes the free table
+    whose previous booking ends closest to its start. When every fixed
+    interval starts before the movable ones (e.g. reservations already
+    under way), the greedy pass fails only if more intervals overlap at
+    some moment than there are tables, so no other assignment would fit.
+
+    Args:
+        tables: Tables with the same number of seats.
+        fixed: Reservations that keep their table.
+        movable: Intervals to place.
+        deadline: time.perf_counter() value after which to give up.
+
+    Returns:
+        {key: table} for every movable interval, or None if they do not
+        all fit or the deadline passed.
+    """
+    packer = TablePacker(tables, fixed)
+    by_id = {t.id: t for t in packer.tables}
+    assignment: Dict[Hashable, Table] = {}
+    for key, start_dt, end_dt, current_id, excluded in sorted(
+        movable, key=lambda i: (i[1], i[2])
+    ):
+        if deadline is not None and time.perf_counter() > deadline:
+            return None
+        current = by_id.get(current_id)
+        if current is not None and packer.is_free(current, start_dt, end_dt):
+            table = current
+        else:
+            free = [
+                t
+                for t in packer.tables
+                if t.id not in excluded and packer.is_free(t, start_dt, end_dt)
+            ]
+            if not free:
+                return None
+            table = max(
+                free,
+                key=lambda t: (
+                    max(
+                        (e for _, e in packer.busy[t.id] if e <= start_dt),
+                        default=datetime.min,
+                    ),
+                    -t.id,
+                ),
+            )
+        packer.busy[table.id].append((start_dt, end_dt))
+        assignment[key] = table
+    return assignment
+
+
+class RepackingTableSelectionStrategy(TableSelectionStrategy):
+    """
+    DefaultTableSelectionStrategy that, when the smallest fitting tables
+    are all taken, tries to make room by moving not-yet-started CONFIRMED
+    reservations between tables with the same number of seats.
+
+    Guests do not notice such a move: RULE1 and the price only depend on
+    the seat count. Each seat class of the restaurant-day is recoloured
+    with colour_intervals(), which finds a place for the new party
+    whenever one exists. The moves are made in the caller's transaction,
+    which must also book the returned table (ReservationFacadeService.book
+    does), so they roll back with a failed booking. If a concurrent
+    booking gets in the way nothing moves and the default choice is
+    returned.
+    """
+
+    moves_reservations = True
+
+    def __init__(
+        self,
+        repo: ReservationRepo,
+        table_repo: RestaurantRepo = None,
+        time_budget: float = 0.05,
+    ):
+        """
+        Args:
+            time_budget: Seconds a lookup may spend on repacking before
+                settling for the default choice.
+        """
+        self.repo = repo
+        self.table_repo = table_repo or RestaurantRepo()
+        self.fallback = DefaultTableSelectionStrategy(
+            repo=repo, table_repo=self.table_repo
+        )
+        self.time_budget = time_budget
+
+    def find_by_restaurant_and_time(
+        self,
+        restaurant_id: int,
+        start_dt: datetime,
+        end_dt: datetime,
+        party_size: int,
+        exclude_table_ids: Collection[int] = (),
+    ) -> Optional[Table]:
+        deadline = time.perf_counter() + self.time_budget
+        table = self.fallback.find_by_restaurant_and_time(
+            restaurant_id, start_dt, end_dt, party_size, exclude_table_ids
+        )
+
+        # seat classes that fit the party and beat the default choice
+        tables = sorted(
+            (
+                t
+                for t in self.table_repo.findTablesByRestaurant(restaurant_id)
+                if t.is_available
+            ),
+            key=lambda t: (t.seats, t.id),
+        )
+        classes = []
+        for seats, group in groupby(tables, key=lambda t: t.seats):
+            group = list(group)
+            if (table is None or seats < table.seats) and select_smallest_fitting_table(
+                group[:1], party_size
+            ):
+                classes.append(group)
+        if not classes:
+            return table
+
+        day_start = datetime.combine(start_dt.date(), datetime.min.time())
+        window = (day_start, max(day_start + timedelta(days=1), end_dt))
+        booked = self.repo.findByRestaurantAndInterval(restaurant_id, *window)
+        for seat_class in classes:
+            repacked = self._repack(
+                seat_class,
+                booked,
+                window,
+                start_dt,
+                end_dt,
+                exclude_table_ids,
+                deadline,
+            )
+            if repacked is not None:
+                return repacked
+        return table
+
+    def _repack(
+        self, tables, booked, window, start_dt, end_dt, exclude_table_ids, deadline
+    ) -> Optional[Table]:
+        """
+        Recolour one seat class with the new party in it and make the
+        resulting moves.
+
+        Returns:
+            The new party's table, or None if the class has no room.
+        """
+        table_ids = {t.id for t in tables}
+        now = datetime.now()
+        fixed, movable = [], {}
+        for reservation in booked:
+            if reservation.table_id not in table_ids:
+                continue
+            # started ones stay put, as do ones reaching outside the
+            # window, whose neighbours were not loaded
+            if (
+                reservation.reservation_time <= now
+                or reservation.reservation_time < window[0]
+                or reservation.end_time > window[1]
+            ):
+                fixed.append(reservation)
+            else:
+                movable[reservation.id] = reservation
+
+        intervals = [
+            (r.id, r.reservation_time, r.end_time, r.table_id, ())
+            for r in movable.values()
+        ]
+        intervals.append((None, start_dt, end_dt, None, exclude_table_ids))
+        assignment = colour_intervals(tables, fixed, intervals, deadline)
+        if assignment is None:
+            return None
+
+        moves = [
+            (movable[key], table)
+            for key, table in assignment.items()
+            if key is not None and table.id != movable[key].table_id
+        ]
+        if moves:
+            try:
+                self.repo.moveReservations(moves)
+            except ReservationConflictError:
+                return None
+        return assignment[None]
@@ -0,0 +1,57 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Sequence, Tuple
+
+# (reservation_time, id) of the last row of a page
+Position = Tuple[datetime, int]
+
+# (table_seats, free_tables, restaurant_id) of the last row of a search page
+SearchPosition = Tuple[int, int, int]
+
+
+def encode_cursor(position: Position) -> str:
+    reservation_time, reservation_id = position
+    return _encode([reservation_time.isoformat(), reservation_id])
+
+
+def decode_cursor(cursor: str) -> Position:
+    """
+    Raises:
+        ValueError: If the cursor was not made by encode_cursor.
+    """
+    try:
+        reservation_time, reservation_id = _decode(cursor)
+        return datetime.fromisoformat(reservation_time), int(reservation_id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor.") from exc
+
+
+def encode_search_cursor(position: SearchPosition) -> str:
+    return _encode(list(position))
+
+
+def decode_search_cursor(cursor: str) -> SearchPosition:
+    """
+    Raises:
+        ValueError: If the cursor was not made by encode_search_cursor.
+    """
+    try:
+        table_seats, free_tables, restaurant_id = _decode(cursor)
+        return int(table_seats), int(free_tables), int(restaurant_id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor.") from exc
+
+
+def _encode(values: Sequence) -> str:
+    raw = json.dumps(values)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return json.loads(raw)
+    except binascii.Error as exc:
+        raise ValueError("Invalid cursor.") from exc
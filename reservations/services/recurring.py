@@ -0,0 +1,115 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from reservations.models import SeriesFrequency
+
+# RRULE BYDAY codes, in date.weekday() order
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+MAX_OCCURRENCES = 366
+
+Window = Tuple[datetime, datetime]
+
+
+def expand_occurrences(
+    start_date: date,
+    until: date,
+    start_time: time,
+    duration_hours: Decimal,
+    frequency: str,
+    interval: int = 1,
+    weekdays: Sequence[str] = (),
+    limit: int = MAX_OCCURRENCES,
+) -> Optional[List[Window]]:
+    """
+    The (start, end) windows of a series from start_date to until, in
+    start order.
+
+    Like an RRULE, a WEEKLY series repeats every `interval` weeks counted
+    from the Monday of start_date's week, on each of `weekdays` (the
+    weekday of start_date by default).
+
+    Returns:
+        The windows, or None if there would be more than `limit`.
+    """
+    if frequency == SeriesFrequency.DAILY:
+        offsets, step = [0], timedelta(days=interval)
+        first = start_date
+    else:
+        days = sorted({WEEKDAYS.index(d) for d in weekdays} or {start_date.weekday()})
+        offsets, step = days, timedelta(weeks=interval)
+        first = start_date - timedelta(days=start_date.weekday())
+
+    length = timedelta(hours=float(duration_hours))
+    windows = []
+    period = first
+    while period <= until:
+        for offset in offsets:
+            day = period + timedelta(days=offset)
+            if start_date <= day <= until:
+                if len(windows) == limit:
+                    return None
+                start = datetime.combine(day, start_time)
+                windows.append((start, start + length))
+        period += step
+    return windows
+
+
+def overlaps(windows: Sequence[Window], busy: Sequence[Window]) -> List[bool]:
+    """
+    For each window, whether it overlaps any busy interval.
+
+    Both sequences must be ordered by start. One merge pass over the two,
+    O(len(windows) + len(busy)): busy intervals ending before a window
+    starts cannot overlap it or any later window, so they are skipped for
+    good.
+    """
+    flags = []
+    i, count = 0, len(busy)
+    for start, end in windows:
+        while i < count and busy[i][1] <= start:
+            i += 1
+        # later busy intervals start no earlier than busy[i]
+        flags.append(i < count and busy[i][0] < end)
+    return flags
+
+
+def assign_tables(
+    windows: Sequence[Window],
+    tables: Sequence,
+    busy: Dict[int, Sequence[Window]],
+) -> List[Optional[object]]:
+    """
+    A table per window, or None where every table is taken.
+
+    Each window gets a table of the smallest size free for it, as book()
+    would pick; pass `tables` smallest first, in order of preference. The
+    series keeps to one table per size where it can: among tables of the
+    size a window needs, the one free for the most windows (the first on
+    ties).
+    """
+    free = {
+        table.id: [not taken for taken in overlaps(windows, busy.get(table.id, ()))]
+        for table in tables
+    }
+    preferred = {}
+    for table in tables:
+        kept = preferred.get(table.seats)
+        # the first of equals stays
+        if kept is None or sum(free[table.id]) > sum(free[kept.id]):
+            preferred[table.seats] = table
+
+    assigned = []
+    for index in range(len(windows)):
+        open_tables = [t for t in tables if free[t.id][index]]
+        if not open_tables:
+            assigned.append(None)
+            continue
+        seats = min(t.seats for t in open_tables)
+        kept = preferred[seats]
+        assigned.append(
+            kept
+            if free[kept.id][index]
+            else next(t for t in open_tables if t.seats == seats)
+        )
+    return assigned
@@ -0,0 +1,199 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from django.db import transaction
+
+from reservations.models import ReservationEventKind, ReservationStatus
+from reservations.repos.repository import ReservationRepo
+from reservations.repos.rollups import OccupancyRollupRepo
+from restaurant.repos.cache import CachedRestaurantRepo
+
+BUCKET = timedelta(hours=1)
+
+# (restaurant_id, day, hour)
+Key = Tuple[int, date, int]
+# (bookings, covers, revenue, cancellations, guest_minutes), as
+# OccupancyRollupRepo.DELTA_FIELDS
+Delta = Tuple[int, int, Decimal, int, int]
+
+
+def booking_deltas(
+    restaurant_id: int,
+    start: datetime,
+    end: datetime,
+    num_seats: int,
+    cost: Decimal,
+) -> Iterator[Tuple[Key, Delta]]:
+    """
+    What a CONFIRMED reservation adds to the rollup: the booking in the
+    hour it starts, and guest minutes in every hour it spans.
+    """
+    yield (restaurant_id, start.date(), start.hour), (1, num_seats, cost, 0, 0)
+    bucket = start.replace(minute=0, second=0, microsecond=0)
+    while bucket < end:
+        following = bucket + BUCKET
+        minutes = (min(end, following) - max(start, bucket)) // timedelta(minutes=1)
+        yield (restaurant_id, bucket.date(), bucket.hour), (
+            0,
+            0,
+            0,
+            0,
+            num_seats * minutes,
+        )
+        bucket = following
+
+
+def cancellation_delta(restaurant_id: int, start: datetime) -> Tuple[Key, Delta]:
+    return (restaurant_id, start.date(), start.hour), (0, 0, 0, 1, 0)
+
+
+def accumulate(deltas: Iterable[Tuple[Key, Delta]], sign: int = 1, into=None):
+    """
+    Sum deltas per key into `into` (a new dict by default), scaled by sign.
+    """
+    totals = into if into is not None else defaultdict(lambda: [0, 0, 0, 0, 0])
+    for key, delta in deltas:
+        total = totals[key]
+        for i, value in enumerate(delta):
+            total[i] += sign * value
+    return totals
+
+
+def event_deltas(events: Iterable[dict]) -> Dict[Key, List]:
+    """
+    Rollup changes for a batch of reservation events: a cancellation
+    takes its booking back out and counts as a cancellation.
+    """
+    totals = accumulate(())
+    for event in events:
+        booking = booking_deltas(
+            event["restaurant_id"],
+            datetime.fromisoformat(event["reservation_time"]),
+            datetime.fromisoformat(event["end_time"]),
+            event["num_seats"],
+            Decimal(event["cost"]),
+        )
+        if event["kind"] == ReservationEventKind.BOOKED:
+            accumulate(booking, into=totals)
+        elif event["kind"] == ReservationEventKind.CANCELLED:
+            accumulate(booking, sign=-1, into=totals)
+            accumulate(
+                [
+                    cancellation_delta(
+                        event["restaurant_id"],
+                        datetime.fromisoformat(event["reservation_time"]),
+                    )
+                ],
+                into=totals,
+            )
+    return totals
+
+
+def rebuild_range(
+    first_day: date,
+    last_day: date,
+    restaurant_ids: Optional[Sequence[int]] = None,
+) -> int:
+    """
+    Recompute the rollup rows of [first_day, last_day] from Reservation
+    rows, replacing the stored ones in one transaction.
+
+    Reads every reservation overlapping the range once, on a server-side
+    cursor; those crossing its edges only contribute their hours inside
+    it, so adjacent ranges can be rebuilt independently.
+
+    Events still queued for the range (in an EventBatcher or the task
+    backend) are applied on top of the rebuilt rows when written, counting
+    their reservations twice, so only rebuild with event writing paused.
+
+    Returns:
+        The number of rollup rows written.
+    """
+    start = datetime.combine(first_day, time.min)
+    end = datetime.combine(last_day + timedelta(days=1), time.min)
+    totals = accumulate(())
+    rows = ReservationRepo.streamForRollup(start, end, restaurant_ids)
+    for restaurant_id, status, reservation_time, end_time, num_seats, cost in rows:
+        if status == ReservationStatus.CONFIRMED:
+            deltas = booking_deltas(
+                restaurant_id, reservation_time, end_time, num_seats, cost
+            )
+        else:
+            deltas = [cancellation_delta(restaurant_id, reservation_time)]
+        accumulate(deltas, into=totals)
+
+    buckets = {
+        key: total for key, total in totals.items() if first_day <= key[1] <= last_day
+    }
+    with transaction.atomic():
+        OccupancyRollupRepo.deleteRange(first_day, last_day, restaurant_ids)
+        OccupancyRollupRepo.bulkCreateRows(buckets)
+    return len(buckets)
+
+
+class OccupancyReportService:
+    """
+    Answers occupancy, covers and revenue range queries from the
+    OccupancyRollup table, one indexed GROUP BY per report.
+
+    Occupancy is guest minutes over the seat capacity of the restaurant's
+    available tables during [start_hour, end_hour) of each day, so pass
+    the opening hours for a meaningful percentage.
+    """
+
+    def __init__(self, repo=None, restaurant_repo=None):
+        self.repo = repo or OccupancyRollupRepo()
+        self.rest_repo = restaurant_repo or CachedRestaurantRepo()
+
+    def report(
+        self,
+        restaurant_id: int,
+        start_date: date,
+        end_date: date,
+        start_hour: int = 0,
+        end_hour: int = 24,
+        group_by: str = "day",
+    ) -> dict:
+        seats = sum(
+            t.seats
+            for t in self.rest_repo.findTablesByRestaurant(restaurant_id)
+            if t.is_available
+        )
+        if group_by == "hour":
+            rows = self.repo.findHourly(
+                restaurant_id, start_date, end_date, start_hour, end_hour
+            )
+            capacity = seats * 60
+        else:
+            rows = self.repo.findDaily(
+                restaurant_id, start_date, end_date, start_hour, end_hour
+            )
+            capacity = seats * 60 * (end_hour - start_hour)
+
+        buckets, totals = [], [0, 0, Decimal(0), 0, 0]
+        for row in rows:
+            buckets.append({**row, **self._summary(row, capacity)})
+            for i, field in enumerate(OccupancyRollupRepo.DELTA_FIELDS):
+                totals[i] += row[field]
+        days = (end_date - start_date).days + 1
+        total = dict(zip(OccupancyRollupRepo.DELTA_FIELDS, totals))
+        return {
+            "restaurant_id": restaurant_id,
+            "start_date": start_date,
+            "end_date": end_date,
+            "start_hour": start_hour,
+            "end_hour": end_hour,
+            "seats": seats,
+            "buckets": buckets,
+            "totals": {
+                **total,
+                **self._summary(total, seats * 60 * (end_hour - start_hour) * days),
+            },
+        }
+
+    @staticmethod
+    def _summary(row: dict, capacity: int) -> dict:
+        occupancy = row["guest_minutes"] / capacity * 100 if capacity else 0.0
+        return {"occupancy_pct": round(occupancy, 2)}
@@ -0,0 +1,184 @@
+import logging
+from datetime import datetime, time, timedelta
+from typing import List, Sequence, Tuple
+
+from django.db import transaction
+
+from reservations.models import Reservation, ReservationEventKind
+from reservations.repos.repository import ReservationConflictError, ReservationRepo
+from reservations.repos.waitlist import WaitlistRepo
+from reservations.services.events import reservation_event, reservation_events
+from restaurant.repos.cache import CachedRestaurantRepo
+from restaurant.services.price_policy import default_pricing_policy
+from restaurant.services.table_selection import select_smallest_fitting_table
+from utils.tasks import task
+
+logger = logging.getLogger(__name__)
+
+Interval = Tuple[datetime, datetime]
+
+
+def free_gaps(
+    busy: Sequence[Interval], start: datetime, end: datetime
+) -> List[Interval]:
+    """
+    The free stretches of [start, end) around `busy` intervals sorted by
+    start time.
+    """
+    gaps = []
+    cursor = start
+    for busy_start, busy_end in busy:
+        if busy_start > cursor:
+            gaps.append((cursor, min(busy_start, end)))
+        cursor = max(cursor, busy_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class WaitlistBackfillService:
+    """
+    Books waitlisted parties onto a table freed by a cancellation.
+
+    The table's free stretches on the cancelled reservations' days that
+    touch a cancelled slot are filled from the restaurant's WAITING
+    entries, in request order: an entry is taken when its window lies in
+    a free stretch, its party fits the table by RULE1 and it does not
+    overlap an entry taken before it. The candidates come from one
+    indexed range query on (restaurant, reservation_time), so the cost
+    follows the entries inside the freed day, not the whole waitlist.
+
+    Everything is booked in one transaction. If a concurrent booking
+    takes part of the stretch first, the whole backfill rolls back and
+    the entries stay on the waitlist.
+    """
+
+    def __init__(
+        self,
+        reservation_repo=None,
+        waitlist_repo=None,
+        restaurant_repo=None,
+        pricing_policy=None,
+        events=None,
+    ):
+        self.res_repo = reservation_repo or ReservationRepo()
+        self.waitlist_repo = waitlist_repo or WaitlistRepo()
+        self.rest_repo = restaurant_repo or CachedRestaurantRepo()
+        self.pricing = pricing_policy or default_pricing_policy()
+        self.events = events or reservation_events
+
+    def backfill(
+        self,
+        restaurant_id: int,
+        table_id: int,
+        intervals: Sequence[Interval],
+    ) -> List[Reservation]:
+        """
+        Fill the table freed over each of `intervals`, e.g. every
+        reservation of the table one bulk cancel freed, in one
+        transaction.
+
+        Returns:
+            The reservations booked for waitlisted parties.
+        """
+        now = datetime.now()
+        intervals = sorted(i for i in intervals if i[1] > now)
+        if not intervals:
+            return []
+        table = next(
+            (
+                t
+                for t in self.rest_repo.findTablesByRestaurant(restaurant_id)
+                if t.id == table_id
+            ),
+            None,
+        )
+        if table is None or not table.is_available:
+            return []
+
+        day_start = max(datetime.combine(intervals[0][0].date(), time.min), now)
+        last_end = max(end for _, end in intervals)
+        day_end = datetime.combine(
+            (last_end - timedelta.resolution).date() + timedelta(days=1), time.min
+        )
+        try:
+            with transaction.atomic():
+                busy = self.res_repo.findIntervalsByTable(table_id, day_start, day_end)
+                gaps = [
+                    (gap_start, gap_end)
+                    for gap_start, gap_end in free_gaps(busy, day_start, day_end)
+                    if any(
+                        gap_start < end and gap_end > start for start, end in intervals
+                    )
+                ]
+                if not gaps:
+                    return []
+                entries = self.waitlist_repo.findWaitingWithin(
+                    restaurant_id, gaps[0][0], gaps[-1][1], table.seats
+                )
+                taken = self._pick(entries, gaps, table)
+                if not taken:
+                    return []
+                booked = self.res_repo.bulkCreateReservations(
+                    [
+                        self.res_repo.buildReservation(
+                            entry.user_id,
+                            table,
+                            entry.party_size,
+                            self.pricing.calculate(
+                                table, entry.party_size, entry.reservation_time
+                            ),
+                            entry.reservation_time,
+                            entry.end_time,
+                        )
+                        for entry in taken
+                    ]
+                )
+                self.waitlist_repo.markBooked(list(zip(taken, booked)))
+                self.events.add_on_commit(
+                    reservation_event(ReservationEventKind.BOOKED, r) for r in booked
+                )
+        except ReservationConflictError:
+            return []
+        return booked
+
+    @staticmethod
+    def _pick(entries, gaps: List[Interval], table) -> list:
+        taken = []
+        for entry in entries:
+            start, end = entry.reservation_time, entry.end_time
+            if not any(gs <= start and end <= ge for gs, ge in gaps):
+                continue
+            if select_smallest_fitting_table([table], entry.party_size) is None:
+                continue
+            if any(start < t.end_time and t.reservation_time < end for t in taken):
+                continue
+            taken.append(entry)
+        return taken
+
+
+waitlist_backfill = WaitlistBackfillService()
+
+
+@task
+def backfill_waitlist(restaurant_id: int, table_id: int, intervals: List[list]) -> None:
+    """
+    waitlist_backfill.backfill() for [start, end] intervals given as ISO
+    strings.
+
+    Sent once the cancellation has committed, so a failing backfill is
+    logged and leaves the entries waiting instead of failing the cancel.
+    """
+    try:
+        waitlist_backfill.backfill(
+            restaurant_id,
+            table_id,
+            [
+                (datetime.fromisoformat(start), datetime.fromisoformat(end))
+                for start, end in intervals
+            ],
+        )
+    except Exception:
+        logger.exception("Waitlist backfill of table %s failed", table_id)
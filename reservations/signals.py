@@ -0,0 +1,8 @@
+from django.dispatch import Signal
+
+# Sent after commit with `reservations`: the Reservation rows whose
+# status, table or time window may have changed. Writes that bypass
+# Model.save() (bulk_create, queryset updates) must send it themselves.
+# `backfill=False` keeps cancellations from being backfilled from the
+# waitlist.
+reservations_changed = Signal()
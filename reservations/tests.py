@@ -1,16 +1,82 @@
+import json
+import threading
 from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
+from urllib.parse import parse_qs, urlsplit
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
 from rest_framework import status
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.test import APIRequestFactory, force_authenticate
 
-from reservations.models import Reservation
-from reservations.repos.repository import ReservationRepo
+from accounts.services import JWTService
+
+from reservations.exceptions import (
+    AlreadyWaitlisted,
+    BookingConflict,
+    IdempotencyKeyInProgress,
+    TableAvailable,
+)
+from reservations.models import (
+    IdempotencyRecord,
+    OccupancyRollup,
+    Reservation,
+    ReservationEvent,
+    ReservationEventKind,
+    ReservationSeries,
+    ReservationStatus,
+    SeriesFrequency,
+    WaitlistEntry,
+    WaitlistStatus,
+)
+from reservations.repos.repository import ReservationConflictError, ReservationRepo
 from reservations.serializers import ReservationRequestSerializer
-from reservations.views import BookReservationView
-from restaurant.models import Restaurant, Table
+from reservations.services.availability import OccupancyGrid, availability_service
+from reservations.services.booking_request import BookingRequestParser
+from reservations.services.events import (
+    EventBatcher,
+    record_reservation_events,
+    reservation_event,
+)
+from reservations.services.facade import ReservationFacadeService
+from reservations.services.idempotency import IdempotencyService
+from reservations.services.interval_index import reservation_index
+from reservations.services.packing import (
+    RepackingTableSelectionStrategy,
+    colour_intervals,
+)
+from reservations.services.recurring import expand_occurrences, overlaps
+from reservations.services.waitlist import waitlist_backfill
+from reservations.views import (
+    AsyncBookReservationView,
+    AsyncCancelReservationView,
+    CancelReservationBatchView,
+    CancelReservationView,
+    CloseDayView,
+    AvailabilityView,
+    BookReservationBatchView,
+    BookReservationView,
+    LeaveWaitlistView,
+    MyReservationsView,
+    OccupancyReportView,
+    PriceQuoteView,
+    ReservationExportView,
+    SearchAvailabilityView,
+    WaitlistView,
+)
+from restaurant.models import PriceRule, Restaurant, Table
+from restaurant.repos.cache import restaurant_metadata_cache
 from restaurant.services.price_policy import DefaultPricingPolicy
+from restaurant.services.table_selection import select_smallest_fitting_table
+from utils.tasks import get_backend, set_backend
 
 User = get_user_model()
 
@@ -67,6 +133,92 @@ class ReservationRequestSerializerTests(TestCase):
         self.assertIn("duration_hours", serializer.errors)
 
 
+class BookingRequestParserTests(TestCase):
+    def setUp(self):
+        self.parser = BookingRequestParser()
+        self.tomorrow = (date.today() + timedelta(days=1)).isoformat()
+        self.valid = {
+            "restaurant_id": 1,
+            "reservation_date": self.tomorrow,
+            "reservation_time": "19:30",
+            "duration_hours": "1.5",
+            "party_size": 2,
+        }
+
+    def _serializer_outcome(self, data):
+        serializer = ReservationRequestSerializer(data=data)
+        if not serializer.is_valid():
+            return serializer.errors
+        payload = serializer.validated_data
+        start = datetime.combine(
+            payload["reservation_date"], payload["reservation_time"]
+        )
+        return (
+            payload["restaurant_id"],
+            payload["party_size"],
+            payload["duration_hours"],
+            start,
+            start + timedelta(hours=float(payload["duration_hours"])),
+        )
+
+    def _parser_outcome(self, data):
+        try:
+            r = self.parser.parse(data)
+        except ValidationError as exc:
+            return exc.detail
+        return r.restaurant_id, r.party_size, r.duration_hours, r.start, r.end
+
+    def test_matches_the_serializer(self):
+        # well-formed requests skip the serializer
+        self.assertIsNotNone(self.parser._fast_parse(self.valid))
+        variants = [
+            {},
+            {"duration_hours": 2},
+            {"duration_hours": 2.5},
+            {"duration_hours": "3.0"},
+            {"duration_hours": "01.5"},
+            {"restaurant_id": "7", "party_size": "4.0"},
+            {"reservation_time": "19:30:15.5+02:00"},
+            {"reservation_date": "20300101"},
+            {"party_size": 0},
+            {"party_size": True},
+            {"restaurant_id": None},
+            {"restaurant_id": "x", "party_size": -1},
+            {"duration_hours": "1.3"},
+            {"duration_hours": "1.05"},
+            {"duration_hours": "4"},
+            {"duration_hours": None},
+            {"reservation_date": "2030-02-30"},
+            {"reservation_time": "25:00"},
+            {"reservation_date": date.today().isoformat(), "reservation_time": "00:00"},
+        ]
+        for change in variants:
+            data = {**self.valid, **change}
+            with self.subTest(data=data):
+                self.assertEqual(
+                    self._parser_outcome(data), self._serializer_outcome(data)
+                )
+        without_duration = dict(self.valid)
+        del without_duration["duration_hours"]
+        self.assertEqual(
+            self._parser_outcome(without_duration),
+            self._serializer_outcome(without_duration),
+        )
+        self.assertEqual(self._parser_outcome([]), self._serializer_outcome([]))
+
+    def test_parse_many_reports_item_errors(self):
+        requests = self.parser.parse_many([self.valid, self.valid], max_length=2)
+        self.assertEqual([r.party_size for r in requests], [2, 2])
+
+        with self.assertRaises(ValidationError) as ctx:
+            self.parser.parse_many([self.valid, {**self.valid, "party_size": 0}], 2)
+        self.assertEqual(ctx.exception.detail[0], {})
+        self.assertIn("party_size", ctx.exception.detail[1])
+
+        with self.assertRaises(ValidationError):
+            self.parser.parse_many([self.valid] * 3, max_length=2)
+
+
 class ReservationRepoTests(TestCase):
     def setUp(self):
         # user, restaurant, and one table
@@ -192,3 +344,1792 @@ class BookReservationViewTests(TestCase):
         resp = self._call(bad, user=self.user)
         self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("party_size", resp.data)
+
+
+class IdempotentBookingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username="alice", password="pw")
+        self.rest = Restaurant.objects.create(name="Testaurant")
+        Table.objects.create(restaurant=self.rest, seats=4, number=1)
+        Table.objects.create(restaurant=self.rest, seats=4, number=2)
+        self.payload = {
+            "restaurant_id": self.rest.id,
+            "reservation_date": (date.today() + timedelta(days=1)).isoformat(),
+            "reservation_time": "18:00",
+            "duration_hours": "2",
+            "party_size": 2,
+        }
+
+    def _call(self, data, key, user=None, view_class=BookReservationView):
+        req = self.factory.post("/book/", data, format="json", HTTP_IDEMPOTENCY_KEY=key)
+        force_authenticate(req, user=user or self.user)
+        return view_class.as_view()(req)
+
+    def test_retry_replays_first_response_without_booking(self):
+        first = self._call(self.payload, "k1")
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            retry = self._call(self.payload, "k1")
+        self.assertEqual(retry.status_code, status.HTTP_200_OK)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.render().content, first.render().content)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+        # a new key books again
+        self._call(self.payload, "k2")
+        self.assertEqual(Reservation.objects.count(), 2)
+
+    def test_replays_from_the_table_when_the_cache_is_cold(self):
+        first = self._call(self.payload, "k1")
+        cache.clear()
+
+        retry = self._call(self.payload, "k1")
+        self.assertEqual(retry.render().content, first.render().content)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_errors_are_replayed_too(self):
+        missing = {**self.payload, "restaurant_id": 9999}
+        self.assertEqual(self._call(missing, "k1").status_code, 404)
+
+        Restaurant.objects.create(id=9999, name="Late")
+        retry = self._call(missing, "k1")
+        self.assertEqual(retry.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(retry.data["detail"], "Restaurant not found.")
+
+    def test_key_reused_for_another_request_gives_422(self):
+        self._call(self.payload, "k1")
+        other = {**self.payload, "party_size": 3}
+
+        resp = self._call(other, "k1")
+        self.assertEqual(resp.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_keys_are_scoped_per_user(self):
+        bob = User.objects.create_user(username="bob", password="pw")
+        self._call(self.payload, "k1")
+        resp = self._call(self.payload, "k1", user=bob)
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertFalse(resp.has_header("Idempotent-Replayed"))
+        self.assertEqual(Reservation.objects.filter(user=bob).count(), 1)
+
+    def test_in_flight_claims_block_then_expire(self):
+        service = IdempotencyService(wait_timeout=0.05, claim_timeout=60)
+        fingerprint = service.fingerprint("POST", "/book/", self.payload)
+        IdempotencyRecord.objects.create(
+            user=self.user, key="k1", fingerprint=fingerprint
+        )
+        with self.assertRaises(IdempotencyKeyInProgress):
+            service.begin(self.user.id, "k1", fingerprint)
+
+        # the first request's worker died: its claim is taken over
+        IdempotencyRecord.objects.update(
+            created_at=datetime.now() - timedelta(seconds=61)
+        )
+        claim = service.begin(self.user.id, "k1", fingerprint)
+        self.assertIsNone(claim.replay)
+
+    async def test_async_view_replays(self):
+        first = await self._call(
+            self.payload, "k1", view_class=AsyncBookReservationView
+        )
+        retry = await self._call(
+            self.payload, "k1", view_class=AsyncBookReservationView
+        )
+
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.render().content, first.render().content)
+        self.assertEqual(await Reservation.objects.acount(), 1)
+
+
+class AsyncReservationViewTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username="alice", password="pw")
+        self.rest = Restaurant.objects.create(name="Testaurant")
+        self.t4 = Table.objects.create(restaurant=self.rest, seats=4, number=1)
+        self.payload = {
+            "restaurant_id": self.rest.id,
+            "reservation_date": (date.today() + timedelta(days=1)).isoformat(),
+            "reservation_time": "18:00",
+            "duration_hours": "2",
+            "party_size": 2,
+        }
+
+    async def _call(self, view_class, data, user=None):
+        req = self.factory.post("/", data, format="json")
+        if user:
+            force_authenticate(req, user=user)
+        return await view_class.as_view()(req)
+
+    def test_views_are_async(self):
+        self.assertTrue(AsyncBookReservationView.view_is_async)
+        self.assertTrue(AsyncCancelReservationView.view_is_async)
+
+    async def test_book_creates_reservation(self):
+        resp = await self._call(AsyncBookReservationView, self.payload, self.user)
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        reservation = await Reservation.objects.aget()
+        self.assertEqual(reservation.user_id, self.user.id)
+        self.assertEqual(reservation.table_id, self.t4.id)
+        self.assertEqual(resp.data["reservation"]["id"], reservation.id)
+        self.assertEqual(resp.data["restaurant"]["name"], "Testaurant")
+
+    async def test_book_errors_match_sync_view(self):
+        resp = await self._call(AsyncBookReservationView, self.payload)
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        missing = {**self.payload, "restaurant_id": 9999}
+        resp = await self._call(AsyncBookReservationView, missing, self.user)
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(resp.data["detail"], "Restaurant not found.")
+
+        big = {**self.payload, "party_size": 9}
+        resp = await self._call(AsyncBookReservationView, big, self.user)
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(resp.data["detail"], "Table not found.")
+
+    async def test_cancel_checks_owner_and_cancels(self):
+        await self._call(AsyncBookReservationView, self.payload, self.user)
+        reservation = await Reservation.objects.aget()
+        other = await User.objects.acreate_user(username="bob", password="pw")
+        data = {"reservation_id": reservation.id}
+
+        resp = await self._call(AsyncCancelReservationView, data, other)
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+        resp = await self._call(AsyncCancelReservationView, data, self.user)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["detail"], "Reservation cancelled successfully.")
+        await reservation.arefresh_from_db()
+        self.assertEqual(reservation.status, ReservationStatus.CANCELLED)
+
+        resp = await self._call(
+            AsyncCancelReservationView, {"reservation_id": 0}, self.user
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BookReservationBatchTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username="corp", password="pw")
+        self.rest = Restaurant.objects.create(name="Banquet")
+        self.t4 = Table.objects.create(restaurant=self.rest, seats=4, number=1)
+        self.t6 = Table.objects.create(restaurant=self.rest, seats=6, number=2)
+        self.view = BookReservationBatchView.as_view()
+
+        tomorrow = date.today() + timedelta(days=1)
+        self.item = {
+            "restaurant_id": self.rest.id,
+            "reservation_date": tomorrow.isoformat(),
+            "reservation_time": "19:00",
+            "duration_hours": "2",
+            "party_size": 4,
+        }
+
+    def _call(self, data):
+        req = self.factory.post("/book/batch/", data, format="json")
+        force_authenticate(req, user=self.user)
+        return self.view(req)
+
+    def test_overlapping_items_get_distinct_tables(self):
+        resp = self._call([self.item, {**self.item, "reservation_time": "20:00"}])
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["booked"], 2)
+
+        tables = {r["reservation"]["table_id"] for r in resp.data["results"]}
+        self.assertEqual(tables, {self.t4.id, self.t6.id})
+        self.assertEqual(Reservation.objects.count(), 2)
+
+    def test_reports_per_item_failures(self):
+        resp = self._call(
+            [
+                self.item,
+                self.item,
+                self.item,
+                {**self.item, "restaurant_id": 9999},
+            ]
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["booked"], 2)
+        self.assertEqual(resp.data["failed"], 2)
+
+        results = resp.data["results"]
+        self.assertEqual([r["index"] for r in results], [0, 1, 2, 3])
+        self.assertEqual(results[2]["detail"], "Table not found.")
+        self.assertEqual(results[3]["detail"], "Restaurant not found.")
+
+    def test_respects_existing_occupancy(self):
+        start = datetime.combine(date.today() + timedelta(days=1), time(18, 30))
+        ReservationRepo.createReservation(
+            self.user, self.t4, 4, 30, start, start + timedelta(hours=1)
+        )
+        resp = self._call([self.item])
+        self.assertEqual(resp.data["results"][0]["reservation"]["table_id"], self.t6.id)
+
+    def test_invalid_item_rejects_whole_batch(self):
+        bad = self.item.copy()
+        bad.pop("party_size")
+        resp = self._call([self.item, bad])
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("party_size", resp.data[1])
+        self.assertEqual(Reservation.objects.count(), 0)
+
+
+class BookingConflictRetryTests(TestCase):
+    class _RacingRepo(ReservationRepo):
+        """
+        Loses the first insert to a concurrent booking.
+        """
+
+        def __init__(self):
+            self.lost = []
+
+        def createReservation(self, user, table, *args):
+            if not self.lost:
+                self.lost.append(table.id)
+                raise ReservationConflictError("table taken")
+            return ReservationRepo.createReservation(user, table, *args)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="racer", password="pw")
+        self.rest = Restaurant.objects.create(name="Busy")
+        self.t4 = Table.objects.create(restaurant=self.rest, seats=4, number=1)
+        self.t6 = Table.objects.create(restaurant=self.rest, seats=6, number=2)
+        self.payload = {
+            "restaurant_id": self.rest.id,
+            "reservation_date": (date.today() + timedelta(days=1)).isoformat(),
+            "reservation_time": "18:00",
+            "duration_hours": "2",
+            "party_size": 4,
+        }
+
+    def test_retries_on_next_best_table(self):
+        repo = self._RacingRepo()
+        facade = ReservationFacadeService(reservation_repo=repo)
+
+        result = facade.book(self.payload, self.user)
+
+        self.assertEqual(repo.lost, [self.t4.id])
+        reservation = Reservation.objects.get(id=result["reservation"]["id"])
+        self.assertEqual(reservation.table, self.t6)
+
+    def test_gives_up_with_conflict_after_max_attempts(self):
+        facade = ReservationFacadeService(reservation_repo=self._RacingRepo())
+        facade.max_booking_attempts = 1
+
+        with self.assertRaises(BookingConflict):
+            facade.book(self.payload, self.user)
+
+
+class RepackingTableSelectionStrategyTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="host", password="pw")
+        self.rest = Restaurant.objects.create(name="Tetris")
+        self.t4a = Table.objects.create(restaurant=self.rest, seats=4, number=1)
+        self.t4b = Table.objects.create(restaurant=self.rest, seats=4, number=2)
+        self.t8 = Table.objects.create(restaurant=self.rest, seats=8, number=3)
+        self.day = datetime.combine(date.today() + timedelta(days=1), time())
+        self.svc = RepackingTableSelectionStrategy(repo=ReservationRepo())
+
+    def _at(self, hour):
+        return self.day + timedelta(hours=hour)
+
+    def _book(self, table, start, end):
+        return Reservation.objects.create(
+            user=self.user,
+            table=table,
+            num_seats=4,
+            cost=30,
+            reservation_time=self._at(start),
+            end_time=self._at(end),
+        )
+
+    def test_moves_later_booking_to_free_a_smaller_table(self):
+        self._book(self.t4a, 18, 20)
+        later = self._book(self.t4b, 20, 22)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            chosen = self.svc.find_by_restaurant_and_time(
+                self.rest.id, self._at(19), self._at(21), party_size=4
+            )
+
+        self.assertEqual(chosen, self.t4b)
+        later.refresh_from_db()
+        self.assertEqual(later.table, self.t4a)
+
+    def test_moves_roll_back_with_a_failed_booking(self):
+        self._book(self.t4a, 18, 20)
+        later = self._book(self.t4b, 20, 22)
+
+        class LosingRepo(ReservationRepo):
+            @staticmethod
+            def createReservation(*args, **kwargs):
+                raise ReservationConflictError("lost the race")
+
+        facade = ReservationFacadeService(
+            reservation_repo=LosingRepo(),
+            table_selector=RepackingTableSelectionStrategy(repo=LosingRepo()),
+        )
+        data = {
+            "restaurant_id": self.rest.id,
+            "reservation_date": self.day.date().isoformat(),
+            "reservation_time": "19:00",
+            "duration_hours": "2",
+            "party_size": 4,
+        }
+        # every table tried is lost, the repacked one first
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(NotFound):
+                facade.book(data, self.user)
+
+        later.refresh_from_db()
+        self.assertEqual(later.table, self.t4b)
+
+    def test_keeps_default_choice_when_class_is_full(self):
+        first = self._book(self.t4a, 19, 21)
+        second = self._book(self.t4b, 18, 22)
+
+        chosen = self.svc.find_by_restaurant_and_time(
+            self.rest.id, self._at(20), self._at(21), party_size=4
+        )
+
+        self.assertEqual(chosen, self.t8)
+        self.assertEqual(
+            sorted(Reservation.objects.values_list("id", "table_id").order_by("id")),
+            [(first.id, self.t4a.id), (second.id, self.t4b.id)],
+        )
+
+    def test_colouring_fails_only_when_too_many_overlap(self):
+        tables = [self.t4a, self.t4b]
+        intervals = [
+            (key, self._at(start), self._at(end), None, ())
+            for key, (start, end) in enumerate([(18, 20), (19, 21), (20, 22)])
+        ]
+        assignment = colour_intervals(tables, [], intervals)
+        self.assertEqual(assignment[0], assignment[2])
+        self.assertNotEqual(assignment[0], assignment[1])
+
+        intervals.append((3, self._at(19.5), self._at(20.5), None, ()))
+        self.assertIsNone(colour_intervals(tables, [], intervals))
+
+    def test_moves_are_all_or_nothing(self):
+        first = self._book(self.t4a, 19, 21)
+        second = self._book(self.t4b, 19, 21)
+
+        # a swap overlaps mid-way; PostgreSQL defers the constraint for it
+        with self.captureOnCommitCallbacks(execute=True):
+            ReservationRepo.moveReservations([(first, self.t4b), (second, self.t4a)])
+        first.refresh_from_db()
+        self.assertEqual(first.table_id, self.t4b.id)
+
+        second.status = ReservationStatus.CANCELLED
+        second.save()
+        with self.assertRaises(ReservationConflictError):
+            ReservationRepo.moveReservations([(first, self.t4a), (second, self.t4b)])
+        first.refresh_from_db()
+        self.assertEqual(first.table_id, self.t4b.id)
+
+
+@skipUnless(connection.vendor == "postgresql", "exclusion constraint needs PostgreSQL")
+class ConcurrentBookingTests(TransactionTestCase):
+    """
+    Hammers ReservationFacadeService.book from several threads against a
+    real PostgreSQL database (e.g. the one started by `make postgres`).
+    """
+
+    threads = 8
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f"u{i}", password="pw")
+            for i in range(self.threads)
+        ]
+        self.rest = Restaurant.objects.create(name="Rush")
+        self.tables = [
+            Table.objects.create(restaurant=self.rest, seats=4, number=n)
+            for n in range(1, 4)
+        ]
+        self.day = (date.today() + timedelta(days=1)).isoformat()
+
+    def _payload(self, hour):
+        return {
+            "restaurant_id": self.rest.id,
+            "reservation_date": self.day,
+            "reservation_time": f"{hour:02d}:00",
+            "duration_hours": "1",
+            "party_size": 4,
+        }
+
+    def _run_concurrently(self, payloads):
+        barrier = threading.Barrier(len(payloads))
+        outcomes = []
+
+        def worker(user, payload):
+            facade = ReservationFacadeService()
+            try:
+                barrier.wait()
+                facade.book(payload, user)
+                outcomes.append("booked")
+            except (NotFound, BookingConflict):
+                outcomes.append("refused")
+            except Exception as exc:  # surfaced by the assertions below
+                outcomes.append(repr(exc))
+            finally:
+                connection.close()
+
+        workers = [
+            threading.Thread(target=worker, args=(user, payload))
+            for user, payload in zip(self.users, payloads)
+        ]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        return outcomes
+
+    def test_same_slot_contenders_never_double_book(self):
+        outcomes = self._run_concurrently([self._payload(19)] * self.threads)
+
+        self.assertEqual(outcomes.count("booked"), len(self.tables), outcomes)
+        self.assertEqual(outcomes.count("refused"), self.threads - len(self.tables))
+        booked_tables = Reservation.objects.filter(
+            status=ReservationStatus.CONFIRMED
+        ).values_list("table_id", flat=True)
+        self.assertEqual(sorted(booked_tables), sorted(t.id for t in self.tables))
+
+    def test_different_slots_all_succeed(self):
+        payloads = [self._payload(12 + i) for i in range(self.threads)]
+        outcomes = self._run_concurrently(payloads)
+
+        self.assertEqual(outcomes, ["booked"] * self.threads)
+
+    def test_duplicates_in_flight_wait_for_the_first_request(self):
+        factory = APIRequestFactory()
+        barrier = threading.Barrier(self.threads)
+        bodies = []
+
+        def worker():
+            req = factory.post(
+                "/book/", self._payload(19), format="json", HTTP_IDEMPOTENCY_KEY="k"
+            )
+            force_authenticate(req, user=self.users[0])
+            try:
+                barrier.wait()
+                resp = BookReservationView.as_view()(req)
+                bodies.append((resp.status_code, resp.render().content))
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(self.threads)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertEqual(len(set(bodies)), 1, bodies)
+        self.assertEqual(bodies[0][0], status.HTTP_200_OK)
+
+
+class OccupancyGridTests(TestCase):
+    def setUp(self):
+        self.day = date(2030, 1, 15)
+        self.t4 = Table(id=1, seats=4, number=1)
+        self.t6 = Table(id=2, seats=6, number=2)
+
+    def _at(self, hour, minute=0):
+        return datetime.combine(self.day, time(hour, minute))
+
+    def test_marks_every_touched_slot(self):
+        grid = OccupancyGrid.build(
+            self.day, [self.t4], [(1, self._at(18, 15), self._at(19))]
+        )
+        # 18:00-18:30 and 18:30-19:00
+        self.assertEqual(grid.tables[0][2], 0b11 << 36)
+
+    def test_free_starts_need_consecutive_free_slots(self):
+        grid = OccupancyGrid.build(
+            self.day,
+            [self.t4, self.t6],
+            [(1, self._at(19), self._at(20)), (2, self._at(18), self._at(21))],
+        )
+        starts = grid.free_starts(party_size=4, slots=2)
+        self.assertFalse(starts >> 37 & 1)  # 18:30 runs into the 19:00 booking
+        self.assertTrue(starts >> 34 & 1)  # 17:00-18:00 on the 4-top
+        self.assertTrue(starts >> 40 & 1)  # 20:00-21:00 on the 4-top
+
+        # only the 6-top seats six and it is busy 18:00-21:00
+        starts = grid.free_starts(party_size=6, slots=2)
+        self.assertFalse(starts >> 35 & 1)
+        self.assertTrue(starts >> 42 & 1)
+
+    def test_runs_continue_past_midnight(self):
+        grid = OccupancyGrid.build(self.day, [self.t4], [])
+        starts = grid.free_starts(party_size=2, slots=2)
+        self.assertTrue(starts >> 47 & 1)
+        self.assertEqual(starts >> 48, 0)
+
+        next_day = self._at(0) + timedelta(days=1)
+        grid = OccupancyGrid.build(
+            self.day,
+            [self.t4],
+            [(1, next_day, next_day + timedelta(hours=2))],
+        )
+        starts = grid.free_starts(party_size=2, slots=2)
+        self.assertTrue(starts >> 46 & 1)  # 23:00-00:00
+        self.assertFalse(starts >> 47 & 1)  # 23:30 runs into the 00:00 booking
+
+
+class AvailabilityViewTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username="looker", password="pw")
+        self.rest = Restaurant.objects.create(name="Grid")
+        self.t4 = Table.objects.create(restaurant=self.rest, seats=4, number=1)
+        self.view = AvailabilityView.as_view()
+        self.day = date.today() + timedelta(days=1)
+        self.query = {
+            "restaurant_id": self.rest.id,
+            "date": self.day.isoformat(),
+            "party_size": 4,
+            "duration_hours": "1",
+        }
+
+    def _call(self, query):
+        req = self.factory.get("/availability/", query)
+        force_authenticate(req, user=self.user)
+        return self.view(req)
+
+    def test_lists_free_slots_and_skips_booked_ones(self):
+        start = datetime.combine(self.day, time(19))
+        with self.captureOnCommitCallbacks(execute=True):
+            ReservationRepo.createReservation(
+                self.user, self.t4, 4, 30, start, start + timedelta(hours=1)
+            )
+
+        resp = self._call(self.query)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        slots = resp.data["slots"]
+        # 18:30, 19:00 and 19:30 hit the booking
+        self.assertEqual(len(slots), 48 - 3)
+        self.assertIn("23:30", slots)
+        self.assertIn("18:00", slots)
+        self.assertNotIn("18:30", slots)
+        self.assertNotIn("19:00", slots)
+        self.assertIn("20:00", slots)
+
+    def test_grid_is_cached_and_invalidated_on_booking(self):
+        self._call(self.query)
+        with self.assertNumQueries(0):
+            self._call(self.query)
+
+        start = datetime.combine(self.day, time(12))
+        with self.captureOnCommitCallbacks(execute=True):
+            ReservationRepo.createReservation(
+                self.user, self.t4, 4, 30, start, start + timedelta(hours=1)
+            )
+        self.assertNotIn("12:00", self._call(self.query).data["slots"])
+
+    def test_booking_after_midnight_invalidates_the_previous_day(self):
+        query = {**self.query, "duration_hours": "2"}
+        self.assertIn("23:30", self._call(query).data["slots"])
+
+        start = datetime.combine(self.day + timedelta(days=1), time(1))
+        with self.captureOnCommitCallbacks(execute=True):
+            ReservationRepo.createReservation(
+                self.user, self.t4, 4, 30, start, start + timedelta(hours=1)
+            )
+        slots = self._call(query).data["slots"]
+        self.assertIn("23:00", slots)
+        self.assertNotIn("23:30", slots)
+
+    def test_party_larger_than_any_table_has_no_slots(self):
+        resp = self._call({**self.query, "party_size": 5})
+        self.assertEqual(resp.data["slots"], [])
+
+    def test_unknown_restaurant_gives_404(self):
+        resp = self._call({**self.query, "restaurant_id": 9999})
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class PriceQuoteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        restaurant_metadata_cache.clear()
+        self.addCleanup(restaurant_metadata_cache.clear)
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username="diner", password="pw")
+        self.rest = Restaurant.objects.create(name="Priced")
+        self.small = Table.objects.create(restaurant=self.rest, seats=4, number=1)
+        self.large = Table.objects.create(restaurant=self.rest, seats=6, number=2)
+        self.day = date.today() + timedelta(days=1)
+        PriceRule.objects.create(
+            restaurant=self.rest,
+            weekday=self.day.weekday(),
+            start_time=time(18),
+            seat_price=Decimal("20"),
+        )
+
+    def _quote(self, **params):
+        query = {
+            "restaurant_id": self.rest.id,
+            "date": self.day.isoformat(),
+            "party_size": 4,
+            "duration_hours": "2",
+        }
+        query.update(params)
+        req = self.factory.get("/quote/", query)
+        force_authenticate(req, user=self.user)
+        return PriceQuoteView.as_view()(req)
+
+    def test_quotes_free_tables_with_rule_prices(self):
+        start = datetime.combine(self.day, time(19))
+        Reservation.objects.create(
+            user=self.user,
+            table=self.small,
+            num_seats=4,
+            cost=30,
+            reservation_time=start,
+            end_time=start + timedelta(hours=2),
+        )
+
+        res = self._quote()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        slots = {slot["start_time"]: slot["tables"] for slot in res.data["slots"]}
+        self.assertEqual(
+            slots["16:00"],
+            [
+                {"table_id": self.small.id, "seats": 4, "cost": "30.00"},
+                {"table_id": self.large.id, "seats": 6, "cost": "50.00"},
+            ],
+        )
+        # the small table is booked from 19:00 to 21:00
+        self.assertEqual(
+            slots["18:00"], [{"table_id": self.large.id, "seats": 6, "cost": "100.00"}]
+        )
+        self.assertEqual(
+            [t["table_id"] for t in slots["21:00"]], [self.small.id, self.large.id]
+        )
+        # a 2h booking from 23:30 runs into the next day, as book allows
+        self.assertIn("23:30", slots)
+
+    def test_booking_charges_the_quoted_price(self):
+        quoted = next(
+            slot["tables"][0]["cost"]
+            for slot in self._quote().data["slots"]
+            if slot["start_time"] == "19:30"
+        )
+        result = ReservationFacadeService().book(
+            {
+                "restaurant_id": self.rest.id,
+                "reservation_date": self.day.isoformat(),
+                "reservation_time": "19:30",
+                "duration_hours": "2",
+                "party_size": 4,
+            },
+            self.user,
+        )
+        reservation = Reservation.objects.get(id=result["reservation"]["id"])
+        self.assertEqual(reservation.cost, Decimal(quoted))
+        self.assertEqual(reservation.cost, Decimal("60"))
+
+    def test_unknown_restaurant(self):
+        res = self._quote(restaurant_id=self.rest.id + 100)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ReservationExportTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.staff = User.objects.create_user(
+            username="finance", password="pw", is_staff=True
+        )
+        self.guest = User.objects.create_user(username="guest", password="pw")
+        self.view = ReservationExportView.as_view()
+        self.day = date(2030, 5, 1)
+        self.rests = []
+        for name in ("North", "South"):
+            rest = Restaurant.objects.create(name=name)
+            table = Table.objects.create(restaurant=rest, seats=4, number=7)
+            for offset in range(3):
+                start = datetime.combine(self.day + timedelta(days=offset), time(19))
+                Reservation.objects.create(
+                    user=self.guest,
+                    table=table,
+                    num_seats=2,
+                    cost=20,
+                    reservation_time=start,
+                    end_time=start + timedelta(hours=2),
+                )
+            self.rests.append(rest)
+
+    def _call(self, query, user=None):
+        req = self.factory.get("/export/", query)
+        force_authenticate(req, user=user or self.staff)
+        return self.view(req)
+
+    @staticmethod
+    def _body(resp):
+        return b"".join(resp.streaming_content).decode()
+
+    def test_streams_filtered_csv_in_one_query(self):
+        resp = self._call(
+            {
+                "start_date": (self.day + timedelta(days=1)).isoformat(),
+                "end_date": (self.day + timedelta(days=2)).isoformat(),
+                "restaurant_id": [self.rests[1].id],
+            }
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "text/csv")
+
+        with self.assertNumQueries(1):
+            lines = self._body(resp).splitlines()
+        self.assertTrue(lines[0].startswith("id,restaurant_id,restaurant_name,"))
+        self.assertEqual(len(lines), 3)
+        self.assertIn(",South,", lines[1])
+        self.assertIn(",guest,2,20.00,CONFIRMED,", lines[1])
+
+    def test_streams_ndjson(self):
+        resp = self._call({"file_format": "ndjson"})
+        rows = [json.loads(line) for line in self._body(resp).splitlines()]
+
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]["restaurant_name"], "North")
+        self.assertEqual(rows[0]["table_number"], 7)
+        self.assertEqual(rows[0]["reservation_time"], "2030-05-01T19:00:00")
+
+    def test_staff_only(self):
+        self.assertEqual(self._call({}, user=self.guest).status_code, 403)
+
+        # tokens carry no is_staff claim; the user is hydrated to check it
+        access = JWTService.generate_tokens(self.staff)["access"]
+        resp = self.client.get(
+            reverse("reservations:export_reservations"),
+            headers={"Authorization": f"Bearer {access}"},
+        )
+        self.assertEqual(resp.status_code, 200)
+
+    async def test_streams_asynchronously_under_asgi(self):
+        access = JWTService.generate_tokens(self.staff)["access"]
+        resp = await self.async_client.get(
+            reverse("reservations:export_reservations"),
+            {"file_format": "ndjson"},
+            headers={"Authorization": f"Bearer {access}"},
+        )
+
+        self.assertEqual(resp.status_code, 200)
+        # a sync iterator would be read into a list before the first byte
+        self.assertTrue(resp.is_async)
+        body = b"".join([chunk async for chunk in resp.streaming_content])
+        self.assertEqual(len(body.decode().splitlines()), 6)
+
+    def test_rejects_inverted_date_range(self):
+        resp = self._call({"start_date": "2030-05-02", "end_date": "2030-05-01"})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_command_writes_selected_rows(self):
+        out = StringIO()
+        call_command(
+            "export_reservations",
+            "--format=ndjson",
+            f"--restaurant={self.rests[0].id}",
+            f"--start-date={self.day.isoformat()}",
+            f"--end-date={self.day.isoformat()}",
+            stdout=out,
+        )
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([r["restaurant_name"] for r in rows], ["North"])
+
+
+class MyReservationsTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username="corp", password="pw")
+        other = User.objects.create_user(username="other", password="pw")
+        rest = Restaurant.objects.create(name="Keyset")
+        tables = [
+            Table.objects.create(restaurant=rest, seats=4, number=n) for n in (1, 2)
+        ]
+        day = datetime(2030, 7, 1, 19)
+        # two reservations per start time, to page across ties
+        self.expected = []
+        for offset in range(3):
+            for table in tables:
+                start = day + timedelta(days=offset)
+                r = Reservation.objects.create(
+                    user=self.user,
+                    table=table,
+                    num_seats=2,
+                    cost=20,
+                    reservation_time=start,
+                    end_time=start + timedelta(hours=2),
+                    status=(
+                        ReservationStatus.CANCELLED
+                        if offset == 1 and table.number == 1
+                        else ReservationStatus.CONFIRMED
+                    ),
+                )
+                self.expected.append(r.id)
+        Reservation.objects.create(
+            user=other,
+            table=tables[0],
+            num_seats=2,
+            cost=20,
+            reservation_time=day - timedelta(days=1),
+            end_time=day - timedelta(days=1, hours=-2),
+        )
+        # newest first, the later id first among equal start times
+        self.expected.reverse()
+
+    def _call(self, query):
+        req = self.factory.get("/mine/", query)
+        force_authenticate(req, user=self.user)
+        return MyReservationsView.as_view()(req)
+
+    def test_pages_through_every_reservation_once(self):
+        seen, query = [], {"limit": 4}
+        with self.assertNumQueries(1):
+            resp = self._call(query)
+        while True:
+            self.assertEqual(resp.status_code, 200)
+            seen += [row["id"] for row in resp.data["results"]]
+            if resp.data["next"] is None:
+                break
+            query = parse_qs(urlsplit(resp.data["next"]).query)
+            with self.assertNumQueries(1):
+                resp = self._call(query)
+
+        self.assertEqual(seen, self.expected)
+        row = resp.data["results"][0]
+        self.assertEqual(row["restaurant_name"], "Keyset")
+        self.assertEqual(row["start_time"], datetime(2030, 7, 1, 19))
+        self.assertEqual(row["cost"], "20.00")
+
+    def test_filters_by_status(self):
+        resp = self._call({"status": ReservationStatus.CANCELLED})
+        self.assertEqual(len(resp.data["results"]), 1)
+        self.assertIsNone(resp.data["next"])
+
+    def test_rejects_invalid_cursor(self):
+        resp = self._call({"cursor": "not-a-cursor"})
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("cursor", resp.data)
+
+
+class AvailabilitySearchTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username="hungry", password="pw")
+        self.day = date.today() + timedelta(days=1)
+
+        def restaurant(name, *tables):
+            rest = Restaurant.objects.create(name=name)
+            for number, (seats, is_available) in enumerate(tables, 1):
+                Table.objects.create(
+                    restaurant=rest,
+                    number=number,
+                    seats=seats,
+                    is_available=is_available,
+                )
+            return rest
+
+        self.roomy = restaurant("Roomy", (4, True), (6, True), (8, True), (6, True))
+        self.busy = restaurant("Busy", (6, True), (8, True))
+        self.small = restaurant("Small", (4, True), (4, True))
+        self.closed = restaurant("Closed", (6, False))
+        self.exact = restaurant("Exact", (5, True), (8, True))
+        start = datetime.combine(self.day, time(19))
+        Reservation.objects.create(
+            user=self.user,
+            table=self.busy.tables.get(number=1),
+            num_seats=6,
+            cost=50,
+            reservation_time=start,
+            end_time=start + timedelta(hours=2),
+        )
+
+    def _search(self, **params):
+        query = {
+            "date": self.day.isoformat(),
+            "reservation_time": "20:00",
+            "party_size": 6,
+        }
+        query.update(params)
+        req = self.factory.get("/search/", query)
+        force_authenticate(req, user=self.user)
+        return SearchAvailabilityView.as_view()(req)
+
+    def _ranked(self, results):
+        return [
+            (r["restaurant"]["name"], r["table_seats"], r["free_tables"])
+            for r in results
+        ]
+
+    def test_ranks_restaurants_by_fit_with_one_query(self):
+        with self.assertNumQueries(1):
+            res = self._search()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self._ranked(res.data["results"]),
+            [("Roomy", 6, 3), ("Busy", 8, 1), ("Exact", 8, 1)],
+        )
+        self.assertIsNone(res.data["next"])
+        self.assertEqual(
+            res.data["results"][0]["end_time"],
+            datetime.combine(self.day, time(21)),
+        )
+
+    def test_unavailable_tables_are_never_offered_or_booked(self):
+        self.assertNotIn(
+            "Closed", [r["restaurant"]["name"] for r in self._search().data["results"]]
+        )
+
+        req = self.factory.get(
+            "/availability/",
+            {
+                "restaurant_id": self.closed.id,
+                "date": self.day.isoformat(),
+                "party_size": 6,
+            },
+        )
+        force_authenticate(req, user=self.user)
+        self.assertEqual(AvailabilityView.as_view()(req).data["slots"], [])
+
+        with self.assertRaisesMessage(NotFound, "Table not found."):
+            ReservationFacadeService().book(
+                {
+                    "restaurant_id": self.closed.id,
+                    "reservation_date": self.day.isoformat(),
+                    "reservation_time": "20:00",
+                    "party_size": 6,
+                },
+                self.user,
+            )
+
+    def test_odd_party_gets_the_table_rule1_picks(self):
+        res = self._search(party_size=5)
+        ranked = self._ranked(res.data["results"])
+        self.assertEqual(ranked[0], ("Exact", 5, 2))
+        for name, seats, _ in ranked:
+            rest = Restaurant.objects.get(name=name)
+            free = [
+                t
+                for t in rest.tables.filter(is_available=True)
+                if not (rest == self.busy and t.number == 1)
+            ]
+            with self.subTest(restaurant=name):
+                self.assertEqual(select_smallest_fitting_table(free, 5).seats, seats)
+
+    def test_pages_follow_the_ranking(self):
+        seen = []
+        res = self._search(limit=2)
+        while True:
+            seen.extend(self._ranked(res.data["results"]))
+            if not res.data["next"]:
+                break
+            cursor = parse_qs(urlsplit(res.data["next"]).query)["cursor"][0]
+            res = self._search(limit=2, cursor=cursor)
+        self.assertEqual(seen, self._ranked(self._search().data["results"]))
+        self.assertEqual(len(seen), 3)
+
+    def test_filters_restaurants_and_rejects_bad_input(self):
+        res = self._search(restaurant_id=[self.busy.id, self.small.id])
+        self.assertEqual(self._ranked(res.data["results"]), [("Busy", 8, 1)])
+
+        self.assertEqual(
+            self._search(cursor="garbage").status_code, status.HTTP_400_BAD_REQUEST
+        )
+        past = self._search(date=(self.day - timedelta(days=2)).isoformat())
+        self.assertEqual(past.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CancelReservationTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.facade = ReservationFacadeService()
+        self.alice = User.objects.create_user(username="alice", password="pw")
+        self.bob = User.objects.create_user(username="bob", password="pw")
+        self.staff = User.objects.create_user(
+            username="manager", password="pw", is_staff=True
+        )
+        self.rest = Restaurant.objects.create(name="Cancel")
+        self.tables = [
+            Table.objects.create(restaurant=self.rest, seats=4, number=n)
+            for n in (1, 2)
+        ]
+        self.day = date.today() + timedelta(days=1)
+
+    def _book(self, user, table, hour=19):
+        start = datetime.combine(self.day, time(hour))
+        return Reservation.objects.create(
+            user=user,
+            table=table,
+            num_seats=4,
+            cost=40,
+            reservation_time=start,
+            end_time=start + timedelta(hours=2),
+        )
+
+    def _record_backfills(self):
+        calls = []
+        backfill = waitlist_backfill.backfill
+
+        def recording(*args):
+            calls.append(args)
+            return backfill(*args)
+
+        waitlist_backfill.backfill = recording
+        self.addCleanup(delattr, waitlist_backfill, "backfill")
+        return calls
+
+    def _post(self, view, data, user):
+        req = self.factory.post("/cancel/", data, format="json")
+        force_authenticate(req, user=user)
+        return view.as_view()(req)
+
+    def test_cancel_is_one_statement_and_frees_the_table(self):
+        mine = self._book(self.alice, self.tables[0])
+        self._book(self.bob, self.tables[1])
+        # warm the interval index and the occupancy grid before cancelling
+        reservation_index.warm(self.rest.id)
+        self.addCleanup(reservation_index.invalidate, self.rest.id)
+
+        def grid_slots():
+            return availability_service.free_slots(
+                self.rest.id, self.day, 4, Decimal("2")
+            )
+
+        self.assertNotIn(time(19), grid_slots())
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertNumQueries(1):
+                message = self.facade.cancel_reservation(mine.id, self.alice)
+        self.assertEqual(message, "Reservation cancelled successfully.")
+        for callback in callbacks:
+            callback()
+
+        mine.refresh_from_db()
+        self.assertEqual(mine.status, ReservationStatus.CANCELLED)
+        event = ReservationEvent.objects.get()
+        self.assertEqual(event.kind, ReservationEventKind.CANCELLED)
+        self.assertEqual((event.restaurant_id, event.cost), (self.rest.id, 40))
+        self.assertEqual(event.reservation_time, mine.reservation_time)
+        free = reservation_index.free_tables(
+            self.rest.id, mine.reservation_time, mine.end_time
+        )
+        self.assertEqual([t.id for t in free], [self.tables[0].id])
+        self.assertIn(time(19), grid_slots())
+
+    def test_tells_missing_forbidden_and_already_cancelled_apart(self):
+        mine = self._book(self.alice, self.tables[0])
+        view = CancelReservationView
+
+        resp = self._post(view, {"reservation_id": mine.id}, self.bob)
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+        resp = self._post(view, {"reservation_id": 0}, self.alice)
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(resp.data["reservation_id"], ["Reservation does not exist."])
+
+        self._post(view, {"reservation_id": mine.id}, self.alice)
+        resp = self._post(view, {"reservation_id": mine.id}, self.alice)
+        self.assertEqual(resp.data["detail"], "Reservation is already cancelled.")
+
+    def test_cancels_a_party_at_once(self):
+        party = [self._book(self.alice, t) for t in self.tables]
+        other = self._book(self.bob, self.tables[0], hour=12)
+        ids = [party[0].id, other.id, party[1].id, 0]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self._post(
+                CancelReservationBatchView, {"reservation_ids": ids}, self.alice
+            )
+        self.assertEqual(resp.data["cancelled"], 2)
+        self.assertEqual(
+            [(r["reservation_id"], r["cancelled"]) for r in resp.data["results"]],
+            [(ids[0], True), (ids[1], False), (ids[2], True), (0, False)],
+        )
+        self.assertEqual(
+            resp.data["results"][1]["detail"],
+            "You do not have permission to cancel this reservation.",
+        )
+        self.assertEqual(ReservationEvent.objects.count(), 2)
+        other.refresh_from_db()
+        self.assertEqual(other.status, ReservationStatus.CONFIRMED)
+
+    def test_bulk_cancel_backfills_each_table_once(self):
+        party = [self._book(self.alice, t) for t in self.tables]
+        lunch = self._book(self.alice, self.tables[0], hour=12)
+        waiting = [
+            WaitlistEntry.objects.create(
+                user=self.bob,
+                restaurant=self.rest,
+                party_size=4,
+                reservation_time=r.reservation_time,
+                end_time=r.end_time,
+            )
+            for r in (lunch, party[0])
+        ]
+        calls = self._record_backfills()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.facade.cancel_many(
+                {"reservation_ids": [r.id for r in (*party, lunch)]}, self.alice
+            )
+
+        self.assertEqual(
+            sorted((table_id, len(freed)) for _, table_id, freed in calls),
+            [(self.tables[0].id, 2), (self.tables[1].id, 1)],
+        )
+        for entry in waiting:
+            entry.refresh_from_db()
+            self.assertEqual(entry.status, WaitlistStatus.BOOKED)
+            self.assertEqual(entry.reservation.table_id, self.tables[0].id)
+
+    def test_close_day_cancels_everything_without_backfilling(self):
+        booked = [
+            self._book(self.alice, self.tables[0]),
+            self._book(self.bob, self.tables[1], hour=12),
+        ]
+        next_day = self._book(self.bob, self.tables[1], hour=23)
+        next_day.reservation_time += timedelta(days=1)
+        next_day.end_time += timedelta(days=1)
+        next_day.save()
+        waiting = WaitlistEntry.objects.create(
+            user=self.bob,
+            restaurant=self.rest,
+            party_size=2,
+            reservation_time=booked[0].reservation_time,
+            end_time=booked[0].end_time,
+        )
+        data = {"restaurant_id": self.rest.id, "date": self.day.isoformat()}
+        self.assertEqual(
+            self._post(CloseDayView, data, self.alice).status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+
+        calls = self._record_backfills()
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self._post(CloseDayView, data, self.staff)
+        self.assertEqual(calls, [])
+        self.assertEqual(resp.data["cancelled_reservations"], 2)
+        self.assertEqual(resp.data["cancelled_waitlist_entries"], 1)
+        self.assertEqual(
+            Reservation.objects.filter(status=ReservationStatus.CONFIRMED).get(),
+            next_day,
+        )
+        waiting.refresh_from_db()
+        self.assertEqual(waiting.status, WaitlistStatus.CANCELLED)
+        self.assertEqual(ReservationEvent.objects.count(), 2)
+
+
+class RecurringReservationTests(TestCase):
+    def setUp(self):
+        self.facade = ReservationFacadeService()
+        self.user = User.objects.create_user(username="regular", password="pw")
+        self.rest = Restaurant.objects.create(name="Standing")
+        self.tables = [
+            Table.objects.create(restaurant=self.rest, seats=4, number=n)
+            for n in (1, 2)
+        ]
+        today = date.today()
+        # a Monday at least a day ahead
+        self.monday = today + timedelta(days=7 - today.weekday())
+
+    def _series(self, **overrides):
+        data = {
+            "restaurant_id": self.rest.id,
+            "start_date": self.monday.isoformat(),
+            "until": (self.monday + timedelta(weeks=3)).isoformat(),
+            "reservation_time": "19:00",
+            "duration_hours": "2",
+            "party_size": 4,
+        }
+        data.update(overrides)
+        return data
+
+    def _block(self, table, day, hour=18):
+        start = datetime.combine(day, time(hour))
+        return Reservation.objects.create(
+            user=self.user,
+            table=table,
+            num_seats=4,
+            cost=40,
+            reservation_time=start,
+            end_time=start + timedelta(hours=2),
+        )
+
+    def test_expand_follows_rrule_semantics(self):
+        wednesday = self.monday + timedelta(days=2)
+        weekly = expand_occurrences(
+            wednesday,
+            wednesday + timedelta(weeks=4),
+            time(19),
+            Decimal("1.5"),
+            SeriesFrequency.WEEKLY,
+            interval=2,
+            weekdays=["TU", "TH"],
+        )
+        # the Tuesday of the first week is before start_date
+        self.assertEqual(
+            [start.date() for start, _ in weekly],
+            [
+                self.monday + timedelta(days=3),
+                self.monday + timedelta(weeks=2, days=1),
+                self.monday + timedelta(weeks=2, days=3),
+                self.monday + timedelta(weeks=4, days=1),
+            ],
+        )
+        self.assertEqual(weekly[0][1] - weekly[0][0], timedelta(hours=1, minutes=30))
+
+        daily = expand_occurrences(
+            self.monday,
+            self.monday + timedelta(days=7),
+            time(12),
+            Decimal("1"),
+            SeriesFrequency.DAILY,
+            interval=3,
+        )
+        self.assertEqual(len(daily), 3)
+        self.assertIsNone(
+            expand_occurrences(
+                self.monday,
+                self.monday + timedelta(days=400),
+                time(12),
+                Decimal("1"),
+                SeriesFrequency.DAILY,
+            )
+        )
+
+    def test_overlaps_matches_pairwise_check(self):
+        def at(hour):
+            return datetime.combine(self.monday, time(hour))
+
+        windows = [(at(h), at(h + 1)) for h in range(8, 20, 2)]
+        busy = [(at(7), at(9)), (at(9), at(10)), (at(11), at(16)), (at(12), at(13))]
+        expected = [any(b < e and s < f for b, f in busy) for s, e in windows]
+        self.assertEqual(overlaps(windows, busy), expected)
+        self.assertEqual(overlaps(windows, []), [False] * len(windows))
+
+    def test_books_series_moving_or_reporting_conflicts(self):
+        week = timedelta(weeks=1)
+        # each table is free for two of the four weeks; the first one wins
+        self._block(self.tables[0], self.monday + week)
+        for table in self.tables:
+            self._block(table, self.monday + 2 * week, hour=20)
+        self._block(self.tables[1], self.monday + 3 * week)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = self.facade.book_recurring(self._series(), self.user)
+
+        self.assertEqual((result["booked"], result["conflicts"]), (3, 1))
+        tables = [o.get("table_id") for o in result["occurrences"]]
+        self.assertEqual(
+            tables, [self.tables[0].id, self.tables[1].id, None, self.tables[0].id]
+        )
+        self.assertEqual(result["occurrences"][2]["detail"], "Table not found.")
+
+        series = ReservationSeries.objects.get(id=result["series_id"])
+        self.assertEqual(
+            (series.frequency, series.weekdays, series.start_time),
+            (SeriesFrequency.WEEKLY, "", time(19)),
+        )
+        self.assertEqual(series.reservations.count(), 3)
+        self.assertEqual(
+            ReservationEvent.objects.filter(kind=ReservationEventKind.BOOKED).count(),
+            3,
+        )
+
+    def test_series_and_single_bookings_skip_the_same_tables(self):
+        Table.objects.filter(pk=self.tables[1].pk).update(is_available=False)
+        restaurant_metadata_cache.clear()
+        week = timedelta(weeks=1)
+        self._block(self.tables[0], self.monday + week)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = self.facade.book_recurring(self._series(), self.user)
+        self.assertEqual(
+            [o.get("table_id") for o in result["occurrences"]],
+            [self.tables[0].id, None, self.tables[0].id, self.tables[0].id],
+        )
+
+        with self.assertRaisesMessage(NotFound, "Table not found."):
+            self.facade.book(
+                {
+                    "restaurant_id": self.rest.id,
+                    "reservation_date": (self.monday + week).isoformat(),
+                    "reservation_time": "19:00",
+                    "duration_hours": "2",
+                    "party_size": 4,
+                },
+                self.user,
+            )
+
+    def test_occurrences_keep_to_the_smallest_free_table(self):
+        large = Table.objects.create(restaurant=self.rest, seats=10, number=3)
+        restaurant_metadata_cache.clear()
+        week = timedelta(weeks=1)
+        # the small tables are both taken in one week only
+        for table in self.tables:
+            self._block(table, self.monday + week)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = self.facade.book_recurring(self._series(), self.user)
+
+        self.assertEqual(
+            [o["table_id"] for o in result["occurrences"]],
+            [self.tables[0].id, large.id, self.tables[0].id, self.tables[0].id],
+        )
+        # priced by the table booked, so the large one only costs more once
+        series = Reservation.objects.filter(series_id=result["series_id"])
+        self.assertLess(
+            max(r.cost for r in series if r.table_id == self.tables[0].id),
+            series.get(table=large).cost,
+        )
+
+    def test_query_count_does_not_grow_with_the_series(self):
+        # restaurant, tables and prices come from the metadata cache once warm
+        self.facade.rest_repo.findById(self.rest.id)
+        self.facade.rest_repo.findTablesByRestaurant(self.rest.id)
+        self.facade.pricing.week(self.rest.id)
+        counts = []
+        for weeks in (1, 30):
+            Reservation.objects.all().delete()
+            with CaptureQueriesContext(connection) as queries:
+                result = self.facade.book_recurring(
+                    self._series(
+                        until=(self.monday + timedelta(weeks=weeks)).isoformat(),
+                        weekdays=["MO", "FR"],
+                    ),
+                    self.user,
+                )
+            self.assertEqual(result["conflicts"], 0)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_rejects_invalid_series(self):
+        cases = [
+            ({"until": (self.monday - timedelta(days=1)).isoformat()}, "until"),
+            ({"frequency": "DAILY", "weekdays": ["MO"]}, "weekdays"),
+            ({"weekdays": ["XX"]}, "weekdays"),
+            (
+                {
+                    "frequency": "DAILY",
+                    "until": (self.monday + timedelta(days=400)).isoformat(),
+                },
+                "non_field_errors",
+            ),
+        ]
+        for overrides, field in cases:
+            with self.subTest(field=field):
+                with self.assertRaises(ValidationError) as ctx:
+                    self.facade.book_recurring(self._series(**overrides), self.user)
+                self.assertIn(field, ctx.exception.detail)
+        self.assertFalse(ReservationSeries.objects.exists())
+
+    def test_unknown_restaurant(self):
+        with self.assertRaises(NotFound):
+            self.facade.book_recurring(
+                self._series(restaurant_id=self.rest.id + 100), self.user
+            )
+
+
+class WaitlistTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.facade = ReservationFacadeService()
+        self.alice = User.objects.create_user(username="alice", password="pw")
+        self.bob = User.objects.create_user(username="bob", password="pw")
+        self.rest = Restaurant.objects.create(name="Queue")
+        self.table = Table.objects.create(restaurant=self.rest, seats=4, number=1)
+        self.day = date.today() + timedelta(days=1)
+
+    def _at(self, hour):
+        return datetime.combine(self.day, time(hour))
+
+    def _book(self, user, start, end):
+        return Reservation.objects.create(
+            user=user,
+            table=self.table,
+            num_seats=4,
+            cost=30,
+            reservation_time=self._at(start),
+            end_time=self._at(end),
+        )
+
+    def _wait(self, user, start, end, party_size=4):
+        return WaitlistEntry.objects.create(
+            user=user,
+            restaurant=self.rest,
+            party_size=party_size,
+            reservation_time=self._at(start),
+            end_time=self._at(end),
+        )
+
+    def _cancel(self, reservation):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.facade.cancel_reservation(reservation.id, reservation.user)
+
+    def test_join_and_list_through_the_api(self):
+        self._book(self.bob, 18, 20)
+        data = {
+            "restaurant_id": self.rest.id,
+            "reservation_date": self.day.isoformat(),
+            "reservation_time": "19:00",
+            "duration_hours": "2",
+            "party_size": 3,
+        }
+        req = self.factory.post("/waitlist/", data, format="json")
+        force_authenticate(req, user=self.alice)
+        resp = WaitlistView.as_view()(req)
+
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.data["status"], WaitlistStatus.WAITING)
+        self.assertEqual(resp.data["end_time"], self._at(21))
+
+        req = self.factory.get("/waitlist/")
+        force_authenticate(req, user=self.alice)
+        listed = WaitlistView.as_view()(req).data
+        self.assertEqual([e["id"] for e in listed], [resp.data["id"]])
+
+        req = self.factory.post("/waitlist/", {**data, "party_size": 11}, format="json")
+        force_authenticate(req, user=self.alice)
+        resp = WaitlistView.as_view()(req)
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(resp.data["detail"], "Table not found.")
+
+    def test_join_is_refused_when_a_table_is_free_or_already_waited_for(self):
+        def join(hour):
+            return self.facade.join_waitlist(
+                {
+                    "restaurant_id": self.rest.id,
+                    "reservation_date": self.day.isoformat(),
+                    "reservation_time": f"{hour}:00",
+                    "duration_hours": "2",
+                    "party_size": 4,
+                },
+                self.alice,
+            )
+
+        with self.assertRaises(TableAvailable):
+            join(18)
+        self._book(self.bob, 17, 21)
+        join(18)
+        with self.assertRaises(AlreadyWaitlisted):
+            join(19)
+        self.assertEqual(WaitlistEntry.objects.filter(user=self.alice).count(), 1)
+
+    def test_failed_backfill_does_not_fail_the_cancel(self):
+        class BrokenRepo(ReservationRepo):
+            @staticmethod
+            def findIntervalsByTable(*args):
+                raise OperationalError("database is locked")
+
+        cancelled = self._book(self.bob, 18, 20)
+        entry = self._wait(self.alice, 18, 20)
+        repo, waitlist_backfill.res_repo = waitlist_backfill.res_repo, BrokenRepo()
+        try:
+            with self.assertLogs("reservations.services.waitlist", "ERROR"):
+                self._cancel(cancelled)
+        finally:
+            waitlist_backfill.res_repo = repo
+
+        cancelled.refresh_from_db()
+        entry.refresh_from_db()
+        self.assertEqual(cancelled.status, ReservationStatus.CANCELLED)
+        self.assertEqual(entry.status, WaitlistStatus.WAITING)
+
+    def test_cancellation_books_waiting_entries_in_request_order(self):
+        cancelled = self._book(self.bob, 18, 21)
+        first = self._wait(self.alice, 18, 20)
+        overlapping = self._wait(self.bob, 19, 21)
+        last = self._wait(self.alice, 20, 21)
+
+        self._cancel(cancelled)
+
+        for entry in (first, overlapping, last):
+            entry.refresh_from_db()
+        self.assertEqual(first.status, WaitlistStatus.BOOKED)
+        self.assertEqual(overlapping.status, WaitlistStatus.WAITING)
+        self.assertEqual(last.status, WaitlistStatus.BOOKED)
+        self.assertEqual(first.reservation.user, self.alice)
+        self.assertEqual(first.reservation.table, self.table)
+        self.assertEqual(first.reservation.reservation_time, self._at(18))
+        self.assertEqual(last.reservation.end_time, self._at(21))
+
+    def test_only_entries_inside_the_freed_gap_and_fitting_the_table(self):
+        self._book(self.bob, 16, 18)
+        cancelled = self._book(self.bob, 18, 20)
+        self._book(self.bob, 21, 22)
+        spills_over = self._wait(self.alice, 17, 19)
+        too_big = self._wait(self.alice, 18, 20, party_size=5)
+        odd = self._wait(self.alice, 18, 20, party_size=3)
+        stretch = self._wait(self.alice, 20, 21)
+
+        self._cancel(cancelled)
+
+        statuses = {
+            entry.id: entry.status
+            for entry in WaitlistEntry.objects.filter(user=self.alice)
+        }
+        self.assertEqual(statuses[spills_over.id], WaitlistStatus.WAITING)
+        self.assertEqual(statuses[too_big.id], WaitlistStatus.WAITING)
+        # RULE1: a party of 3 at a 4-seat table
+        self.assertEqual(statuses[odd.id], WaitlistStatus.BOOKED)
+        # the free hour after the cancelled slot is filled as well
+        self.assertEqual(statuses[stretch.id], WaitlistStatus.BOOKED)
+
+    def test_leave_waitlist(self):
+        entry = self._wait(self.alice, 18, 20)
+
+        def leave(user, entry_id):
+            req = self.factory.post(
+                "/waitlist/leave/", {"waitlist_id": entry_id}, format="json"
+            )
+            force_authenticate(req, user=user)
+            return LeaveWaitlistView.as_view()(req)
+
+        self.assertEqual(leave(self.bob, entry.id).status_code, 403)
+        self.assertEqual(leave(self.alice, 0).status_code, 404)
+        resp = leave(self.alice, entry.id)
+        self.assertEqual(resp.data["detail"], "Left the waitlist successfully.")
+
+        self._cancel(self._book(self.bob, 18, 20))
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, WaitlistStatus.CANCELLED)
+
+
+class ReservationEventTests(TestCase):
+    class _RecordingBackend:
+        inline = False
+
+        def __init__(self):
+            self.submitted = []
+
+        def submit(self, name, args):
+            self.submitted.append((name, args))
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="alice", password="pw")
+        self.rest = Restaurant.objects.create(name="Audit")
+        self.table = Table.objects.create(restaurant=self.rest, seats=4, number=1)
+        self.payload = {
+            "restaurant_id": self.rest.id,
+            "reservation_date": (date.today() + timedelta(days=1)).isoformat(),
+            "reservation_time": "18:00",
+            "duration_hours": "2",
+            "party_size": 4,
+        }
+
+    def _recording(self):
+        backend, previous = self._RecordingBackend(), get_backend()
+        set_backend(backend)
+        self.addCleanup(set_backend, previous)
+        return backend
+
+    def test_booking_and_cancelling_record_events_after_commit(self):
+        facade = ReservationFacadeService()
+        with self.captureOnCommitCallbacks() as callbacks:
+            result = facade.book(self.payload, self.user)
+        self.assertFalse(ReservationEvent.objects.exists())
+
+        for callback in callbacks:
+            callback()
+        with self.captureOnCommitCallbacks(execute=True):
+            facade.cancel_reservation(result["reservation"]["id"], self.user)
+
+        events = list(ReservationEvent.objects.all())
+        self.assertEqual(
+            [e.kind for e in events],
+            [ReservationEventKind.BOOKED, ReservationEventKind.CANCELLED],
+        )
+        self.assertEqual(events[0].reservation_id, result["reservation"]["id"])
+        self.assertEqual(events[0].restaurant_id, self.rest.id)
+        self.assertEqual(events[0].table_id, self.table.id)
+        self.assertEqual(events[0].end_time, result["reservation"]["end_time"])
+
+    def test_events_are_sent_in_batches(self):
+        backend = self._recording()
+        batcher = EventBatcher(
+            record_reservation_events, batch_size=3, flush_interval=60
+        )
+        batcher.add([{"n": 1}, {"n": 2}])
+        self.assertEqual(backend.submitted, [])
+
+        batcher.add([{"n": 3}])
+        batcher.add([{"n": 4}])
+        batcher.flush()
+        self.assertEqual(
+            backend.submitted,
+            [
+                (record_reservation_events.name, ([{"n": 1}, {"n": 2}, {"n": 3}],)),
+                (record_reservation_events.name, ([{"n": 4}],)),
+            ],
+        )
+
+    def test_partial_batches_are_sent_after_the_flush_interval(self):
+        backend = self._recording()
+        batcher = EventBatcher(
+            record_reservation_events, batch_size=100, flush_interval=0.05
+        )
+        batcher.add([{"n": 1}])
+        timer = batcher.timer
+        timer.join(1)
+
+        self.assertEqual(len(backend.submitted), 1)
+        self.assertIsNone(batcher.timer)
+
+
+class OccupancyRollupTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.staff = User.objects.create_user(
+            username="owner", password="pw", is_staff=True
+        )
+        self.guest = User.objects.create_user(username="guest", password="pw")
+        self.rest = Restaurant.objects.create(name="Rollup")
+        self.tables = [
+            Table.objects.create(restaurant=self.rest, seats=4, number=1),
+            Table.objects.create(restaurant=self.rest, seats=6, number=2),
+        ]
+        self.day = date(2030, 6, 1)
+
+    def _reserve(self, table, day, hour, hours, seats, status=None):
+        start = datetime.combine(day, time(hour))
+        return Reservation.objects.create(
+            user=self.guest,
+            table=table,
+            num_seats=seats,
+            cost=seats * 10,
+            reservation_time=start,
+            end_time=start + timedelta(hours=hours),
+            status=status or ReservationStatus.CONFIRMED,
+        )
+
+    def _rollup(self):
+        return {
+            (r.day, r.hour): (
+                r.bookings,
+                r.covers,
+                r.revenue,
+                r.cancellations,
+                r.guest_minutes,
+            )
+            for r in OccupancyRollup.objects.filter(restaurant_id=self.rest.id)
+        }
+
+    def _report(self, query, user=None):
+        req = self.factory.get("/occupancy/", query)
+        force_authenticate(req, user=user or self.staff)
+        return OccupancyReportView.as_view()(req)
+
+    def test_booking_and_cancelling_update_the_rollup(self):
+        facade = ReservationFacadeService()
+        payload = {
+            "restaurant_id": self.rest.id,
+            "reservation_date": self.day.isoformat(),
+            "reservation_time": "18:30",
+            "duration_hours": "1",
+            "party_size": 4,
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            result = facade.book(payload, self.guest)
+        cost = Reservation.objects.get(id=result["reservation"]["id"]).cost
+        self.assertEqual(
+            self._rollup(),
+            {
+                (self.day, 18): (1, 4, cost, 0, 120),
+                (self.day, 19): (0, 0, 0, 0, 120),
+            },
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            facade.cancel_reservation(result["reservation"]["id"], self.guest)
+        self.assertEqual(
+            self._rollup(),
+            {(self.day, 18): (0, 0, 0, 1, 0), (self.day, 19): (0, 0, 0, 0, 0)},
+        )
+
+    def test_rebuild_matches_incremental_rollup(self):
+        evening = self._reserve(self.tables[0], self.day, 19, 2, 4)
+        # crosses midnight, and the chunk edge below
+        late = self._reserve(self.tables[1], self.day, 23, 2, 6)
+        cancelled = self._reserve(
+            self.tables[0], self.day + timedelta(days=1), 12, 1, 2
+        )
+        events = [
+            reservation_event(ReservationEventKind.BOOKED, r)
+            for r in (evening, late, cancelled)
+        ]
+        cancelled.status = ReservationStatus.CANCELLED
+        cancelled.save()
+        events.append(reservation_event(ReservationEventKind.CANCELLED, cancelled))
+        record_reservation_events(events)
+        incremental = self._rollup()
+        self.assertEqual(incremental[(self.day, 23)], (1, 6, 60, 0, 360))
+        self.assertEqual(
+            incremental[(self.day + timedelta(days=1), 0)], (0, 0, 0, 0, 360)
+        )
+
+        OccupancyRollup.objects.update(bookings=99)
+        out = StringIO()
+        call_command(
+            "rebuild_occupancy_rollups", "--chunk-days=1", "--workers=1", stdout=out
+        )
+        self.assertIn("in 2 chunks", out.getvalue())
+        # rebuilt rows hold no zero deltas left behind by cancellations
+        self.assertEqual(
+            self._rollup(),
+            {key: value for key, value in incremental.items() if any(value)},
+        )
+
+    def test_report_by_day_and_hour(self):
+        self._reserve(self.tables[0], self.day, 12, 2, 4)
+        self._reserve(self.tables[1], self.day, 19, 1, 5)
+        self._reserve(self.tables[1], self.day + timedelta(days=1), 20, 1, 6)
+        call_command("rebuild_occupancy_rollups", "--workers=1", stdout=StringIO())
+        query = {
+            "restaurant_id": self.rest.id,
+            "start_date": self.day.isoformat(),
+            "end_date": (self.day + timedelta(days=2)).isoformat(),
+            "start_hour": 12,
+            "end_hour": 22,
+        }
+
+        resp = self._report(query)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["seats"], 10)
+        first, second = resp.data["buckets"]
+        self.assertEqual(first["day"], self.day)
+        self.assertEqual((first["bookings"], first["covers"]), (2, 9))
+        # 4 seats for 2 hours and 5 for 1 of 10 seats for 10 hours
+        self.assertEqual(first["occupancy_pct"], 13.0)
+        self.assertEqual(resp.data["totals"]["revenue"], 150)
+        self.assertEqual(resp.data["totals"]["occupancy_pct"], round(1140 / 180, 2))
+
+        resp = self._report({**query, "group_by": "hour", "start_hour": 13})
+        self.assertEqual(
+            [
+                (b["day"].day, b["hour"], b["guest_minutes"])
+                for b in resp.data["buckets"]
+            ],
+            [(1, 13, 240), (1, 19, 300), (2, 20, 360)],
+        )
+
+    def test_report_validation_and_permissions(self):
+        query = {
+            "restaurant_id": self.rest.id,
+            "start_date": self.day.isoformat(),
+            "end_date": self.day.isoformat(),
+        }
+        self.assertEqual(self._report(query, user=self.guest).status_code, 403)
+        self.assertEqual(
+            self._report({**query, "start_hour": 20, "end_hour": 20}).status_code, 400
+        )
+        self.assertEqual(self._report({**query, "restaurant_id": 0}).status_code, 404)
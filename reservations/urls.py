@@ -1,9 +1,57 @@
+from django.conf import settings
 from django.urls import path
 
-from reservations.views import BookReservationView, CancelReservationView
+from reservations.views import (
+    AsyncBookReservationView,
+    AsyncCancelReservationView,
+    AvailabilityView,
+    BookRecurringReservationView,
+    BookReservationBatchView,
+    BookReservationView,
+    CancelReservationBatchView,
+    CancelReservationView,
+    CloseDayView,
+    LeaveWaitlistView,
+    MyReservationsView,
+    OccupancyReportView,
+    PriceQuoteView,
+    ReservationExportView,
+    SearchAvailabilityView,
+    WaitlistView,
+)
+
+# ASGI deployments serve the async variants, see settings.ASYNC_VIEWS
+if settings.ASYNC_VIEWS:
+    BookView, CancelView = AsyncBookReservationView, AsyncCancelReservationView
+else:
+    BookView, CancelView = BookReservationView, CancelReservationView
 
 app_name = "reservations"
 urlpatterns = [
-    path("book/", BookReservationView.as_view(), name="book_reservation"),
-    path("cancel/", CancelReservationView.as_view(), name="cancel_reservation"),
+    path("book/", BookView.as_view(), name="book_reservation"),
+    path(
+        "book/batch/",
+        BookReservationBatchView.as_view(),
+        name="book_reservation_batch",
+    ),
+    path(
+        "book/recurring/",
+        BookRecurringReservationView.as_view(),
+        name="book_recurring_reservation",
+    ),
+    path("availability/", AvailabilityView.as_view(), name="availability"),
+    path("quote/", PriceQuoteView.as_view(), name="price_quote"),
+    path("search/", SearchAvailabilityView.as_view(), name="search_availability"),
+    path("cancel/", CancelView.as_view(), name="cancel_reservation"),
+    path("mine/", MyReservationsView.as_view(), name="my_reservations"),
+    path(
+        "cancel/batch/",
+        CancelReservationBatchView.as_view(),
+        name="cancel_reservation_batch",
+    ),
+    path("close-day/", CloseDayView.as_view(), name="close_day"),
+    path("export/", ReservationExportView.as_view(), name="export_reservations"),
+    path("occupancy/", OccupancyReportView.as_view(), name="occupancy_report"),
+    path("waitlist/", WaitlistView.as_view(), name="waitlist"),
+    path("waitlist/leave/", LeaveWaitlistView.as_view(), name="leave_waitlist"),
 ]
@@ -1,16 +1,100 @@
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import permissions, status
-from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 
+from accounts.permissions import IsStaff
+from docs.swagger.reservation.availability import AVAILABILITY_VIEW_SCHEMA
 from docs.swagger.reservation.book import BOOK_RESERVATION_VIEW_SCHEMA
+from docs.swagger.reservation.book_batch import BOOK_RESERVATION_BATCH_VIEW_SCHEMA
+from docs.swagger.reservation.book_recurring import (
+    BOOK_RECURRING_RESERVATION_VIEW_SCHEMA,
+)
 from docs.swagger.reservation.cancel import CANCEL_RESERVATION_VIEW_SCHEMA
-from reservations.models import Reservation
-from reservations.serializers import CancelReservationSerializer
+from docs.swagger.reservation.cancel_batch import CANCEL_RESERVATION_BATCH_VIEW_SCHEMA
+from docs.swagger.reservation.close_day import CLOSE_DAY_VIEW_SCHEMA
+from docs.swagger.reservation.export import EXPORT_RESERVATIONS_VIEW_SCHEMA
+from docs.swagger.reservation.mine import MY_RESERVATIONS_VIEW_SCHEMA
+from docs.swagger.reservation.occupancy import OCCUPANCY_REPORT_VIEW_SCHEMA
+from docs.swagger.reservation.quote import QUOTE_VIEW_SCHEMA
+from docs.swagger.reservation.search import SEARCH_AVAILABILITY_VIEW_SCHEMA
+from docs.swagger.reservation.waitlist import (
+    JOIN_WAITLIST_VIEW_SCHEMA,
+    LEAVE_WAITLIST_VIEW_SCHEMA,
+    WAITLIST_VIEW_SCHEMA,
+)
+from reservations.models import Reservation, WaitlistEntry
+from reservations.serializers import (
+    CancelReservationSerializer,
+    LeaveWaitlistSerializer,
+)
+from reservations.services.export import achunks
 from reservations.services.facade import ReservationFacadeService
+from reservations.services.idempotency import IDEMPOTENCY_HEADER, IdempotencyService
+from utils.async_api_view import AsyncAPIView
 
 _facade = ReservationFacadeService()
+_idempotency = IdempotencyService.from_settings()
+
+
+def _replayed(claim):
+    response = Response(claim.replay.data, status=claim.replay.status_code)
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _fingerprint(request):
+    return _idempotency.fingerprint(request.method, request.path, request.data)
+
+
+def _idempotent(view, request, handler):
+    """
+    Run handler() once per Idempotency-Key header value: retries with the
+    same key get the stored response instead.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        return handler()
+    claim = _idempotency.begin(request.user.pk, key, _fingerprint(request))
+    if claim.replay:
+        return _replayed(claim)
+    try:
+        try:
+            response = handler()
+        except Exception as exc:
+            # error responses are stored like any other
+            response = view.handle_exception(exc)
+    except BaseException:
+        _idempotency.release(claim)
+        raise
+    _idempotency.complete(claim, response.status_code, response.data)
+    return response
+
+
+async def _aidempotent(view, request, handler):
+    """
+    Awaitable _idempotent() for async views; handler() returns a coroutine.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        return await handler()
+    claim = await _idempotency.abegin(request.user.pk, key, _fingerprint(request))
+    if claim.replay:
+        return _replayed(claim)
+    try:
+        try:
+            response = await handler()
+        except Exception as exc:
+            response = view.handle_exception(exc)
+    except BaseException:
+        await _idempotency.arelease(claim)
+        raise
+    await _idempotency.acomplete(claim, response.status_code, response.data)
+    return response
 
 
 class BookReservationView(APIView):
@@ -18,7 +102,73 @@ class BookReservationView(APIView):
 
     @swagger_auto_schema(**BOOK_RESERVATION_VIEW_SCHEMA)
     def post(self, request, *args, **kwargs):
-        result = _facade.book(request.data, request.user, context={"request": request})
+        def book():
+            result = _facade.book(
+                request.data, request.user, context={"request": request}
+            )
+            return Response(result, status=status.HTTP_200_OK)
+
+        return _idempotent(self, request, book)
+
+
+class AsyncBookReservationView(AsyncAPIView):
+    """
+    BookReservationView for ASGI deployments, backed by
+    ReservationFacadeService.abook.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(**BOOK_RESERVATION_VIEW_SCHEMA)
+    async def post(self, request, *args, **kwargs):
+        async def book():
+            result = await _facade.abook(
+                request.data, request.user, context={"request": request}
+            )
+            return Response(result, status=status.HTTP_200_OK)
+
+        return await _aidempotent(self, request, book)
+
+
+class BookReservationBatchView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(**BOOK_RESERVATION_BATCH_VIEW_SCHEMA)
+    def post(self, request, *args, **kwargs):
+        result = _facade.book_many(
+            request.data, request.user, context={"request": request}
+        )
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class BookRecurringReservationView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(**BOOK_RECURRING_RESERVATION_VIEW_SCHEMA)
+    def post(self, request, *args, **kwargs):
+        result = _facade.book_recurring(
+            request.data, request.user, context={"request": request}
+        )
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class AvailabilityView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(**AVAILABILITY_VIEW_SCHEMA)
+    def get(self, request, *args, **kwargs):
+        result = _facade.availability(
+            request.query_params, context={"request": request}
+        )
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class PriceQuoteView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(**QUOTE_VIEW_SCHEMA)
+    def get(self, request, *args, **kwargs):
+        result = _facade.quote(request.query_params, context={"request": request})
         return Response(result, status=status.HTTP_200_OK)
 
 
@@ -38,7 +188,154 @@ class CancelReservationView(APIView):
             )
             return Response({"detail": message}, status=status.HTTP_200_OK)
         except Reservation.DoesNotExist:
-
-            raise NotFound(detail="Reservation not found.")
+            raise _reservation_does_not_exist()
         except PermissionDenied as e:
             raise PermissionDenied(detail=str(e))
+
+
+class AsyncCancelReservationView(AsyncAPIView):
+    """
+    CancelReservationView for ASGI deployments, backed by
+    ReservationFacadeService.acancel_reservation.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(**CANCEL_RESERVATION_VIEW_SCHEMA)
+    async def post(self, request, *args, **kwargs):
+        serializer = CancelReservationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        reservation_id = serializer.validated_data["reservation_id"]
+
+        try:
+            message = await _facade.acancel_reservation(
+                reservation_id=reservation_id, user=request.user
+            )
+        except Reservation.DoesNotExist:
+            raise _reservation_does_not_exist()
+        return Response({"detail": message}, status=status.HTTP_200_OK)
+
+
+def _reservation_does_not_exist() -> ValidationError:
+    # the response the serializer gave when it checked existence itself
+    return ValidationError({"reservation_id": ["Reservation does not exist."]})
+
+
+class CancelReservationBatchView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(**CANCEL_RESERVATION_BATCH_VIEW_SCHEMA)
+    def post(self, request, *args, **kwargs):
+        result = _facade.cancel_many(
+            request.data, request.user, context={"request": request}
+        )
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class CloseDayView(APIView):
+    """
+    Cancels all of a restaurant's reservations and waitlist entries on a
+    day; for staff.
+    """
+
+    permission_classes = [IsStaff]
+
+    @swagger_auto_schema(**CLOSE_DAY_VIEW_SCHEMA)
+    def post(self, request, *args, **kwargs):
+        result = _facade.close_day(request.data, context={"request": request})
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class MyReservationsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(**MY_RESERVATIONS_VIEW_SCHEMA)
+    def get(self, request, *args, **kwargs):
+        page = _facade.my_reservations(
+            request.query_params, request.user, context={"request": request}
+        )
+        return _page_response(request, page)
+
+
+class SearchAvailabilityView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(**SEARCH_AVAILABILITY_VIEW_SCHEMA)
+    def get(self, request, *args, **kwargs):
+        page = _facade.search(request.query_params, context={"request": request})
+        return _page_response(request, page)
+
+
+def _page_response(request, page) -> Response:
+    next_url = None
+    if page["next_cursor"]:
+        next_url = replace_query_param(
+            request.build_absolute_uri(), "cursor", page["next_cursor"]
+        )
+    return Response(
+        {"next": next_url, "results": page["results"]}, status=status.HTTP_200_OK
+    )
+
+
+class WaitlistView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(**WAITLIST_VIEW_SCHEMA)
+    def get(self, request, *args, **kwargs):
+        return Response(_facade.waitlist(request.user), status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(**JOIN_WAITLIST_VIEW_SCHEMA)
+    def post(self, request, *args, **kwargs):
+        result = _facade.join_waitlist(
+            request.data, request.user, context={"request": request}
+        )
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
+class LeaveWaitlistView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(**LEAVE_WAITLIST_VIEW_SCHEMA)
+    def post(self, request, *args, **kwargs):
+        serializer = LeaveWaitlistSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            message = _facade.leave_waitlist(
+                serializer.validated_data["waitlist_id"], request.user
+            )
+        except WaitlistEntry.DoesNotExist:
+            raise NotFound(detail="Waitlist entry not found.")
+        return Response({"detail": message}, status=status.HTTP_200_OK)
+
+
+class ReservationExportView(APIView):
+    """
+    Streams every matching reservation as CSV or NDJSON for staff, reading
+    the database in chunks while the response is sent.
+    """
+
+    permission_classes = [IsStaff]
+
+    @swagger_auto_schema(**EXPORT_RESERVATIONS_VIEW_SCHEMA)
+    def get(self, request, *args, **kwargs):
+        lines, content_type, file_format = _facade.export(
+            request.query_params, context={"request": request}
+        )
+        if isinstance(request._request, ASGIRequest):
+            lines = achunks(lines)
+        response = StreamingHttpResponse(lines, content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="reservations.{file_format}"'
+        )
+        return response
+
+
+class OccupancyReportView(APIView):
+    permission_classes = [IsStaff]
+
+    @swagger_auto_schema(**OCCUPANCY_REPORT_VIEW_SCHEMA)
+    def get(self, request, *args, **kwargs):
+        result = _facade.occupancy(request.query_params, context={"request": request})
+        return Response(result, status=status.HTTP_200_OK)
@@ -2,7 +2,7 @@
 
 from django.contrib import admin
 
-from .models import Restaurant, Table
+from .models import PriceRule, Restaurant, Table
 
 
 class TableInline(admin.TabularInline):  # Or admin.StackedInline for a different layout
@@ -56,3 +56,22 @@ class TableAdmin(admin.ModelAdmin):
             },
         ),
     )
+
+
+@admin.register(PriceRule)
+class PriceRuleAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the PriceRule model.
+    """
+
+    list_display = (
+        "restaurant",
+        "weekday",
+        "start_time",
+        "end_time",
+        "seat_price",
+        "priority",
+    )
+    list_filter = ("restaurant", "weekday")
+    search_fields = ("restaurant__name",)
+    ordering = ("restaurant", "-priority", "weekday", "start_time")
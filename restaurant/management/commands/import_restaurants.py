@@ -0,0 +1,71 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from restaurant.services.importer import IMPORT_FORMATS, RestaurantImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports restaurants and their tables from a CSV, JSON or NDJSON file, "
+        "upserting tables by (restaurant, number) in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import.")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="File format. Defaults to the file extension.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Tables written per statement and transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate the file without writing anything.",
+        )
+        parser.add_argument(
+            "--show-errors",
+            type=int,
+            default=20,
+            help="Rejected rows to list.",
+        )
+
+    def handle(self, *args, **options):
+        file_format = options["format"] or os.path.splitext(options["path"])[1][1:]
+        if file_format not in IMPORT_FORMATS:
+            raise CommandError(
+                f"Cannot tell the format of {options['path']}; pass --format."
+            )
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        importer = RestaurantImporter(
+            batch_size=options["batch_size"], dry_run=options["dry_run"]
+        )
+        started = time.perf_counter()
+        try:
+            with open(options["path"], encoding="utf-8", newline="") as stream:
+                report = importer.run(read_rows(stream, file_format))
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+        elapsed = time.perf_counter() - started
+
+        for line, message in report.errors[: options["show_errors"]]:
+            self.stderr.write(f"line {line}: {message}")
+        verb = "Validated" if options["dry_run"] else "Imported"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {report.tables} tables ({report.restaurants_created} new "
+                f"restaurants) from {report.rows} rows in {elapsed:.2f}s, "
+                f"{report.rows / max(elapsed, 1e-9):.0f} rows/s"
+            )
+        )
+        if report.errors:
+            raise CommandError(f"{len(report.errors)} rows were rejected.")
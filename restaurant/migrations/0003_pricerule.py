@@ -0,0 +1,74 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:54
+
+import datetime
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0002_table_is_available"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PriceRule",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "weekday",
+                    models.PositiveSmallIntegerField(
+                        blank=True,
+                        choices=[
+                            (0, "Monday"),
+                            (1, "Tuesday"),
+                            (2, "Wednesday"),
+                            (3, "Thursday"),
+                            (4, "Friday"),
+                            (5, "Saturday"),
+                            (6, "Sunday"),
+                        ],
+                        help_text="Day the rule applies to; blank for every day",
+                        null=True,
+                    ),
+                ),
+                ("start_time", models.TimeField(default=datetime.time(0, 0))),
+                (
+                    "end_time",
+                    models.TimeField(
+                        blank=True, help_text="Exclusive; blank for midnight", null=True
+                    ),
+                ),
+                (
+                    "seat_price",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=8,
+                        validators=[django.core.validators.MinValueValidator(0)],
+                    ),
+                ),
+                ("priority", models.IntegerField(default=0)),
+                (
+                    "restaurant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="price_rules",
+                        to="restaurant.restaurant",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["restaurant", "-priority", "weekday", "start_time"],
+            },
+        ),
+    ]
@@ -1,5 +1,6 @@
-from datetime import datetime
+from datetime import datetime, time
 
+from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
@@ -43,3 +44,56 @@ class Table(models.Model):
     class Meta:
         unique_together = ("restaurant", "number")
         ordering = ["restaurant", "number"]
+
+
+class Weekday(models.IntegerChoices):
+    MONDAY = 0, "Monday"
+    TUESDAY = 1, "Tuesday"
+    WEDNESDAY = 2, "Wednesday"
+    THURSDAY = 3, "Thursday"
+    FRIDAY = 4, "Friday"
+    SATURDAY = 5, "Saturday"
+    SUNDAY = 6, "Sunday"
+
+
+class PriceRule(models.Model):
+    """
+    A seat price for part of a restaurant's week.
+
+    Bookings starting in [start_time, end_time) on `weekday` (every day
+    when blank) are charged `seat_price` per billed seat. Where rules
+    overlap, the one with the highest priority wins.
+    """
+
+    restaurant = models.ForeignKey(
+        Restaurant, on_delete=models.CASCADE, related_name="price_rules"
+    )
+    weekday = models.PositiveSmallIntegerField(
+        choices=Weekday.choices,
+        null=True,
+        blank=True,
+        help_text="Day the rule applies to; blank for every day",
+    )
+    start_time = models.TimeField(default=time.min)
+    end_time = models.TimeField(
+        null=True, blank=True, help_text="Exclusive; blank for midnight"
+    )
+    seat_price = models.DecimalField(
+        max_digits=8, decimal_places=2, validators=[MinValueValidator(0)]
+    )
+    priority = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["restaurant", "-priority", "weekday", "start_time"]
+
+    def __str__(self):
+        day = self.get_weekday_display() if self.weekday is not None else "Daily"
+        return f"{self.restaurant}: {day} from {self.start_time}, {self.seat_price}"
+
+    def clean(self):
+        for field in ("start_time", "end_time"):
+            value = getattr(self, field)
+            if value and (value.minute % 30 or value.second or value.microsecond):
+                raise ValidationError({field: "Prices change on the half hour."})
+        if self.end_time and self.end_time <= self.start_time:
+            raise ValidationError({"end_time": "end_time must be after start_time."})
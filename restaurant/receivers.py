@@ -0,0 +1,37 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from restaurant.models import PriceRule, Restaurant, Table
+from restaurant.repos.cache import restaurant_metadata_cache
+from restaurant.signals import tables_changed
+
+
+def _invalidate(restaurant_id):
+    restaurant_metadata_cache.invalidate(restaurant_id)
+    # readers may have re-cached the old rows before the write committed
+    transaction.on_commit(lambda: restaurant_metadata_cache.invalidate(restaurant_id))
+
+
+@receiver(post_save, sender=Restaurant)
+@receiver(post_delete, sender=Restaurant)
+def restaurant_changed(sender, instance, **kwargs):
+    _invalidate(instance.id)
+
+
+@receiver(post_save, sender=Table)
+@receiver(post_delete, sender=Table)
+def table_changed(sender, instance, **kwargs):
+    _invalidate(instance.restaurant_id)
+
+
+@receiver(post_save, sender=PriceRule)
+@receiver(post_delete, sender=PriceRule)
+def price_rule_changed(sender, instance, **kwargs):
+    _invalidate(instance.restaurant_id)
+
+
+@receiver(tables_changed)
+def tables_bulk_changed(sender, restaurant_ids, **kwargs):
+    for restaurant_id in restaurant_ids:
+        restaurant_metadata_cache.invalidate(restaurant_id)
@@ -0,0 +1,208 @@
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+
+from restaurant.models import Table
+from restaurant.repos.repository import RestaurantRepo
+from utils.lru_cache import MISSING, TTLCache
+
+
+class RestaurantSnapshot(NamedTuple):
+    id: int
+    name: str
+
+
+class TableSnapshot(NamedTuple):
+    id: int
+    restaurant_id: int
+    number: int
+    seats: int
+    is_available: bool
+
+    def to_model(self) -> Table:
+        """
+        A Table instance for FK assignment, built without a query.
+        """
+        return Table.from_db(None, self._fields, self)
+
+
+class RestaurantMetadataCache:
+    """
+    Two-tier store of restaurant and table snapshots.
+
+    The first tier is an in-process TTLCache. The optional second tier is
+    a Django cache alias (RESTAURANT_METADATA_CACHE["SHARED_CACHE_ALIAS"])
+    shared between workers. Entries are dropped from both tiers by the
+    Restaurant/Table/PriceRule signal receivers, which run in the process
+    that saved the change.
+
+    Other workers learn of it through a version key per restaurant in the
+    second tier: invalidate() replaces it, and a first-tier hit is only
+    used while its version still matches, at the cost of one small shared
+    cache read. Without a second tier a change reaches other workers only
+    when their entries expire, so for up to `ttl` seconds they may still
+    offer a table that was just made unavailable.
+    """
+
+    key_prefix = "restaurant:metadata"
+    kinds = ("restaurant", "tables", "prices")
+
+    def __init__(self, maxsize: int, ttl: float, shared_alias: Optional[str] = None):
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.shared_alias = shared_alias
+
+    @classmethod
+    def from_settings(cls) -> "RestaurantMetadataCache":
+        conf = getattr(settings, "RESTAURANT_METADATA_CACHE", {})
+        return cls(
+            maxsize=conf.get("MAXSIZE", 1024),
+            ttl=conf.get("TTL", 30),
+            shared_alias=conf.get("SHARED_CACHE_ALIAS"),
+        )
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias] if self.shared_alias else None
+
+    def get(self, kind: str, restaurant_id: int):
+        key = self._key(kind, restaurant_id)
+        entry = self.local.get(key)
+        shared = self.shared
+        if shared is None:
+            return entry if entry is MISSING else entry[1]
+        version_key = self._version_key(restaurant_id)
+        if entry is not MISSING and entry[0] == shared.get(version_key):
+            return entry[1]
+        found = shared.get_many([key, version_key])
+        value = found.get(key, MISSING)
+        if value is not MISSING:
+            self.local.set(key, (found.get(version_key), value))
+        return value
+
+    def set(self, kind: str, restaurant_id: int, value) -> None:
+        key = self._key(kind, restaurant_id)
+        shared = self.shared
+        if shared is None:
+            self.local.set(key, (None, value))
+            return
+        self.local.set(key, (shared.get(self._version_key(restaurant_id)), value))
+        shared.set(key, value, self.ttl)
+
+    async def aget(self, kind: str, restaurant_id: int):
+        key = self._key(kind, restaurant_id)
+        entry = self.local.get(key)
+        shared = self.shared
+        if shared is None:
+            return entry if entry is MISSING else entry[1]
+        version_key = self._version_key(restaurant_id)
+        if entry is not MISSING and entry[0] == await shared.aget(version_key):
+            return entry[1]
+        found = await shared.aget_many([key, version_key])
+        value = found.get(key, MISSING)
+        if value is not MISSING:
+            self.local.set(key, (found.get(version_key), value))
+        return value
+
+    async def aset(self, kind: str, restaurant_id: int, value) -> None:
+        key = self._key(kind, restaurant_id)
+        shared = self.shared
+        if shared is None:
+            self.local.set(key, (None, value))
+            return
+        version = await shared.aget(self._version_key(restaurant_id))
+        self.local.set(key, (version, value))
+        await shared.aset(key, value, self.ttl)
+
+    def invalidate(self, restaurant_id: int) -> None:
+        keys = [self._key(kind, restaurant_id) for kind in self.kinds]
+        for key in keys:
+            self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete_many(keys)
+            # stales every other worker's first-tier entries; kept forever
+            # as an evicted version only costs them a shared read
+            self.shared.set(self._version_key(restaurant_id), uuid4().hex, None)
+
+    def clear(self) -> None:
+        self.local.clear()
+
+    def _key(self, kind: str, restaurant_id: int) -> str:
+        return f"{self.key_prefix}:{kind}:{restaurant_id}"
+
+    def _version_key(self, restaurant_id: int) -> str:
+        return f"{self.key_prefix}:version:{restaurant_id}"
+
+
+restaurant_metadata_cache = RestaurantMetadataCache.from_settings()
+
+
+class CachedRestaurantRepo(RestaurantRepo):
+    """
+    Read-through RestaurantRepo returning immutable snapshots.
+
+    Restaurants that do not exist are not cached, so creating one is
+    visible immediately.
+    """
+
+    def __init__(self, cache: Optional[RestaurantMetadataCache] = None):
+        self.cache = cache or restaurant_metadata_cache
+
+    def findById(self, restaurant_id: int) -> Optional[RestaurantSnapshot]:
+        snapshot = self.cache.get("restaurant", restaurant_id)
+        if snapshot is MISSING:
+            restaurant = RestaurantRepo.findById(restaurant_id)
+            if restaurant is None:
+                return None
+            snapshot = RestaurantSnapshot(restaurant.id, restaurant.name)
+            self.cache.set("restaurant", restaurant_id, snapshot)
+        return snapshot
+
+    async def afindById(self, restaurant_id: int) -> Optional[RestaurantSnapshot]:
+        snapshot = await self.cache.aget("restaurant", restaurant_id)
+        if snapshot is MISSING:
+            restaurant = await RestaurantRepo.afindById(restaurant_id)
+            if restaurant is None:
+                return None
+            snapshot = RestaurantSnapshot(restaurant.id, restaurant.name)
+            await self.cache.aset("restaurant", restaurant_id, snapshot)
+        return snapshot
+
+    def findByIds(self, restaurant_ids: Iterable[int]) -> Dict[int, RestaurantSnapshot]:
+        found, missing = {}, set()
+        for restaurant_id in set(restaurant_ids):
+            snapshot = self.cache.get("restaurant", restaurant_id)
+            if snapshot is MISSING:
+                missing.add(restaurant_id)
+            else:
+                found[restaurant_id] = snapshot
+        if missing:
+            for restaurant in RestaurantRepo.findByIds(missing).values():
+                snapshot = RestaurantSnapshot(restaurant.id, restaurant.name)
+                self.cache.set("restaurant", restaurant.id, snapshot)
+                found[restaurant.id] = snapshot
+        return found
+
+    def findTablesByRestaurant(self, restaurant_id: int) -> Tuple[TableSnapshot, ...]:
+        tables = self.cache.get("tables", restaurant_id)
+        if tables is MISSING:
+            tables = tuple(
+                TableSnapshot(t.id, t.restaurant_id, t.number, t.seats, t.is_available)
+                for t in RestaurantRepo.findTablesByRestaurant(restaurant_id)
+            )
+            self.cache.set("tables", restaurant_id, tables)
+        return tables
+
+    async def afindTablesByRestaurant(
+        self, restaurant_id: int
+    ) -> Tuple[TableSnapshot, ...]:
+        tables = await self.cache.aget("tables", restaurant_id)
+        if tables is MISSING:
+            tables = tuple(
+                TableSnapshot(t.id, t.restaurant_id, t.number, t.seats, t.is_available)
+                for t in await RestaurantRepo.afindTablesByRestaurant(restaurant_id)
+            )
+            await self.cache.aset("tables", restaurant_id, tables)
+        return tables
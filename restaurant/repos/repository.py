@@ -1,8 +1,9 @@
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
 
-from django.db import models
+from django.db import models, transaction
 
-from restaurant.models import Restaurant
+from restaurant.models import PriceRule, Restaurant, Table
+from restaurant.signals import tables_changed
 
 
 class RestaurantRepo:
@@ -25,3 +26,104 @@ class RestaurantRepo:
             return Restaurant.objects.get(pk=restaurant_id)
         except Restaurant.DoesNotExist:
             return None
+
+    @staticmethod
+    async def afindById(restaurant_id: int) -> Optional[Restaurant]:
+        """
+        Async findById.
+        """
+        try:
+            return await Restaurant.objects.aget(pk=restaurant_id)
+        except Restaurant.DoesNotExist:
+            return None
+
+    @staticmethod
+    def findByIds(restaurant_ids: Iterable[int]) -> Dict[int, Restaurant]:
+        """
+        Retrieve several Restaurants with one query.
+
+        Args:
+            restaurant_ids: The IDs of the restaurants to retrieve.
+
+        Returns:
+            A mapping of ID to Restaurant for the IDs that exist.
+        """
+        return Restaurant.objects.in_bulk(set(restaurant_ids))
+
+    @staticmethod
+    def findTablesByRestaurant(restaurant_id: int) -> List[Table]:
+        """
+        Retrieve every Table belonging to a restaurant.
+
+        Args:
+            restaurant_id: The ID of the restaurant whose tables to list.
+
+        Returns:
+            The restaurant's tables, ordered by table number.
+        """
+        return list(Table.objects.filter(restaurant_id=restaurant_id))
+
+    @staticmethod
+    async def afindTablesByRestaurant(restaurant_id: int) -> List[Table]:
+        """
+        Async findTablesByRestaurant.
+        """
+        return [t async for t in Table.objects.filter(restaurant_id=restaurant_id)]
+
+    @staticmethod
+    def findPriceRules(restaurant_id: int) -> List[PriceRule]:
+        """
+        Retrieve every PriceRule of a restaurant.
+        """
+        return list(PriceRule.objects.filter(restaurant_id=restaurant_id))
+
+    @staticmethod
+    async def afindPriceRules(restaurant_id: int) -> List[PriceRule]:
+        """
+        Async findPriceRules.
+        """
+        return [r async for r in PriceRule.objects.filter(restaurant_id=restaurant_id)]
+
+    @staticmethod
+    def findIdsByNames(names: Iterable[str]) -> Dict[str, List[int]]:
+        """
+        Look up restaurants by name with one query.
+
+        Returns:
+            A mapping of name to the IDs of every restaurant with that
+            name, for the names that exist.
+        """
+        ids: Dict[str, List[int]] = {}
+        for restaurant_id, name in Restaurant.objects.filter(
+            name__in=set(names)
+        ).values_list("id", "name"):
+            ids.setdefault(name, []).append(restaurant_id)
+        return ids
+
+    @staticmethod
+    def bulkCreateRestaurants(names: Iterable[str]) -> List[Restaurant]:
+        """
+        Insert one restaurant per name with a single statement.
+        """
+        return Restaurant.objects.bulk_create(Restaurant(name=name) for name in names)
+
+    @staticmethod
+    def bulkUpsertTables(tables: List[Table]) -> None:
+        """
+        Insert tables, or update seats and availability of the ones whose
+        (restaurant, number) already exists, with a single statement.
+
+        bulk_create skips post_save, so `tables_changed` is sent explicitly
+        once the surrounding transaction commits.
+        """
+        with transaction.atomic():
+            Table.objects.bulk_create(
+                tables,
+                update_conflicts=True,
+                unique_fields=["restaurant", "number"],
+                update_fields=["seats", "is_available"],
+            )
+        restaurant_ids = {t.restaurant_id for t in tables}
+        transaction.on_commit(
+            lambda: tables_changed.send(sender=Table, restaurant_ids=restaurant_ids)
+        )
@@ -0,0 +1,229 @@
+import csv
+import json
+from typing import (
+    IO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from restaurant.models import Restaurant, Table
+from restaurant.repos.repository import RestaurantRepo
+
+IMPORT_FORMATS = ("csv", "json", "ndjson")
+# CSV columns; is_available is optional
+CSV_COLUMNS = ("restaurant", "number", "seats", "is_available")
+# an empty is_available cell keeps the default, True
+_TRUE, _FALSE = {"1", "true", "yes", "y", ""}, {"0", "false", "no", "n"}
+
+
+class TableRow(NamedTuple):
+    line: int
+    restaurant: str
+    number: int
+    seats: int
+    is_available: bool
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.tables = 0
+        self.restaurants_created = 0
+        # (line, message) of every rejected row
+        self.errors: List[Tuple[int, str]] = []
+
+
+def read_rows(
+    stream: IO[str], file_format: str
+) -> Iterator[Tuple[int, Union[dict, ValueError]]]:
+    """
+    Yield (line, fields) for every table in an import file, or (line,
+    ValueError) for a record that cannot be read, so the rest of the
+    file is still imported.
+
+    csv: one table per row, with the CSV_COLUMNS header.
+    ndjson: one restaurant per line,
+        {"name": ..., "tables": [{"number": ..., "seats": ...}, ...]}.
+    json: a list of such restaurants. Unlike the other formats it is
+        parsed whole, so prefer ndjson for large files.
+    """
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+        missing = set(CSV_COLUMNS[:3]) - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"CSV header lacks {', '.join(sorted(missing))}.")
+        for fields in reader:
+            yield reader.line_num, fields
+    elif file_format == "ndjson":
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+            try:
+                restaurant = json.loads(text)
+            except ValueError as exc:
+                yield line, ValueError(f"invalid JSON: {exc}")
+                continue
+            yield from _restaurant_tables(line, restaurant)
+    elif file_format == "json":
+        for index, restaurant in enumerate(json.load(stream), start=1):
+            yield from _restaurant_tables(index, restaurant)
+    else:
+        raise ValueError(f"Unknown format {file_format!r}.")
+
+
+def _restaurant_tables(
+    line: int, restaurant
+) -> Iterator[Tuple[int, Union[dict, ValueError]]]:
+    if not isinstance(restaurant, dict):
+        yield line, ValueError("a restaurant must be a JSON object.")
+        return
+    tables = restaurant.get("tables") or ()
+    if not isinstance(tables, list):
+        yield line, ValueError("tables must be a list.")
+        return
+    for table in tables:
+        if not isinstance(table, dict):
+            yield line, ValueError("a table must be a JSON object.")
+            continue
+        yield line, {"restaurant": restaurant.get("name"), **table}
+
+
+def parse_row(line: int, fields: dict) -> TableRow:
+    """
+    Raises:
+        ValueError: If a field is missing or out of bounds; the message
+            says which.
+    """
+    name = str(fields.get("restaurant") or "").strip()
+    if not name:
+        raise ValueError("restaurant name is required.")
+    max_length = Restaurant._meta.get_field("name").max_length
+    if len(name) > max_length:
+        raise ValueError(f"restaurant name exceeds {max_length} characters.")
+
+    number = _integer(fields, "number")
+    if number < 1:
+        raise ValueError("number must be a positive integer.")
+    seats = _integer(fields, "seats")
+    try:
+        Table._meta.get_field("seats").run_validators(seats)
+    except ValidationError as exc:
+        raise ValueError(f"seats: {' '.join(exc.messages)}") from exc
+
+    is_available = fields.get("is_available", True)
+    if not isinstance(is_available, bool):
+        value = str(is_available).strip().lower()
+        if value not in _TRUE | _FALSE:
+            raise ValueError("is_available must be true or false.")
+        is_available = value in _TRUE
+    return TableRow(line, name, number, seats, is_available)
+
+
+def _integer(fields: dict, key: str) -> int:
+    value = fields.get(key)
+    if isinstance(value, bool):
+        raise ValueError(f"{key} must be an integer.")
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        raise ValueError(f"{key} must be an integer.") from None
+
+
+class RestaurantImporter:
+    """
+    Upserts restaurants and tables from parsed import rows.
+
+    Rows are validated one at a time, including (restaurant, number)
+    uniqueness within the file, and valid ones are written in batches,
+    each in its own transaction: one lookup of unknown restaurant names,
+    one bulk insert of the new restaurants and one bulk upsert of the
+    tables. Restaurants are matched by name; rows naming several existing
+    restaurants are rejected. Invalid rows are reported and skipped.
+    """
+
+    def __init__(self, batch_size: int = 1000, dry_run: bool = False, repo=None):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.repo = repo or RestaurantRepo()
+        self.restaurant_ids: Dict[str, Optional[int]] = {}
+
+    def run(self, rows: Iterable[Tuple[int, Union[dict, ValueError]]]) -> ImportReport:
+        report = ImportReport()
+        # (restaurant, number) -> first line, for duplicates within the file
+        seen: Dict[Tuple[str, int], int] = {}
+        batch: List[TableRow] = []
+        for line, fields in rows:
+            report.rows += 1
+            if isinstance(fields, ValueError):
+                report.errors.append((line, str(fields)))
+                continue
+            try:
+                row = parse_row(line, fields)
+            except ValueError as exc:
+                report.errors.append((line, str(exc)))
+                continue
+            first = seen.setdefault((row.restaurant, row.number), line)
+            if first != line:
+                report.errors.append(
+                    (
+                        line,
+                        f"table {row.number} of {row.restaurant!r} is already "
+                        f"on line {first}.",
+                    )
+                )
+                continue
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self._flush(batch, report)
+                batch = []
+        if batch:
+            self._flush(batch, report)
+        return report
+
+    def _flush(self, batch: List[TableRow], report: ImportReport) -> None:
+        with transaction.atomic():
+            self._resolve_restaurants({row.restaurant for row in batch}, report)
+            tables = []
+            for row in batch:
+                restaurant_id = self.restaurant_ids.get(row.restaurant)
+                if restaurant_id is None:
+                    report.errors.append(
+                        (row.line, f"several restaurants are named {row.restaurant!r}.")
+                    )
+                    continue
+                tables.append(
+                    Table(
+                        restaurant_id=restaurant_id,
+                        number=row.number,
+                        seats=row.seats,
+                        is_available=row.is_available,
+                    )
+                )
+            if tables and not self.dry_run:
+                self.repo.bulkUpsertTables(tables)
+            report.tables += len(tables)
+
+    def _resolve_restaurants(self, names, report: ImportReport) -> None:
+        unknown = {n for n in names if n not in self.restaurant_ids}
+        if not unknown:
+            return
+        for name, ids in self.repo.findIdsByNames(unknown).items():
+            # None marks an ambiguous name
+            self.restaurant_ids[name] = ids[0] if len(ids) == 1 else None
+            unknown.discard(name)
+        if self.dry_run:
+            created = [Restaurant(id=-i, name=n) for i, n in enumerate(unknown, 1)]
+        else:
+            created = self.repo.bulkCreateRestaurants(sorted(unknown))
+        for restaurant in created:
+            self.restaurant_ids[restaurant.name] = restaurant.id
+        report.restaurants_created += len(created)
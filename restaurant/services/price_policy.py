@@ -1,6 +1,22 @@
 from abc import ABC, abstractmethod
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
-from restaurant.models import Table
+from django.conf import settings
+
+from restaurant.models import PriceRule, Table
+from restaurant.repos.cache import restaurant_metadata_cache
+from restaurant.repos.repository import RestaurantRepo
+from utils.lru_cache import MISSING
+
+# prices change on the half hour, see PriceRule.clean
+SLOT = timedelta(minutes=30)
+SLOTS_PER_DAY = 48
+
+# a rule's seat price per half-hour slot of the week, Monday 00:00 first;
+# None where no rule applies
+WeekPrices = Tuple[Optional[Decimal], ...]
 
 
 class PricingPolicy(ABC):
@@ -9,12 +25,38 @@ class PricingPolicy(ABC):
     """
 
     @abstractmethod
-    def calculate(self, table: Table, party_size: int) -> float:
+    def calculate(
+        self, table: Table, party_size: int, start_dt: Optional[datetime] = None
+    ) -> float:
         """
-        Return the total price for booking.
+        Return the total price for booking, starting at `start_dt` when
+        the price depends on the time.
         """
         pass
 
+    async def acalculate(
+        self, table: Table, party_size: int, start_dt: Optional[datetime] = None
+    ) -> float:
+        """
+        Async calculate, for policies that read the database.
+        """
+        return self.calculate(table, party_size, start_dt)
+
+    def quote_day(
+        self, restaurant_id: int, day: date, tables: Iterable[Table], party_size: int
+    ) -> Dict[int, List]:
+        """
+        Per table id, the price of booking the table at each half-hour
+        start slot of the day. Calls calculate once per table and slot
+        unless a policy overrides it.
+        """
+        day_start = datetime.combine(day, time.min)
+        starts = [day_start + i * SLOT for i in range(SLOTS_PER_DAY)]
+        return {
+            t.id: [self.calculate(t, party_size, start) for start in starts]
+            for t in tables
+        }
+
 
 class DefaultPricingPolicy(PricingPolicy):
     """
@@ -25,5 +67,113 @@ class DefaultPricingPolicy(PricingPolicy):
     def __init__(self, seat_price: float):
         self.seat_price = seat_price
 
-    def calculate(self, table: Table, party_size: int) -> float:
+    def calculate(
+        self, table: Table, party_size: int, start_dt: Optional[datetime] = None
+    ) -> float:
         return (int(table.seats) - 1) * self.seat_price
+
+
+def compile_price_rules(rules: Sequence[PriceRule]) -> WeekPrices:
+    """
+    Paint rules onto a week of half-hour slots in ascending priority, so
+    where rules overlap the highest priority (then the newest) wins.
+    """
+    prices = [None] * (7 * SLOTS_PER_DAY)
+    for rule in sorted(rules, key=lambda r: (r.priority, r.id)):
+        first = _slot(rule.start_time)
+        last = -(-_minutes(rule.end_time) // 30) if rule.end_time else SLOTS_PER_DAY
+        if first >= last:
+            continue
+        days = range(7) if rule.weekday is None else (rule.weekday,)
+        for day in days:
+            offset = day * SLOTS_PER_DAY
+            prices[offset + first : offset + last] = [rule.seat_price] * (last - first)
+    return tuple(prices)
+
+
+def _minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def _slot(value: time) -> int:
+    return _minutes(value) // 30
+
+
+class RuleBasedPricingPolicy(PricingPolicy):
+    """
+    RULE2 with the seat price taken from the restaurant's PriceRules for
+    the weekday and half-hour slot a booking starts in, and `seat_price`
+    where no rule applies.
+
+    Each restaurant's rules are compiled into a week-long array of seat
+    prices, one per slot, cached in the restaurant metadata cache until a
+    rule changes. A price is one index into it, and a day of quotes one
+    slice.
+    """
+
+    def __init__(self, seat_price: Decimal, repo=None, cache=None):
+        self.seat_price = Decimal(seat_price)
+        self.repo = repo or RestaurantRepo()
+        self.cache = cache or restaurant_metadata_cache
+
+    def calculate(
+        self, table: Table, party_size: int, start_dt: Optional[datetime] = None
+    ) -> Decimal:
+        seat_price = self.seat_price
+        if start_dt is not None:
+            seat_price = self._seat_price(self.week(table.restaurant_id), start_dt)
+        return (int(table.seats) - 1) * seat_price
+
+    async def acalculate(
+        self, table: Table, party_size: int, start_dt: Optional[datetime] = None
+    ) -> Decimal:
+        seat_price = self.seat_price
+        if start_dt is not None:
+            week = await self.aweek(table.restaurant_id)
+            seat_price = self._seat_price(week, start_dt)
+        return (int(table.seats) - 1) * seat_price
+
+    def quote_day(
+        self, restaurant_id: int, day: date, tables: Iterable[Table], party_size: int
+    ) -> Dict[int, List[Decimal]]:
+        offset = day.weekday() * SLOTS_PER_DAY
+        seat_prices = [
+            self.seat_price if price is None else price
+            for price in self.week(restaurant_id)[offset : offset + SLOTS_PER_DAY]
+        ]
+        # one row per distinct table size
+        rows = {}
+        quotes = {}
+        for table in tables:
+            billed = int(table.seats) - 1
+            if billed not in rows:
+                rows[billed] = [billed * price for price in seat_prices]
+            quotes[table.id] = rows[billed]
+        return quotes
+
+    def week(self, restaurant_id: int) -> WeekPrices:
+        week = self.cache.get("prices", restaurant_id)
+        if week is MISSING:
+            week = compile_price_rules(self.repo.findPriceRules(restaurant_id))
+            self.cache.set("prices", restaurant_id, week)
+        return week
+
+    async def aweek(self, restaurant_id: int) -> WeekPrices:
+        week = await self.cache.aget("prices", restaurant_id)
+        if week is MISSING:
+            week = compile_price_rules(await self.repo.afindPriceRules(restaurant_id))
+            await self.cache.aset("prices", restaurant_id, week)
+        return week
+
+    def _seat_price(self, week: WeekPrices, start_dt: datetime) -> Decimal:
+        price = week[start_dt.weekday() * SLOTS_PER_DAY + _slot(start_dt.time())]
+        return self.seat_price if price is None else price
+
+
+def default_pricing_policy() -> RuleBasedPricingPolicy:
+    """
+    The policy bookings use, with settings.PRICING["SEAT_PRICE"] where
+    no price rule applies.
+    """
+    conf = getattr(settings, "PRICING", {})
+    return RuleBasedPricingPolicy(seat_price=Decimal(str(conf.get("SEAT_PRICE", 10))))
@@ -1,9 +1,45 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Optional
+from typing import Collection, Iterable, List, Optional
+
+from asgiref.sync import sync_to_async
 
 from reservations.repos.repository import ReservationRepo
+from reservations.services.interval_index import reservation_index
 from restaurant.models import Table
+from restaurant.repos.repository import RestaurantRepo
+
+
+def fitting_tables(candidates: Iterable[Table], party_size: int) -> List[Table]:
+    """
+    The candidates that can seat the party under RULE1, smallest first:
+    an odd party is rounded up to the next even seat count unless
+    some candidate has exactly `party_size` seats. Tables that are not
+    `is_available` are never candidates.
+    """
+    candidates = [t for t in candidates if t.is_available]
+
+    # apply RULE1: adjust required seats
+    required = party_size
+    # if odd and not equal to any table size exactly, round up to next even
+    if party_size % 2 == 1:
+        # see if any table has exact odd capacity == party_size
+        if not any(t.seats == party_size for t in candidates):
+            required += 1
+
+    # tables with capacity >= required; sorted() keeps candidate order on ties
+    suitable = [t for t in candidates if t.seats >= required]
+    return sorted(suitable, key=lambda t: t.seats)
+
+
+def select_smallest_fitting_table(
+    candidates: Iterable[Table], party_size: int
+) -> Optional[Table]:
+    """
+    Pick the smallest free table for the party, applying RULE1.
+    """
+    suitable = fitting_tables(candidates, party_size)
+    return suitable[0] if suitable else None
 
 
 class TableSelectionStrategy(ABC):
@@ -11,6 +47,10 @@ class TableSelectionStrategy(ABC):
     Strategy interface for selecting a table given a restaurant and time slot.
     """
 
+    # True when selecting may move other reservations; callers must then
+    # select and book in one transaction
+    moves_reservations = False
+
     @abstractmethod
     def find_by_restaurant_and_time(
         self,
@@ -18,12 +58,31 @@ class TableSelectionStrategy(ABC):
         start_dt: datetime,
         end_dt: datetime,
         party_size: int,
+        exclude_table_ids: Collection[int] = (),
     ) -> Optional[Table]:
         """
         Return a suitable Table or None if no table is available.
+        Tables in `exclude_table_ids` (e.g. lost to a concurrent booking)
+        must not be returned.
         """
         pass
 
+    async def afind_by_restaurant_and_time(
+        self,
+        restaurant_id: int,
+        start_dt: datetime,
+        end_dt: datetime,
+        party_size: int,
+        exclude_table_ids: Collection[int] = (),
+    ) -> Optional[Table]:
+        """
+        Async find_by_restaurant_and_time. Runs the sync lookup in a
+        worker thread unless a strategy overrides it.
+        """
+        return await sync_to_async(self.find_by_restaurant_and_time)(
+            restaurant_id, start_dt, end_dt, party_size, exclude_table_ids
+        )
+
 
 class DefaultTableSelectionStrategy(TableSelectionStrategy):
     """
@@ -31,8 +90,9 @@ class DefaultTableSelectionStrategy(TableSelectionStrategy):
     applying RULE1: no odd seats unless party_size equals table capacity.
     """
 
-    def __init__(self, repo: ReservationRepo):
+    def __init__(self, repo: ReservationRepo, table_repo: RestaurantRepo = None):
         self.repo = repo
+        self.table_repo = table_repo or RestaurantRepo()
 
     def find_by_restaurant_and_time(
         self,
@@ -40,29 +100,89 @@ class DefaultTableSelectionStrategy(TableSelectionStrategy):
         start_dt: datetime,
         end_dt: datetime,
         party_size: int,
+        exclude_table_ids: Collection[int] = (),
     ) -> Optional[Table]:
         # fetch all tables in restaurant
-        all_tables = Table.objects.filter(restaurant_id=restaurant_id)
+        all_tables = self.table_repo.findTablesByRestaurant(restaurant_id)
         # fetch occupied tables in interval
         occupied = self.repo.findByRestaurantAndInterval(
             restaurant_id, start_dt, end_dt
         )
         occupied_ids = {r.table_id for r in occupied}
+        occupied_ids.update(exclude_table_ids)
 
         # candidates are free tables
         candidates = [t for t in all_tables if t.id not in occupied_ids]
 
-        # apply RULE1: adjust required seats
-        required = party_size
-        # if odd and not equal to any table size exactly, round up to next even
-        if party_size % 2 == 1:
-            # see if any table has exact odd capacity == party_size
-            if not any(t.seats == party_size for t in candidates):
-                required += 1
+        return select_smallest_fitting_table(candidates, party_size)
+
+    async def afind_by_restaurant_and_time(
+        self,
+        restaurant_id: int,
+        start_dt: datetime,
+        end_dt: datetime,
+        party_size: int,
+        exclude_table_ids: Collection[int] = (),
+    ) -> Optional[Table]:
+        all_tables = await self.table_repo.afindTablesByRestaurant(restaurant_id)
+        occupied = await self.repo.afindByRestaurantAndInterval(
+            restaurant_id, start_dt, end_dt
+        )
+        occupied_ids = {r.table_id for r in occupied}
+        occupied_ids.update(exclude_table_ids)
+
+        candidates = [t for t in all_tables if t.id not in occupied_ids]
+
+        return select_smallest_fitting_table(candidates, party_size)
+
+
+class IntervalIndexTableSelectionStrategy(TableSelectionStrategy):
+    """
+    Selects tables from the in-memory ReservationIntervalIndex, so a warm
+    lookup costs a bisect per table and one indexed EXISTS confirming
+    the chosen table.
+
+    A restaurant's index is built on its first lookup; intervals the index
+    cannot answer are delegated to DefaultTableSelectionStrategy. The
+    index only sees this process's bookings, so when the database
+    disagrees with it (another worker booked the chosen table, or freed
+    one when the index has none) the restaurant is reloaded on its next
+    lookup and the database's answer is returned.
+    """
 
-        # pick smallest table with capacity >= required
-        suitable = [t for t in candidates if t.seats >= required]
-        if not suitable:
-            return None
+    def __init__(self, repo: ReservationRepo, index=None):
+        self.repo = repo
+        self.index = index or reservation_index
+        self.fallback = DefaultTableSelectionStrategy(repo=repo)
 
-        return min(suitable, key=lambda t: t.seats)
+    def find_by_restaurant_and_time(
+        self,
+        restaurant_id: int,
+        start_dt: datetime,
+        end_dt: datetime,
+        party_size: int,
+        exclude_table_ids: Collection[int] = (),
+    ) -> Optional[Table]:
+        if not self.index.is_warm(restaurant_id):
+            self.index.warm(restaurant_id)
+
+        candidates = self.index.free_tables(restaurant_id, start_dt, end_dt)
+        if candidates is None:
+            return self.fallback.find_by_restaurant_and_time(
+                restaurant_id, start_dt, end_dt, party_size, exclude_table_ids
+            )
+
+        candidates = [t for t in candidates if t.id not in exclude_table_ids]
+        chosen = select_smallest_fitting_table(candidates, party_size)
+        if chosen is not None and not self.repo.isTableBooked(
+            chosen.id, start_dt, end_dt
+        ):
+            return chosen
+
+        # booked elsewhere, or maybe freed elsewhere: ask the database
+        found = self.fallback.find_by_restaurant_and_time(
+            restaurant_id, start_dt, end_dt, party_size, exclude_table_ids
+        )
+        if found != chosen:
+            self.index.invalidate(restaurant_id)
+        return found
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent after commit with `restaurant_ids`: restaurants whose tables were
+# written in bulk. Writes that bypass Model.save() (bulk_create, queryset
+# updates) must send it themselves.
+tables_changed = Signal()
@@ -1,9 +1,41 @@
+import io
+import json
+import os
+import tempfile
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
 from django.test import TestCase
 
-from restaurant.models import Restaurant, Table
+from reservations.models import Reservation, ReservationStatus
+from reservations.repos.repository import ReservationRepo
+from reservations.services.interval_index import (
+    ReservationIntervalIndex,
+    reservation_index,
+)
+from restaurant.models import PriceRule, Restaurant, Table, Weekday
+from restaurant.repos.cache import (
+    CachedRestaurantRepo,
+    RestaurantMetadataCache,
+    TableSnapshot,
+    restaurant_metadata_cache,
+)
 from restaurant.repos.repository import RestaurantRepo
-from restaurant.services.price_policy import DefaultPricingPolicy
-from restaurant.services.table_selection import DefaultTableSelectionStrategy
+from restaurant.services.importer import RestaurantImporter, read_rows
+from restaurant.services.price_policy import (
+    DefaultPricingPolicy,
+    PricingPolicy,
+    RuleBasedPricingPolicy,
+)
+from restaurant.services.table_selection import (
+    DefaultTableSelectionStrategy,
+    IntervalIndexTableSelectionStrategy,
+)
+from utils.lru_cache import MISSING
 
 
 class RestaurantRepoTests(TestCase):
@@ -50,6 +82,95 @@ class DefaultPricingPolicyTests(TestCase):
         self.assertEqual(price, (5 - 1) * self.seat_price)
 
 
+class RuleBasedPricingPolicyTests(TestCase):
+    def setUp(self):
+        restaurant_metadata_cache.clear()
+        self.addCleanup(restaurant_metadata_cache.clear)
+        self.restaurant = Restaurant.objects.create(name="Bistro")
+        self.table = Table.objects.create(restaurant=self.restaurant, seats=6, number=1)
+        self.policy = RuleBasedPricingPolicy(seat_price=Decimal("10"))
+        today = date.today()
+        self.friday = today + timedelta(days=(4 - today.weekday()) % 7 or 7)
+
+    def _rule(self, **fields):
+        return PriceRule.objects.create(restaurant=self.restaurant, **fields)
+
+    def _at(self, day, hour, minute=0):
+        return datetime.combine(day, time(hour, minute))
+
+    def test_without_rules_matches_default_policy(self):
+        default = DefaultPricingPolicy(seat_price=10)
+        self.assertEqual(
+            self.policy.calculate(self.table, 4, self._at(self.friday, 19)),
+            default.calculate(self.table, 4),
+        )
+        self.assertEqual(self.policy.calculate(self.table, 4), Decimal("50"))
+
+    def test_highest_priority_rule_for_the_slot_wins(self):
+        self._rule(start_time=time(18), end_time=time(22), seat_price=Decimal("12"))
+        self._rule(
+            weekday=Weekday.FRIDAY,
+            start_time=time(19),
+            seat_price=Decimal("15"),
+            priority=1,
+        )
+        thursday = self.friday - timedelta(days=1)
+        cases = [
+            (self._at(thursday, 17, 30), Decimal("50")),
+            (self._at(thursday, 18), Decimal("60")),
+            (self._at(thursday, 21, 59), Decimal("60")),
+            (self._at(thursday, 22), Decimal("50")),
+            (self._at(self.friday, 18, 30), Decimal("60")),
+            (self._at(self.friday, 19), Decimal("75")),
+            (self._at(self.friday, 23, 30), Decimal("75")),
+        ]
+        for start, cost in cases:
+            with self.subTest(start=start):
+                self.assertEqual(self.policy.calculate(self.table, 4, start), cost)
+
+    def test_quote_day_matches_calculate(self):
+        self._rule(start_time=time(11, 30), end_time=time(14), seat_price=Decimal("8"))
+        self._rule(weekday=self.friday.weekday(), seat_price=Decimal("11.50"))
+        small = Table.objects.create(restaurant=self.restaurant, seats=4, number=2)
+        tables = [self.table, small]
+
+        with self.assertNumQueries(1):
+            quotes = self.policy.quote_day(self.restaurant.id, self.friday, tables, 4)
+        expected = PricingPolicy.quote_day(
+            self.policy, self.restaurant.id, self.friday, tables, 4
+        )
+        self.assertEqual(quotes, expected)
+        self.assertEqual(quotes[small.id][24], Decimal("34.50"))
+
+    def test_compiled_rules_are_cached_until_a_rule_changes(self):
+        rule = self._rule(seat_price=Decimal("12"))
+        start = self._at(self.friday, 19)
+        self.assertEqual(self.policy.calculate(self.table, 4, start), Decimal("60"))
+        with self.assertNumQueries(0):
+            self.policy.calculate(self.table, 4, start)
+
+        rule.seat_price = Decimal("20")
+        with self.captureOnCommitCallbacks(execute=True):
+            rule.save()
+        self.assertEqual(self.policy.calculate(self.table, 4, start), Decimal("100"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rule.delete()
+        self.assertEqual(self.policy.calculate(self.table, 4, start), Decimal("50"))
+
+    def test_rule_times_must_fall_on_the_half_hour(self):
+        for fields in (
+            {"start_time": time(18, 15)},
+            {"start_time": time(20), "end_time": time(18)},
+        ):
+            with self.subTest(fields=fields):
+                rule = PriceRule(
+                    restaurant=self.restaurant, seat_price=Decimal("1"), **fields
+                )
+                with self.assertRaises(ValidationError):
+                    rule.full_clean()
+
+
 class DefaultTableSelectionStrategyTests(TestCase):
 
     def setUp(self):
@@ -132,3 +253,281 @@ class DefaultTableSelectionStrategyTests(TestCase):
             self.restaurant.id, self.start, self.end, party_size=2
         )
         self.assertIsNone(chosen)
+
+
+class IntervalIndexTableSelectionStrategyTests(TestCase):
+    def setUp(self):
+        self.index = reservation_index
+        self.index.invalidate()
+        self.addCleanup(self.index.invalidate)
+
+        self.user = get_user_model().objects.create_user(username="u", password="p")
+        self.restaurant = Restaurant.objects.create(name="Testaurant")
+        self.t4 = Table.objects.create(restaurant=self.restaurant, seats=4, number=1)
+        self.t6 = Table.objects.create(restaurant=self.restaurant, seats=6, number=2)
+
+        self.repo = ReservationRepo()
+        self.start = datetime.now() + timedelta(days=1)
+        self.end = self.start + timedelta(hours=2)
+        self.svc = IntervalIndexTableSelectionStrategy(repo=self.repo)
+
+    def _book(self, table):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.repo.createReservation(
+                self.user, table, 4, 30, self.start, self.end
+            )
+
+    def test_warm_lookup_only_confirms_the_chosen_table(self):
+        self.assertEqual(
+            self.svc.find_by_restaurant_and_time(
+                self.restaurant.id, self.start, self.end, party_size=4
+            ),
+            self.t4,
+        )
+        with self.assertNumQueries(1):
+            chosen = self.svc.find_by_restaurant_and_time(
+                self.restaurant.id, self.start, self.end, party_size=4
+            )
+        self.assertEqual(chosen, self.t4)
+
+    def test_booking_and_cancel_keep_index_current(self):
+        self.svc.find_by_restaurant_and_time(
+            self.restaurant.id, self.start, self.end, party_size=4
+        )
+        reservation = self._book(self.t4)
+
+        with self.assertNumQueries(1):
+            chosen = self.svc.find_by_restaurant_and_time(
+                self.restaurant.id, self.start, self.end, party_size=4
+            )
+        self.assertEqual(chosen, self.t6)
+
+        reservation.status = ReservationStatus.CANCELLED
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation.save(update_fields=["status"])
+
+        chosen = self.svc.find_by_restaurant_and_time(
+            self.restaurant.id, self.start, self.end, party_size=4
+        )
+        self.assertEqual(chosen, self.t4)
+
+    def test_table_booked_by_another_worker_is_not_chosen(self):
+        self.index.warm(self.restaurant.id)
+        # no on_commit callbacks run: this process's index never hears of it
+        self.repo.createReservation(self.user, self.t4, 4, 30, self.start, self.end)
+
+        chosen = self.svc.find_by_restaurant_and_time(
+            self.restaurant.id, self.start, self.end, party_size=4
+        )
+        self.assertEqual(chosen, self.t6)
+        self.assertFalse(self.index.is_warm(self.restaurant.id))
+
+    def test_table_freed_by_another_worker_is_offered(self):
+        reservation = self._book(self.t4)
+        self._book(self.t6)
+        self.index.warm(self.restaurant.id)
+        Reservation.objects.filter(pk=reservation.pk).update(
+            status=ReservationStatus.CANCELLED
+        )
+
+        # the index has no free table; the database has one
+        chosen = self.svc.find_by_restaurant_and_time(
+            self.restaurant.id, self.start, self.end, party_size=4
+        )
+        self.assertEqual(chosen, self.t4)
+        self.assertFalse(self.index.is_warm(self.restaurant.id))
+
+    def test_restaurant_is_reloaded_after_max_age(self):
+        index = ReservationIntervalIndex(max_age=0)
+        index.warm(self.restaurant.id)
+        self.assertFalse(index.is_warm(self.restaurant.id))
+        self.assertIsNone(index.free_tables(self.restaurant.id, self.start, self.end))
+
+    def test_cold_index_loads_existing_reservations(self):
+        self._book(self.t4)
+        self.index.invalidate()
+
+        chosen = self.svc.find_by_restaurant_and_time(
+            self.restaurant.id, self.start, self.end, party_size=4
+        )
+        self.assertEqual(chosen, self.t6)
+
+    def test_intervals_before_horizon_fall_back_to_db(self):
+        self.index.warm(self.restaurant.id)
+        past_start = self.start - timedelta(days=2)
+        chosen = self.svc.find_by_restaurant_and_time(
+            self.restaurant.id, past_start, past_start + timedelta(hours=1), 4
+        )
+        self.assertEqual(chosen, self.t4)
+
+
+class CachedRestaurantRepoTests(TestCase):
+    def setUp(self):
+        restaurant_metadata_cache.clear()
+        self.addCleanup(restaurant_metadata_cache.clear)
+        self.repo = CachedRestaurantRepo()
+        self.restaurant = Restaurant.objects.create(name="Cached")
+        self.table = Table.objects.create(restaurant=self.restaurant, seats=4, number=1)
+
+    def test_steady_state_reads_run_no_queries(self):
+        self.repo.findById(self.restaurant.id)
+        self.repo.findTablesByRestaurant(self.restaurant.id)
+
+        with self.assertNumQueries(0):
+            restaurant = self.repo.findById(self.restaurant.id)
+            tables = self.repo.findTablesByRestaurant(self.restaurant.id)
+
+        self.assertEqual(restaurant.name, "Cached")
+        self.assertEqual(
+            tables, (TableSnapshot(self.table.id, self.restaurant.id, 1, 4, True),)
+        )
+
+    def test_missing_restaurant_is_not_cached(self):
+        self.assertIsNone(self.repo.findById(9999))
+        with self.assertNumQueries(1):
+            self.repo.findById(9999)
+
+    def test_table_changes_invalidate_snapshots(self):
+        self.repo.findTablesByRestaurant(self.restaurant.id)
+
+        self.table.seats = 6
+        self.table.save()
+        Table.objects.create(restaurant=self.restaurant, seats=8, number=2)
+
+        seats = [t.seats for t in self.repo.findTablesByRestaurant(self.restaurant.id)]
+        self.assertEqual(seats, [6, 8])
+
+    def test_restaurant_rename_invalidates_snapshot(self):
+        self.repo.findById(self.restaurant.id)
+        self.restaurant.name = "Renamed"
+        self.restaurant.save()
+        self.assertEqual(self.repo.findById(self.restaurant.id).name, "Renamed")
+
+    def test_changes_reach_other_workers_through_the_shared_version(self):
+        # two workers' caches sharing the default cache as second tier
+        saving, other = (
+            RestaurantMetadataCache(maxsize=16, ttl=300, shared_alias="default")
+            for _ in range(2)
+        )
+        self.addCleanup(cache.clear)
+        other.set("tables", self.restaurant.id, ("stale",))
+        self.assertEqual(other.get("tables", self.restaurant.id), ("stale",))
+
+        saving.invalidate(self.restaurant.id)
+        self.assertIs(other.get("tables", self.restaurant.id), MISSING)
+        saving.set("tables", self.restaurant.id, ("fresh",))
+        self.assertEqual(other.get("tables", self.restaurant.id), ("fresh",))
+
+    def test_snapshot_converts_to_table_without_query(self):
+        snapshot = self.repo.findTablesByRestaurant(self.restaurant.id)[0]
+        with self.assertNumQueries(0):
+            table = snapshot.to_model()
+        self.assertEqual(table, self.table)
+        self.assertEqual(table.restaurant_id, self.restaurant.id)
+
+
+class RestaurantImporterTests(TestCase):
+    def setUp(self):
+        restaurant_metadata_cache.clear()
+        self.addCleanup(restaurant_metadata_cache.clear)
+        self.alpha = Restaurant.objects.create(name="Alpha")
+        Table.objects.create(restaurant=self.alpha, number=1, seats=4)
+
+    def _import(self, text, file_format="csv", **kwargs):
+        importer = RestaurantImporter(**kwargs)
+        with self.captureOnCommitCallbacks(execute=True):
+            return importer.run(read_rows(io.StringIO(text), file_format))
+
+    def test_creates_restaurants_and_upserts_tables_in_batches(self):
+        CachedRestaurantRepo().findTablesByRestaurant(self.alpha.id)
+
+        report = self._import(
+            "restaurant,number,seats,is_available\n"
+            "Alpha,1,6,false\n"
+            "Alpha,2,8,\n"
+            "Beta,1,4,true\n",
+            batch_size=2,
+        )
+
+        self.assertEqual((report.tables, report.restaurants_created), (3, 1))
+        self.assertEqual(report.errors, [])
+        self.assertEqual(
+            list(
+                Table.objects.order_by("restaurant_id", "number").values_list(
+                    "restaurant__name", "number", "seats", "is_available"
+                )
+            ),
+            [("Alpha", 1, 6, False), ("Alpha", 2, 8, True), ("Beta", 1, 4, True)],
+        )
+        # the bulk write dropped the cached snapshot
+        seats = [
+            t.seats
+            for t in CachedRestaurantRepo().findTablesByRestaurant(self.alpha.id)
+        ]
+        self.assertEqual(seats, [6, 8])
+
+    def test_rejects_invalid_and_duplicate_rows(self):
+        report = self._import(
+            "restaurant,number,seats\n"
+            "Gamma,1,12\n"
+            "Gamma,x,4\n"
+            ",1,4\n"
+            "Gamma,2,4\n"
+            "Gamma,2,6\n"
+        )
+
+        self.assertEqual([line for line, _ in report.errors], [2, 3, 4, 6])
+        self.assertIn("seats", report.errors[0][1])
+        self.assertIn("line 5", report.errors[3][1])
+        self.assertEqual(
+            list(Table.objects.filter(restaurant__name="Gamma").values_list("seats")),
+            [(4,)],
+        )
+
+    def test_unreadable_ndjson_lines_are_reported_and_skipped(self):
+        report = self._import(
+            "\n".join(
+                [
+                    json.dumps({"name": "Zeta", "tables": [{"number": 1, "seats": 4}]}),
+                    '{"name": "Eta", "tables": [',
+                    json.dumps(["Theta"]),
+                    json.dumps({"name": "Iota", "tables": [{"number": 1, "seats": 6}]}),
+                ]
+            ),
+            file_format="ndjson",
+            batch_size=1,
+        )
+
+        self.assertEqual([line for line, _ in report.errors], [2, 3])
+        self.assertIn("invalid JSON", report.errors[0][1])
+        self.assertEqual((report.rows, report.tables), (4, 2))
+        self.assertEqual(
+            set(Restaurant.objects.values_list("name", flat=True)),
+            {"Alpha", "Zeta", "Iota"},
+        )
+
+    def test_dry_run_writes_nothing(self):
+        report = self._import(
+            json.dumps([{"name": "Delta", "tables": [{"number": 1, "seats": 6}]}]),
+            file_format="json",
+            dry_run=True,
+        )
+        self.assertEqual((report.tables, report.restaurants_created), (1, 1))
+        self.assertFalse(Restaurant.objects.filter(name="Delta").exists())
+
+    def test_command_imports_ndjson_and_fails_on_rejected_rows(self):
+        lines = [
+            {"name": "Alpha", "tables": [{"number": 2, "seats": 10}]},
+            {"name": "Epsilon", "tables": [{"number": 1, "seats": 3}]},
+        ]
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson", delete=False) as handle:
+            handle.write("\n".join(json.dumps(line) for line in lines))
+        self.addCleanup(os.remove, handle.name)
+
+        out, err = io.StringIO(), io.StringIO()
+        with self.assertRaisesMessage(CommandError, "1 rows were rejected"):
+            call_command("import_restaurants", handle.name, stdout=out, stderr=err)
+
+        self.assertIn("Imported 1 tables", out.getvalue())
+        self.assertIn("line 2: seats", err.getvalue())
+        self.assertTrue(Table.objects.filter(restaurant=self.alpha, number=2).exists())
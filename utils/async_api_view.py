@@ -0,0 +1,45 @@
+from inspect import isawaitable
+
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers may be coroutines (`async def post(...)`).
+
+    DRF 3.15 only dispatches synchronously, so this mirrors
+    APIView.dispatch with the handler awaited. Django marks the view as
+    async (every handler except `options` must then be `async def`), so
+    under ASGI it runs on the event loop without a thread hop.
+
+    Authentication, permission and throttle checks still run
+    synchronously on the event loop: use authentication classes that do
+    not query the database, such as StatelessJWTAuthentication.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            self.initial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,20 @@
+import math
+from typing import Sequence
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """
+    Returns the `pct`-th percentile of `values` (nearest-rank method).
+
+    Args:
+        values (Sequence[float]): Samples, in any order.
+        pct (float): Percentile between 0 and 100.
+
+    Returns:
+        float: The sample at that rank, or 0.0 when there are no samples.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered)) - 1
+    return ordered[max(0, min(len(ordered) - 1, rank))]
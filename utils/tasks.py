@@ -0,0 +1,148 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Sequence
+
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Task:
+    """
+    A function that can run in the background with .delay(*args).
+
+    Tasks are addressed by their dotted path, so arguments must be
+    JSON-serialisable for the Celery backend.
+    """
+
+    def __init__(self, func: Callable):
+        self.func = func
+        self.name = f"{func.__module__}.{func.__qualname__}"
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args):
+        return self.func(*args)
+
+    def delay(self, *args) -> None:
+        get_backend().submit(self.name, args)
+
+
+def task(func: Callable) -> Task:
+    return Task(func)
+
+
+def run_task(name: str, args: Sequence) -> None:
+    """
+    Run a task by dotted path; the entry point of every backend.
+    """
+    import_string(name)(*args)
+
+
+class SyncBackend:
+    """
+    Runs tasks inline, in the caller's thread; for tests and scripts.
+    """
+
+    inline = True
+
+    def submit(self, name: str, args: Sequence) -> None:
+        run_task(name, args)
+
+    def shutdown(self) -> None:
+        pass
+
+
+class ThreadPoolBackend:
+    """
+    Runs tasks on an in-process thread pool, for local runs without a
+    broker. Queued tasks are lost if the process dies.
+
+    Each worker thread holds its own database connection, closed after
+    every task so idle threads do not keep connections open.
+    """
+
+    inline = False
+
+    def __init__(self, max_workers: int = 2):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="tasks"
+        )
+
+    def submit(self, name: str, args: Sequence) -> None:
+        self.executor.submit(self._run, name, args)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
+
+    @staticmethod
+    def _run(name: str, args: Sequence) -> None:
+        try:
+            run_task(name, args)
+        except Exception:
+            logger.exception("Task %s failed", name)
+        finally:
+            connections.close_all()
+
+
+class CeleryBackend:
+    """
+    Sends tasks to Celery workers through CELERY_BROKER_URL.
+
+    Start a worker with `celery -A config.celery worker`. Celery is an
+    optional dependency, imported only when this backend is used.
+    """
+
+    inline = False
+    task_name = "utils.tasks.run_task"
+
+    def __init__(self, broker_url: str, result_backend: Optional[str] = None):
+        from celery import Celery
+
+        self.app = Celery("booking", broker=broker_url, backend=result_backend)
+        self.app.conf.update(task_serializer="json", accept_content=["json"])
+        self.runner = self.app.task(name=self.task_name, ignore_result=True)(run_task)
+
+    def submit(self, name: str, args: Sequence) -> None:
+        self.runner.delay(name, list(args))
+
+    def shutdown(self) -> None:
+        pass
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def build_backend():
+    conf = getattr(settings, "TASKS", {})
+    kind = conf.get("BACKEND", "thread")
+    if kind == "sync":
+        return SyncBackend()
+    if kind == "thread":
+        return ThreadPoolBackend(max_workers=conf.get("THREADS", 2))
+    if kind == "celery":
+        return CeleryBackend(
+            settings.CELERY_BROKER_URL,
+            getattr(settings, "CELERY_RESULT_BACKEND", None),
+        )
+    raise ValueError(f"Unknown TASKS backend {kind!r}.")
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = build_backend()
+    return _backend
+
+
+def set_backend(backend) -> None:
+    """
+    Replace the process-wide backend, e.g. with SyncBackend in tests.
+    """
+    global _backend
+    _backend = backend
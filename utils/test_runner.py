@@ -0,0 +1,14 @@
+from django.test.runner import DiscoverRunner
+
+from utils.tasks import SyncBackend, set_backend
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Runs background tasks inline, so their writes happen inside each
+    test's transaction and are visible to its assertions.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        set_backend(SyncBackend())